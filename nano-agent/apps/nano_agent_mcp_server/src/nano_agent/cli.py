@@ -11,6 +11,7 @@ import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
+from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from pathlib import Path
 import os
@@ -21,7 +22,12 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-from .modules.nano_agent import prompt_nano_agent, _execute_nano_agent
+from .modules.nano_agent import (
+    prompt_nano_agent,
+    _execute_nano_agent,
+    _execute_nano_agent_batch_async,
+    build_batch_request
+)
 from .modules.data_types import PromptNanoAgentRequest
 from .modules.constants import (
     DEFAULT_MODEL,
@@ -187,6 +193,101 @@ def run(
                 expand=False
             ))
 
+@app.command()
+def batch(
+    prompts_file: Path = typer.Argument(..., help="JSONL file: one prompt string or {\"agentic_prompt\", \"model\", \"provider\"} object per line"),
+    model: str = typer.Option(DEFAULT_MODEL, help="Default model for lines that don't specify one"),
+    provider: str = typer.Option(DEFAULT_PROVIDER, help="Default provider for lines that don't specify one"),
+    concurrency: int = typer.Option(None, help="Override the per-provider concurrency limit"),
+    output: Path = typer.Option(None, help="Write per-prompt results as JSONL to this file"),
+    verbose: bool = typer.Option(False, help="Show each prompt's result")
+):
+    """Run many prompts from a JSONL file concurrently."""
+    if not prompts_file.exists():
+        console.print(f"[red]Error: File not found: {prompts_file}[/red]")
+        sys.exit(1)
+    
+    prompts = []
+    for line_number, line in enumerate(prompts_file.read_text(encoding="utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            prompts.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            console.print(f"[red]Error: Invalid JSON on line {line_number}: {e}[/red]")
+            sys.exit(1)
+    
+    if not prompts:
+        console.print("[red]Error: No prompts found[/red]")
+        sys.exit(1)
+    
+    try:
+        request = build_batch_request(prompts, model, provider, concurrency)
+    except Exception as e:
+        console.print(f"[red]Error: Invalid batch: {e}[/red]")
+        sys.exit(1)
+    
+    for item_provider, item_model in sorted({(p.provider, p.model) for p in request.prompts}):
+        check_provider_setup(item_provider, item_model)
+    
+    console.print(Panel(
+        f"[cyan]Running Nano Agent Batch[/cyan]\nPrompts: {len(request.prompts)}\nFile: {prompts_file}",
+        expand=False
+    ))
+    
+    async def on_item_complete(item, completed, total):
+        mark = "[green]✓[/green]" if item.success else "[red]✗[/red]"
+        console.print(f"{mark} [{completed}/{total}] #{item.index + 1} in {item.execution_time_seconds:.2f}s")
+    
+    response = asyncio.run(_execute_nano_agent_batch_async(request, on_item_complete=on_item_complete))
+    
+    table = Table(title="📋 Batch Results")
+    table.add_column("#", justify="right")
+    table.add_column("Model")
+    table.add_column("Status")
+    table.add_column("Wait (s)", justify="right")
+    table.add_column("Run (s)", justify="right")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Cost", justify="right")
+    for item, prompt_request in zip(response.results, request.prompts):
+        usage = item.metadata.get("token_usage", {})
+        table.add_row(
+            str(item.index + 1),
+            prompt_request.model,
+            "[green]ok[/green]" if item.success else "[red]failed[/red]",
+            f"{item.queue_wait_seconds or 0:.2f}",
+            f"{item.execution_time_seconds or 0:.2f}",
+            f"{usage.get('total_tokens', 0):,}",
+            f"${usage.get('total_cost', 0):.4f}"
+        )
+    console.print(table)
+    
+    totals = response.token_usage
+    console.print(
+        f"\n[bold]{response.succeeded}/{len(response.results)} succeeded[/bold] in "
+        f"{response.execution_time_seconds:.2f}s "
+        f"(sum of runs {response.metadata['sum_item_seconds']:.2f}s) | "
+        f"Tokens: {totals.get('total_tokens', 0):,} | Cost: ${totals.get('total_cost', 0):.4f}"
+    )
+    
+    if verbose:
+        for item in response.results:
+            console.print(Panel(
+                f"[green]{item.result}[/green]" if item.success else f"[red]{item.error}[/red]",
+                title=f"#{item.index + 1}",
+                border_style="green" if item.success else "red",
+                expand=False
+            ))
+    
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            for item in response.results:
+                f.write(json.dumps(item.model_dump(mode="json")) + "\n")
+        console.print(f"[dim]Results written to {output}[/dim]")
+    
+    if not response.success:
+        sys.exit(1)
+
 @app.command()
 def demo():
     """Run a demo showing various agent capabilities."""
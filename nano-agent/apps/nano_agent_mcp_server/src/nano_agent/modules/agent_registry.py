@@ -0,0 +1,290 @@
+"""
+Process-wide Agent Registry for Nano Agent.
+
+Building an agent means validating the provider setup, filtering model
+settings, collecting tools and (for OpenAI-compatible endpoints) constructing
+a fresh AsyncOpenAI client. None of that changes between requests for the
+same provider/model, so the registry builds each agent once and shares it
+across concurrent runs.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from agents import Agent
+
+from .constants import (
+    AVAILABLE_MODELS,
+    DEFAULT_TEMPERATURE,
+    MAX_TOKENS,
+    NANO_AGENT_SYSTEM_PROMPT,
+    PROVIDER_REQUIREMENTS,
+)
+from .nano_agent_tools import get_nano_agent_tools
+from .provider_config import ProviderConfig
+
+logger = logging.getLogger(__name__)
+
+# Environment variables that influence how an agent/client is built per provider.
+# A change to any of these produces a new registry key, so rotated keys are
+# picked up without a server restart.
+PROVIDER_CREDENTIAL_ENV = {
+    "openai": ("OPENAI_API_KEY",),
+    "anthropic": ("ANTHROPIC_API_KEY", "OPENAI_API_KEY"),
+    "ollama": ("OPENAI_API_KEY",),
+    "openrouter": ("OPENROUTER_API_KEY", "OPENAI_API_KEY"),
+}
+
+
+@dataclass(frozen=True)
+class AgentKey:
+    """Identity of a cached agent."""
+    provider: str
+    model: str
+    settings: Tuple[Tuple[str, Any], ...]
+    credentials_fingerprint: str
+
+    @property
+    def base(self) -> Tuple[str, str, Tuple[Tuple[str, Any], ...]]:
+        """Key without the credential fingerprint."""
+        return (self.provider, self.model, self.settings)
+
+
+@dataclass
+class AgentRegistryEntry:
+    """A built agent along with bookkeeping about its construction."""
+    agent: Agent
+    built_at: float
+    build_seconds: float
+    hits: int = 0
+
+
+@dataclass
+class AgentRegistryStats:
+    """Counters describing registry effectiveness."""
+    hits: int = 0
+    misses: int = 0
+    builds: int = 0
+    invalidations: int = 0
+    total_build_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert stats to dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "builds": self.builds,
+            "invalidations": self.invalidations,
+            "total_build_seconds": round(self.total_build_seconds, 6),
+        }
+
+
+def default_base_settings() -> Dict[str, Any]:
+    """Base model settings used for every nano agent."""
+    return {
+        "temperature": DEFAULT_TEMPERATURE,
+        "max_tokens": MAX_TOKENS
+    }
+
+
+def _credentials_fingerprint(provider: str) -> str:
+    """Hash the credential env vars relevant to a provider.
+
+    Only a digest is kept so the registry never stores raw keys.
+    """
+    names = set(PROVIDER_CREDENTIAL_ENV.get(provider, ()))
+    required = PROVIDER_REQUIREMENTS.get(provider)
+    if required:
+        names.add(required)
+
+    digest = hashlib.sha256()
+    for name in sorted(names):
+        digest.update(name.encode())
+        digest.update(b"=")
+        digest.update((os.getenv(name) or "").encode())
+        digest.update(b";")
+    return digest.hexdigest()[:16]
+
+
+class AgentRegistry:
+    """Thread-safe cache of fully-built agents keyed by (provider, model, settings)."""
+
+    def __init__(self, available_models: Optional[dict] = None, provider_requirements: Optional[dict] = None):
+        """Initialize the registry.
+
+        Args:
+            available_models: Models per provider used for validation (defaults to AVAILABLE_MODELS)
+            provider_requirements: API key requirements per provider (defaults to PROVIDER_REQUIREMENTS)
+        """
+        self.available_models = available_models if available_models is not None else AVAILABLE_MODELS
+        self.provider_requirements = provider_requirements if provider_requirements is not None else PROVIDER_REQUIREMENTS
+        self._entries: Dict[AgentKey, AgentRegistryEntry] = {}
+        self._build_locks: Dict[AgentKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.stats = AgentRegistryStats()
+
+    def make_key(self, provider: str, model: str, base_settings: Optional[Dict[str, Any]] = None) -> AgentKey:
+        """Build the registry key for a provider/model/settings combination."""
+        settings = base_settings if base_settings is not None else default_base_settings()
+        return AgentKey(
+            provider=provider,
+            model=model,
+            settings=tuple(sorted(settings.items())),
+            credentials_fingerprint=_credentials_fingerprint(provider),
+        )
+
+    def get_agent(
+        self,
+        provider: str,
+        model: str,
+        base_settings: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Optional[Agent], Optional[str]]:
+        """Return a cached agent, building it on first use.
+
+        Args:
+            provider: Provider name
+            model: Model identifier
+            base_settings: Base settings dictionary (defaults to default_base_settings())
+
+        Returns:
+            Tuple of (agent, error_message). Exactly one of them is None.
+        """
+        key = self.make_key(provider, model, base_settings)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.hits += 1
+                self.stats.hits += 1
+                return entry.agent, None
+            self.stats.misses += 1
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # Build outside the registry lock so other keys are not blocked,
+        # but only once per key even under concurrent misses.
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    # Another caller finished the build while we waited
+                    entry.hits += 1
+                    self.stats.misses -= 1
+                    self.stats.hits += 1
+                    return entry.agent, None
+
+            agent, error = self._build(key, dict(key.settings))
+            if agent is None:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+                return None, error
+
+        return agent, None
+
+    def _build(self, key: AgentKey, base_settings: Dict[str, Any]) -> Tuple[Optional[Agent], Optional[str]]:
+        """Validate the provider and construct a new agent for key."""
+        build_start = time.perf_counter()
+
+        is_valid, error_msg = ProviderConfig.validate_provider_setup(
+            key.provider,
+            key.model,
+            self.available_models,
+            self.provider_requirements
+        )
+        if not is_valid:
+            return None, error_msg
+
+        ProviderConfig.setup_provider(key.provider)
+
+        model_settings = ProviderConfig.get_model_settings(
+            model=key.model,
+            provider=key.provider,
+            base_settings=base_settings
+        )
+
+        agent = ProviderConfig.create_agent(
+            name="NanoAgent",
+            instructions=NANO_AGENT_SYSTEM_PROMPT,
+            tools=get_nano_agent_tools(),
+            model=key.model,
+            provider=key.provider,
+            model_settings=model_settings
+        )
+
+        build_seconds = time.perf_counter() - build_start
+        with self._lock:
+            # Drop entries built with superseded credentials for the same agent
+            stale = [k for k in self._entries if k.base == key.base and k != key]
+            for stale_key in stale:
+                del self._entries[stale_key]
+                self._build_locks.pop(stale_key, None)
+            self._entries[key] = AgentRegistryEntry(
+                agent=agent,
+                built_at=time.time(),
+                build_seconds=build_seconds,
+            )
+            self.stats.builds += 1
+            self.stats.total_build_seconds += build_seconds
+
+        logger.debug(f"Built agent for {key.provider}/{key.model} in {build_seconds * 1000:.2f}ms")
+        return agent, None
+
+    def invalidate(self, provider: Optional[str] = None, model: Optional[str] = None) -> int:
+        """Drop cached agents.
+
+        Args:
+            provider: Only drop agents for this provider (default: all providers)
+            model: Only drop agents for this model (default: all models)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            doomed = [
+                key for key in self._entries
+                if (provider is None or key.provider == provider)
+                and (model is None or key.model == model)
+            ]
+            for key in doomed:
+                del self._entries[key]
+                self._build_locks.pop(key, None)
+            self.stats.invalidations += len(doomed)
+
+        if doomed:
+            logger.info(f"Invalidated {len(doomed)} cached agent(s)")
+        return len(doomed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics including the number of cached agents."""
+        with self._lock:
+            stats = self.stats.to_dict()
+            stats["cached_agents"] = len(self._entries)
+        return stats
+
+
+# Process-wide registry shared by the MCP server and CLI
+_registry: Optional[AgentRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_agent_registry() -> AgentRegistry:
+    """Get the process-wide agent registry, creating it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AgentRegistry()
+    return _registry
+
+
+def invalidate_agent_registry(provider: Optional[str] = None, model: Optional[str] = None) -> int:
+    """Invalidate entries in the process-wide registry (e.g. after an env/key change)."""
+    return get_agent_registry().invalidate(provider=provider, model=model)
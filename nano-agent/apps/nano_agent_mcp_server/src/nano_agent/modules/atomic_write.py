@@ -0,0 +1,232 @@
+"""
+Atomic File Writes for Nano Agent.
+
+Every tool that writes a file goes through this module. New content is
+written to a temp file in the target's directory and moved over the target
+with os.replace, so readers see either the old file or the new one, never
+a truncated mix. Writes whose bytes equal what's already on disk are
+skipped (compared by size, then by digest), which leaves mtime alone and
+keeps downstream caches and watchers quiet.
+
+How much is flushed to disk before a write counts as done is set by the
+fsync policy: "none" (the OS decides), "file" (fsync the data before it is
+published) or "dir" (also fsync the directory so the rename itself
+survives a crash). It defaults to WRITE_FSYNC_POLICY and can be overridden
+with NANO_AGENT_WRITE_FSYNC.
+"""
+
+import logging
+import os
+import stat as stat_module
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from .constants import WRITE_CHUNK_BYTES, WRITE_FSYNC_ENV, WRITE_FSYNC_POLICY
+from .digest_cache import digest_bytes, get_digest_cache, new_hasher
+
+logger = logging.getLogger(__name__)
+
+FSYNC_NONE = "none"
+FSYNC_FILE = "file"
+FSYNC_DIR = "dir"
+FSYNC_POLICIES = (FSYNC_NONE, FSYNC_FILE, FSYNC_DIR)
+
+
+def get_fsync_policy() -> str:
+    """fsync policy from NANO_AGENT_WRITE_FSYNC or the default."""
+    value = os.getenv(WRITE_FSYNC_ENV)
+    if value:
+        if value.lower() in FSYNC_POLICIES:
+            return value.lower()
+        logger.warning(f"Ignoring invalid {WRITE_FSYNC_ENV}={value!r}")
+    return WRITE_FSYNC_POLICY
+
+
+def new_digest():
+    """Incremental hasher matching content_digest."""
+    return new_hasher()
+
+
+def content_digest(data: Union[bytes, memoryview]) -> str:
+    """Digest used to compare contents (the one the digest cache reports)."""
+    return digest_bytes(data)
+
+
+def _file_digest(path: Union[str, Path]) -> str:
+    digest = new_digest()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(WRITE_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def matches_digest(path: Union[str, Path], size: int, digest: str) -> bool:
+    """Whether path is a regular file of this size whose content_digest is digest."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if not stat_module.S_ISREG(stat.st_mode) or stat.st_size != size:
+        return False
+    try:
+        return _file_digest(path) == digest
+    except OSError:
+        return False
+
+
+def is_unchanged(path: Union[str, Path], data: bytes, digest: Optional[str] = None) -> bool:
+    """Whether path is a regular file holding exactly data (whose content_digest is digest, if known)."""
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+    except OSError:
+        return False
+    return matches_digest(path, len(data), digest or content_digest(data))
+
+
+def sync_directory(directory: Union[str, Path]) -> None:
+    """fsync a directory so renames and deletions in it are durable."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError as e:
+        logger.debug(f"Cannot open {directory} to sync it: {e}")
+        return
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        # Not every filesystem supports fsync on directories
+        logger.debug(f"Cannot sync directory {directory}: {e}")
+    finally:
+        os.close(fd)
+
+
+def write_target(path: Union[str, Path]) -> Path:
+    """The file a write to path should replace (a symlink's target, not the link)."""
+    path = Path(path)
+    return Path(os.path.realpath(path)) if path.is_symlink() else path
+
+
+class StagedFile:
+    """A temp file next to a target, moved over it by publish().
+
+    The temp file gets the mode of the file it replaces (or the default
+    mode for new files, after the umask).
+    """
+
+    def __init__(self, path: Union[str, Path], fsync: Optional[str] = None):
+        self.path = write_target(path)
+        self.fsync = fsync or get_fsync_policy()
+        self.temp_path = str(self.path.parent / f".{self.path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        self.bytes_written = 0
+        try:
+            self.mode: Optional[int] = stat_module.S_IMODE(os.stat(self.path).st_mode)
+        except FileNotFoundError:
+            self.mode = None
+        fd = os.open(self.temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666 if self.mode is None else self.mode)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: Union[bytes, memoryview]) -> None:
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def close(self) -> None:
+        """Finish the temp file (flushed and, by policy, fsynced)."""
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if self.fsync != FSYNC_NONE:
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+        if self.mode is not None:
+            # os.open applied the umask to the mode
+            os.chmod(self.temp_path, self.mode)
+
+    def publish(self) -> None:
+        """Move the temp file over the target."""
+        self.close()
+        os.replace(self.temp_path, self.path)
+        self.temp_path = None
+        if self.fsync == FSYNC_DIR:
+            sync_directory(self.path.parent)
+
+    def discard(self) -> None:
+        """Remove the temp file if it wasn't published."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.temp_path is not None:
+            try:
+                os.unlink(self.temp_path)
+            except OSError:
+                pass
+            self.temp_path = None
+
+    def __enter__(self) -> "StagedFile":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.discard()
+
+
+@dataclass
+class WriteResult:
+    """Outcome of an atomic write."""
+    path: Path
+    changed: bool  # False when the file already held these bytes
+    size: int  # Bytes of content
+    created: bool = False
+    digest: Optional[str] = None  # Digest of the content now on disk (see digest_cache)
+
+
+def atomic_write(
+    path: Union[str, Path],
+    data: bytes,
+    fsync: Optional[str] = None,
+    skip_unchanged: bool = True
+) -> WriteResult:
+    """Replace a file's content atomically, creating it if needed.
+
+    Args:
+        path: Absolute path of the file (its parent must exist)
+        data: New content
+        fsync: fsync policy for this write (default: get_fsync_policy())
+        skip_unchanged: Leave the file alone if it already holds data
+
+    Returns:
+        WriteResult saying whether anything was written
+
+    Raises:
+        OSError: If the file can't be written; the target is then unchanged
+    """
+    target = write_target(path)
+    # One hash serves both the unchanged check and the digest cache
+    digest = content_digest(data)
+    if skip_unchanged and is_unchanged(target, data, digest):
+        return WriteResult(path=target, changed=False, size=len(data), digest=get_digest_cache().record(target, digest))
+    created = not os.path.lexists(target)
+    with StagedFile(target, fsync) as staged:
+        staged.write(data)
+        staged.publish()
+    digest = get_digest_cache().record(target, digest)
+    return WriteResult(path=target, changed=True, size=len(data), created=created, digest=digest)
+
+
+def atomic_write_text(
+    path: Union[str, Path],
+    text: str,
+    encoding: str = "utf-8",
+    fsync: Optional[str] = None,
+    skip_unchanged: bool = True
+) -> WriteResult:
+    """Encode text and write it with atomic_write.
+
+    Raises:
+        UnicodeEncodeError: If text can't be encoded
+        OSError: If the file can't be written
+    """
+    return atomic_write(path, text.encode(encoding), fsync, skip_unchanged)
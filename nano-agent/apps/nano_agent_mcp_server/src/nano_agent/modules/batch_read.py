@@ -0,0 +1,150 @@
+"""
+Batch File Reads for Nano Agent.
+
+Reading N files with read_file costs N model round-trips. read_many_files
+reads them in one call: sizes are stat'ed first so the byte budget is
+planned up front, then the files are read concurrently on a small thread
+pool, each only as far as its share of the budget.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from .constants import READ_MANY_WORKERS
+from .line_index import read_line_range
+from .text_encoding import detect_file_encoding, get_encoding_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchReadItem:
+    """Outcome of reading one file of a batch."""
+    path: Path
+    text: Optional[str] = None
+    error: Optional[str] = None
+    start_line: int = 1
+    end_line: int = 0
+    total_lines: int = 0
+    truncated: bool = False
+    budget: int = 0
+
+
+@dataclass
+class BatchReadResult:
+    """Files read by read_files, in request order."""
+    items: List[BatchReadItem] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)
+    total_bytes: int = 0
+
+
+def _plan(paths: List[Path], max_file_bytes: int, max_total_bytes: int) -> BatchReadResult:
+    """Stat each path and split the total budget in request order."""
+    result = BatchReadResult()
+    remaining = max_total_bytes
+    for path in paths:
+        if remaining <= 0:
+            result.skipped.append(path)
+            continue
+        item = BatchReadItem(path=path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            item.error = "File not found"
+        except OSError as e:
+            item.error = str(e)
+        else:
+            if not os.path.isfile(path):
+                item.error = "Path is not a file"
+            else:
+                item.budget = min(stat.st_size, max_file_bytes, remaining)
+                remaining -= item.budget
+        result.items.append(item)
+    return result
+
+
+def _read_item(item: BatchReadItem) -> BatchReadItem:
+    """Read one planned file up to its budget (runs on the read pool)."""
+    if item.error is not None:
+        return item
+    max_bytes = max(item.budget, 1)
+    try:
+        guess = detect_file_encoding(item.path)
+        if not guess.binary:
+            try:
+                page = read_line_range(item.path, offset=1, max_bytes=max_bytes, encoding=guess.encoding)
+            except UnicodeDecodeError:
+                # The head fitted but the part read doesn't; sniff the whole file
+                guess = get_encoding_cache().detect(item.path, full=True)
+                if not guess.binary:
+                    page = read_line_range(item.path, offset=1, max_bytes=max_bytes, encoding=guess.encoding)
+    except OSError as e:
+        item.error = str(e)
+        return item
+    if guess.binary:
+        item.error = "Binary file, not text"
+        return item
+    item.text = page.text
+    item.start_line = page.start_line
+    item.end_line = page.end_line
+    item.total_lines = page.total_lines
+    item.truncated = page.has_more
+    return item
+
+
+class _ReadPool:
+    """Lazily created thread pool for batch reads.
+
+    Separate from the tool executor: read_many_files already runs on a tool
+    thread, and waiting there for work queued on the same pool could starve
+    it.
+    """
+
+    def __init__(self, workers: int = READ_MANY_WORKERS):
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="nano-agent-read",
+                    )
+        return self._pool
+
+
+_read_pool = _ReadPool()
+
+
+def read_files(paths: List[Path], max_file_bytes: int, max_total_bytes: int) -> BatchReadResult:
+    """Read several files concurrently within per-file and total byte budgets.
+
+    Budgets are in on-disk bytes and handed out in request order; a file
+    cut short stops at a line boundary. Files past the total budget are not
+    opened at all.
+
+    Args:
+        paths: Absolute paths in the order results should appear
+        max_file_bytes: Most bytes read from any single file
+        max_total_bytes: Most bytes read across the batch
+
+    Returns:
+        BatchReadResult with one item per path that fit in the budget
+    """
+    result = _plan(paths, max_file_bytes, max_total_bytes)
+    readable = [item for item in result.items if item.error is None]
+    if len(readable) > 1:
+        list(_read_pool.get().map(_read_item, readable))
+    else:
+        for item in readable:
+            _read_item(item)
+    result.total_bytes = sum(len(item.text.encode("utf-8")) for item in result.items if item.text)
+    return result
@@ -0,0 +1,276 @@
+"""
+Closest-match Diagnostics for Failed Edits.
+
+When an edit's old_str isn't in the file, the model needs to know where the
+text it meant actually is and how it differs. Lines are indexed by their
+whitespace-normalized form, so the rarest lines of old_str point straight
+at candidate regions (one dict lookup each instead of a scan of the file).
+The few best-voted regions are then compared line by line with difflib,
+and the winner is reported with its line numbers and a short diff.
+
+Indexes are cached per file version, so retries on the same file reuse
+them.
+"""
+
+import difflib
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .constants import (
+    CLOSEST_MATCH_ANCHORS,
+    CLOSEST_MATCH_CACHE_ENTRIES,
+    CLOSEST_MATCH_CANDIDATES,
+    CLOSEST_MATCH_DIFF_LINES,
+    CLOSEST_MATCH_MIN_SIMILARITY,
+)
+from .file_cache import FileVersion, file_version
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_line(line: str) -> str:
+    """Line with runs of whitespace collapsed and the ends stripped."""
+    return " ".join(line.split())
+
+
+class NormalizedLineIndex:
+    """Lines of a text and where each whitespace-normalized line occurs."""
+
+    def __init__(self, lines: List[str], normalized: List[str], positions: Dict[str, List[int]]):
+        self.lines = lines
+        self.normalized = normalized
+        self.positions = positions
+        self._tokens: Optional[Dict[str, List[int]]] = None
+
+    @classmethod
+    def build(cls, text: str) -> "NormalizedLineIndex":
+        lines = text.split("\n")
+        normalized = [normalize_line(line) for line in lines]
+        positions: Dict[str, List[int]] = {}
+        for number, key in enumerate(normalized):
+            if key:
+                positions.setdefault(key, []).append(number)
+        return cls(lines, normalized, positions)
+
+    def token_positions(self) -> Dict[str, List[int]]:
+        """Lines containing each word token (built on first use)."""
+        if self._tokens is None:
+            tokens: Dict[str, List[int]] = {}
+            for number, line in enumerate(self.normalized):
+                for token in set(_TOKEN_RE.findall(line)):
+                    tokens.setdefault(token, []).append(number)
+            self._tokens = tokens
+        return self._tokens
+
+
+@dataclass
+class ClosestMatch:
+    """The region of a file most similar to an edit's old_str."""
+    start_line: int  # 1-based, inclusive
+    end_line: int
+    similarity: float
+    whitespace_only: bool
+    diff: List[str] = field(default_factory=list)
+
+
+def _needle_lines(old_str: str) -> List[str]:
+    lines = old_str.split("\n")
+    # A trailing newline in old_str doesn't add a line to match
+    if len(lines) > 1 and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _vote(index: NormalizedLineIndex, needle: List[str]) -> Counter:
+    """Candidate start lines voted for by the rarest lines of the needle."""
+    anchors = []
+    for offset, line in enumerate(needle):
+        key = normalize_line(line)
+        occurrences = index.positions.get(key) if key else None
+        if occurrences:
+            anchors.append((len(occurrences), offset, occurrences))
+    anchors.sort(key=lambda anchor: anchor[0])
+    votes: Counter = Counter()
+    for _, offset, occurrences in anchors[:CLOSEST_MATCH_ANCHORS]:
+        for position in occurrences:
+            votes[position - offset] += 1
+    return votes
+
+
+def _fragment_candidates(index: NormalizedLineIndex, needle: List[str]) -> Counter:
+    """Lines containing a single-line needle apart from whitespace."""
+    fragment = normalize_line(needle[0])
+    votes: Counter = Counter()
+    if fragment:
+        for number, line in enumerate(index.normalized):
+            if fragment in line:
+                votes[number] += 1
+                if len(votes) >= CLOSEST_MATCH_CANDIDATES:
+                    break
+    return votes
+
+
+def _token_candidates(index: NormalizedLineIndex, needle: List[str]) -> Counter:
+    """Candidate start lines voted for by the needle's rarest words.
+
+    Used when no line of the needle occurs verbatim (e.g. every line has a
+    typo), so whole-line anchors can't help.
+    """
+    tokens = index.token_positions()
+    anchors = []
+    for offset, line in enumerate(needle):
+        for token in set(_TOKEN_RE.findall(line)):
+            occurrences = tokens.get(token)
+            if occurrences:
+                anchors.append((len(occurrences), offset, occurrences))
+    anchors.sort(key=lambda anchor: anchor[0])
+    votes: Counter = Counter()
+    for _, offset, occurrences in anchors[:CLOSEST_MATCH_ANCHORS]:
+        for position in occurrences:
+            votes[position - offset] += 1
+    return votes
+
+
+def _similarity(wanted: List[str], window: List[str]) -> float:
+    """Similarity of two line lists.
+
+    Short lists are compared character by character. Longer ones by whole
+    lines, or line by line when they have the same length, so a block in
+    which every line was changed a little still scores well.
+    """
+    if len(wanted) <= 3:
+        return difflib.SequenceMatcher(None, "\n".join(wanted), "\n".join(window), autojunk=False).ratio()
+    similarity = difflib.SequenceMatcher(None, wanted, window, autojunk=False).ratio()
+    if len(wanted) == len(window) and similarity < 1.0:
+        aligned = sum(
+            1.0 if a == b else difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+            for a, b in zip(wanted, window)
+        ) / len(wanted)
+        similarity = max(similarity, aligned)
+    return similarity
+
+
+def find_closest_match(
+    index: NormalizedLineIndex,
+    old_str: str,
+    label: str = "file"
+) -> Optional[ClosestMatch]:
+    """Find the region of an indexed text that old_str most likely meant.
+
+    Args:
+        index: Index of the file's text
+        old_str: Text that was not found verbatim
+        label: Name of the file for the diff header
+
+    Returns:
+        ClosestMatch, or None if no region is similar enough
+    """
+    needle = _needle_lines(old_str)
+    wanted = [normalize_line(line) for line in needle]
+    votes = _vote(index, needle)
+    if not votes and len(needle) == 1:
+        votes = _fragment_candidates(index, needle)
+    if not votes:
+        votes = _token_candidates(index, needle)
+    if not votes:
+        return None
+
+    total = len(index.lines)
+    best: Optional[Tuple[float, int, int]] = None
+    for start, _ in votes.most_common(CLOSEST_MATCH_CANDIDATES):
+        # Allow the region to be a line or two longer or shorter than old_str
+        for size in range(max(1, len(needle) - 2), len(needle) + 3):
+            first = min(max(start, 0), max(total - size, 0))
+            window = index.normalized[first:first + size]
+            if len(needle) == 1 and len(window) == 1 and wanted[0] and wanted[0] in window[0]:
+                similarity = 1.0
+            else:
+                similarity = _similarity(wanted, window)
+            if best is None or similarity > best[0]:
+                best = (similarity, first, len(window))
+    similarity, first, size = best
+    if similarity < CLOSEST_MATCH_MIN_SIMILARITY:
+        return None
+
+    region = index.lines[first:first + size]
+    whitespace_only = [normalize_line(line) for line in region] == wanted or (
+        len(needle) == 1 and size == 1 and bool(wanted[0]) and wanted[0] in index.normalized[first]
+    )
+    diff = list(difflib.unified_diff(
+        needle, region, "old_str", f"{label} lines {first + 1}-{first + size}", lineterm="", n=2
+    ))
+    if len(diff) > CLOSEST_MATCH_DIFF_LINES:
+        diff = diff[:CLOSEST_MATCH_DIFF_LINES] + [f"... ({len(diff) - CLOSEST_MATCH_DIFF_LINES} more diff lines)"]
+    return ClosestMatch(
+        start_line=first + 1,
+        end_line=first + size,
+        similarity=similarity,
+        whitespace_only=whitespace_only,
+        diff=diff,
+    )
+
+
+def describe_closest_match(match: Optional[ClosestMatch]) -> str:
+    """Error text for an old_str that wasn't found, pointing at the closest match."""
+    if match is None:
+        return "Text not found in file, and no similar region was found. Read the file to check the current text."
+    lines = match.end_line - match.start_line + 1
+    where = f"line {match.start_line}" if lines == 1 else f"lines {match.start_line}-{match.end_line}"
+    if match.whitespace_only:
+        summary = (f"Text not found exactly; {where} match "
+                   f"apart from whitespace (indentation, tabs or trailing spaces).")
+    else:
+        summary = f"Text not found in file. Closest match is {where} ({match.similarity:.0%} similar)."
+    return "\n".join([
+        summary,
+        "Diff from old_str to the file:",
+        *match.diff,
+        f"Retry with old_str copied exactly from the file "
+        f"(read_file offset={match.start_line} limit={lines} shows them).",
+    ])
+
+
+class NormalizedIndexCache:
+    """Bounded LRU of normalized line indexes keyed by path and file version."""
+
+    def __init__(self, max_entries: int = CLOSEST_MATCH_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[FileVersion, NormalizedLineIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, path: str, stat: os.stat_result, text: str) -> NormalizedLineIndex:
+        """Return the index for this file version, building it from text if needed."""
+        version = file_version(stat)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+        index = NormalizedLineIndex.build(text)
+        with self._lock:
+            self.builds += 1
+            self._entries[path] = (version, index)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    def get_stats(self) -> dict:
+        """Hit/build counters."""
+        with self._lock:
+            return {"hits": self.hits, "builds": self.builds, "entries": len(self._entries)}
+
+
+_indexes = NormalizedIndexCache()
+
+
+def get_normalized_index_cache() -> NormalizedIndexCache:
+    """Get the process-wide normalized line index cache."""
+    return _indexes
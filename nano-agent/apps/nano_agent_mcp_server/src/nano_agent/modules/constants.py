@@ -42,21 +42,171 @@ PROVIDER_REQUIREMENTS = {
 MAX_AGENT_TURNS = 20  # Maximum turns in agent loop
 DEFAULT_TEMPERATURE = 0.2  # Temperature for agent responses
 MAX_TOKENS = 4000  # Maximum tokens per response
+DEFAULT_TIMEOUT_SECONDS = 300  # Wall-clock limit for a whole agent run
+DEFAULT_TURN_TIMEOUT_SECONDS = 120  # Limit for a single model call or round of tool calls
+
+# Streaming Progress
+STREAM_TEXT_FLUSH_SECONDS = 0.5  # Minimum interval between partial-text progress notifications
+STREAM_TEXT_FLUSH_CHARS = 200  # Flush buffered partial text once it reaches this many characters
+
+# Batch Execution
+MAX_BATCH_PROMPTS = 100  # Maximum prompts accepted by prompt_nano_agent_batch
+DEFAULT_BATCH_CONCURRENCY = 4  # Concurrent runs for providers without an explicit limit
+BATCH_CONCURRENCY_BY_PROVIDER = {
+    "openrouter": 8,
+    "openai": 8,
+    "anthropic": 4,
+    "ollama": 1,  # Local models serialize on a single GPU anyway
+}
+BATCH_CONCURRENCY_ENV_PREFIX = "NANO_AGENT_BATCH_CONCURRENCY_"  # e.g. NANO_AGENT_BATCH_CONCURRENCY_OPENROUTER=16
+
+# Tool Execution
+DEFAULT_TOOL_WORKERS = 8  # Threads running blocking tool bodies off the event loop
+TOOL_WORKERS_ENV = "NANO_AGENT_TOOL_WORKERS"  # Override the tool thread pool size
+
+# Workspace Paths
+WORKSPACE_DIR_CACHE_ENTRIES = 4096  # Directory symlink resolutions memoized per workspace
+
+# File Content Cache (process-wide, shared by all runs)
+FILE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Memory ceiling for cached decoded text
+FILE_CACHE_MAX_ENTRY_BYTES = 4 * 1024 * 1024  # Larger files are read but not cached
+FILE_CACHE_MAX_BYTES_ENV = "NANO_AGENT_FILE_CACHE_MAX_BYTES"  # Override the ceiling (0 disables)
+
+# File Digests (process-wide, validated by file version)
+DIGEST_CACHE_ENTRIES = 20_000  # Digests kept (about 200 bytes each)
+DIGEST_WORKERS = 4  # Threads hashing files in the background
+DIGEST_READ_BYTES = 1024 * 1024  # Read size while hashing
+FILE_DIGEST_MAX_PATHS = 500  # Paths digested by one file_digest call
+
+# Text Encodings (detected per file version for read_file and edit_file)
+ENCODING_SAMPLE_BYTES = 64 * 1024  # Bytes sniffed to pick a file's encoding
+ENCODING_CANDIDATES = ("utf-8", "cp949")  # Tried in order on the sample; cp949 is a superset of euc-kr
+ENCODING_CACHE_ENTRIES = 4096  # Encoding guesses kept per process
+
+# Atomic Writes
+WRITE_FSYNC_POLICY = "none"  # "none", "file" (fsync data before publishing) or "dir" (also fsync the directory)
+WRITE_FSYNC_ENV = "NANO_AGENT_WRITE_FSYNC"  # Override the fsync policy
+WRITE_CHUNK_BYTES = 1024 * 1024  # Read size when comparing existing content
+
+# Write Sessions (open_write, append_chunk, commit_write)
+WRITE_SESSION_MAX_OPEN = 16  # Sessions open at once; the least recently used is dropped beyond this
+WRITE_SESSION_IDLE_SECONDS = 600  # Sessions untouched this long are discarded
+WRITE_SESSION_MAX_BYTES = 256 * 1024 * 1024  # Largest file a session may write
+
+# Ranged Reads
+READ_FILE_MAX_BYTES = 256 * 1024  # Default cap on text returned by one read_file call
+READ_FILE_MAX_LINES = 2000  # Default number of lines returned when a file is read in pages
+LINE_INDEX_MIN_BYTES = 1024 * 1024  # Files at least this large are paged through an mmap line index
+LINE_INDEX_BLOCK_BYTES = 64 * 1024  # Granularity of the line index (lines are counted per block)
+LINE_INDEX_CACHE_ENTRIES = 32  # Line indexes kept per process
+
+# Edit Diagnostics (closest match for a failed edit)
+CLOSEST_MATCH_ANCHORS = 8  # Rarest old_str lines used to vote for candidate regions
+CLOSEST_MATCH_CANDIDATES = 8  # Best-voted regions compared line by line
+CLOSEST_MATCH_MIN_SIMILARITY = 0.5  # Weaker matches are not reported
+CLOSEST_MATCH_DIFF_LINES = 30  # Longest diff shown in an error message
+CLOSEST_MATCH_CACHE_ENTRIES = 8  # Normalized line indexes kept per process
+
+# Batch Reads (read_many_files)
+READ_MANY_MAX_FILES = 50  # Files read by one read_many_files call
+READ_MANY_DEFAULT_TOTAL_BYTES = 256 * 1024  # Total budget unless asked otherwise
+READ_MANY_MAX_TOTAL_BYTES = 1024 * 1024  # Upper bound on max_total_bytes
+READ_MANY_MAX_FILE_BYTES = 64 * 1024  # Default budget per file
+READ_MANY_WORKERS = 8  # Threads reading files of a batch concurrently
+
+# File Metadata (get_files_info)
+FILES_INFO_MAX_PATHS = 500  # Paths described by one get_files_info call
+
+# Content Search (process-wide trigram signature indexes)
+SEARCH_DEFAULT_RESULTS = 100  # Matching lines returned by search_files unless asked otherwise
+SEARCH_MAX_RESULTS = 1000  # Upper bound on max_results
+SEARCH_SNIPPET_CHARS = 200  # Matching lines are cut to this many characters
+SEARCH_INDEX_MAX_BYTES = 32 * 1024 * 1024  # Signature memory per indexed root; files beyond it are scanned
+SEARCH_INDEX_MAX_FILE_BYTES = 2 * 1024 * 1024  # Larger files are not indexed, only scanned
+SEARCH_INDEX_MAX_FILES = 200_000  # Files walked per root
+SEARCH_INDEX_MAX_ROOTS = 4  # Indexed roots kept per process
+SEARCH_INDEX_REFRESH_SECONDS = 2.0  # Minimum interval between rescans for changes made outside the tools
+
+# Directory Listings
+LIST_DIRECTORY_PAGE_SIZE = 500  # Entries per list_directory page unless asked otherwise
+LIST_DIRECTORY_MAX_PAGE_SIZE = 5000  # Upper bound on limit
+
+# Tree Walks (find_files and the search index)
+FIND_DEFAULT_RESULTS = 200  # Paths returned by find_files unless asked otherwise
+FIND_MAX_RESULTS = 2000  # Upper bound on max_results
+GITIGNORE_CACHE_ENTRIES = 256  # Compiled .gitignore files kept per process
+# Pruned by every walk unless a project .gitignore re-includes them with '!'
+DEFAULT_IGNORE_PATTERNS = [
+    ".git/", ".hg/", ".svn/", "node_modules/", "__pycache__/",
+    ".venv/", "venv/", ".tox/", ".mypy_cache/", ".pytest_cache/",
+    ".dart_tool/",
+]
+
+# Parallel Tool Calls (several independent tool calls in one model turn)
+PARALLEL_TOOL_CALLS_BY_PROVIDER = {
+    "openai": True,
+    "openrouter": True,
+    "anthropic": True,
+    "ollama": False,  # Local OpenAI-compatible servers may reject the parameter
+}
 
 # Tool Names
 TOOL_READ_FILE = "read_file"
 TOOL_LIST_DIRECTORY = "list_directory"
 TOOL_WRITE_FILE = "write_file"
+TOOL_OPEN_WRITE = "open_write"
+TOOL_APPEND_CHUNK = "append_chunk"
+TOOL_COMMIT_WRITE = "commit_write"
 TOOL_GET_FILE_INFO = "get_file_info"
+TOOL_GET_FILES_INFO = "get_files_info"
+TOOL_FILE_DIGEST = "file_digest"
 TOOL_EDIT_FILE = "edit_file"
+TOOL_SEARCH_FILES = "search_files"
+TOOL_FIND_FILES = "find_files"
+TOOL_READ_MANY_FILES = "read_many_files"
+TOOL_REPLACE_LINES = "replace_lines"
+TOOL_APPLY_EDITS = "apply_edits"
+TOOL_APPLY_PATCH = "apply_patch"
 
 # Available Tools List
 AVAILABLE_TOOLS = [
     TOOL_READ_FILE,
     TOOL_LIST_DIRECTORY,
     TOOL_WRITE_FILE,
+    TOOL_OPEN_WRITE,
+    TOOL_APPEND_CHUNK,
+    TOOL_COMMIT_WRITE,
     TOOL_GET_FILE_INFO,
+    TOOL_GET_FILES_INFO,
+    TOOL_FILE_DIGEST,
     TOOL_EDIT_FILE,
+    TOOL_SEARCH_FILES,
+    TOOL_FIND_FILES,
+    TOOL_READ_MANY_FILES,
+    TOOL_REPLACE_LINES,
+    TOOL_APPLY_EDITS,
+    TOOL_APPLY_PATCH,
+]
+
+# Tools that never modify the filesystem; they run concurrently with each
+# other, while tools outside this list hold an exclusive lock on their path
+READ_ONLY_TOOLS = [
+    TOOL_READ_FILE,
+    TOOL_LIST_DIRECTORY,
+    TOOL_GET_FILE_INFO,
+    TOOL_GET_FILES_INFO,
+    TOOL_FILE_DIGEST,
+    TOOL_SEARCH_FILES,
+    TOOL_FIND_FILES,
+    TOOL_READ_MANY_FILES,
+]
+
+# Read-only tools whose results depend only on their path's stat, so they can
+# be memoized per run (a search depends on every file below its directory; a
+# listing shows child sizes, which change without touching the directory's stat)
+MEMOIZED_TOOLS = [
+    TOOL_READ_FILE,
+    TOOL_GET_FILE_INFO,
 ]
 
 # Demo Configuration
@@ -77,6 +227,8 @@ Your capabilities:
 2. List directories to explore project structure
 3. Write files to create or modify content
 4. Get detailed file information
+5. Search file contents across the project
+6. Find files by name or glob pattern across the project tree
 
 When given a task:
 1. First understand what needs to be done
@@ -85,7 +237,25 @@ When given a task:
 4. Verify your work
 
 Be thorough but concise. Always verify files exist before trying to read them.
+To find where something is defined or used, search for it instead of listing
+and reading directories one by one. To see a project's layout, use find_files
+with a depth limit rather than listing each directory.
 When writing files, ensure the content is correct before saving.
+If a file is too long to send in one write_file call, write it in pieces:
+open_write, then append_chunk for each piece in order, then commit_write.
+To make several changes to a file, send them together with apply_edits; for
+changes across files, send one unified diff to apply_patch. Either applies
+all of its changes or none of them. In large or generated files, replace
+lines by number with replace_lines instead of quoting the old text; pass the
+etag of the read_file page holding exactly those lines as expected_hash.
+Before reading a file again, pass what you got for it last time as
+if_none_match: the etag at the end of a page, or the file's digest from
+file_digest, get_file_info, write_file or apply_edits. If the content is
+unchanged you get a one-line "Not modified" instead of the whole file.
+When you need several files, read them with one read_many_files call (a list
+of paths or a glob) instead of one read_file per file; likewise check several
+paths with one get_files_info call. Other independent calls can be requested
+together in one turn; they run in parallel.
 
 If asked about general information, respond and do not use any tools.
 """
@@ -99,10 +269,15 @@ ERROR_FILE_NOT_FOUND = "Error: File not found: {}"
 ERROR_NOT_A_FILE = "Error: Path is not a file: {}"
 ERROR_DIR_NOT_FOUND = "Error: Directory not found: {}"
 ERROR_NOT_A_DIR = "Error: Path is not a directory: {}"
+ERROR_BINARY_FILE = "Error: {} is a binary file, not text"
+ERROR_INVALID_PATH = "Error: Invalid path: {}"
 
 # Success Messages
 SUCCESS_FILE_WRITE = "Successfully wrote {} bytes to {}"
 SUCCESS_FILE_EDIT = "updated"
+SUCCESS_FILE_UNCHANGED = "File already up to date: {} ({} bytes, nothing written)"
+SUCCESS_FILE_EDIT_UNCHANGED = "unchanged (the new text equals the old text)"
+SUCCESS_READ_NOT_MODIFIED = "Not modified: {} is unchanged since the read with etag {}"
 SUCCESS_AGENT_COMPLETE = "Agent completed successfully in {:.2f}s"
 
 # Version Info
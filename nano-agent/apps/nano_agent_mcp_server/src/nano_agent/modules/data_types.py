@@ -8,6 +8,8 @@ from pydantic import BaseModel, Field
 from typing import Literal, Optional, Dict, Any, List
 from datetime import datetime
 
+from .constants import MAX_BATCH_PROMPTS, DEFAULT_TIMEOUT_SECONDS, DEFAULT_TURN_TIMEOUT_SECONDS
+
 
 # MCP Tool Request/Response Models
 
@@ -27,6 +29,16 @@ class PromptNanoAgentRequest(BaseModel):
         default="openai",
         description="LLM provider for the agent"
     )
+    timeout_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Wall-clock limit for the run (defaults to AgentConfig.timeout_seconds)"
+    )
+    turn_timeout_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Limit for a single model call or round of tool calls"
+    )
 
 
 class PromptNanoAgentResponse(BaseModel):
@@ -44,6 +56,54 @@ class PromptNanoAgentResponse(BaseModel):
     )
 
 
+class PromptNanoAgentBatchRequest(BaseModel):
+    """Request model for prompt_nano_agent_batch MCP tool."""
+    prompts: List[PromptNanoAgentRequest] = Field(
+        ...,
+        description="Independent agent prompts to execute concurrently",
+        min_length=1,
+        max_length=MAX_BATCH_PROMPTS
+    )
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Override the per-provider concurrency limit"
+    )
+
+
+class BatchItemResponse(PromptNanoAgentResponse):
+    """Result of a single prompt within a batch."""
+    index: int = Field(description="Position of the prompt in the batch")
+    queue_wait_seconds: Optional[float] = Field(
+        default=None,
+        description="Time spent waiting for a worker slot"
+    )
+
+
+class PromptNanoAgentBatchResponse(BaseModel):
+    """Response model for prompt_nano_agent_batch MCP tool."""
+    success: bool = Field(description="Whether every prompt in the batch succeeded")
+    results: List[BatchItemResponse] = Field(
+        default_factory=list,
+        description="Per-prompt results in request order"
+    )
+    succeeded: int = Field(default=0, description="Number of prompts that succeeded")
+    failed: int = Field(default=0, description="Number of prompts that failed")
+    error: Optional[str] = Field(default=None, description="Error message if the batch could not run")
+    token_usage: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Token and cost totals aggregated across all prompts"
+    )
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Additional batch execution metadata"
+    )
+    execution_time_seconds: Optional[float] = Field(
+        default=None,
+        description="Total wall-clock time for the batch"
+    )
+
+
 # Internal Agent Tool Models
 
 class ReadFileRequest(BaseModel):
@@ -65,6 +125,7 @@ class ReadFileResponse(BaseModel):
     error: Optional[str] = Field(default=None, description="Error message if failed")
     file_size_bytes: Optional[int] = Field(default=None, description="File size")
     last_modified: Optional[datetime] = Field(default=None, description="Last modification time")
+    digest: Optional[str] = Field(default=None, description="Content digest, as reported by file_digest")
 
 
 class CreateFileRequest(BaseModel):
@@ -96,6 +157,22 @@ class CreateFileResponse(BaseModel):
     bytes_written: Optional[int] = Field(default=None, description="Number of bytes written")
 
 
+class EditOperation(BaseModel):
+    """One replacement of an apply_edits call."""
+    old_str: str = Field(
+        ...,
+        description="Exact text to replace (must occur once unless replace_all is set)"
+    )
+    new_str: str = Field(
+        ...,
+        description="Text to insert in place of old_str"
+    )
+    replace_all: bool = Field(
+        default=False,
+        description="Replace every occurrence of old_str"
+    )
+
+
 # Agent Configuration Models
 
 class AgentConfig(BaseModel):
@@ -114,10 +191,15 @@ class AgentConfig(BaseModel):
         description="Maximum tokens in response"
     )
     timeout_seconds: int = Field(
-        default=300,
+        default=DEFAULT_TIMEOUT_SECONDS,
         gt=0,
         description="Execution timeout"
     )
+    turn_timeout_seconds: int = Field(
+        default=DEFAULT_TURN_TIMEOUT_SECONDS,
+        gt=0,
+        description="Timeout for a single model call or round of tool calls"
+    )
 
 
 # Execution Tracking Models
@@ -0,0 +1,246 @@
+"""
+Process-wide File Digest Cache for Nano Agent.
+
+Agents re-read files just to find out whether they changed. A digest
+answers that in a few bytes: file_digest, get_file_info and the write
+tools report one, and a later call compares it instead of the content.
+
+Digests are keyed by path and validated by the file's version (mtime_ns,
+size, inode), so an unchanged file costs one stat however often it is
+asked about. Misses are hashed on a small thread pool, several files at a
+time; read_file and get_file_info never hash inline but schedule the hash
+in the background, so the next file_digest of the file is usually a hit.
+Content is hashed with xxh3 when the xxhash package is installed, blake2b
+otherwise; atomic_write compares contents with the same hasher, so a
+write hashes its bytes once for both.
+"""
+
+import hashlib
+import logging
+import os
+import stat as stat_module
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .constants import DIGEST_CACHE_ENTRIES, DIGEST_READ_BYTES, DIGEST_WORKERS
+from .file_cache import FileVersion, file_version
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+
+def new_hasher():
+    """Incremental hasher matching digest_bytes."""
+    if xxhash is not None:
+        return xxhash.xxh3_64()
+    return hashlib.blake2b(digest_size=8)
+
+
+def digest_bytes(data: Union[bytes, memoryview]) -> str:
+    """Digest of in-memory content, as reported by the tools (16 hex chars)."""
+    hasher = new_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def _hash_file(path: Union[str, Path]) -> Tuple[str, FileVersion]:
+    """Hash a file, returning the digest and the version it was taken from."""
+    hasher = new_hasher()
+    with open(path, "rb") as f:
+        version = file_version(os.fstat(f.fileno()))
+        for chunk in iter(lambda: f.read(DIGEST_READ_BYTES), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest(), version
+
+
+class DigestCache:
+    """Thread-safe LRU of file digests, validated by file version."""
+
+    def __init__(self, max_entries: int = DIGEST_CACHE_ENTRIES, workers: int = DIGEST_WORKERS):
+        self.max_entries = max_entries
+        self.workers = workers
+        self._entries: "OrderedDict[str, Tuple[FileVersion, str]]" = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="nano-digest")
+        return self._executor
+
+    def lookup(self, path: Union[str, Path], version: FileVersion) -> Optional[str]:
+        """The cached digest of this version of path, if any (no I/O)."""
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+        return None
+
+    def _store(self, key: str, version: FileVersion, digest: str) -> None:
+        with self._lock:
+            self._entries[key] = (version, digest)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _compute(self, key: str) -> str:
+        digest, version = _hash_file(key)
+        self._store(key, version, digest)
+        return digest
+
+    def digest(self, path: Union[str, Path], version: Optional[FileVersion] = None) -> str:
+        """Digest of a file, hashing it only if it changed since last time.
+
+        Args:
+            path: Absolute path of a regular file
+            version: Its version, if the caller has just stat'ed it
+
+        Raises:
+            OSError: If the file can't be stat'ed or read
+        """
+        key = str(path)
+        if version is None:
+            version = file_version(os.stat(key))
+        cached = self.lookup(key, version)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            # A background hash of this file is running; its result may be this version's
+            pending.exception()
+            cached = self.lookup(key, version)
+            if cached is not None:
+                return cached
+        return self._compute(key)
+
+    def digest_many(self, paths: List[Path]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Digests of several files, hashing the misses concurrently.
+
+        Returns:
+            (digest, error_message) per path, in order
+        """
+        results: List[Tuple[Optional[str], Optional[str]]] = []
+        futures: Dict[int, Future] = {}
+        for i, path in enumerate(paths):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                results.append((None, "not found"))
+                continue
+            except OSError as e:
+                results.append((None, e.strerror or str(e)))
+                continue
+            if not stat_module.S_ISREG(stat.st_mode):
+                results.append((None, "not a file"))
+                continue
+            cached = self.lookup(path, file_version(stat))
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                futures[i] = self._get_executor().submit(self._compute, str(path))
+            results.append((cached, None))
+        for i, future in futures.items():
+            try:
+                results[i] = (future.result(), None)
+            except OSError as e:
+                results[i] = (None, e.strerror or str(e))
+        return results
+
+    def prefetch(self, path: Union[str, Path], version: Optional[FileVersion] = None) -> None:
+        """Hash a file in the background if its current version isn't cached.
+
+        Args:
+            path: Absolute path of a regular file
+            version: Its version, if the caller has just stat'ed it
+        """
+        key = str(path)
+        if version is None:
+            try:
+                version = file_version(os.stat(key))
+            except OSError:
+                return
+        if self.lookup(key, version) is not None:
+            return
+        executor = self._get_executor()
+        with self._lock:
+            if key in self._pending:
+                return
+            future = executor.submit(self._compute, key)
+            self._pending[key] = future
+            self.prefetched += 1
+        future.add_done_callback(lambda _: self._finish_prefetch(key, future))
+
+    def peek(self, path: Union[str, Path], version: FileVersion) -> Optional[str]:
+        """The cached digest of this version of path, or None after scheduling its hash (never hashes inline)."""
+        cached = self.lookup(path, version)
+        if cached is None:
+            self.prefetch(path, version)
+        return cached
+
+    def _finish_prefetch(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        if future.exception() is not None:
+            logger.debug(f"Background digest of {key} failed: {future.exception()}")
+
+    def put(self, path: Union[str, Path], data: Union[bytes, memoryview]) -> Optional[str]:
+        """Record the digest of content just written to path, without re-reading it.
+
+        Returns:
+            The digest, or None if path can't be stat'ed
+        """
+        return self.record(path, digest_bytes(data))
+
+    def record(self, path: Union[str, Path], digest: str) -> Optional[str]:
+        """Record a digest the caller already took of path's current content.
+
+        Returns:
+            The digest, or None if path can't be stat'ed
+        """
+        key = str(path)
+        try:
+            version = file_version(os.stat(key))
+        except OSError:
+            return None
+        self._store(key, version, digest)
+        return digest
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefetched": self.prefetched,
+                "pending": len(self._pending),
+                "algorithm": "xxh3_64" if xxhash is not None else "blake2b-64",
+            }
+
+
+_cache = DigestCache()
+
+
+def get_digest_cache() -> DigestCache:
+    """Get the process-wide digest cache."""
+    return _cache
@@ -0,0 +1,208 @@
+"""
+Process-wide File Content Cache for Nano Agent.
+
+Agents in different MCP requests keep re-reading the same hot files.
+The cache keeps their decoded text in an LRU bounded by total bytes, and
+validates every hit with a single stat (mtime_ns, size, inode) so edits made
+outside the server are never served stale.
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .constants import FILE_CACHE_MAX_BYTES, FILE_CACHE_MAX_BYTES_ENV, FILE_CACHE_MAX_ENTRY_BYTES
+
+logger = logging.getLogger(__name__)
+
+# (mtime_ns, size, inode) identifying one version of a file
+FileVersion = Tuple[int, int, int]
+
+
+def file_version(stat: os.stat_result) -> FileVersion:
+    """Version key of a stat result."""
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+@dataclass
+class _CacheEntry:
+    version: FileVersion
+    text: str
+    cost: int
+
+
+@dataclass
+class FileCacheStats:
+    """Counters describing cache effectiveness."""
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+    uncacheable: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert stats to dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+            "uncacheable": self.uncacheable,
+        }
+
+
+def get_file_cache_max_bytes() -> int:
+    """Memory ceiling from NANO_AGENT_FILE_CACHE_MAX_BYTES or the default."""
+    value = os.getenv(FILE_CACHE_MAX_BYTES_ENV)
+    if value:
+        try:
+            max_bytes = int(value)
+            if max_bytes >= 0:
+                return max_bytes
+        except ValueError:
+            pass
+        logger.warning(f"Ignoring invalid {FILE_CACHE_MAX_BYTES_ENV}={value!r}")
+    return FILE_CACHE_MAX_BYTES
+
+
+class FileContentCache:
+    """Thread-safe LRU of decoded file text, bounded by total bytes.
+
+    Entry cost is the in-memory size of the decoded string, so the ceiling
+    reflects what the server actually holds, not the on-disk size.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, max_entry_bytes: int = FILE_CACHE_MAX_ENTRY_BYTES):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Total memory ceiling (defaults to get_file_cache_max_bytes(); 0 disables)
+            max_entry_bytes: Files whose text is larger than this are never cached
+        """
+        self.max_bytes = get_file_cache_max_bytes() if max_bytes is None else max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, self.max_bytes)
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.stats = FileCacheStats()
+
+    def read_text(self, path: Union[str, Path], encoding: str = "utf-8") -> Tuple[str, os.stat_result]:
+        """Return the decoded text of a file, from cache when it is unchanged.
+
+        Reads in text mode, exactly like open(path, 'r', encoding=encoding).read().
+
+        Args:
+            path: Absolute path of the file
+            encoding: Text encoding
+
+        Returns:
+            Tuple of (text, stat result of the version returned)
+
+        Raises:
+            OSError: If the file can't be stat'ed or opened
+            UnicodeDecodeError: If the content can't be decoded
+        """
+        key = (str(path), encoding)
+        stat = os.stat(path)
+        version = file_version(stat)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.version == version:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return entry.text, stat
+                self._remove(key)
+                self.stats.stale += 1
+            self.stats.misses += 1
+
+        with open(path, "r", encoding=encoding) as f:
+            opened_stat = os.fstat(f.fileno())
+            text = f.read()
+        # Only cache if the file didn't change between stat and read
+        if file_version(opened_stat) == version:
+            self._store(key, version, text)
+        return text, opened_stat
+
+    def put(self, path: Union[str, Path], text: str, encoding: str = "utf-8") -> None:
+        """Cache text just written to path (e.g. by an edit), keyed by its new stat.
+
+        Newlines are translated as a text-mode read would, so the entry matches
+        what read_text returns after it is evicted.
+        """
+        try:
+            version = file_version(os.stat(path))
+        except OSError:
+            return
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        self._store((str(path), encoding), version, text)
+
+    def _store(self, key: Tuple[str, str], version: FileVersion, text: str) -> None:
+        cost = sys.getsizeof(text)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if cost > self.max_entry_bytes:
+                self.stats.uncacheable += 1
+                return
+            self._entries[key] = _CacheEntry(version=version, text=text, cost=cost)
+            self.current_bytes += cost
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.cost
+                self.stats.evictions += 1
+                self.stats.evicted_bytes += evicted.cost
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.cost
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None) -> int:
+        """Drop cached text for one path (all encodings) or everything."""
+        with self._lock:
+            if path is None:
+                keys = list(self._entries)
+            else:
+                keys = [k for k in self._entries if k[0] == str(path)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counters, current size and ceiling."""
+        with self._lock:
+            stats = self.stats.to_dict()
+            stats.update({
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            })
+        return stats
+
+
+# Process-wide cache shared by all runs in the server/CLI process
+_cache: Optional[FileContentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_file_cache() -> FileContentCache:
+    """Get the process-wide file content cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FileContentCache()
+    return _cache
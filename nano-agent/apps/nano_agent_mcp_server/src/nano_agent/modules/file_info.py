@@ -0,0 +1,96 @@
+"""
+File Metadata for Nano Agent.
+
+Everything get_file_info reports comes from one os.stat: the type from
+S_ISREG/S_ISDIR on st_mode, size and times from the same result. Asking
+exists(), is_file() and is_dir() separately costs a syscall each, which
+adds up when an agent checks a directory's files one by one.
+get_files_info stats a whole batch this way and renders it as a compact
+table.
+"""
+
+import logging
+import os
+import stat as stat_module
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from .file_cache import FileVersion, file_version
+
+logger = logging.getLogger(__name__)
+
+KIND_FILE = "file"
+KIND_DIR = "dir"
+KIND_OTHER = "other"
+
+
+@dataclass
+class FileInfo:
+    """Metadata of one path, or why it couldn't be stat'ed."""
+    path: Path
+    kind: Optional[str] = None  # KIND_FILE, KIND_DIR or KIND_OTHER
+    size: int = 0
+    mtime: float = 0.0
+    ctime: float = 0.0
+    version: Optional[FileVersion] = None  # (mtime_ns, size, inode) as used by the caches
+    error: Optional[str] = None
+
+    @property
+    def is_file(self) -> bool:
+        return self.kind == KIND_FILE
+
+    @property
+    def is_dir(self) -> bool:
+        return self.kind == KIND_DIR
+
+    @property
+    def modified(self) -> str:
+        return datetime.fromtimestamp(self.mtime).isoformat()
+
+    @property
+    def created(self) -> str:
+        return datetime.fromtimestamp(self.ctime).isoformat()
+
+
+def stat_info(path: Path) -> FileInfo:
+    """Metadata of path from a single os.stat (symlinks are followed).
+
+    Raises:
+        OSError: If path can't be stat'ed (FileNotFoundError if it's missing)
+    """
+    stat = os.stat(path)
+    if stat_module.S_ISREG(stat.st_mode):
+        kind = KIND_FILE
+    elif stat_module.S_ISDIR(stat.st_mode):
+        kind = KIND_DIR
+    else:
+        kind = KIND_OTHER
+    return FileInfo(
+        path=path, kind=kind, size=stat.st_size, mtime=stat.st_mtime, ctime=stat.st_ctime,
+        version=file_version(stat)
+    )
+
+
+def stat_many(paths: List[Path]) -> List[FileInfo]:
+    """Metadata of each path, in order; failures are recorded, not raised."""
+    infos = []
+    for path in paths:
+        try:
+            infos.append(stat_info(path))
+        except FileNotFoundError:
+            infos.append(FileInfo(path=path, error="not found"))
+        except OSError as e:
+            infos.append(FileInfo(path=path, error=e.strerror or str(e)))
+    return infos
+
+
+def format_info_row(info: FileInfo, display_path: str) -> str:
+    """One table row: type, size, modification time (to the second), path."""
+    if info.error is not None:
+        return f"{'-':<5} {'-':>10} {'-':<19} {display_path} ({info.error})"
+    size = str(info.size) if info.is_file else "-"
+    modified = datetime.fromtimestamp(info.mtime).isoformat(timespec="seconds")
+    name = f"{display_path}/" if info.is_dir and not display_path.endswith("/") else display_path
+    return f"{info.kind:<5} {size:>10} {modified:<19} {name}"
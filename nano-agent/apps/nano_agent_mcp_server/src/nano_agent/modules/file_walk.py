@@ -0,0 +1,300 @@
+"""
+Directory Tree Walking for Nano Agent.
+
+Walks use os.scandir so the file type comes from the directory entry
+itself (no stat per entry on most filesystems), and prune ignored
+directories through the compiled .gitignore matcher before descending.
+Symlinked directories are listed but never followed, so walks can't loop.
+
+Single directories are listed a page at a time: each page is one pass over
+os.scandir that keeps only the `limit` entries following the cursor (a
+bounded heap), so memory stays flat however large the directory is.
+"""
+
+import base64
+import heapq
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Tuple
+
+from .gitignore import GitIgnoreMatcher, compile_glob
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FoundPath:
+    """A path produced by a walk."""
+    path: str
+    relative_path: str
+    is_dir: bool
+    depth: int
+    size: Optional[int] = None
+
+
+@dataclass
+class FindResults:
+    """Paths matched by find_paths plus walk counters."""
+    paths: List[FoundPath] = field(default_factory=list)
+    truncated: bool = False
+    directories_walked: int = 0
+    entries_seen: int = 0
+    ignored: int = 0
+
+
+def walk_tree(
+    root: str,
+    max_depth: Optional[int] = None,
+    respect_gitignore: bool = True,
+    results: Optional[FindResults] = None
+) -> Iterator[Tuple[os.DirEntry, str, int]]:
+    """Yield (entry, relative_path, depth) for everything under root, depth first.
+
+    Entries within a directory come in name order. Depth 1 is root's direct
+    children; directories at max_depth are yielded but not entered.
+
+    Args:
+        root: Absolute directory to walk
+        max_depth: Deepest level to yield (default: unlimited)
+        respect_gitignore: Prune paths ignored by .gitignore and the defaults
+        results: Optional FindResults whose counters are updated
+    """
+    matcher = GitIgnoreMatcher.for_directory(root) if respect_gitignore else None
+    # Stack of (directory, relative path, depth of its entries, matcher)
+    stack = [(root, "", 1, matcher)]
+    while stack:
+        directory, relative_dir, depth, matcher = stack.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda e: e.name)
+        except OSError as e:
+            logger.debug(f"Skipping unreadable directory {directory}: {e}")
+            continue
+        if results is not None:
+            results.directories_walked += 1
+        subdirectories = []
+        for entry in entries:
+            if results is not None:
+                results.entries_seen += 1
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if matcher is not None and matcher.is_ignored(entry.path, is_dir):
+                if results is not None:
+                    results.ignored += 1
+                continue
+            relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            yield entry, relative, depth
+            if is_dir and (max_depth is None or depth < max_depth):
+                child = matcher.child(entry.path) if matcher is not None else None
+                subdirectories.append((entry.path, relative, depth + 1, child))
+        # Reversed so the first subdirectory is walked first
+        stack.extend(reversed(subdirectories))
+
+
+def find_paths(
+    root: str,
+    pattern: str = "*",
+    max_depth: Optional[int] = None,
+    max_results: Optional[int] = None,
+    include_dirs: bool = False,
+    respect_gitignore: bool = True
+) -> FindResults:
+    """Find paths under root matching a glob.
+
+    A pattern without '/' is matched against names at any depth (like
+    find -name); a pattern with '/' is matched against the path relative to
+    root, where '**' spans directories.
+
+    Args:
+        root: Absolute directory to search
+        pattern: Glob pattern
+        max_depth: Deepest level to search (default: unlimited)
+        max_results: Stop after this many matches
+        include_dirs: Also return matching directories
+        respect_gitignore: Prune paths ignored by .gitignore and the defaults
+
+    Returns:
+        FindResults with matches in walk order
+    """
+    regex = compile_glob(pattern)
+    match_name = "/" not in pattern
+    results = FindResults()
+    for entry, relative, depth in walk_tree(root, max_depth, respect_gitignore, results):
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if not is_dir and not entry.is_file():
+                continue
+        except OSError:
+            continue
+        if is_dir and not include_dirs:
+            continue
+        if not regex.match(entry.name if match_name else relative):
+            continue
+        if max_results is not None and len(results.paths) >= max_results:
+            results.truncated = True
+            break
+        size = None
+        if not is_dir:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                pass
+        results.paths.append(FoundPath(
+            path=entry.path,
+            relative_path=relative,
+            is_dir=is_dir,
+            depth=depth,
+            size=size,
+        ))
+    return results
+
+
+# Sort modes of list_directory: name ascending, largest first, newest first
+SORT_NAME = "name"
+SORT_SIZE = "size"
+SORT_MTIME = "mtime"
+SORT_MODES = (SORT_NAME, SORT_SIZE, SORT_MTIME)
+
+
+@dataclass
+class DirectoryEntryInfo:
+    """One entry of a directory listing."""
+    name: str
+    is_dir: bool
+    size: int
+    mtime_ns: int
+    is_symlink: bool = False
+
+    def sort_key(self, sort: str) -> Tuple[Any, ...]:
+        """Ascending key of the entry for a sort mode (names break ties)."""
+        if sort == SORT_SIZE:
+            return (-self.size, self.name)
+        if sort == SORT_MTIME:
+            return (-self.mtime_ns, self.name)
+        return (self.name,)
+
+
+@dataclass
+class DirectorySummary:
+    """Counts for a whole directory, gathered in the same pass as a page."""
+    directories: int = 0
+    files: int = 0
+    symlinks: int = 0
+    total_bytes: int = 0
+
+    @property
+    def total(self) -> int:
+        """Number of entries."""
+        return self.directories + self.files
+
+    def add(self, entry: DirectoryEntryInfo) -> None:
+        """Count an entry."""
+        if entry.is_dir:
+            self.directories += 1
+        else:
+            self.files += 1
+            self.total_bytes += entry.size
+        if entry.is_symlink:
+            self.symlinks += 1
+
+
+@dataclass
+class DirectoryPage:
+    """A page of a directory listing."""
+    entries: List[DirectoryEntryInfo]
+    summary: DirectorySummary
+    start_index: int
+    next_token: Optional[str] = None
+
+
+def iter_directory(path: str) -> Iterator[DirectoryEntryInfo]:
+    """Yield the entries of a directory from os.scandir, one stat each.
+
+    Symlinks are described by their target; broken links by the link itself.
+    """
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            try:
+                is_symlink = entry.is_symlink()
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    stat = entry.stat(follow_symlinks=False)
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            yield DirectoryEntryInfo(
+                name=entry.name,
+                is_dir=is_dir,
+                size=0 if is_dir else stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                is_symlink=is_symlink,
+            )
+
+
+def encode_page_token(directory: str, sort: str, key: Tuple[Any, ...], index: int) -> str:
+    """Opaque cursor pointing after the entry with the given sort key."""
+    payload = json.dumps({"d": directory, "s": sort, "k": list(key), "i": index}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(token: str, directory: str, sort: str) -> Tuple[Tuple[Any, ...], int]:
+    """Sort key and start index encoded in a cursor.
+
+    Raises:
+        ValueError: If the token is malformed or was issued for another listing
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        token_directory, token_sort = payload["d"], payload["s"]
+        key, index = tuple(payload["k"]), int(payload["i"])
+    except Exception:
+        raise ValueError("malformed page_token")
+    if token_directory != directory:
+        raise ValueError("page_token belongs to a different directory")
+    if token_sort != sort:
+        raise ValueError(f"page_token was issued for sort={token_sort!r}")
+    return key, index
+
+
+def list_directory_page(
+    path: str,
+    sort: str = SORT_NAME,
+    limit: int = 500,
+    page_token: Optional[str] = None
+) -> DirectoryPage:
+    """One page of a directory listing in a single scandir pass.
+
+    The page holds the `limit` entries that sort after the cursor. Entries
+    added or removed between pages only affect pages not yet returned.
+
+    Raises:
+        ValueError: For an unknown sort mode or an invalid page_token
+        OSError: If the directory can't be read
+    """
+    if sort not in SORT_MODES:
+        raise ValueError(f"sort must be one of {', '.join(SORT_MODES)}")
+    after: Optional[Tuple[Any, ...]] = None
+    start_index = 0
+    if page_token:
+        after, start_index = decode_page_token(page_token, path, sort)
+
+    summary = DirectorySummary()
+
+    def candidates() -> Iterator[DirectoryEntryInfo]:
+        for entry in iter_directory(path):
+            summary.add(entry)
+            if after is None or entry.sort_key(sort) > after:
+                yield entry
+
+    # One more than the page size tells whether another page follows
+    selected = heapq.nsmallest(limit + 1, candidates(), key=lambda e: e.sort_key(sort))
+    entries = selected[:limit]
+    next_token = None
+    if len(selected) > limit:
+        next_token = encode_page_token(path, sort, entries[-1].sort_key(sort), start_index + len(entries))
+    return DirectoryPage(entries=entries, summary=summary, start_index=start_index, next_token=next_token)
@@ -4,19 +4,154 @@ File path resolution and handling for Nano Agent.
 This module provides consistent path resolution for all file operations,
 ensuring paths are always resolved relative to the current working directory
 and returned as absolute paths.
+
+The working directory is held by a Workspace, captured once when an agent
+run starts and installed in a context variable for the run's tool calls.
+It keeps the resolved root, so containment and display paths are string
+prefix checks, and memoizes the symlink resolution of each directory it
+has seen: resolving a path costs one lstat of its last component rather
+than one per component. Outside a run, the workspace of the current
+working directory is used, without the directory memo (nothing bounds
+its lifetime).
 """
 
 import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Union
+from typing import Dict, Iterator, Optional, Union
+
+from .constants import WORKSPACE_DIR_CACHE_ENTRIES
+
+
+class Workspace:
+    """
+    Root directory that a run's relative paths are resolved against.
+    
+    Directory resolutions are memoized for the workspace's lifetime (one
+    run), so a directory replaced by a symlink mid-run keeps resolving to
+    where it pointed first until forget() is called.
+    """
+    
+    def __init__(self, path: Union[str, Path], confine: bool = False, memoize: bool = True):
+        """
+        Args:
+            path: Root directory (made absolute, but kept as given for display)
+            confine: Reject paths that resolve outside the root
+            memoize: Memoize directory resolutions
+        """
+        self.path = Path(os.path.abspath(path))
+        self.root = os.path.realpath(self.path)
+        self.confine = confine
+        self.memoize = memoize
+        self._given = str(self.path)
+        self._prefix = self.root if self.root.endswith(os.sep) else self.root + os.sep
+        self._dirs: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.dir_hits = 0
+        self.dir_misses = 0
+    
+    def _resolve_dir(self, directory: str) -> str:
+        """Symlink-free form of an absolute directory path, memoized."""
+        if not self.memoize:
+            return os.path.realpath(directory)
+        resolved = self._dirs.get(directory)
+        if resolved is not None:
+            self.dir_hits += 1
+            return resolved
+        resolved = os.path.realpath(directory)
+        with self._lock:
+            if len(self._dirs) >= WORKSPACE_DIR_CACHE_ENTRIES:
+                self._dirs.clear()
+            self._dirs[directory] = resolved
+            self.dir_misses += 1
+        return resolved
+    
+    def forget(self) -> None:
+        """Drop memoized directory resolutions."""
+        with self._lock:
+            self._dirs.clear()
+    
+    def contains(self, path: Union[str, Path]) -> bool:
+        """Whether a resolved absolute path is the root or lies below it."""
+        path = os.fspath(path)
+        return path == self.root or path.startswith(self._prefix)
+    
+    def resolve(self, path_input: Union[str, Path]) -> Path:
+        """
+        Resolve a path to an absolute, symlink-free Path, like Path.resolve().
+        
+        Relative paths are taken relative to the workspace root.
+        
+        Raises:
+            PermissionError: If the workspace is confined and the path resolves outside it
+        """
+        path = os.fspath(path_input)
+        if not os.path.isabs(path):
+            path = os.path.join(self._given, path)
+        directory, name = os.path.split(path)
+        if name in ("", ".", ".."):
+            resolved = self._resolve_dir(path)
+        else:
+            resolved = os.path.join(self._resolve_dir(directory), name)
+            if os.path.islink(resolved):
+                resolved = os.path.realpath(resolved)
+        if self.confine and not self.contains(resolved):
+            raise PermissionError(f"Path is outside the workspace {self.root}: {path_input}")
+        return Path(resolved)
+    
+    def display(self, path: Union[str, Path]) -> str:
+        """A resolved path relative to the root when it lies below it ('./' for the root)."""
+        path = os.fspath(path)
+        if path == self.root or path == self._given:
+            return "./"
+        for prefix in (self._prefix, self._given + os.sep):
+            if path.startswith(prefix):
+                return path[len(prefix):]
+        return path
+
+
+_current_workspace: ContextVar[Optional[Workspace]] = ContextVar("nano_agent_workspace", default=None)
+_default_workspaces: Dict[str, Workspace] = {}
+_MAX_DEFAULT_WORKSPACES = 16
+
+
+def get_workspace() -> Workspace:
+    """The workspace of the run in the current context, or of the current working directory."""
+    workspace = _current_workspace.get()
+    if workspace is not None:
+        return workspace
+    cwd = os.getcwd()
+    workspace = _default_workspaces.get(cwd)
+    if workspace is None:
+        if len(_default_workspaces) >= _MAX_DEFAULT_WORKSPACES:
+            _default_workspaces.clear()
+        workspace = _default_workspaces[cwd] = Workspace(cwd, memoize=False)
+    return workspace
+
+
+@contextmanager
+def workspace_scope(workspace: Optional[Workspace] = None) -> Iterator[Workspace]:
+    """Install a workspace (default: the current working directory) for an agent run.
+    
+    Must be entered before the run starts so the SDK's tasks inherit it.
+    """
+    workspace = workspace if workspace is not None else Workspace(os.getcwd())
+    token = _current_workspace.set(workspace)
+    try:
+        yield workspace
+    finally:
+        _current_workspace.reset(token)
 
 
 def resolve_path(path_input: Union[str, Path]) -> Path:
     """
     Resolve a path to an absolute path.
     
-    If the input is relative, it's resolved relative to os.getcwd().
-    If the input is absolute, it's returned as-is (but as a Path object).
+    If the input is relative, it's resolved relative to the workspace root
+    (the current working directory unless a run installed another).
+    Symlinks and .. are resolved either way.
     
     Args:
         path_input: A string or Path object representing a file/directory path
@@ -24,14 +159,7 @@ def resolve_path(path_input: Union[str, Path]) -> Path:
     Returns:
         An absolute Path object
     """
-    path = Path(path_input)
-    
-    if path.is_absolute():
-        # Already absolute, just resolve to handle .. and symlinks
-        return path.resolve()
-    else:
-        # Relative path - resolve relative to current working directory
-        return (Path.cwd() / path).resolve()
+    return get_workspace().resolve(path_input)
 
 
 def get_working_directory() -> Path:
@@ -39,9 +167,9 @@ def get_working_directory() -> Path:
     Get the current working directory as a Path object.
     
     Returns:
-        The current working directory as an absolute Path
+        The workspace root as an absolute Path
     """
-    return Path.cwd()
+    return get_workspace().path
 
 
 def is_path_safe(path: Path) -> bool:
@@ -85,18 +213,7 @@ def format_path_for_display(path: Path, relative_to_cwd: bool = True) -> str:
         A string representation of the path
     """
     if relative_to_cwd:
-        try:
-            # Try to make it relative to cwd for cleaner display
-            cwd = Path.cwd()
-            rel_path = path.relative_to(cwd)
-            # If it's in the current directory, use ./ prefix for clarity
-            if str(rel_path) == ".":
-                return "./"
-            elif not str(rel_path).startswith(".."):
-                return str(rel_path)
-        except ValueError:
-            # Path is not relative to cwd, use absolute
-            pass
+        return get_workspace().display(path)
     
     return str(path)
 
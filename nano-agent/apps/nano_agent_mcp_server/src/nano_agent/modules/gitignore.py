@@ -0,0 +1,229 @@
+"""
+Compiled .gitignore Matching for Nano Agent.
+
+Tree walks (find_files, the search index) prune ignored directories
+instead of descending into build outputs, dependency caches and VCS
+metadata. Each .gitignore is compiled once into regexes and cached by its
+(mtime_ns, size, inode), so repeated walks only stat it.
+
+Supported syntax follows gitignore(5): comments, negation with '!',
+directory-only patterns with a trailing '/', patterns anchored by a '/',
+'*', '?', character classes and '**'. A deeper .gitignore takes precedence
+over a shallower one, and within a file the last matching pattern wins.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from .constants import DEFAULT_IGNORE_PATTERNS, GITIGNORE_CACHE_ENTRIES
+from .file_cache import FileVersion, file_version
+
+logger = logging.getLogger(__name__)
+
+GITIGNORE_FILE = ".gitignore"
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a gitignore-style glob into a regex (without anchors).
+
+    '*' and '?' never match '/', while '**' matches across directories.
+    """
+    parts = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                if at_start and pattern.startswith("**/", i):
+                    parts.append("(?:.*/)?")
+                    i += 3
+                    continue
+                parts.append(".*")
+                i += 2
+                continue
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern.startswith("[!", i) or pattern.startswith("[^", i) else i + 1)
+            if end < 0:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:].replace("\\", "\\\\")
+                else:
+                    body = body.replace("\\", "\\\\")
+                parts.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+def compile_glob(pattern: str) -> re.Pattern:
+    """Compile a glob matched against a whole relative path or name."""
+    return re.compile(f"^{translate_glob(pattern)}$")
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """One compiled gitignore pattern."""
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+
+
+def parse_ignore_lines(lines: Sequence[str]) -> List[IgnoreRule]:
+    """Compile gitignore lines into rules, skipping blanks and comments."""
+    rules = []
+    for raw in lines:
+        line = raw.rstrip("\n").rstrip("\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to the file's directory
+        anchored = "/" in line
+        line = line.lstrip("/")
+        body = translate_glob(line)
+        regex = re.compile(f"^{body}$" if anchored else f"^(?:.*/)?{body}$")
+        rules.append(IgnoreRule(regex=regex, negate=negate, dir_only=dir_only))
+    return rules
+
+
+def match_rules(rules: Sequence[IgnoreRule], relative_path: str, is_dir: bool) -> Optional[bool]:
+    """Decision of a rule list for a path: True ignored, False re-included, None no match."""
+    for rule in reversed(rules):
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.regex.match(relative_path):
+            return not rule.negate
+    return None
+
+
+class _RulesCache:
+    """LRU of compiled .gitignore files validated by their stat."""
+
+    def __init__(self, max_entries: int = GITIGNORE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[FileVersion, List[IgnoreRule]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.compiles = 0
+
+    def load(self, directory: str) -> List[IgnoreRule]:
+        """Rules of directory/.gitignore (empty if there is none)."""
+        path = os.path.join(directory, GITIGNORE_FILE)
+        try:
+            version = file_version(os.stat(path))
+        except OSError:
+            return []
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                rules = parse_ignore_lines(f.readlines())
+        except OSError as e:
+            logger.debug(f"Could not read {path}: {e}")
+            return []
+        with self._lock:
+            self._entries[path] = (version, rules)
+            self._entries.move_to_end(path)
+            self.compiles += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rules
+
+    def get_stats(self) -> dict:
+        """Hit and compile counters."""
+        with self._lock:
+            return {"hits": self.hits, "compiles": self.compiles, "entries": len(self._entries)}
+
+
+_rules_cache = _RulesCache()
+_default_rules = parse_ignore_lines(DEFAULT_IGNORE_PATTERNS)
+
+
+class GitIgnoreMatcher:
+    """Ignore decisions for paths below a directory, given every .gitignore above it.
+
+    Matchers are immutable; child() returns the matcher for a subdirectory,
+    so a walk carries one matcher per directory on its stack.
+    """
+
+    def __init__(self, base: str, rules: Sequence[IgnoreRule], parent: Optional["GitIgnoreMatcher"] = None):
+        self.base = base
+        self.rules = rules
+        self.parent = parent
+        self._prefix = base.rstrip(os.sep) + os.sep
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "GitIgnoreMatcher":
+        """Matcher for a directory, including .gitignore files up to its repository root.
+
+        DEFAULT_IGNORE_PATTERNS apply at the outermost level, so a project
+        .gitignore can re-include them with '!'.
+        """
+        directory = os.path.abspath(directory)
+        chain = [directory]
+        current = directory
+        while not os.path.exists(os.path.join(current, ".git")):
+            parent = os.path.dirname(current)
+            if parent == current:
+                # Not inside a repository: only the directory itself counts
+                chain = [directory]
+                break
+            current = parent
+            chain.append(current)
+        matcher = cls(chain[-1], _default_rules)
+        for path in reversed(chain):
+            rules = _rules_cache.load(path)
+            if rules:
+                matcher = cls(path, rules, matcher)
+        return matcher
+
+    def child(self, directory: str) -> "GitIgnoreMatcher":
+        """Matcher for a subdirectory, adding its own .gitignore if present."""
+        rules = _rules_cache.load(directory)
+        return GitIgnoreMatcher(directory, rules, self) if rules else self
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool:
+        """Whether an absolute path below the matcher's directory is ignored."""
+        matcher: Optional[GitIgnoreMatcher] = self
+        while matcher is not None:
+            if path.startswith(matcher._prefix):
+                decision = match_rules(matcher.rules, path[len(matcher._prefix):], is_dir)
+                if decision is not None:
+                    return decision
+            matcher = matcher.parent
+        return False
+
+
+def get_gitignore_stats() -> dict:
+    """Compiled .gitignore cache counters."""
+    return _rules_cache.get_stats()
@@ -0,0 +1,157 @@
+"""
+Line-range Edits for Nano Agent.
+
+replace_lines splices new text over a range of lines by byte offset, with
+no search for the old text. Offsets come from the same cached block line
+index as ranged reads, so locating lines in a large file costs a binary
+search plus one block scan. The new file is streamed from the
+memory-mapped original (prefix, new text, suffix) through atomic_write's
+staged temp file, so memory stays flat however large the file is.
+
+Each range is identified by a short hash of its bytes, the same one a
+ranged read_file reports as its etag. An edit that passes the hash it
+expects is rejected when the lines have changed since, instead of
+overwriting someone else's change.
+"""
+
+import logging
+import mmap
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple, Union
+
+from .atomic_write import StagedFile
+from .constants import LINE_INDEX_MIN_BYTES
+from .file_cache import file_version, get_file_cache
+from .line_index import LineIndex, get_line_index_cache, range_hash
+
+logger = logging.getLogger(__name__)
+
+# Most bytes of the current range shown when an expected hash doesn't match
+STALE_RANGE_PREVIEW_BYTES = 2048
+
+
+@dataclass
+class LineSplice:
+    """Outcome of a replace_lines call (line numbers are 1-based, inclusive)."""
+    start_line: int
+    end_line: int  # Last line replaced (start_line - 1 for a pure insertion)
+    new_end_line: int  # Last line of the inserted text (start_line - 1 if none)
+    total_lines: int  # Lines in the file after the edit
+    old_hash: str
+    new_hash: str
+    changed: bool = True  # False when the new text equals the old lines
+
+
+@contextmanager
+def _open_buffer(path: Union[str, Path]) -> Iterator[Tuple[Any, LineIndex, os.stat_result]]:
+    """Bytes of a file with its line index; large files are memory-mapped."""
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size < LINE_INDEX_MIN_BYTES:
+            data = f.read()
+            yield data, LineIndex.build(data, len(data)), stat
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm, get_line_index_cache().get(str(path), stat, mm), stat
+
+
+def _line_ending(buffer: Any, size: int) -> bytes:
+    """Line ending used by the file (from its first line)."""
+    newline = buffer.find(b"\n", 0, min(size, 64 * 1024))
+    return b"\r\n" if newline > 0 and buffer[newline - 1:newline] == b"\r" else b"\n"
+
+
+def replace_line_range(
+    path: Union[str, Path],
+    start_line: int,
+    end_line: int,
+    new_text: str,
+    expected_hash: Optional[str] = None,
+    encoding: str = "utf-8"
+) -> Tuple[Optional[LineSplice], Optional[str]]:
+    """Replace lines start_line..end_line of a file with new_text.
+
+    An end_line of start_line - 1 inserts before start_line without
+    replacing anything; an empty new_text deletes the lines. new_text gets
+    the file's line ending (LF or CRLF) and a final newline unless it
+    replaces the file's unterminated last line.
+
+    Args:
+        path: Absolute path of the file
+        start_line: First line to replace (1-based)
+        end_line: Last line to replace (inclusive)
+        new_text: Replacement text
+        expected_hash: Hash the range must still have (from range_hash)
+        encoding: Encoding of the file (one that writes newlines as b"\n", see ascii_compatible)
+
+    Returns:
+        Tuple of (LineSplice, error_message); exactly one is None
+
+    Raises:
+        OSError: If the file can't be read or written
+        UnicodeEncodeError: If new_text can't be written in encoding
+    """
+    if encoding == "utf-8-sig":
+        # The BOM is already at the start of the file; spliced text must not repeat it
+        encoding = "utf-8"
+    with _open_buffer(path) as (buffer, index, stat):
+        total = index.total_lines
+        if start_line < 1 or start_line > total + 1:
+            return None, f"start_line must be between 1 and {total + 1} (the file has {total} lines)"
+        if end_line < start_line - 1 or end_line > total:
+            return None, f"end_line must be between {start_line - 1} (insert only) and {total}"
+
+        size = index.size
+        start = index.line_start(buffer, start_line - 1)
+        end = index.line_start(buffer, end_line)
+        old_hash = range_hash(buffer[start:end])
+        if expected_hash is not None and expected_hash != old_hash:
+            current = bytes(buffer[start:min(end, start + STALE_RANGE_PREVIEW_BYTES)])
+            preview = current.decode(encoding, errors="replace")
+            more = "\n..." if end - start > STALE_RANGE_PREVIEW_BYTES else ""
+            return None, (
+                f"Lines {start_line}-{end_line} changed since they were read "
+                f"(hash {old_hash}, expected {expected_hash}). Current lines:\n{preview}{more}"
+            )
+
+        newline = _line_ending(buffer, size)
+        data = new_text.replace("\r\n", "\n").encode(encoding)
+        # The last line of the file may lack a newline; keep it that way
+        open_end = size > 0 and buffer[size - 1:size] != b"\n"
+        if data and not data.endswith(b"\n") and not (end == size and open_end):
+            data += b"\n"
+        if newline != b"\n":
+            data = data.replace(b"\n", newline)
+        # Appending after an unterminated last line terminates it first
+        separator = newline if data and start == size and open_end else b""
+
+        changed = separator + data != buffer[start:end]
+        if changed:
+            with StagedFile(path) as staged:
+                with memoryview(buffer) as view:
+                    staged.write(view[:start])
+                    staged.write(separator)
+                    staged.write(data)
+                    staged.write(view[end:])
+                staged.close()
+                if file_version(os.stat(path)) != file_version(stat):
+                    return None, "The file changed on disk while the edit was prepared"
+                staged.publish()
+
+    if changed:
+        get_file_cache().invalidate(path)
+    inserted = data.count(b"\n") + (0 if data.endswith(b"\n") or not data else 1)
+    removed = end_line - start_line + 1
+    return LineSplice(
+        start_line=start_line,
+        end_line=end_line,
+        new_end_line=start_line + inserted - 1,
+        total_lines=total - removed + inserted,
+        old_hash=old_hash,
+        new_hash=range_hash(data),
+        changed=changed,
+    ), None
+
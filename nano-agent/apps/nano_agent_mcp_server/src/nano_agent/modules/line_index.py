@@ -0,0 +1,240 @@
+"""
+Line-addressed Reads for Nano Agent.
+
+Serves a range of lines from a file without reading the whole file. Large
+files are memory-mapped and described by a block line index: for every
+LINE_INDEX_BLOCK_BYTES block it stores how many lines start before it.
+Finding a line is a binary search plus a scan of one block, so a range
+read costs O(block + range) instead of O(file). Indexes are cached per
+file version (mtime_ns, size, inode) and rebuilt when the file changes.
+"""
+
+import bisect
+import codecs
+import hashlib
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .constants import (
+    LINE_INDEX_BLOCK_BYTES,
+    LINE_INDEX_CACHE_ENTRIES,
+    LINE_INDEX_MIN_BYTES,
+)
+from .file_cache import FileVersion, file_version, get_file_cache
+
+
+def range_hash(data: Any) -> str:
+    """Short content hash of a line range's raw bytes (as replace_lines checks it)."""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+@dataclass
+class LineRange:
+    """Text of a line range and where it sits in the file.
+
+    Line numbers are 1-based and inclusive. end_line is start_line - 1 when
+    no complete line was returned.
+    """
+    text: str
+    start_line: int
+    end_line: int
+    total_lines: int
+    truncated_line: bool = False  # The last line was cut at max_bytes
+    line_bytes: int = 0  # Full length of the cut line, when truncated_line
+    hash: str = ""  # range_hash of the returned lines' bytes in the file
+
+    @property
+    def has_more(self) -> bool:
+        """Whether lines after end_line exist (or the last line was cut)."""
+        return self.truncated_line or self.end_line < self.total_lines
+
+
+class LineIndex:
+    """Block line index of one file version."""
+
+    def __init__(self, size: int, block_size: int, lines_before: array, total_lines: int):
+        self.size = size
+        self.block_size = block_size
+        self.lines_before = lines_before  # lines_before[i]: newlines before block i
+        self.total_lines = total_lines
+
+    @classmethod
+    def build(cls, buffer: Any, size: int, block_size: int = LINE_INDEX_BLOCK_BYTES) -> "LineIndex":
+        """Count newlines per block of a bytes-like buffer (e.g. an mmap)."""
+        lines_before = array("Q")
+        newlines = 0
+        for start in range(0, size, block_size):
+            lines_before.append(newlines)
+            newlines += buffer[start:start + block_size].count(b"\n")
+        last_line_open = size > 0 and buffer[size - 1:size] != b"\n"
+        return cls(size, block_size, lines_before, newlines + int(last_line_open))
+
+    def line_start(self, buffer: Any, line: int) -> int:
+        """Byte offset where 0-based line starts (size if past the end)."""
+        if line <= 0:
+            return 0
+        # Last block with fewer than `line` newlines before it holds the newline ending line-1
+        block = bisect.bisect_left(self.lines_before, line) - 1
+        remaining = line - self.lines_before[block]
+        pos = block * self.block_size
+        while remaining:
+            found = buffer.find(b"\n", pos, self.size)
+            if found < 0:
+                return self.size
+            pos = found + 1
+            remaining -= 1
+        return pos
+
+
+class LineIndexCache:
+    """Bounded LRU of line indexes keyed by path and file version."""
+
+    def __init__(self, max_entries: int = LINE_INDEX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[FileVersion, LineIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, path: str, stat: os.stat_result, buffer: Any) -> LineIndex:
+        """Return the index for this file version, building it from buffer if needed."""
+        version = file_version(stat)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+        index = LineIndex.build(buffer, stat.st_size)
+        with self._lock:
+            self.builds += 1
+            self._entries[path] = (version, index)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/build counters."""
+        with self._lock:
+            return {"hits": self.hits, "builds": self.builds, "entries": len(self._entries)}
+
+
+_line_indexes = LineIndexCache()
+
+
+def get_line_index_cache() -> LineIndexCache:
+    """Get the process-wide line index cache."""
+    return _line_indexes
+
+
+def _decode(data: bytes, encoding: str, cut: bool) -> Tuple[str, bool]:
+    """Decode data; when it was cut at a byte limit, drop a trailing partial character."""
+    if not cut:
+        return data.decode(encoding), False
+    # An incremental decoder holds back a character cut at the end, whatever the codec
+    decoder = codecs.getincrementaldecoder(encoding)()
+    text = decoder.decode(data, final=False)
+    return text, bool(decoder.getstate()[0])
+
+
+def ascii_compatible(encoding: str) -> bool:
+    """Whether encoding writes ASCII text, newlines included, as single bytes (a BOM aside)."""
+    return "a\n".encode(encoding).endswith(b"a\n")
+
+
+def _slice_lines(
+    buffer: Any,
+    index: LineIndex,
+    offset: int,
+    limit: Optional[int],
+    max_bytes: Optional[int],
+    encoding: str
+) -> LineRange:
+    """Cut lines [offset, offset + limit) out of buffer, honouring max_bytes."""
+    size = index.size
+    start = index.line_start(buffer, offset - 1)
+    end = start
+    lines = 0
+    byte_limit = start + max_bytes if max_bytes is not None else size
+    truncated_line = False
+    line_bytes = 0
+    while end < size and (limit is None or lines < limit):
+        newline = buffer.find(b"\n", end, size)
+        line_end = size if newline < 0 else newline + 1
+        if line_end > byte_limit:
+            if lines == 0:
+                # A single line longer than max_bytes: return its head
+                end = byte_limit
+                truncated_line = True
+                line_bytes = line_end - start
+            break
+        end = line_end
+        lines += 1
+
+    data = bytes(buffer[start:end])
+    text, _ = _decode(data, encoding, cut=truncated_line)
+    # Match text-mode reads, which translate CRLF line endings
+    text = text.replace("\r\n", "\n")
+    return LineRange(
+        text=text,
+        start_line=offset,
+        end_line=offset + lines - 1,
+        total_lines=index.total_lines,
+        truncated_line=truncated_line,
+        line_bytes=line_bytes,
+        hash=range_hash(data),
+    )
+
+
+def read_line_range(
+    path: Union[str, Path],
+    offset: int = 1,
+    limit: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    encoding: str = "utf-8"
+) -> LineRange:
+    """Read a range of lines from a file.
+
+    Files smaller than LINE_INDEX_MIN_BYTES are read whole and sliced;
+    larger files are memory-mapped and located through a cached line index.
+    Either way the range is cut from the file's bytes, so LineRange.hash is
+    the range_hash replace_lines checks. UTF-16/32 files, whose newlines
+    aren't single bytes, are sliced from their decoded text instead (their
+    hash then covers that text as UTF-8).
+
+    Args:
+        path: Absolute path of the file
+        offset: First line to return (1-based)
+        limit: Maximum number of lines (None for all remaining lines)
+        max_bytes: Maximum bytes of file content to return
+        encoding: Text encoding
+
+    Returns:
+        LineRange with the text and its position in the file
+
+    Raises:
+        OSError: If the file can't be opened
+        UnicodeDecodeError: If the range can't be decoded
+    """
+    offset = max(1, offset)
+    if not ascii_compatible(encoding):
+        # Lines are found by their b"\n" byte, which UTF-16/32 don't have: slice the text as UTF-8
+        text, _ = get_file_cache().read_text(path, encoding)
+        data = text.encode("utf-8")
+        return _slice_lines(data, LineIndex.build(data, len(data)), offset, limit, max_bytes, "utf-8")
+
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size < LINE_INDEX_MIN_BYTES:
+            data = f.read()
+            return _slice_lines(data, LineIndex.build(data, len(data)), offset, limit, max_bytes, encoding)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index = get_line_index_cache().get(str(path), stat, mm)
+            return _slice_lines(mm, index, offset, limit, max_bytes, encoding)
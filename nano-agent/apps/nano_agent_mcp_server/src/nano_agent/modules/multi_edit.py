@@ -0,0 +1,414 @@
+"""
+Multi-edit and Patch Application for Nano Agent.
+
+edit_file makes one replacement per call. apply_edits and apply_patch make
+many in one call: every file is read once, every change is located and
+checked against the original content before anything is written, and each
+file is then written once. Files are staged through atomic_write and all
+files of a change set are replaced together, so a conflict or a failed
+write leaves every file as it was.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .atomic_write import FSYNC_DIR, StagedFile, get_fsync_policy, sync_directory
+from .digest_cache import get_digest_cache
+from .file_cache import FileVersion, file_version, get_file_cache
+from .text_encoding import detect_file_encoding, sniff_encoding
+
+logger = logging.getLogger(__name__)
+
+_HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_DEV_NULL = "/dev/null"
+
+
+# Replacements (apply_edits)
+
+def plan_edits(content: str, edits: Sequence[Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Apply edits to content, all located in the original text.
+
+    Each edit has old_str, new_str and replace_all. Edits don't see each
+    other's results; they must not overlap.
+
+    Returns:
+        Tuple of (new_content, error_message). Exactly one of them is None.
+    """
+    spans: List[Tuple[int, int, str, int]] = []
+    for number, edit in enumerate(edits, 1):
+        old_str = edit.old_str
+        if not old_str:
+            return None, f"Edit {number}: old_str must not be empty"
+        starts = []
+        position = content.find(old_str)
+        while position >= 0:
+            starts.append(position)
+            position = content.find(old_str, position + len(old_str))
+        if not starts:
+            return None, f"Edit {number}: text not found: {old_str[:100]!r}"
+        if len(starts) > 1 and not edit.replace_all:
+            return None, (
+                f"Edit {number}: found {len(starts)} occurrences of {old_str[:100]!r}; "
+                f"add context to make it unique or set replace_all"
+            )
+        spans.extend((start, start + len(old_str), edit.new_str, number) for start in starts)
+
+    spans.sort()
+    for previous, current in zip(spans, spans[1:]):
+        if current[0] < previous[1]:
+            return None, f"Edits {previous[3]} and {current[3]} overlap"
+
+    pieces = []
+    position = 0
+    for start, end, new_str, _ in spans:
+        pieces.append(content[position:start])
+        pieces.append(new_str)
+        position = end
+    pieces.append(content[position:])
+    return "".join(pieces), None
+
+
+# Unified diffs (apply_patch)
+
+@dataclass
+class Hunk:
+    """One @@ section of a unified diff."""
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    lines: List[Tuple[str, str]] = field(default_factory=list)
+    old_missing_newline: bool = False
+    new_missing_newline: bool = False
+
+    @property
+    def header(self) -> str:
+        """The hunk's @@ line."""
+        return f"@@ -{self.old_start},{self.old_count} +{self.new_start},{self.new_count} @@"
+
+    @property
+    def old_lines(self) -> List[str]:
+        return [text for tag, text in self.lines if tag != "+"]
+
+    @property
+    def new_lines(self) -> List[str]:
+        return [text for tag, text in self.lines if tag != "-"]
+
+
+@dataclass
+class FilePatch:
+    """The hunks of one file in a unified diff (None path = /dev/null)."""
+    old_path: Optional[str]
+    new_path: Optional[str]
+    hunks: List[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        """The path the patch is about, for messages."""
+        return self.new_path or self.old_path or ""
+
+
+def _header_path(line: str) -> Optional[str]:
+    """Path of a ---/+++ line (timestamps after a tab dropped)."""
+    path = line[4:].split("\t", 1)[0].strip()
+    return None if path == _DEV_NULL else path
+
+
+def _strip_prefixes(patch: FilePatch) -> None:
+    """Drop git's a/ and b/ prefixes when both sides use them."""
+    old, new = patch.old_path, patch.new_path
+    if (old is None or old.startswith("a/")) and (new is None or new.startswith("b/")):
+        patch.old_path = old[2:] if old else None
+        patch.new_path = new[2:] if new else None
+
+
+def parse_unified_diff(text: str) -> Tuple[List[FilePatch], Optional[str]]:
+    """Parse a (possibly multi-file, git-style) unified diff.
+
+    Returns:
+        Tuple of (file patches, error_message)
+    """
+    lines = text.splitlines()
+    patches: List[FilePatch] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not (line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ ")):
+            i += 1
+            continue
+        patch = FilePatch(old_path=_header_path(line), new_path=_header_path(lines[i + 1]))
+        _strip_prefixes(patch)
+        i += 2
+        while i < len(lines) and lines[i].startswith("@@"):
+            match = _HUNK_HEADER_RE.match(lines[i])
+            if not match:
+                return [], f"Malformed hunk header in {patch.path}: {lines[i]!r}"
+            hunk = Hunk(
+                old_start=int(match.group(1)),
+                old_count=int(match.group(2) or 1),
+                new_start=int(match.group(3)),
+                new_count=int(match.group(4) or 1),
+            )
+            i += 1
+            old_seen = new_seen = 0
+            while i < len(lines) and (old_seen < hunk.old_count or new_seen < hunk.new_count or lines[i].startswith("\\")):
+                body = lines[i]
+                if body.startswith("\\"):
+                    # "\ No newline at end of file" applies to the line before it
+                    last_tag = hunk.lines[-1][0] if hunk.lines else " "
+                    if last_tag != "+":
+                        hunk.old_missing_newline = True
+                    if last_tag != "-":
+                        hunk.new_missing_newline = True
+                    i += 1
+                    continue
+                tag, content = (body[0], body[1:]) if body else (" ", "")
+                if tag not in " +-":
+                    return [], f"Unexpected line in hunk {hunk.header} of {patch.path}: {body[:80]!r}"
+                hunk.lines.append((tag, content))
+                if tag != "+":
+                    old_seen += 1
+                if tag != "-":
+                    new_seen += 1
+                i += 1
+            if old_seen != hunk.old_count or new_seen != hunk.new_count:
+                return [], f"Hunk {hunk.header} of {patch.path} is truncated"
+            patch.hunks.append(hunk)
+        if not patch.hunks:
+            return [], f"No hunks for {patch.path}"
+        patches.append(patch)
+    if not patches:
+        return [], "No file changes found in patch (expected ---/+++ headers and @@ hunks)"
+    return patches, None
+
+
+def _find_block(lines: List[str], block: List[str], expected: int, lowest: int) -> int:
+    """Index where block occurs, nearest to expected and not before lowest (-1 if absent)."""
+    size = len(block)
+    last = len(lines) - size
+    if last < lowest:
+        return -1
+    expected = min(max(expected, lowest), last)
+    for distance in range(0, max(expected - lowest, last - expected) + 1):
+        for candidate in (expected - distance, expected + distance):
+            if lowest <= candidate <= last and lines[candidate:candidate + size] == block:
+                return candidate
+    return -1
+
+
+def apply_hunks(content: Optional[str], patch: FilePatch) -> Tuple[Optional[str], Optional[str]]:
+    """Apply a file's hunks to its current content (None if it doesn't exist).
+
+    Hunks may have drifted from their line numbers; each is placed at the
+    nearest position where its context and removed lines match exactly.
+
+    Returns:
+        Tuple of (new_content, error_message); new_content is "" for a deletion
+    """
+    text = content or ""
+    ends_with_newline = text.endswith("\n")
+    lines = text.split("\n")
+    if ends_with_newline or not text:
+        lines.pop()
+
+    result: List[str] = []
+    position = 0
+    offset = 0
+    missing_newline = bool(text) and not ends_with_newline
+    for hunk in patch.hunks:
+        old_lines = hunk.old_lines
+        # A hunk removing nothing inserts after line old_start
+        nominal = hunk.old_start - 1 if hunk.old_count else hunk.old_start
+        start = _find_block(lines, old_lines, nominal + offset, position)
+        if start < 0:
+            return None, f"Hunk {hunk.header} of {patch.path} does not apply: its context was not found"
+        result.extend(lines[position:start])
+        result.extend(hunk.new_lines)
+        position = start + len(old_lines)
+        offset = start - nominal
+        if position == len(lines):
+            missing_newline = hunk.new_missing_newline
+    result.extend(lines[position:])
+    if not result:
+        return "", None
+    return "\n".join(result) + ("" if missing_newline else "\n"), None
+
+
+# Atomic multi-file commit
+
+@dataclass
+class FileSnapshot:
+    """A file as read for a change."""
+    text: str  # Content with newlines translated to "\n" ("" if binary)
+    data: bytes  # Content as it is on disk
+    newline: str  # Line ending the file uses ("\n" or "\r\n"), re-applied on write
+    version: FileVersion
+    encoding: Optional[str] = "utf-8"  # Detected encoding, re-applied on write (None if binary)
+
+    @property
+    def binary(self) -> bool:
+        return self.encoding is None
+
+
+@dataclass
+class FileChange:
+    """New content for one path (None deletes it), with the file it was planned from (None if new)."""
+    path: Path
+    content: Optional[str]
+    original: Optional[FileSnapshot] = None
+    _staged: Optional[StagedFile] = None
+
+    @property
+    def version(self) -> Optional[FileVersion]:
+        """Version of the file the change was planned from (None if it didn't exist)."""
+        return self.original.version if self.original is not None else None
+
+    @property
+    def encoding(self) -> str:
+        """Encoding the new content is written in: the file's, or UTF-8 for a new file."""
+        return self.original.encoding if self.original is not None else "utf-8"
+
+    def encode(self) -> bytes:
+        """The new content as it will be written, in the file's encoding and line endings.
+
+        Raises:
+            UnicodeEncodeError: If the content can't be written in the file's encoding
+        """
+        newline = self.original.newline if self.original is not None else "\n"
+        content = self.content if newline == "\n" else self.content.replace("\n", newline)
+        return content.encode(self.encoding)
+
+
+def read_for_change(path: Path) -> Optional[FileSnapshot]:
+    """Current content of a file, or None if it doesn't exist.
+
+    The file is decoded in its detected encoding (see text_encoding); a
+    binary file comes back with binary set and no text.
+
+    Raises:
+        UnicodeDecodeError: If the file doesn't decode even in the encoding its bytes suggest
+        OSError: For errors other than the file not existing
+    """
+    try:
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    version = file_version(stat)
+    guess = detect_file_encoding(path, stat)
+    if not guess.binary:
+        try:
+            text = data.decode(guess.encoding)
+        except UnicodeDecodeError:
+            # The head fitted but a later part of the file doesn't
+            guess = sniff_encoding(data)
+            text = None if guess.binary else data.decode(guess.encoding)
+    if guess.binary:
+        return FileSnapshot(text="", data=data, newline="\n", version=version, encoding=None)
+    # Same line ending rule as replace_lines: the first line's decides
+    first = text.find("\n")
+    newline = "\r\n" if first > 0 and text[first - 1] == "\r" else "\n"
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return FileSnapshot(text=text, data=data, newline=newline, version=version, encoding=guess.encoding)
+
+
+def _stage(change: FileChange) -> None:
+    """Write a change's content to a temp file next to its target."""
+    change.path.parent.mkdir(parents=True, exist_ok=True)
+    staged = StagedFile(change.path)
+    change._staged = staged
+    staged.write(change.encode())
+    staged.close()
+
+
+def _discard_staged(changes: Sequence[FileChange]) -> None:
+    for change in changes:
+        if change._staged is not None:
+            change._staged.discard()
+            change._staged = None
+
+
+def _current_version(path: Path) -> Optional[FileVersion]:
+    try:
+        return file_version(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def _restore(change: FileChange) -> None:
+    """Put a replaced or deleted file back to its original content."""
+    if change.original is None:
+        os.unlink(change.path)
+        return
+    with StagedFile(change.path) as staged:
+        staged.write(change.original.data)
+        staged.publish()
+
+
+def commit_changes(changes: Sequence[FileChange]) -> Optional[str]:
+    """Write all changes or none of them.
+
+    Changes that leave a file's content as it is are skipped. Every new
+    content is first written to a temp file. Then each target is checked
+    to be unchanged since it was read, and the temp files replace their
+    targets. If a replace fails, the files already replaced are restored
+    from their original content.
+
+    Returns:
+        Error message, or None on success
+    """
+    changes = [
+        change for change in changes
+        if change.content is None or change.original is None or change.content != change.original.text
+    ]
+    change = None
+    try:
+        for change in changes:
+            if change.content is not None:
+                _stage(change)
+        for change in changes:
+            if _current_version(change.path) != change.version:
+                _discard_staged(changes)
+                return f"{change.path} changed on disk while the edit was prepared; nothing was written"
+    except Exception as e:
+        _discard_staged(changes)
+        return f"Failed to write {change.path}: {e}; nothing was written"
+
+    done: List[FileChange] = []
+    try:
+        for change in changes:
+            if change.content is None:
+                os.unlink(change.path)
+                if get_fsync_policy() == FSYNC_DIR:
+                    sync_directory(change.path.parent)
+            else:
+                change._staged.publish()
+                change._staged = None
+            done.append(change)
+    except OSError as e:
+        failed = change.path
+        for applied in reversed(done):
+            try:
+                _restore(applied)
+            except OSError as restore_error:
+                logger.error(f"Could not restore {applied.path} after a failed patch: {restore_error}")
+        _discard_staged(changes)
+        for applied in done:
+            get_file_cache().invalidate(applied.path)
+        return f"Failed to write {failed}: {e}; all files were restored"
+
+    cache = get_file_cache()
+    digests = get_digest_cache()
+    for change in changes:
+        if change.content is None:
+            cache.invalidate(change.path)
+        else:
+            cache.put(change.path, change.content, change.encoding)
+            digests.put(change.path, change.encode())
+    return None
@@ -7,7 +7,7 @@ autonomous task execution with file system tools.
 
 import logging
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union, Callable, Awaitable
 from datetime import datetime
 import time
 from pathlib import Path
@@ -18,6 +18,9 @@ import asyncio
 from agents import Agent, Runner, RunConfig, ModelSettings
 from agents.lifecycle import RunHooksBase
 
+# MCP request context (injected by FastMCP)
+from mcp.server.fastmcp import Context
+
 # Rich logging imports
 from rich.console import Console
 from rich.panel import Panel
@@ -25,11 +28,24 @@ from rich.syntax import Syntax
 from rich.text import Text
 
 # Token tracking
-from .token_tracking import TokenTracker, format_token_count, format_cost
+from .token_tracking import (
+    TokenTracker,
+    format_token_count,
+    format_cost,
+    aggregate_token_summaries,
+    get_token_ledger,
+    RUN_STATUS_CANCELLED,
+    RUN_STATUS_COMPLETED,
+    RUN_STATUS_FAILED,
+    RUN_STATUS_TIMED_OUT,
+)
 
 from .data_types import (
     PromptNanoAgentRequest,
     PromptNanoAgentResponse,
+    PromptNanoAgentBatchRequest,
+    PromptNanoAgentBatchResponse,
+    BatchItemResponse,
     AgentConfig,
     AgentExecution
 )
@@ -38,23 +54,33 @@ from .constants import (
     DEFAULT_MODEL,
     DEFAULT_PROVIDER,
     MAX_AGENT_TURNS,
-    DEFAULT_TEMPERATURE,
-    MAX_TOKENS,
+    DEFAULT_TIMEOUT_SECONDS,
+    DEFAULT_TURN_TIMEOUT_SECONDS,
     AVAILABLE_TOOLS,
     AVAILABLE_MODELS,
-    NANO_AGENT_SYSTEM_PROMPT,
     ERROR_NO_API_KEY,
     ERROR_PROVIDER_NOT_SUPPORTED,
     SUCCESS_AGENT_COMPLETE,
     VERSION,
-    PROVIDER_REQUIREMENTS
+    DEFAULT_BATCH_CONCURRENCY,
+    BATCH_CONCURRENCY_BY_PROVIDER,
+    BATCH_CONCURRENCY_ENV_PREFIX
 )
 
-# Import tools from nano_agent_tools
-from .nano_agent_tools import get_nano_agent_tools
+# Shared, pre-built agents per provider/model
+from .agent_registry import get_agent_registry
 
-# Import provider configuration
-from .provider_config import ProviderConfig
+# Streamed execution progress and latency metrics
+from .tool_calls import ToolCallLog, get_tool_call_log, tool_call_log_scope
+from .tool_executor import get_tool_executor
+from .file_cache import get_file_cache
+from .digest_cache import get_digest_cache
+from .search_index import get_search_indexes
+from .gitignore import get_gitignore_stats
+from .write_sessions import get_write_sessions
+from .files import workspace_scope
+from .nano_agent_tools import ToolResultMemo, tool_result_memo_scope
+from .streaming import ProgressCallback, RunDeadline, RunMetrics, StreamEventProcessor
 
 # Initialize logger and rich console
 logger = logging.getLogger(__name__)
@@ -72,6 +98,7 @@ class RichLoggingHooks(RunHooksBase):
         """
         self.tool_call_count = 0
         self.tool_call_map = {}  # Map tool call number to tool name
+        self.call_numbers = {}  # Map SDK tool call id to tool call number
         self.token_tracker = token_tracker
     
     async def on_agent_start(self, context, agent):
@@ -94,11 +121,12 @@ class RichLoggingHooks(RunHooksBase):
             return str_value[:max_length-3] + "..."
         return str_value
     
-    def _format_tool_args(self, tool_name):
-        """Format tool arguments for display."""
-        # For now, return empty dict since we can't access args directly
-        # In real implementation, we'd extract from context
-        return {}
+    def _format_tool_args(self, tool_args):
+        """Format tool arguments for display, truncating long values."""
+        formatted_args = {}
+        for key, value in tool_args.items():
+            formatted_args[key] = self._truncate_value(value, 100)
+        return json.dumps(formatted_args, indent=2)
     
     async def on_tool_start(self, context, agent, tool):
         """Called before a tool is invoked."""
@@ -107,92 +135,30 @@ class RichLoggingHooks(RunHooksBase):
         # Extract tool name 
         tool_name = getattr(tool, 'name', 'Unknown Tool')
         
-        # Store mapping for later use
+        # Store mapping for later use; number by call id so parallel calls keep their number
         self.tool_call_map[self.tool_call_count] = tool_name
-        self.current_tool_number = self.tool_call_count
-        self.current_tool_name = tool_name
-        self.current_tool_start_time = time.time()
-        
-        # Try multiple methods to get tool arguments
-        tool_args = {}
-        
-        # Method 1: Check if tool has call attributes
-        if hasattr(tool, 'call') and hasattr(tool.call, 'function'):
-            try:
-                if hasattr(tool.call.function, 'arguments'):
-                    tool_args = json.loads(tool.call.function.arguments)
-                    logger.debug(f"Found args in tool.call.function: {tool_args}")
-            except Exception as e:
-                logger.debug(f"Failed to get args from tool.call: {e}")
+        call_id = getattr(context, 'tool_call_id', None)
+        if call_id:
+            self.call_numbers[call_id] = self.tool_call_count
         
-        # Method 2: Look in context for recent tool calls
-        if not tool_args and hasattr(context, 'messages'):
-            try:
-                # Get the last few messages and look for tool calls
-                for msg in reversed(list(context.messages)[-3:]):
-                    if hasattr(msg, 'tool_calls'):
-                        for tc in msg.tool_calls:
-                            if hasattr(tc, 'function') and tc.function.name == tool_name:
-                                if hasattr(tc.function, 'arguments'):
-                                    tool_args = json.loads(tc.function.arguments)
-                                    logger.debug(f"Found args in context messages: {tool_args}")
-                                    break
-                        if tool_args:
-                            break
-            except Exception as e:
-                logger.debug(f"Failed to get args from context: {e}")
-        
-        # Method 3: Check the tool object directly
-        if not tool_args:
-            # Log what the tool object contains for debugging
-            logger.debug(f"Tool type: {type(tool)}, dir: {[x for x in dir(tool) if not x.startswith('_')][:10]}")
-            if hasattr(tool, '__dict__'):
-                logger.debug(f"Tool dict: {list(tool.__dict__.keys())[:10]}")
-        
-        # Display the tool call with or without arguments
-        if tool_args:
-            # Truncate values that are too long
-            formatted_args = {}
-            for key, value in tool_args.items():
-                formatted_args[key] = self._truncate_value(value, 100)
-            
-            args_str = json.dumps(formatted_args, indent=2)
-            display_text = f"{tool_name}(\n{args_str}\n)"
-            
-            console.print(Panel(
-                Syntax(display_text, "python", theme="monokai", line_numbers=False),
-                title=f"🔧 Tool Call #{self.tool_call_count}",
-                border_style="cyan"
-            ))
-        else:
-            # Fallback to simple display
-            console.print(Panel(
-                Text(f"Invoking: {tool_name}", style="cyan"),
-                title=f"🔧 Tool Call #{self.tool_call_count}",
-                border_style="cyan"
-            ))
-        
-        # Store args for later use if found
-        self.current_tool_args = tool_args
+        # Arguments are shown when the call ends, from the run's tool call log
+        console.print(Panel(
+            Text(f"Invoking: {tool_name}", style="cyan"),
+            title=f"🔧 Tool Call #{self.tool_call_count}",
+            border_style="cyan"
+        ))
     
     async def on_tool_end(self, context, agent, tool, result):
         """Called after a tool is invoked."""
         tool_name = getattr(tool, 'name', 'Unknown Tool')
-        tool_number = getattr(self, 'current_tool_number', 0)
+        call_id = getattr(context, 'tool_call_id', None)
+        tool_number = self.call_numbers.pop(call_id, self.tool_call_count)
         
-        # Calculate execution time
-        exec_time = time.time() - getattr(self, 'current_tool_start_time', time.time())
-        
-        # Try to get the captured arguments from our tools module
-        tool_args = {}
-        try:
-            from .nano_agent_tools import _last_tool_args
-            if tool_name in _last_tool_args:
-                tool_args = _last_tool_args[tool_name]
-                # Clear after use to avoid showing stale args
-                del _last_tool_args[tool_name]
-        except:
-            pass
+        # Arguments and timing come from the per-run tool call log
+        tool_calls = get_tool_call_log()
+        record = tool_calls.get(call_id) if tool_calls is not None else None
+        tool_args = record.arguments if record is not None else {}
+        exec_time = record.duration_seconds if record is not None and record.duration_seconds is not None else 0.0
         
         # Process the result for display
         result_str = str(result)
@@ -245,12 +211,7 @@ class RichLoggingHooks(RunHooksBase):
         
         # Format the function call with arguments and return value
         if tool_args:
-            # Truncate argument values that are too long
-            formatted_args = {}
-            for key, value in tool_args.items():
-                formatted_args[key] = self._truncate_value(value, 100)
-            
-            args_str = json.dumps(formatted_args, indent=2)
+            args_str = self._format_tool_args(tool_args)
             call_display = f"{tool_name}({args_str}) -> {display_result}{truncation_note}"
         else:
             call_display = f"{tool_name}() -> {display_result}{truncation_note}"
@@ -287,111 +248,201 @@ class RichLoggingHooks(RunHooksBase):
             ))
 
 
-async def _execute_nano_agent_async(request: PromptNanoAgentRequest, enable_rich_logging: bool = True) -> PromptNanoAgentResponse:
+def _collect_usage_so_far(result: Any, token_tracker: TokenTracker) -> None:
+    """Copy usage from an unfinished run's context into the tracker.
+    
+    Hooks only report usage when the agent ends, so for runs stopped early
+    the run context holds the tokens of every model call that completed.
+    """
+    if hasattr(result, 'context_wrapper'):
+        token_tracker.update(result.context_wrapper.usage)
+
+
+def _record_run(
+    request: PromptNanoAgentRequest,
+    status: str,
+    token_tracker: TokenTracker,
+    start_time: float
+) -> Dict[str, Any]:
+    """Record a run in the process-wide token ledger and return the entry."""
+    entry = get_token_ledger().record(
+        model=request.model,
+        provider=request.provider,
+        status=status,
+        token_usage=token_tracker.get_summary(),
+        execution_time_seconds=time.time() - start_time
+    )
+    return entry.to_dict()
+
+
+def _build_timeout_response(
+    request: PromptNanoAgentRequest,
+    result: Any,
+    deadline: RunDeadline,
+    run_metrics: RunMetrics,
+    event_processor: StreamEventProcessor,
+    tool_calls: ToolCallLog,
+    tool_results: ToolResultMemo,
+    token_tracker: TokenTracker,
+    start_time: float
+) -> PromptNanoAgentResponse:
+    """
+    Build a partial response for a run stopped by its wall-clock or turn deadline.
+    
+    The result carries whatever text the model streamed before the deadline
+    and the token usage of all model calls that completed.
+    """
+    run_metrics.finish()
+    run_metrics.record_tool_calls(tool_calls.records, event_processor.call_turns)
+    execution_time = time.time() - start_time
+    kind = deadline.expired_limit()
+    limit = deadline.limit_seconds(kind)
+    
+    _collect_usage_so_far(result, token_tracker)
+    _record_run(request, RUN_STATUS_TIMED_OUT, token_tracker, start_time)
+    
+    label = "wall-clock" if kind == RunDeadline.WALL_CLOCK else "per-turn"
+    error = f"Agent timed out: {label} limit of {limit:g}s exceeded after {execution_time:.2f}s"
+    logger.warning(f"{error} (turn {len(run_metrics.turns)})")
+    
+    return PromptNanoAgentResponse(
+        success=False,
+        result=event_processor.output_text or None,
+        error=error,
+        metadata={
+            "model": request.model,
+            "provider": request.provider,
+            "turns": len(run_metrics.turns),
+            "timed_out": True,
+            "timeout": {"kind": kind, "limit_seconds": limit},
+            "streaming": run_metrics.to_dict(),
+            "tool_calls": tool_calls.get_summary(),
+            "tool_result_cache": tool_results.get_stats(),
+            "token_usage": token_tracker.get_summary(),
+        },
+        execution_time_seconds=execution_time
+    )
+
+
+async def _execute_nano_agent_async(
+    request: PromptNanoAgentRequest,
+    enable_rich_logging: bool = True,
+    on_progress: Optional[ProgressCallback] = None
+) -> PromptNanoAgentResponse:
     """
     Execute the nano agent using OpenAI Agent SDK (async version).
     
-    This method uses the OpenAI Agent SDK for a robust agent experience
-    with better tool handling and conversation management.
+    This method runs the agent through the SDK's streamed runner so progress
+    (turns, tool start/end, partial text) can be reported while the agent
+    works, and records time-to-first-token and per-turn latency.
     
     Args:
         request: The validated request containing prompt and configuration
         enable_rich_logging: Whether to enable rich console logging for tool calls
+        on_progress: Optional async callback(kind, message) for streaming progress
         
     Returns:
         Response with execution results or error information
     """
     start_time = time.time()
+    # Always track tokens (batch totals and the ledger rely on it); hooks only for rich logging
+    token_tracker = TokenTracker(model=request.model, provider=request.provider)
+    result = None
     
     try:
         logger.info(f"Executing nano agent with Agent SDK: {request.agentic_prompt[:100]}...")
         logger.debug(f"Model: {request.model}, Provider: {request.provider}")
         
-        # Validate provider and model combination
-        is_valid, error_msg = ProviderConfig.validate_provider_setup(
-            request.provider, 
-            request.model,
-            AVAILABLE_MODELS,
-            PROVIDER_REQUIREMENTS
-        )
-        if not is_valid:
+        # Fetch the shared agent for this provider/model (built once per process)
+        agent, error_msg = get_agent_registry().get_agent(request.provider, request.model)
+        if agent is None:
             return PromptNanoAgentResponse(
                 success=False,
                 error=error_msg,
                 execution_time_seconds=time.time() - start_time
             )
         
-        # Setup provider-specific configurations
-        ProviderConfig.setup_provider(request.provider)
-        
-        # Get tools for the agent
-        tools = get_nano_agent_tools()
-        
-        # Configure model settings based on model capabilities
-        base_settings = {
-            "temperature": DEFAULT_TEMPERATURE,
-            "max_tokens": MAX_TOKENS
-        }
-        
-        # Get filtered settings for the specific model
-        model_settings = ProviderConfig.get_model_settings(
-            model=request.model,
-            provider=request.provider,
-            base_settings=base_settings
-        )
-        
-        # Create agent using the provider configuration
-        agent = ProviderConfig.create_agent(
-            name="NanoAgent",
-            instructions=NANO_AGENT_SYSTEM_PROMPT,
-            tools=tools,
-            model=request.model,
-            provider=request.provider,
-            model_settings=model_settings
-        )
-        
-        # Create token tracker and hooks for rich logging if enabled
-        token_tracker = TokenTracker(model=request.model, provider=request.provider) if enable_rich_logging else None
         hooks = RichLoggingHooks(token_tracker=token_tracker) if enable_rich_logging else None
         
-        # Run the agent asynchronously
-        result = await Runner.run(
-            agent,
-            request.agentic_prompt,
-            max_turns=MAX_AGENT_TURNS,
-            run_config=RunConfig(
-                workflow_name="nano_agent_task",
-                trace_metadata={
-                    "model": request.model,
-                    "provider": request.provider,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            ),
-            hooks=hooks
+        # Run the agent through the streamed runner and consume events as they arrive
+        run_metrics = RunMetrics()
+        event_processor = StreamEventProcessor(run_metrics, on_progress)
+        tool_calls = ToolCallLog()
+        tool_results = ToolResultMemo()
+        deadline = RunDeadline(
+            run_metrics,
+            timeout_seconds=request.timeout_seconds or DEFAULT_TIMEOUT_SECONDS,
+            turn_timeout_seconds=request.turn_timeout_seconds or DEFAULT_TURN_TIMEOUT_SECONDS
         )
+        # The SDK's run task copies the current context, inheriting this run's tool call
+        # log and workspace (the working directory, captured once here)
+        with tool_call_log_scope(tool_calls), tool_result_memo_scope(tool_results), workspace_scope():
+            result = Runner.run_streamed(
+                agent,
+                request.agentic_prompt,
+                max_turns=MAX_AGENT_TURNS,
+                run_config=RunConfig(
+                    workflow_name="nano_agent_task",
+                    trace_metadata={
+                        "model": request.model,
+                        "provider": request.provider,
+                        "timestamp": datetime.now().isoformat(),
+                    }
+                ),
+                hooks=hooks
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            async with asyncio.timeout_at(loop.time() + deadline.remaining()) as timeout_scope:
+                async for event in result.stream_events():
+                    await event_processor.process(event)
+                    # Turn boundaries move the per-turn deadline forward
+                    timeout_scope.reschedule(loop.time() + deadline.remaining())
+        except TimeoutError:
+            if not timeout_scope.expired():
+                raise
+            # Cancels the in-flight provider request and any running tool tasks
+            result.cancel()
+            return _build_timeout_response(
+                request, result, deadline, run_metrics, event_processor, tool_calls, tool_results, token_tracker, start_time
+            )
+        except asyncio.CancelledError:
+            # The MCP client cancelled or disconnected. The SDK drives the run in
+            # its own task, so stop it explicitly or it keeps calling the provider.
+            result.cancel()
+            run_metrics.finish()
+            _collect_usage_so_far(result, token_tracker)
+            entry = _record_run(request, RUN_STATUS_CANCELLED, token_tracker, start_time)
+            logger.warning(
+                f"Agent run cancelled by client after {entry['execution_time_seconds']:.2f}s "
+                f"({entry['token_usage']['total_tokens']} tokens used)"
+            )
+            raise
+        await event_processor.flush()
+        run_metrics.finish()
+        run_metrics.record_tool_calls(tool_calls.records, event_processor.call_turns)
         
         execution_time = time.time() - start_time
         
         # Extract the final output
         final_output = result.final_output if hasattr(result, 'final_output') else str(result)
         
-        # Check if result has usage information
-        if hasattr(result, 'usage') and token_tracker:
-            token_tracker.add_usage(
-                input_tokens=result.usage.get('prompt_tokens', 0),
-                output_tokens=result.usage.get('completion_tokens', 0)
-            )
+        # Without hooks, pull the accumulated usage from the run context
+        if hooks is None and hasattr(result, 'context_wrapper'):
+            token_tracker.update(result.context_wrapper.usage)
         
         # Prepare metadata
         metadata = {
             "model": request.model,
             "provider": request.provider,
-            "turns": len(result.messages) if hasattr(result, 'messages') else 0,
+            "turns": len(run_metrics.turns),
+            "streaming": run_metrics.to_dict(),
+            "tool_calls": tool_calls.get_summary(),
+            "tool_result_cache": tool_results.get_stats(),
         }
         
-        # Add token usage if available
-        if token_tracker:
-            metadata["token_usage"] = token_tracker.get_summary()
+        metadata["token_usage"] = token_tracker.get_summary()
+        _record_run(request, RUN_STATUS_COMPLETED, token_tracker, start_time)
         
         logger.info(f"Agent completed successfully in {execution_time:.2f}s")
         
@@ -407,6 +458,9 @@ async def _execute_nano_agent_async(request: PromptNanoAgentRequest, enable_rich
         full_traceback = traceback.format_exc()
         logger.error(f"Agent SDK execution failed: {str(e)}\nFull traceback:\n{full_traceback}")
         execution_time = time.time() - start_time
+        if result is not None and not token_tracker.total_usage.total_tokens:
+            _collect_usage_so_far(result, token_tracker)
+        _record_run(request, RUN_STATUS_FAILED, token_tracker, start_time)
         
         return PromptNanoAgentResponse(
             success=False,
@@ -440,65 +494,35 @@ def _execute_nano_agent(request: PromptNanoAgentRequest, enable_rich_logging: bo
         logger.info(f"Executing nano agent with Agent SDK: {request.agentic_prompt[:100]}...")
         logger.debug(f"Model: {request.model}, Provider: {request.provider}")
         
-        # Validate provider and model combination
-        is_valid, error_msg = ProviderConfig.validate_provider_setup(
-            request.provider, 
-            request.model,
-            AVAILABLE_MODELS,
-            PROVIDER_REQUIREMENTS
-        )
-        if not is_valid:
+        # Fetch the shared agent for this provider/model (built once per process)
+        agent, error_msg = get_agent_registry().get_agent(request.provider, request.model)
+        if agent is None:
             return PromptNanoAgentResponse(
                 success=False,
                 error=error_msg,
                 execution_time_seconds=time.time() - start_time
             )
         
-        # Setup provider-specific configurations
-        ProviderConfig.setup_provider(request.provider)
-        
-        # Configure model settings based on model capabilities
-        base_settings = {
-            "temperature": DEFAULT_TEMPERATURE,
-            "max_tokens": MAX_TOKENS
-        }
-        
-        # Get filtered settings for the specific model
-        model_settings = ProviderConfig.get_model_settings(
-            model=request.model,
-            provider=request.provider,
-            base_settings=base_settings
-        )
-        
-        # Create agent with provider-specific configuration
-        agent = ProviderConfig.create_agent(
-            name="NanoAgent",
-            instructions=NANO_AGENT_SYSTEM_PROMPT,
-            tools=get_nano_agent_tools(),
-            model=request.model,
-            provider=request.provider,
-            model_settings=model_settings
-        )
-        
         # Create token tracker and hooks for rich logging if enabled
         token_tracker = TokenTracker(model=request.model, provider=request.provider) if enable_rich_logging else None
         hooks = RichLoggingHooks(token_tracker=token_tracker) if enable_rich_logging else None
         
         # Run the agent synchronously (we'll handle async in the wrapper)
-        result = Runner.run_sync(
-            agent,
-            request.agentic_prompt,
-            max_turns=MAX_AGENT_TURNS,
-            run_config=RunConfig(
-                workflow_name="nano_agent_task",
-                trace_metadata={
-                    "model": request.model,
-                    "provider": request.provider,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            ),
-            hooks=hooks
-        )
+        with tool_call_log_scope() as tool_calls, tool_result_memo_scope() as tool_results, workspace_scope():
+            result = Runner.run_sync(
+                agent,
+                request.agentic_prompt,
+                max_turns=MAX_AGENT_TURNS,
+                run_config=RunConfig(
+                    workflow_name="nano_agent_task",
+                    trace_metadata={
+                        "model": request.model,
+                        "provider": request.provider,
+                        "timestamp": datetime.now().isoformat(),
+                    }
+                ),
+                hooks=hooks
+            )
         
         execution_time = time.time() - start_time
         
@@ -517,6 +541,8 @@ def _execute_nano_agent(request: PromptNanoAgentRequest, enable_rich_logging: bo
             "timestamp": datetime.now().isoformat(),
             "agent_sdk": True,
             "turns_used": len(result.messages) if hasattr(result, 'messages') else None,
+            "tool_calls": tool_calls.get_summary(),
+            "tool_result_cache": tool_results.get_stats(),
         }
         
         # Add token usage information if available
@@ -562,7 +588,9 @@ async def prompt_nano_agent(
     agentic_prompt: str,
     model: str = DEFAULT_MODEL,
     provider: str = DEFAULT_PROVIDER,
-    ctx: Any = None  # Context will be injected by FastMCP when registered
+    timeout_seconds: Optional[float] = None,
+    turn_timeout_seconds: Optional[float] = None,
+    ctx: Optional[Context] = None  # Context will be injected by FastMCP when registered
 ) -> Dict[str, Any]:
     """
     Execute an autonomous agent with a natural language prompt.
@@ -593,6 +621,13 @@ async def prompt_nano_agent(
                  - "anthropic": Anthropic's Claude models via LiteLLM
                  - "ollama": Local models via Ollama
         
+        timeout_seconds: Optional wall-clock limit for the whole run
+                        (default: 300s). On expiry the run is cancelled and
+                        a partial result with usage so far is returned.
+        
+        turn_timeout_seconds: Optional limit for a single model call or round
+                             of tool calls (default: 120s)
+        
         ctx: MCP context (automatically injected)
     
     Returns:
@@ -616,26 +651,37 @@ async def prompt_nano_agent(
         {"success": True, "result": "Created schema.md with 15 JSON schemas analyzed"}
     """
     try:
+        # Progress must increase monotonically; the total is unknown until the run ends
+        progress_count = 0
+        
+        async def report_progress(kind: str, message: str) -> None:
+            nonlocal progress_count
+            progress_count += 1
+            await ctx.report_progress(progress_count, None, message)
+        
         # Report progress if context is available
         if ctx:
-            await ctx.report_progress(0.1, 1.0, "Initializing agent...")
+            await report_progress("init", "Initializing agent...")
         
         # Create and validate request
         request = PromptNanoAgentRequest(
             agentic_prompt=agentic_prompt,
             model=model,
-            provider=provider
+            provider=provider,
+            timeout_seconds=timeout_seconds,
+            turn_timeout_seconds=turn_timeout_seconds
         )
         
-        if ctx:
-            await ctx.report_progress(0.3, 1.0, "Executing agent task...")
-        
         # Execute the agent (disable rich logging when called via MCP to avoid interference)
-        # Use async version if we're already in an async context
-        response = await _execute_nano_agent_async(request, enable_rich_logging=(ctx is None))
+        # Every turn, tool start/end and partial text chunk is forwarded as progress
+        response = await _execute_nano_agent_async(
+            request,
+            enable_rich_logging=(ctx is None),
+            on_progress=report_progress if ctx else None
+        )
         
         if ctx:
-            await ctx.report_progress(1.0, 1.0, "Task completed")
+            await ctx.report_progress(progress_count + 1, progress_count + 1, "Task completed")
             if response.success:
                 await ctx.info(SUCCESS_AGENT_COMPLETE.format(response.execution_time_seconds))
             else:
@@ -659,6 +705,220 @@ async def prompt_nano_agent(
         return error_response.model_dump()
 
 
+def get_batch_concurrency(provider: str, override: Optional[int] = None) -> int:
+    """
+    Get the number of concurrent agent runs allowed for a provider in a batch.
+    
+    Resolution order: explicit override, NANO_AGENT_BATCH_CONCURRENCY_<PROVIDER>
+    environment variable, BATCH_CONCURRENCY_BY_PROVIDER, DEFAULT_BATCH_CONCURRENCY.
+    
+    Args:
+        provider: The provider name
+        override: Optional limit that takes precedence over configuration
+        
+    Returns:
+        Positive concurrency limit
+    """
+    if override is not None:
+        return override
+    
+    env_value = os.getenv(f"{BATCH_CONCURRENCY_ENV_PREFIX}{provider.upper()}")
+    if env_value:
+        try:
+            limit = int(env_value)
+            if limit > 0:
+                return limit
+        except ValueError:
+            pass
+        logger.warning(f"Ignoring invalid {BATCH_CONCURRENCY_ENV_PREFIX}{provider.upper()}={env_value!r}")
+    
+    return BATCH_CONCURRENCY_BY_PROVIDER.get(provider, DEFAULT_BATCH_CONCURRENCY)
+
+
+def build_batch_request(
+    prompts: List[Union[str, Dict[str, Any]]],
+    model: str = DEFAULT_MODEL,
+    provider: str = DEFAULT_PROVIDER,
+    max_concurrency: Optional[int] = None
+) -> PromptNanoAgentBatchRequest:
+    """
+    Build a validated batch request from plain prompts or prompt objects.
+    
+    Each item is either a prompt string or an object with "agentic_prompt"
+    (or "prompt") and optional "model"/"provider" overriding the batch defaults.
+    
+    Raises:
+        pydantic.ValidationError: If any item is invalid
+    """
+    items = []
+    for item in prompts:
+        if isinstance(item, str):
+            items.append({"agentic_prompt": item, "model": model, "provider": provider})
+        else:
+            items.append({
+                "agentic_prompt": item.get("agentic_prompt", item.get("prompt")),
+                "model": item.get("model", model),
+                "provider": item.get("provider", provider),
+            })
+    
+    return PromptNanoAgentBatchRequest(prompts=items, max_concurrency=max_concurrency)
+
+
+async def _execute_nano_agent_batch_async(
+    request: PromptNanoAgentBatchRequest,
+    on_item_complete: Optional[Callable[[BatchItemResponse, int, int], Awaitable[None]]] = None
+) -> PromptNanoAgentBatchResponse:
+    """
+    Execute many independent agent prompts concurrently.
+    
+    Each provider gets its own semaphore so a slow or rate-limited provider
+    cannot starve the others. Results are returned in request order. Errors
+    raised by on_item_complete are logged and ignored; if an item itself
+    raises (or the batch is cancelled), the remaining items are cancelled.
+    
+    Args:
+        request: The validated batch request
+        on_item_complete: Optional async callback(item_response, completed, total)
+        
+    Returns:
+        Batch response with per-item results and aggregated token usage
+    """
+    start_time = time.time()
+    total = len(request.prompts)
+    
+    limits = {
+        item.provider: get_batch_concurrency(item.provider, request.max_concurrency)
+        for item in request.prompts
+    }
+    semaphores = {provider: asyncio.Semaphore(limit) for provider, limit in limits.items()}
+    completed = 0
+    
+    async def run_item(index: int, item: PromptNanoAgentRequest) -> BatchItemResponse:
+        nonlocal completed
+        queued_at = time.time()
+        async with semaphores[item.provider]:
+            queue_wait = time.time() - queued_at
+            # Rich logging is disabled: interleaved panels from concurrent runs are unreadable
+            response = await _execute_nano_agent_async(item, enable_rich_logging=False)
+        
+        item_response = BatchItemResponse(
+            index=index,
+            queue_wait_seconds=round(queue_wait, 4),
+            **response.model_dump()
+        )
+        completed += 1
+        if on_item_complete:
+            # Progress is best effort: a failed notification must not cost the batch its results
+            try:
+                await on_item_complete(item_response, completed, total)
+            except Exception as e:
+                logger.warning(f"Progress callback failed for batch item {index}: {e}")
+        return item_response
+    
+    logger.info(f"Executing batch of {total} prompts with concurrency {limits}")
+    tasks = [asyncio.ensure_future(run_item(i, item)) for i, item in enumerate(request.prompts)]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # gather leaves the other items running; stop them instead of paying for discarded results
+        for task in tasks:
+            task.cancel()
+        raise
+    execution_time = time.time() - start_time
+    
+    succeeded = sum(1 for r in results if r.success)
+    token_usage = aggregate_token_summaries(
+        [r.metadata["token_usage"] for r in results if "token_usage" in r.metadata]
+    )
+    item_seconds = [r.execution_time_seconds or 0.0 for r in results]
+    
+    logger.info(f"Batch completed: {succeeded}/{total} succeeded in {execution_time:.2f}s")
+    
+    return PromptNanoAgentBatchResponse(
+        success=succeeded == total,
+        results=list(results),
+        succeeded=succeeded,
+        failed=total - succeeded,
+        token_usage=token_usage,
+        metadata={
+            "concurrency": limits,
+            "sum_item_seconds": round(sum(item_seconds), 4),
+            "max_item_seconds": round(max(item_seconds), 4),
+        },
+        execution_time_seconds=execution_time
+    )
+
+
+async def prompt_nano_agent_batch(
+    prompts: List[Union[str, Dict[str, Any]]],
+    model: str = DEFAULT_MODEL,
+    provider: str = DEFAULT_PROVIDER,
+    max_concurrency: Optional[int] = None,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """
+    Execute many independent agentic prompts concurrently.
+    
+    Use this instead of calling prompt_nano_agent repeatedly when you have
+    several unrelated tasks (e.g. one per file). Prompts run in parallel with
+    a per-provider concurrency limit and results are returned in order.
+    
+    Args:
+        prompts: List of prompts. Each item is either a prompt string or an object
+                 {"agentic_prompt": "...", "model": "...", "provider": "..."} where
+                 model and provider are optional and default to the values below.
+        
+        model: Default model for items that don't specify one
+        
+        provider: Default provider for items that don't specify one
+        
+        max_concurrency: Optional override for the number of prompts run at once
+                         per provider (defaults to the provider's configured limit)
+        
+        ctx: MCP context (automatically injected)
+    
+    Returns:
+        Dictionary containing:
+        - success: Whether every prompt succeeded
+        - results: Per-prompt results (same shape as prompt_nano_agent plus index
+          and queue_wait_seconds)
+        - succeeded / failed: Counts
+        - token_usage: Token and cost totals across the batch
+        - metadata: Concurrency limits and timing totals
+        - execution_time_seconds: Total wall-clock time
+    """
+    try:
+        request = build_batch_request(prompts, model, provider, max_concurrency)
+        
+        async def report_item(item: BatchItemResponse, completed: int, total: int) -> None:
+            if ctx:
+                status = "done" if item.success else "failed"
+                await ctx.report_progress(completed, total, f"Prompt {item.index + 1} {status} ({completed}/{total})")
+        
+        response = await _execute_nano_agent_batch_async(request, on_item_complete=report_item)
+        
+        if ctx:
+            await ctx.info(
+                f"Batch completed: {response.succeeded}/{len(request.prompts)} succeeded "
+                f"in {response.execution_time_seconds:.2f}s"
+            )
+        
+        return response.model_dump()
+        
+    except Exception as e:
+        logger.error(f"Error in prompt_nano_agent_batch: {str(e)}", exc_info=True)
+        
+        if ctx:
+            await ctx.error(f"Batch execution failed: {str(e)}")
+        
+        error_response = PromptNanoAgentBatchResponse(
+            success=False,
+            error=str(e),
+            metadata={"error_type": type(e).__name__}
+        )
+        return error_response.model_dump()
+
+
 # Additional utility functions
 
 async def get_agent_status() -> Dict[str, Any]:
@@ -674,7 +934,15 @@ async def get_agent_status() -> Dict[str, Any]:
         "available_providers": list(AVAILABLE_MODELS.keys()),
         "tools_available": AVAILABLE_TOOLS,
         "agent_sdk": True,
-        "agent_sdk_version": "0.2.5"  # From openai-agents package
+        "agent_sdk_version": "0.2.5",  # From openai-agents package
+        "agent_registry": get_agent_registry().get_stats(),
+        "token_ledger": get_token_ledger().get_summary(),
+        "tool_executor": get_tool_executor().get_stats(),
+        "file_cache": get_file_cache().get_stats(),
+        "digest_cache": get_digest_cache().get_stats(),
+        "search_indexes": get_search_indexes().get_stats(),
+        "gitignore_cache": get_gitignore_stats(),
+        "write_sessions": get_write_sessions().get_stats(),
     }
 
 
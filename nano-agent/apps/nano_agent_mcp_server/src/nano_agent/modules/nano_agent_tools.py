@@ -6,41 +6,95 @@ to complete its work. These are not exposed directly via MCP but are
 available to the agent during execution.
 """
 
+import functools
 import os
 import logging
+import threading
+from contextlib import AsyncExitStack, contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator, List, Set, Tuple, Union
 import json
+import re
 
 # Import function_tool decorator from agents SDK
 try:
     from agents import function_tool
+    from agents.tool_context import ToolContext
 except ImportError:
     # Fallback if agents SDK not available
     def function_tool(func):
         return func
+    ToolContext = Any
 
 from .data_types import (
     ReadFileRequest,
     ReadFileResponse,
     CreateFileRequest,
-    CreateFileResponse
+    CreateFileResponse,
+    EditOperation
 )
 from .constants import (
     ERROR_FILE_NOT_FOUND,
     ERROR_NOT_A_FILE,
     ERROR_DIR_NOT_FOUND,
     ERROR_NOT_A_DIR,
+    ERROR_BINARY_FILE,
+    ERROR_INVALID_PATH,
     SUCCESS_FILE_WRITE,
-    SUCCESS_FILE_EDIT
+    SUCCESS_FILE_EDIT,
+    SUCCESS_FILE_UNCHANGED,
+    SUCCESS_FILE_EDIT_UNCHANGED,
+    SUCCESS_READ_NOT_MODIFIED,
+    READ_ONLY_TOOLS,
+    MEMOIZED_TOOLS,
+    READ_FILE_MAX_BYTES,
+    READ_FILE_MAX_LINES,
+    SEARCH_DEFAULT_RESULTS,
+    SEARCH_MAX_RESULTS,
+    FIND_DEFAULT_RESULTS,
+    FIND_MAX_RESULTS,
+    LIST_DIRECTORY_PAGE_SIZE,
+    LIST_DIRECTORY_MAX_PAGE_SIZE,
+    READ_MANY_MAX_FILES,
+    READ_MANY_DEFAULT_TOTAL_BYTES,
+    READ_MANY_MAX_TOTAL_BYTES,
+    READ_MANY_MAX_FILE_BYTES,
+    FILES_INFO_MAX_PATHS,
+    FILE_DIGEST_MAX_PATHS
 )
 from .files import (
     resolve_path,
     get_working_directory,
+    get_workspace,
     ensure_parent_exists,
     format_path_for_display
 )
+from .atomic_write import atomic_write_text
+from .batch_read import read_files
+from .closest_match import describe_closest_match, find_closest_match, get_normalized_index_cache
+from .digest_cache import get_digest_cache
+from .file_cache import file_version, get_file_cache
+from .file_info import format_info_row, stat_info, stat_many
+from .file_walk import SORT_NAME, find_paths, list_directory_page
+from .line_edit import replace_line_range
+from .line_index import LineRange, ascii_compatible, read_line_range
+from .multi_edit import (
+    FileChange,
+    FilePatch,
+    apply_hunks,
+    commit_changes,
+    parse_unified_diff,
+    plan_edits,
+    read_for_change
+)
+from .path_locks import get_path_locks
+from .search_index import get_search_indexes, search_index
+from .text_encoding import detect_file_encoding, get_encoding_cache, read_decoded
+from .tool_calls import get_tool_call_log
+from .tool_executor import run_tool
+from .write_sessions import get_write_sessions
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -76,22 +130,20 @@ def _read_file_impl(request: ReadFileRequest) -> ReadFileResponse:
                 error=f"Path is not a file: {request.file_path}"
             )
         
-        # Get file metadata
-        stat = file_path.stat()
-        file_size = stat.st_size
-        last_modified = datetime.fromtimestamp(stat.st_mtime)
-        
-        # Read file content
+        # Read file content (served from the shared cache when unchanged)
         try:
-            with open(file_path, 'r', encoding=request.encoding) as f:
-                content = f.read()
-                
+            content, stat = get_file_cache().read_text(file_path, request.encoding)
+            file_size = stat.st_size
+            last_modified = datetime.fromtimestamp(stat.st_mtime)
+            digest = get_digest_cache().peek(file_path, file_version(stat))
+            
             logger.info(f"Successfully read file: {request.file_path} ({file_size} bytes)")
             
             return ReadFileResponse(
                 content=content,
                 file_size_bytes=file_size,
-                last_modified=last_modified
+                last_modified=last_modified,
+                digest=digest
             )
             
         except UnicodeDecodeError as e:
@@ -179,15 +231,61 @@ def _create_file_impl(request: CreateFileRequest) -> CreateFileResponse:
 
 
 # Raw tool implementations (not decorated)
-def read_file_raw(file_path: str) -> str:
+def _page_footer(page: LineRange, file_path: str, max_bytes: int) -> str:
+    """Note appended to a partial read telling the agent how to continue."""
+    if not page.has_more:
+        return ""
+    if page.truncated_line:
+        # The same offset would return the same cut line: only a larger max_bytes gets past it
+        return (f"\n[Showing the first {max_bytes} bytes of line {page.start_line} of {page.total_lines}, "
+                f"which is {page.line_bytes} bytes long. Call read_file('{file_path}', "
+                f"offset={page.start_line}, max_bytes={page.line_bytes}) to read it whole, "
+                f"or offset={page.start_line + 1} to skip it.]")
+    shown = f"lines {page.start_line}-{page.end_line} of {page.total_lines}"
+    return (f"\n[Showing {shown}. "
+            f"Call read_file('{file_path}', offset={page.end_line + 1}) to continue.]")
+
+
+def _etag_note(etag: str) -> str:
+    """Last line of a read, naming the etag to pass as if_none_match."""
+    return f"\n[etag {etag}]"
+
+
+def read_file_raw(
+    file_path: str,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    if_none_match: Optional[str] = None
+) -> str:
     """
-    Read the contents of a file.
+    Read the contents of a file, or a range of its lines.
+    
+    Without a range, files up to READ_FILE_MAX_BYTES are returned whole.
+    Larger files, and any call with offset/limit/max_bytes, are returned one
+    page at a time with a note on how to read the rest.
+    
+    Paged reads, and any read given if_none_match, end with an etag line;
+    small files read whole without if_none_match are returned verbatim. A
+    whole file's etag is its digest (as reported by file_digest,
+    get_file_info and the write tools); a page's etag is the range hash of
+    the lines returned, which replace_lines accepts as expected_hash.
+    Passing an etag back as if_none_match returns a one-line "not modified"
+    note instead of the same content.
+    
+    The file's encoding is detected (see text_encoding): UTF-8, a BOM-marked
+    UTF-8/16/32 file or cp949/euc-kr are decoded as such, and binary files
+    are refused without being decoded.
     
     Args:
         file_path: Path to the file to read (relative or absolute)
+        offset: First line to return, 1-based (default: 1)
+        limit: Maximum number of lines to return (default: READ_FILE_MAX_LINES for paged reads)
+        max_bytes: Maximum bytes of content to return (default: READ_FILE_MAX_BYTES)
+        if_none_match: Etag of an earlier read of the same file or page
     
     Returns:
-        File contents as string, or error message if failed
+        File contents and etag, a not-modified note, or error message if failed
     """
     try:
         # Resolve to absolute path
@@ -198,19 +296,137 @@ def read_file_raw(file_path: str) -> str:
         if not path.is_file():
             return ERROR_NOT_A_FILE.format(file_path)
         
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Log with both display path and absolute path for clarity
         display_path = format_path_for_display(path)
-        logger.info(f"Successfully read file: {display_path} ({len(content)} chars) [absolute: {path}]")
-        return content
+        ranged = offset is not None or limit is not None or max_bytes is not None
+        stat = path.stat()
+        guess = detect_file_encoding(path, stat)
+        if guess.binary:
+            return ERROR_BINARY_FILE.format(file_path)
+        if not ranged and stat.st_size <= READ_FILE_MAX_BYTES:
+            if if_none_match is None:
+                # Hash in the background so a later file_digest or conditional read is a lookup
+                get_digest_cache().prefetch(path)
+                content, _, guess = read_decoded(path, guess)
+                if content is None:
+                    return ERROR_BINARY_FILE.format(file_path)
+                # Log with both display path and absolute path for clarity
+                logger.info(f"Successfully read file: {display_path} ({len(content)} chars) [absolute: {path}]")
+                return content
+            
+            etag = get_digest_cache().digest(path, file_version(stat))
+            if if_none_match.strip() == etag:
+                logger.info(f"Not modified: {display_path} [absolute: {path}]")
+                return SUCCESS_READ_NOT_MODIFIED.format(file_path, etag)
+            content, opened_stat, guess = read_decoded(path, guess)
+            if content is None:
+                return ERROR_BINARY_FILE.format(file_path)
+            if file_version(opened_stat) != file_version(stat):
+                # Changed between the digest and the read
+                etag = get_digest_cache().digest(path)
+            logger.info(f"Successfully read file: {display_path} ({len(content)} chars) [absolute: {path}]")
+            return content + _etag_note(etag)
+        
+        get_digest_cache().prefetch(path)
+        byte_limit = max_bytes if max_bytes is not None else READ_FILE_MAX_BYTES
+        if limit is None and max_bytes is None:
+            limit = READ_FILE_MAX_LINES
+        try:
+            page = read_line_range(path, offset or 1, limit, byte_limit, guess.encoding)
+        except UnicodeDecodeError:
+            # The sniffed head fitted but this page doesn't
+            guess = get_encoding_cache().detect(path, full=True)
+            if guess.binary:
+                return ERROR_BINARY_FILE.format(file_path)
+            page = read_line_range(path, offset or 1, limit, byte_limit, guess.encoding)
+        if page.start_line > max(page.total_lines, 1):
+            return f"Error: offset {page.start_line} is past the end of {file_path} ({page.total_lines} lines)"
+        
+        etag = page.hash
+        if if_none_match and if_none_match.strip() == etag:
+            logger.info(f"Not modified: lines {page.start_line}-{page.end_line} of {display_path} [absolute: {path}]")
+            return SUCCESS_READ_NOT_MODIFIED.format(f"lines {page.start_line}-{page.end_line} of {file_path}", etag)
+        
+        logger.info(f"Read lines {page.start_line}-{page.end_line} of {display_path} "
+                    f"({page.total_lines} lines) [absolute: {path}]")
+        return page.text + _page_footer(page, file_path, byte_limit) + _etag_note(etag)
     except Exception as e:
         error_msg = f"Error reading file {file_path}: {str(e)}"
         logger.error(error_msg)
         return error_msg
 
 
+def read_many_files_raw(
+    file_paths: Optional[List[str]] = None,
+    pattern: Optional[str] = None,
+    directory_path: Optional[str] = None,
+    max_total_bytes: Optional[int] = None,
+    max_file_bytes: Optional[int] = None
+) -> str:
+    """
+    Read several files in one call.
+    
+    Args:
+        file_paths: Paths to read, in order (relative or absolute)
+        pattern: Glob selecting files instead (see find_files), e.g. 'src/**/*.py'
+        directory_path: Directory the pattern is matched in (default: current working directory)
+        max_total_bytes: Budget across all files
+        max_file_bytes: Budget per file
+    
+    Returns:
+        Each file's content under a '==> path <==' header, or error message
+    """
+    try:
+        if not file_paths and not pattern:
+            return "Error: Provide file_paths or a pattern"
+        total_budget = min(max(max_total_bytes or READ_MANY_DEFAULT_TOTAL_BYTES, 1), READ_MANY_MAX_TOTAL_BYTES)
+        file_budget = max(max_file_bytes or READ_MANY_MAX_FILE_BYTES, 1)
+        
+        paths = [resolve_path(p) for p in file_paths or []]
+        if pattern:
+            root = resolve_path(directory_path) if directory_path else Path(get_workspace().root)
+            if not root.is_dir():
+                return ERROR_DIR_NOT_FOUND.format(directory_path or str(root))
+            found = find_paths(str(root), pattern, max_results=READ_MANY_MAX_FILES + 1)
+            paths.extend(Path(p.path) for p in found.paths)
+        # Keep the first occurrence of each path
+        paths = list(dict.fromkeys(paths))
+        if not paths:
+            return f"No files matching {pattern!r}"
+        dropped = max(len(paths) - READ_MANY_MAX_FILES, 0)
+        paths = paths[:READ_MANY_MAX_FILES]
+        
+        batch = read_files(paths, file_budget, total_budget)
+        
+        read_count = sum(1 for item in batch.items if item.text is not None)
+        parts = [f"Read {read_count} of {len(paths)} files ({batch.total_bytes} bytes)"]
+        for item in batch.items:
+            display_path = format_path_for_display(item.path)
+            if item.error is not None:
+                parts.append(f"==> {display_path} <==\nError: {item.error}")
+                continue
+            if item.truncated:
+                label = (
+                    f"lines {item.start_line}-{item.end_line} of {item.total_lines}, truncated; "
+                    f"continue with read_file offset={item.end_line + 1}"
+                )
+            else:
+                label = f"{item.total_lines} lines"
+            text = item.text if not item.text or item.text.endswith("\n") else item.text + "\n"
+            parts.append(f"==> {display_path} ({label}) <==\n{text}".rstrip("\n"))
+        if batch.skipped:
+            skipped = ", ".join(format_path_for_display(p) for p in batch.skipped)
+            parts.append(f"Not read (total budget of {total_budget} bytes used up): {skipped}")
+        if dropped:
+            parts.append(f"Only the first {READ_MANY_MAX_FILES} files were read; narrow the selection for the rest")
+        
+        logger.info(f"Read {read_count} files in one batch ({batch.total_bytes} bytes)")
+        return "\n".join(parts)
+    except Exception as e:
+        error_msg = f"Error reading files: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
 def write_file_raw(file_path: str, content: str) -> str:
     """
     Write content to a file.
@@ -229,25 +445,119 @@ def write_file_raw(file_path: str, content: str) -> str:
         # Ensure parent directories exist
         ensure_parent_exists(path)
         
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        size = len(content)
+        result = atomic_write_text(path, content)
         display_path = format_path_for_display(path)
-        logger.info(f"Successfully wrote file: {display_path} ({size} bytes) [absolute: {path}]")
-        return SUCCESS_FILE_WRITE.format(size, display_path)
+        if not result.changed:
+            logger.info(f"File already up to date: {display_path} [absolute: {path}]")
+            return SUCCESS_FILE_UNCHANGED.format(display_path, result.size)
+        get_file_cache().put(path, content)
+        get_search_indexes().mark_changed(path)
+        
+        logger.info(f"Successfully wrote file: {display_path} ({result.size} bytes) [absolute: {path}]")
+        return f"{SUCCESS_FILE_WRITE.format(result.size, display_path)} (digest {result.digest})"
     except Exception as e:
         error_msg = f"Error writing file {file_path}: {str(e)}"
         logger.error(error_msg)
         return error_msg
 
 
-def list_directory_raw(directory_path: Optional[str] = None) -> str:
+def open_write_raw(file_path: str) -> str:
     """
-    List contents of a directory.
+    Start writing a file in chunks.
+    
+    Args:
+        file_path: Path where the file should be written (relative or absolute)
+    
+    Returns:
+        Session id and instructions, or error
+    """
+    try:
+        path = resolve_path(file_path)
+        if path.is_dir():
+            return f"Error: Path is a directory: {file_path}"
+        ensure_parent_exists(path)
+        session = get_write_sessions().open(path)
+        display_path = format_path_for_display(path)
+        logger.info(f"Opened write session {session.session_id} for {display_path} [absolute: {path}]")
+        return (f"Opened write session {session.session_id} for {display_path}. "
+                f"Send the content in order with append_chunk(session_id='{session.session_id}', content=...), "
+                f"then call commit_write(session_id='{session.session_id}').")
+    except Exception as e:
+        error_msg = f"Error opening {file_path} for writing: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+def append_chunk_raw(session_id: str, content: str) -> str:
+    """
+    Append a chunk of content to an open write session.
+    
+    Args:
+        session_id: Id returned by open_write
+        content: Next piece of the file, exactly as it should appear
+    
+    Returns:
+        Running size of the file, or error
+    """
+    try:
+        session, error = get_write_sessions().append(session_id, content)
+        if error:
+            return f"Error: {error}"
+        return (f"Appended {len(content.encode('utf-8'))} bytes to session {session_id} "
+                f"(chunk {session.chunks}, {session.size} bytes so far)")
+    except Exception as e:
+        error_msg = f"Error appending to write session {session_id}: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+def commit_write_raw(session_id: str, discard: Optional[bool] = None) -> str:
+    """
+    Publish the file of a write session atomically (or discard it).
+    
+    Args:
+        session_id: Id returned by open_write
+        discard: Drop the session without changing the file
+    
+    Returns:
+        Success message or error
+    """
+    sessions = get_write_sessions()
+    try:
+        if discard:
+            if not sessions.abort(session_id):
+                return f"Error: No open write session {session_id!r}"
+            return f"Discarded write session {session_id}; the file was not changed"
+        result, error = sessions.commit(session_id)
+        if error:
+            return f"Error: {error}"
+        display_path = format_path_for_display(result.path)
+        if not result.changed:
+            return SUCCESS_FILE_UNCHANGED.format(display_path, result.size)
+        get_file_cache().invalidate(result.path)
+        get_search_indexes().mark_changed(result.path)
+        logger.info(f"Committed write session {session_id}: {display_path} ({result.size} bytes)")
+        return f"{SUCCESS_FILE_WRITE.format(result.size, display_path)} from {result.chunks} chunks"
+    except Exception as e:
+        error_msg = f"Error committing write session {session_id}: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+def list_directory_raw(
+    directory_path: Optional[str] = None,
+    page_token: Optional[str] = None,
+    limit: Optional[int] = None,
+    sort: Optional[str] = None
+) -> str:
+    """
+    List contents of a directory, a page at a time.
     
     Args:
         directory_path: Path to directory (default: current working directory)
+        page_token: Cursor from a previous page to continue the listing
+        limit: Maximum entries per page
+        sort: 'name' (A-Z, default), 'size' (largest first) or 'mtime' (newest first)
     
     Returns:
         Formatted directory listing or error message
@@ -267,24 +577,39 @@ def list_directory_raw(directory_path: Optional[str] = None) -> str:
             dir_display = directory_path if directory_path else str(path)
             return ERROR_NOT_A_DIR.format(dir_display)
         
+        sort = sort or SORT_NAME
+        page_size = min(max(limit or LIST_DIRECTORY_PAGE_SIZE, 1), LIST_DIRECTORY_MAX_PAGE_SIZE)
+        try:
+            page = list_directory_page(str(path), sort=sort, limit=page_size, page_token=page_token)
+        except ValueError as e:
+            return f"Error: {e}"
+        
         items = []
-        for item in sorted(path.iterdir()):
-            if item.is_dir():
-                items.append(f"[DIR]  {item.name}/")
+        for entry in page.entries:
+            if entry.is_dir:
+                items.append(f"[DIR]  {entry.name}/")
             else:
-                size = item.stat().st_size
-                items.append(f"[FILE] {item.name} ({size} bytes)")
+                items.append(f"[FILE] {entry.name} ({entry.size} bytes)")
         
         # When no directory_path was provided, show absolute path
         if directory_path is None:
             display_path = str(path)  # Show absolute path
         else:
             display_path = format_path_for_display(path)
+        summary = page.summary
         result = f"Directory: {display_path}\n"
-        result += f"Total items: {len(items)}\n"
-        result += "\n".join(items) if items else "Empty directory"
+        result += (
+            f"Total items: {summary.total} ({summary.directories} directories, "
+            f"{summary.files} files, {summary.total_bytes} bytes)\n"
+        )
+        if page.next_token or page.start_index:
+            first = page.start_index + 1
+            result += f"Showing items {first}-{page.start_index + len(items)} sorted by {sort}\n"
+        result += "\n".join(items) if items else ("Empty directory" if not summary.total else "No more items")
+        if page.next_token:
+            result += f"\nMore items: call list_directory again with page_token={page.next_token!r}"
         
-        logger.info(f"Listed directory: {display_path} ({len(items)} items) [absolute: {path}]")
+        logger.info(f"Listed directory: {display_path} ({len(items)} of {summary.total} items) [absolute: {path}]")
         return result
     except Exception as e:
         error_msg = f"Error listing directory {directory_path}: {str(e)}"
@@ -295,6 +620,9 @@ def edit_file_raw(file_path: str, old_str: str, new_str: str) -> str:
     """
     Edit a file by replacing exact text matches.
     
+    The file is read and written back in its detected encoding, so a cp949
+    or UTF-16 file stays cp949 or UTF-16.
+    
     Args:
         file_path: Path to the file to edit (relative or absolute)
         old_str: The exact text to find and replace (must match exactly including whitespace)
@@ -315,39 +643,19 @@ def edit_file_raw(file_path: str, old_str: str, new_str: str) -> str:
         if not path.is_file():
             return f"Error: Path is not a file: {file_path}"
         
-        # Read the current content
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError as e:
-            return f"Error: Cannot read file (encoding issue): {str(e)}"
+        # Read the current content in its own encoding
+        guess = detect_file_encoding(path)
+        if guess.binary:
+            return ERROR_BINARY_FILE.format(file_path)
+        content, stat, guess = read_decoded(path, guess)
+        if content is None:
+            return ERROR_BINARY_FILE.format(file_path)
         
-        # Check if old_str exists in the file
+        # Point at the closest region so the retry can copy the exact text
         if old_str not in content:
-            # Provide helpful feedback
-            lines = old_str.split('\n')
-            if len(lines) > 1:
-                # Multi-line search - check if any lines exist
-                found_lines = []
-                for line in lines:
-                    if line.strip() and line.strip() in content:
-                        found_lines.append(line.strip())
-                
-                if found_lines:
-                    return (f"Error: Exact text not found in file. "
-                           f"Found similar lines but not exact match. "
-                           f"Check whitespace and indentation. "
-                           f"Found: {found_lines[:3]}")  # Show first 3 matches
-                else:
-                    return f"Error: Text not found in file. None of the lines exist in the file."
-            else:
-                # Single line search - provide more context
-                stripped = old_str.strip()
-                if stripped and stripped in content:
-                    return (f"Error: Found similar text but not exact match. "
-                           f"Check whitespace and indentation around: '{stripped[:50]}...'")
-                else:
-                    return f"Error: Text not found in file: '{old_str[:100]}...'"
+            index = get_normalized_index_cache().get(str(path), stat, content)
+            match = find_closest_match(index, old_str, format_path_for_display(path))
+            return f"Error: {describe_closest_match(match)}"
         
         # Check for multiple occurrences
         occurrences = content.count(old_str)
@@ -359,12 +667,20 @@ def edit_file_raw(file_path: str, old_str: str, new_str: str) -> str:
         # Perform the replacement
         new_content = content.replace(old_str, new_str, 1)  # Replace only first occurrence
         
-        # Write the updated content back
+        # Nothing to write when the replacement equals the original text
+        if new_content == content:
+            return SUCCESS_FILE_EDIT_UNCHANGED
+        
+        # Write the updated content back, in the encoding it was read with
         try:
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            atomic_write_text(path, new_content, encoding=guess.encoding, skip_unchanged=False)
+        except UnicodeEncodeError as e:
+            return (f"Error: The new text can't be written in the file's {guess.encoding} encoding: {str(e)}. "
+                    f"No changes were made.")
         except Exception as e:
             return f"Error: Failed to write file: {str(e)}"
+        get_file_cache().put(path, new_content, guess.encoding)
+        get_search_indexes().mark_changed(path)
         
         # Log the operation
         display_path = format_path_for_display(path)
@@ -380,6 +696,228 @@ def edit_file_raw(file_path: str, old_str: str, new_str: str) -> str:
         return error_msg
 
 
+def apply_edits_raw(file_path: str, edits: List[EditOperation]) -> str:
+    """
+    Apply several exact-text replacements to one file in a single write.
+    
+    Every edit is located in the original content; all of them must be
+    found (exactly once unless replace_all) and must not overlap, otherwise
+    the file is left untouched.
+    
+    Args:
+        file_path: Path to the file to edit (relative or absolute)
+        edits: Replacements to make (EditOperation models or equivalent dicts)
+    
+    Returns:
+        Success message or detailed error message
+    """
+    try:
+        path = resolve_path(file_path)
+        
+        if not path.exists():
+            return f"Error: File not found: {file_path}"
+        if not path.is_file():
+            return f"Error: Path is not a file: {file_path}"
+        if not edits:
+            return "Error: No edits given"
+        
+        edits = [e if isinstance(e, EditOperation) else EditOperation(**e) for e in edits]
+        try:
+            original = read_for_change(path)
+        except UnicodeDecodeError as e:
+            return f"Error: Cannot read file (encoding issue): {str(e)}"
+        if original is None:
+            return f"Error: File not found: {file_path}"
+        if original.binary:
+            return ERROR_BINARY_FILE.format(file_path)
+        
+        new_content, error = plan_edits(original.text, edits)
+        if error:
+            return f"Error: {error}. No changes were made."
+        if new_content == original.text:
+            return f"The edits leave {file_path} unchanged; nothing was written."
+        
+        error = commit_changes([FileChange(path=path, content=new_content, original=original)])
+        if error:
+            return f"Error: {error}"
+        get_search_indexes().mark_changed(path)
+        
+        display_path = format_path_for_display(path)
+        logger.info(f"Applied {len(edits)} edits to {display_path} [absolute: {path}]")
+        
+        return f"Successfully applied {len(edits)} edits to {file_path} (digest {get_digest_cache().digest(path)})"
+        
+    except PermissionError:
+        return f"Error: Permission denied when accessing file: {file_path}"
+    except Exception as e:
+        error_msg = f"Error editing file {file_path}: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+def apply_patch_raw(patch: str) -> str:
+    """
+    Apply a unified diff that may create, modify and delete several files.
+    
+    Paths are relative to the working directory (git's a/ and b/ prefixes
+    are accepted). Every hunk must apply before any file is written, and the
+    files are then replaced together, so a failing patch changes nothing.
+    
+    Args:
+        patch: Unified diff text, e.g. the output of 'git diff' or 'diff -u'
+    
+    Returns:
+        Summary of the files changed or detailed error message
+    """
+    return _apply_file_patches(*parse_unified_diff(patch))
+
+
+def _patch_paths(file_patches: List[FilePatch]) -> List[str]:
+    """Resolved paths a parsed patch touches (its lock paths)."""
+    return [
+        str(resolve_path(name))
+        for file_patch in file_patches
+        for name in (file_patch.old_path, file_patch.new_path) if name
+    ]
+
+
+def _apply_file_patches(file_patches: List[FilePatch], error: Optional[str]) -> str:
+    """Body of apply_patch_raw, given the result of parse_unified_diff."""
+    try:
+        if error:
+            return f"Error: {error}"
+        
+        changes = []
+        summary = []
+        seen = set()
+        for file_patch in file_patches:
+            name = file_patch.path
+            if file_patch.old_path and file_patch.new_path and file_patch.old_path != file_patch.new_path:
+                return f"Error: Renaming {file_patch.old_path} to {file_patch.new_path} is not supported. No changes were made."
+            path = resolve_path(name)
+            if path in seen:
+                return f"Error: {name} appears more than once in the patch. No changes were made."
+            seen.add(path)
+            if path.exists() and not path.is_file():
+                return f"Error: Path is not a file: {name}. No changes were made."
+            try:
+                original = read_for_change(path)
+            except UnicodeDecodeError as e:
+                return f"Error: Cannot read {name} (encoding issue): {str(e)}. No changes were made."
+            if file_patch.old_path is None and original is not None:
+                return f"Error: {name} already exists but the patch creates it. No changes were made."
+            if file_patch.old_path is not None and original is None:
+                return f"Error: File not found: {name}. No changes were made."
+            if original is not None and original.binary:
+                return f"{ERROR_BINARY_FILE.format(name)}. No changes were made."
+            
+            new_content, error = apply_hunks(original.text if original is not None else None, file_patch)
+            if error:
+                return f"Error: {error}. No changes were made."
+            added = sum(1 for hunk in file_patch.hunks for tag, _ in hunk.lines if tag == "+")
+            removed = sum(1 for hunk in file_patch.hunks for tag, _ in hunk.lines if tag == "-")
+            if file_patch.new_path is None:
+                if new_content:
+                    return f"Error: The patch deletes {name} but leaves lines in it. No changes were made."
+                changes.append(FileChange(path=path, content=None, original=original))
+                summary.append(f"  D {name}")
+            else:
+                changes.append(FileChange(path=path, content=new_content, original=original))
+                status = "A" if original is None else "M"
+                summary.append(f"  {status} {name} (+{added} -{removed})")
+        
+        error = commit_changes(changes)
+        if error:
+            return f"Error: {error}"
+        indexes = get_search_indexes()
+        for change in changes:
+            indexes.mark_changed(change.path)
+        
+        logger.info(f"Applied patch to {len(changes)} files")
+        
+        return f"Applied patch to {len(changes)} files:\n" + "\n".join(summary)
+        
+    except PermissionError as e:
+        return f"Error: Permission denied: {str(e)}"
+    except Exception as e:
+        error_msg = f"Error applying patch: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+def replace_lines_raw(
+    file_path: str,
+    start_line: int,
+    end_line: int,
+    new_text: str,
+    expected_hash: Optional[str] = None
+) -> str:
+    """
+    Replace a range of lines of a file, located by line number.
+    
+    New text is written in the file's detected encoding. UTF-16/32 files,
+    whose newlines aren't single bytes, are left to edit_file.
+    
+    Args:
+        file_path: Path to the file to edit (relative or absolute)
+        start_line: First line to replace (1-based)
+        end_line: Last line to replace (inclusive; start_line - 1 inserts without replacing)
+        new_text: Text to put in place of the lines (empty to delete them)
+        expected_hash: Hash the lines must still have; the edit is rejected if they changed
+    
+    Returns:
+        Success message with the new range's hash, or detailed error message
+    """
+    try:
+        path = resolve_path(file_path)
+        
+        if not path.exists():
+            return f"Error: File not found: {file_path}"
+        if not path.is_file():
+            return f"Error: Path is not a file: {file_path}"
+        
+        guess = detect_file_encoding(path)
+        if guess.binary:
+            return ERROR_BINARY_FILE.format(file_path)
+        if not ascii_compatible(guess.encoding):
+            return (f"Error: replace_lines can't splice lines of a {guess.encoding} file like {file_path}; "
+                    f"use edit_file instead. No changes were made.")
+        
+        try:
+            splice, error = replace_line_range(
+                path, start_line, end_line, new_text, expected_hash, encoding=guess.encoding
+            )
+        except UnicodeEncodeError as e:
+            return (f"Error: The new text can't be written in the file's {guess.encoding} encoding: {str(e)}. "
+                    f"No changes were made.")
+        if error:
+            return f"Error: {error}. No changes were made."
+        if not splice.changed:
+            return (f"Lines {start_line}-{end_line} of {file_path} already hold this text "
+                    f"(hash {splice.old_hash}); nothing was written.")
+        get_search_indexes().mark_changed(path)
+        
+        display_path = format_path_for_display(path)
+        logger.info(f"Replaced lines {start_line}-{end_line} of {display_path} [absolute: {path}]")
+        
+        if splice.end_line < splice.start_line:
+            replaced = f"Inserted before line {splice.start_line}"
+        else:
+            replaced = f"Replaced lines {splice.start_line}-{splice.end_line} (hash {splice.old_hash})"
+        if splice.new_end_line < splice.start_line:
+            now = "the lines were removed"
+        else:
+            now = f"new text is lines {splice.start_line}-{splice.new_end_line} (hash {splice.new_hash})"
+        return f"{replaced} of {file_path}; {now}. The file has {splice.total_lines} lines."
+        
+    except PermissionError:
+        return f"Error: Permission denied when accessing file: {file_path}"
+    except Exception as e:
+        error_msg = f"Error editing file {file_path}: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
 def get_file_info_raw(file_path: str) -> str:
     """
     Get detailed information about a file.
@@ -394,38 +932,248 @@ def get_file_info_raw(file_path: str) -> str:
         # Resolve to absolute path
         path = resolve_path(file_path)
         
-        if not path.exists():
+        try:
+            info = stat_info(path)
+        except FileNotFoundError:
             return ERROR_FILE_NOT_FOUND.format(file_path)
-        
-        stat = path.stat()
         display_path = format_path_for_display(path)
         
-        info = {
+        result = {
             "path": display_path,
             "absolute_path": str(path),
             "name": path.name,
-            "is_file": path.is_file(),
-            "is_directory": path.is_dir(),
-            "size_bytes": stat.st_size if path.is_file() else None,
-            "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            "extension": path.suffix if path.is_file() else None,
+            "is_file": info.is_file,
+            "is_directory": info.is_dir,
+            "size_bytes": info.size if info.is_file else None,
+            "created": info.created,
+            "modified": info.modified,
+            "extension": path.suffix if info.is_file else None,
+            "digest": get_digest_cache().peek(path, info.version) if info.is_file else None,
         }
         
         logger.info(f"Got file info for: {display_path} [absolute: {path}]")
-        return json.dumps(info, indent=2)
+        return json.dumps(result)
     except Exception as e:
         error_msg = f"Error getting file info for {file_path}: {str(e)}"
         logger.error(error_msg)
         return error_msg
 
+def get_files_info_raw(file_paths: List[str]) -> str:
+    """
+    Get type, size and modification time of several paths as a table.
+    
+    Args:
+        file_paths: Paths to describe, in order (relative or absolute)
+    
+    Returns:
+        One row per path (type, size, modified, path), or error message
+    """
+    try:
+        if not file_paths:
+            return "Error: Provide at least one path"
+        paths = list(dict.fromkeys(resolve_path(p) for p in file_paths))
+        dropped = max(len(paths) - FILES_INFO_MAX_PATHS, 0)
+        paths = paths[:FILES_INFO_MAX_PATHS]
+        
+        infos = stat_many(paths)
+        
+        files = sum(1 for info in infos if info.is_file)
+        directories = sum(1 for info in infos if info.is_dir)
+        missing = sum(1 for info in infos if info.error is not None)
+        rows = [
+            f"{len(infos)} paths ({files} files, {directories} directories, {missing} not found or unreadable)",
+            f"{'type':<5} {'size':>10} {'modified':<19} path",
+        ]
+        rows.extend(format_info_row(info, format_path_for_display(info.path)) for info in infos)
+        if dropped:
+            rows.append(f"Only the first {FILES_INFO_MAX_PATHS} paths were described")
+        
+        logger.info(f"Got file info for {len(infos)} paths in one batch")
+        return "\n".join(rows)
+    except Exception as e:
+        error_msg = f"Error getting file info: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+def file_digest_raw(file_paths: List[str]) -> str:
+    """
+    Get content digests of several files.
+    
+    A digest changes whenever the file's content does, so comparing it with
+    one reported earlier tells whether a file needs to be read again.
+    
+    Args:
+        file_paths: Paths of the files, in order (relative or absolute)
+    
+    Returns:
+        One 'digest  path' line per file, or error message
+    """
+    try:
+        if not file_paths:
+            return "Error: Provide at least one path"
+        paths = list(dict.fromkeys(resolve_path(p) for p in file_paths))
+        dropped = max(len(paths) - FILE_DIGEST_MAX_PATHS, 0)
+        paths = paths[:FILE_DIGEST_MAX_PATHS]
+        
+        results = get_digest_cache().digest_many(paths)
+        
+        lines = []
+        for path, (digest, error) in zip(paths, results):
+            display_path = format_path_for_display(path)
+            lines.append(f"{digest}  {display_path}" if error is None else f"{'-':<16}  {display_path} ({error})")
+        if dropped:
+            lines.append(f"Only the first {FILE_DIGEST_MAX_PATHS} paths were digested")
+        
+        logger.info(f"Digested {len(paths)} paths")
+        return "\n".join(lines)
+    except Exception as e:
+        error_msg = f"Error computing digests: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+def search_files_raw(
+    pattern: str,
+    directory_path: Optional[str] = None,
+    regex: bool = False,
+    case_sensitive: bool = True,
+    max_results: Optional[int] = None
+) -> str:
+    """
+    Search the contents of files under a directory.
+    
+    Args:
+        pattern: Text to find (or a regular expression if regex is True)
+        directory_path: Directory to search (default: current working directory)
+        regex: Treat pattern as a Python regular expression
+        case_sensitive: Match case exactly
+        max_results: Maximum matching lines to return
+    
+    Returns:
+        Matches as path:line: snippet, one per line, or error message
+    """
+    try:
+        if not pattern:
+            return "Error: Search pattern must not be empty"
+        path = resolve_path(directory_path) if directory_path else Path(get_workspace().root)
+        if not path.exists():
+            return ERROR_DIR_NOT_FOUND.format(directory_path or str(path))
+        if not path.is_dir():
+            return ERROR_NOT_A_DIR.format(directory_path or str(path))
+        limit = min(max(max_results or SEARCH_DEFAULT_RESULTS, 1), SEARCH_MAX_RESULTS)
+        
+        index = get_search_indexes().get(path)
+        try:
+            results = search_index(
+                index, pattern, directory=str(path), regex=regex,
+                case_sensitive=case_sensitive, max_results=limit
+            )
+        except re.error as e:
+            return f"Error: Invalid regular expression {pattern!r}: {e}"
+        
+        display_path = format_path_for_display(path)
+        if not results.matches:
+            result = f"No matches for {pattern!r} in {display_path}"
+        else:
+            lines = [
+                f"{format_path_for_display(Path(m.path))}:{m.line}: {m.snippet}"
+                for m in results.matches
+            ]
+            result = f"Found {len(results.matches)} matching lines in {results.files_matched} files under {display_path}"
+            if results.truncated:
+                result += f" (stopped at {limit}; narrow the pattern or directory to see more)"
+            result += "\n" + "\n".join(lines)
+        if results.index_truncated:
+            result += f"\nNote: only the first {index.max_files} files under {index.root} are searched"
+        
+        logger.info(
+            f"Searched {display_path} for {pattern!r}: {len(results.matches)} matches, "
+            f"{results.candidates}/{results.files_indexed} files read [absolute: {path}]"
+        )
+        return result
+    except Exception as e:
+        error_msg = f"Error searching {directory_path or 'working directory'}: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+def find_files_raw(
+    pattern: str = "*",
+    directory_path: Optional[str] = None,
+    max_depth: Optional[int] = None,
+    max_results: Optional[int] = None,
+    include_dirs: bool = False,
+    respect_gitignore: bool = True
+) -> str:
+    """
+    Find files under a directory by glob pattern.
+    
+    Args:
+        pattern: Glob matched against names ('*.py'), or against relative
+                 paths if it contains '/' ('src/**/test_*.py')
+        directory_path: Directory to search (default: current working directory)
+        max_depth: Deepest level to search, 1 = direct children (default: unlimited)
+        max_results: Maximum paths to return
+        include_dirs: Also return matching directories
+        respect_gitignore: Skip paths ignored by .gitignore, .git, node_modules, etc.
+    
+    Returns:
+        Matching paths, one per line, or error message
+    """
+    try:
+        if directory_path is None:
+            path = Path(get_workspace().root)
+        else:
+            path = resolve_path(directory_path)
+        if not path.exists():
+            return ERROR_DIR_NOT_FOUND.format(directory_path or str(path))
+        if not path.is_dir():
+            return ERROR_NOT_A_DIR.format(directory_path or str(path))
+        if max_depth is not None and max_depth < 1:
+            return "Error: max_depth must be at least 1"
+        limit = min(max(max_results or FIND_DEFAULT_RESULTS, 1), FIND_MAX_RESULTS)
+        
+        results = find_paths(
+            str(path), pattern, max_depth=max_depth, max_results=limit,
+            include_dirs=include_dirs, respect_gitignore=respect_gitignore
+        )
+        
+        display_path = format_path_for_display(path)
+        lines = []
+        for found in results.paths:
+            display = format_path_for_display(Path(found.path))
+            if found.is_dir:
+                lines.append(f"{display}/")
+            else:
+                lines.append(f"{display} ({found.size} bytes)")
+        
+        depth_note = f", depth <= {max_depth}" if max_depth is not None else ""
+        if not lines:
+            result = f"No paths matching {pattern!r} under {display_path}{depth_note}"
+        else:
+            result = f"Found {len(lines)} paths matching {pattern!r} under {display_path}{depth_note}"
+            if results.truncated:
+                result += f" (stopped at {limit}; narrow the pattern, directory or depth to see more)"
+            result += "\n" + "\n".join(lines)
+        
+        logger.info(
+            f"Found {len(lines)} paths matching {pattern!r} under {display_path} "
+            f"({results.directories_walked} dirs walked, {results.ignored} ignored) [absolute: {path}]"
+        )
+        return result
+    except Exception as e:
+        error_msg = f"Error finding files in {directory_path or 'working directory'}: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
 # Additional utility functions
 
 def list_files(directory: str, pattern: str = "*") -> list[str]:
     """
     List files in a directory matching a pattern.
     
-    This is a utility function that might be useful for agents.
+    This is a utility function that might be useful for agents. Like
+    Path.glob, '*' only looks at the directory itself and '**' recurses;
+    paths ignored by .gitignore are skipped.
     
     Args:
         directory: Directory path to list (relative or absolute)
@@ -441,13 +1189,11 @@ def list_files(directory: str, pattern: str = "*") -> list[str]:
         if not dir_path.is_dir():
             return []
         
-        files = []
-        for file_path in dir_path.glob(pattern):
-            if file_path.is_file():
-                # Return display paths for cleaner output
-                files.append(format_path_for_display(file_path))
+        max_depth = None if "**" in pattern else pattern.count("/") + 1
+        results = find_paths(str(dir_path), pattern, max_depth=max_depth)
         
-        return sorted(files)
+        # Return display paths for cleaner output
+        return sorted(format_path_for_display(Path(found.path)) for found in results.paths)
     except Exception as e:
         logger.error(f"Error listing files in {directory}: {e}")
         return []
@@ -468,18 +1214,21 @@ def get_file_metadata(file_path: str) -> Optional[Dict[str, Any]]:
         # Resolve to absolute path
         path = resolve_path(file_path)
         
-        if not path.exists() or not path.is_file():
+        try:
+            info = stat_info(path)
+        except FileNotFoundError:
+            return None
+        if not info.is_file:
             return None
         
-        stat = path.stat()
         display_path = format_path_for_display(path)
         
         return {
             "path": display_path,
             "absolute_path": str(path),
-            "size_bytes": stat.st_size,
-            "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
+            "size_bytes": info.size,
+            "last_modified": info.modified,
+            "created": info.created,
             "extension": path.suffix,
             "name": path.name
         }
@@ -488,47 +1237,420 @@ def get_file_metadata(file_path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-# Global storage for tool call arguments (for lifecycle hook access)
-_last_tool_args = {}
-_pending_tool_args = {}  # Args set before tool execution
+class ToolResultMemo:
+    """
+    Run-scoped memo of read-only tool results.
+    
+    Entries are keyed by tool name and resolved path and validated against
+    the path's (mtime_ns, size), so a repeated read_file or get_file_info of
+    an unchanged path costs a single stat. Writes and edits made through the
+    tools invalidate the path and entries keyed by its parent directory.
+    Directory listings are not memoized: they show the sizes of the files
+    inside, and a directory's stat doesn't change when one of them grows.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str, tuple], Tuple[Tuple[int, int], str]] = {}
+        self._keys_by_path: Dict[str, Set[Tuple[str, str, tuple]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def lookup(
+        self, tool_name: str, path: str, validator: Tuple[int, int], variant: tuple = ()
+    ) -> Optional[str]:
+        """Return the memoized result if the path is unchanged, counting a hit or miss.
+        
+        variant holds the call's other arguments (e.g. a line range).
+        """
+        with self._lock:
+            entry = self._entries.get((tool_name, path, variant))
+            if entry is not None and entry[0] == validator:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+    
+    def store(
+        self, tool_name: str, path: str, validator: Tuple[int, int], result: str, variant: tuple = ()
+    ) -> None:
+        """Memoize a result for the given path version."""
+        with self._lock:
+            key = (tool_name, path, variant)
+            self._entries[key] = (validator, result)
+            self._keys_by_path.setdefault(path, set()).add(key)
+    
+    def invalidate(self, path: str) -> int:
+        """Drop entries for a path and for its parent directory."""
+        removed = 0
+        with self._lock:
+            for target in (path, os.path.dirname(path)):
+                for key in self._keys_by_path.pop(target, ()):
+                    if self._entries.pop(key, None) is not None:
+                        removed += 1
+            self.invalidations += removed
+        return removed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for run metadata."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+
+_current_memo: ContextVar[Optional[ToolResultMemo]] = ContextVar("nano_agent_tool_result_memo", default=None)
+
+
+def get_tool_result_memo() -> Optional[ToolResultMemo]:
+    """The result memo of the run in the current context, if any."""
+    return _current_memo.get()
+
+
+@contextmanager
+def tool_result_memo_scope(memo: Optional[ToolResultMemo] = None) -> Iterator[ToolResultMemo]:
+    """Install a result memo for the duration of an agent run."""
+    memo = memo if memo is not None else ToolResultMemo()
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+
+
+def _path_version(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a path, or None if it can't be stat'ed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
 
-def capture_args(tool_name: str, **kwargs):
-    """Capture tool arguments for lifecycle hooks."""
-    global _last_tool_args, _pending_tool_args
-    _last_tool_args[tool_name] = kwargs
-    _pending_tool_args[tool_name] = kwargs
-    logger.debug(f"Captured args for {tool_name}: {kwargs}")
+def _run_memoized(memo: ToolResultMemo, tool_name: str, path: str, func, **arguments) -> str:
+    """Run a read-only tool body through the memo (executes on the tool pool)."""
+    version = _path_version(path)
+    if version is None:
+        return func(**arguments)
+    variant = tuple(sorted(
+        (k, v) for k, v in arguments.items() if v is not None and k not in _PATH_ARGUMENTS
+    ))
+    cached = memo.lookup(tool_name, path, version, variant)
+    if cached is not None:
+        return cached
+    result = func(**arguments)
+    # Only keep successful results for a version that didn't change while reading
+    if not result.startswith("Error") and _path_version(path) == version:
+        memo.store(tool_name, path, version, result, variant)
+    return result
+
+
+def _run_invalidating(memo: ToolResultMemo, paths: List[str], func, **arguments) -> str:
+    """Run a modifying tool body, then drop memoized results for its paths."""
+    try:
+        return func(**arguments)
+    finally:
+        for path in paths:
+            memo.invalidate(path)
+
+
+# Arguments naming the path a tool operates on
+_PATH_ARGUMENTS = ("file_path", "directory_path")
+
+
+def _lock_key(arguments: Dict[str, Any]) -> str:
+    """Resolved path a tool call operates on (the working directory by default)."""
+    target = arguments.get("file_path") or arguments.get("directory_path")
+    return str(resolve_path(target) if target else Path(get_workspace().root))
+
+
+async def _invoke(
+    ctx: ToolContext,
+    tool_name: str,
+    func,
+    lock_paths: Optional[Union[List[str], Callable[[], List[str]]]] = None,
+    **arguments
+) -> str:
+    """Run a raw tool on the tool executor, recording the call in the run's log.
+    
+    Read-only tools share a lock on their path so parallel calls run
+    concurrently; any other tool holds the path exclusively. Tools touching
+    several files pass lock_paths, which are locked in sorted order so two
+    such calls can't deadlock; lock_paths may be a callable that resolves
+    them, so resolution errors are handled here. A path that can't be
+    resolved is reported as the tool's error string. Arguments left as None (defaults) are not
+    recorded.
+    """
+    log = get_tool_call_log()
+    record = None
+    if log is not None:
+        recorded_args = {k: v for k, v in arguments.items() if v is not None}
+        record = log.start(getattr(ctx, "tool_call_id", None), tool_name, recorded_args)
+    try:
+        if callable(lock_paths):
+            lock_paths = lock_paths()
+        paths = sorted(set(lock_paths)) if lock_paths else [_lock_key(arguments)]
+    except Exception as e:
+        # An unusable path (embedded NUL, outside a confined workspace) is the model's to fix
+        result = ERROR_INVALID_PATH.format(e)
+        logger.warning(f"{tool_name}: {result}")
+        if record is not None:
+            log.finish(record, result=result)
+        return result
+    read_only = tool_name in READ_ONLY_TOOLS
+    memo = get_tool_result_memo()
+    body = func
+    if memo is not None:
+        if tool_name in MEMOIZED_TOOLS:
+            body = functools.partial(_run_memoized, memo, tool_name, paths[0], func)
+        elif not read_only:
+            body = functools.partial(_run_invalidating, memo, paths, func)
+    path_locks = get_path_locks()
+    lock = path_locks.shared if read_only else path_locks.exclusive
+    try:
+        async with AsyncExitStack() as stack:
+            for path in paths:
+                await stack.enter_async_context(lock(path))
+            result = await run_tool(tool_name, body, **arguments)
+    except BaseException as e:
+        if record is not None:
+            log.finish(record, error=e)
+        raise
+    if record is not None:
+        log.finish(record, result=result)
+    return result
+
+# Decorated tool functions for OpenAI Agent SDK.
+# They are async so the blocking raw implementations run on the tool thread
+# pool (see tool_executor) instead of the event loop serving other clients.
+@function_tool
+async def read_file(
+    ctx: ToolContext,
+    file_path: str,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    if_none_match: Optional[str] = None
+) -> str:
+    """Read the contents of a file, or a page of its lines.
+    
+    Large files are returned a page at a time, ending with a note that tells
+    which offset to use to continue. Pages end with '[etag ...]'; pass it as
+    expected_hash to replace_lines when editing exactly those lines, or as
+    if_none_match when reading the same page again. Pass a file's digest
+    (from file_digest, get_file_info, write_file or apply_edits) when
+    reading the whole file again, to get a short "Not modified" reply if
+    nothing changed.
+    
+    Args:
+        file_path: The path to the file to read (relative or absolute)
+        offset: First line to read, 1-based (default: start of file)
+        limit: Maximum number of lines to read
+        max_bytes: Maximum bytes of content to return
+        if_none_match: Etag from an earlier read, or a digest from file_digest/write_file/apply_edits
+    """
+    return await _invoke(
+        ctx, "read_file", read_file_raw,
+        file_path=file_path, offset=offset, limit=limit, max_bytes=max_bytes,
+        if_none_match=if_none_match
+    )
 
-# Decorated tool functions for OpenAI Agent SDK
 @function_tool
-def read_file(file_path: str) -> str:
-    """Read the contents of a file."""
-    capture_args("read_file", file_path=file_path)
-    return read_file_raw(file_path)
+async def read_many_files(
+    ctx: ToolContext,
+    file_paths: Optional[List[str]] = None,
+    pattern: Optional[str] = None,
+    directory_path: Optional[str] = None,
+    max_total_bytes: Optional[int] = None,
+    max_file_bytes: Optional[int] = None
+) -> str:
+    """Read several files in one call (up to 50), given as paths or a glob.
+    
+    Prefer this over one read_file per file. Each file appears under a
+    '==> path <==' header; files cut short by the byte budgets say which
+    offset to continue from with read_file.
+    
+    Args:
+        file_paths: Paths to read, in order
+        pattern: Glob selecting files instead, e.g. '*.py' or 'src/**/*.py'
+        directory_path: Directory the pattern is matched in (default: current working directory)
+        max_total_bytes: Budget across all files (default: 256 KiB, at most 1 MiB)
+        max_file_bytes: Budget per file (default: 64 KiB)
+    """
+    return await _invoke(
+        ctx, "read_many_files", read_many_files_raw,
+        file_paths=file_paths, pattern=pattern, directory_path=directory_path,
+        max_total_bytes=max_total_bytes, max_file_bytes=max_file_bytes
+    )
 
 @function_tool
-def write_file(file_path: str, content: str) -> str:
+async def write_file(ctx: ToolContext, file_path: str, content: str) -> str:
     """Write content to a file."""
-    capture_args("write_file", file_path=file_path, content=content)
-    return write_file_raw(file_path, content)
+    return await _invoke(ctx, "write_file", write_file_raw, file_path=file_path, content=content)
+
+def _session_lock_paths(session_id: str) -> Optional[List[str]]:
+    """Lock the file a write session targets (None for unknown sessions)."""
+    session = get_write_sessions().get(session_id)
+    return [str(session.path)] if session is not None else None
+
+@function_tool
+async def open_write(ctx: ToolContext, file_path: str) -> str:
+    """Start writing a file too large to send in one write_file call.
+    
+    Returns a session id. Send the content in order with append_chunk, then
+    call commit_write: the file is replaced in one step on commit, and keeps
+    its old content until then.
+    
+    Args:
+        file_path: Path where the file should be written (relative or absolute)
+    """
+    return await _invoke(ctx, "open_write", open_write_raw, file_path=file_path)
+
+@function_tool
+async def append_chunk(ctx: ToolContext, session_id: str, content: str) -> str:
+    """Append the next piece of a file opened with open_write.
+    
+    Args:
+        session_id: Id returned by open_write
+        content: Next piece of the file, exactly as it should appear (include newlines)
+    """
+    return await _invoke(
+        ctx, "append_chunk", append_chunk_raw,
+        lock_paths=_session_lock_paths(session_id), session_id=session_id, content=content
+    )
+
+@function_tool
+async def commit_write(ctx: ToolContext, session_id: str, discard: Optional[bool] = None) -> str:
+    """Finish a file written with open_write and append_chunk.
+    
+    Args:
+        session_id: Id returned by open_write
+        discard: Drop everything written in the session instead, leaving the file as it was
+    """
+    return await _invoke(
+        ctx, "commit_write", commit_write_raw,
+        lock_paths=_session_lock_paths(session_id), session_id=session_id, discard=discard
+    )
+
 
 @function_tool
-def list_directory(directory_path: Optional[str] = None) -> str:
-    """List contents of a directory (defaults to current working directory)."""
-    if directory_path is not None:
-        capture_args("list_directory", directory_path=directory_path)
-    else:
-        capture_args("list_directory", directory_path="<current working directory>")
-    return list_directory_raw(directory_path)
+async def list_directory(
+    ctx: ToolContext,
+    directory_path: Optional[str] = None,
+    page_token: Optional[str] = None,
+    limit: Optional[int] = None,
+    sort: Optional[str] = None
+) -> str:
+    """List contents of a directory (defaults to current working directory).
+    
+    Large directories are returned a page at a time; the listing ends with
+    the page_token to pass for the next page.
+    
+    Args:
+        directory_path: Path to the directory (relative or absolute)
+        page_token: Cursor from the previous page
+        limit: Maximum entries per page (default: 500)
+        sort: 'name' (A-Z, default), 'size' (largest first) or 'mtime' (newest first)
+    """
+    return await _invoke(
+        ctx, "list_directory", list_directory_raw,
+        directory_path=directory_path, page_token=page_token, limit=limit, sort=sort
+    )
 
 @function_tool
-def get_file_info(file_path: str) -> str:
+async def get_file_info(ctx: ToolContext, file_path: str) -> str:
     """Get detailed information about a file."""
-    capture_args("get_file_info", file_path=file_path)
-    return get_file_info_raw(file_path)
+    return await _invoke(ctx, "get_file_info", get_file_info_raw, file_path=file_path)
 
 @function_tool
-def edit_file(file_path: str, old_str: str, new_str: str) -> str:
+async def get_files_info(ctx: ToolContext, file_paths: List[str]) -> str:
+    """Get type, size and modification time of several paths in one call (up to 500).
+    
+    Prefer this over one get_file_info per path. Paths that don't exist
+    are listed as not found rather than failing the call.
+    
+    Args:
+        file_paths: Paths to describe, in order
+    """
+    return await _invoke(ctx, "get_files_info", get_files_info_raw, file_paths=file_paths)
+
+@function_tool
+async def file_digest(ctx: ToolContext, file_paths: List[str]) -> str:
+    """Get content digests of files (up to 500), to tell which changed since you read them.
+    
+    Compare with the digests from an earlier file_digest, get_file_info,
+    write_file or apply_edits call: a file whose digest is the same hasn't
+    changed and doesn't need to be read again.
+    
+    Args:
+        file_paths: Paths of the files
+    """
+    return await _invoke(ctx, "file_digest", file_digest_raw, file_paths=file_paths)
+
+@function_tool
+async def search_files(
+    ctx: ToolContext,
+    pattern: str,
+    directory_path: Optional[str] = None,
+    regex: bool = False,
+    case_sensitive: bool = True,
+    max_results: Optional[int] = None
+) -> str:
+    """Search file contents under a directory and return matching lines.
+    
+    Use this to find where a symbol or text appears instead of listing and
+    reading directories one by one. Results are 'path:line: snippet' lines.
+    
+    Args:
+        pattern: Text to find (or a regular expression if regex is true)
+        directory_path: Directory to search (default: current working directory)
+        regex: Treat pattern as a Python regular expression
+        case_sensitive: Match case exactly (default: true)
+        max_results: Maximum matching lines to return (default: 100)
+    """
+    return await _invoke(
+        ctx, "search_files", search_files_raw,
+        pattern=pattern, directory_path=directory_path, regex=regex,
+        case_sensitive=case_sensitive, max_results=max_results
+    )
+
+@function_tool
+async def find_files(
+    ctx: ToolContext,
+    pattern: str = "*",
+    directory_path: Optional[str] = None,
+    max_depth: Optional[int] = None,
+    max_results: Optional[int] = None,
+    include_dirs: bool = False,
+    respect_gitignore: bool = True
+) -> str:
+    """Find files in a directory tree by glob pattern in one call.
+    
+    Use this to explore a project instead of listing directories one at a
+    time. Ignored paths (.gitignore, .git, node_modules, build caches) are
+    skipped unless respect_gitignore is false.
+    
+    Args:
+        pattern: Glob matched against file names ('*.py'), or against paths
+                 relative to directory_path if it contains '/' ('lib/**/*.dart')
+        directory_path: Directory to search (default: current working directory)
+        max_depth: Deepest level to search, 1 = direct children (default: unlimited)
+        max_results: Maximum paths to return (default: 200)
+        include_dirs: Also return matching directories
+        respect_gitignore: Skip ignored paths (default: true)
+    """
+    return await _invoke(
+        ctx, "find_files", find_files_raw,
+        pattern=pattern, directory_path=directory_path, max_depth=max_depth,
+        max_results=max_results, include_dirs=include_dirs, respect_gitignore=respect_gitignore
+    )
+
+@function_tool
+async def edit_file(ctx: ToolContext, file_path: str, old_str: str, new_str: str) -> str:
     """Edit a file by replacing exact text with new text.
     
     IMPORTANT: This tool performs exact string matching including all whitespace and indentation.
@@ -560,8 +1682,85 @@ def edit_file(file_path: str, old_str: str, new_str: str) -> str:
         - Line endings: Include \n if matching multiple lines
         - Hidden whitespace: Copy exactly from read_file output
     """
-    capture_args("edit_file", file_path=file_path, old_str=old_str, new_str=new_str)
-    return edit_file_raw(file_path, old_str, new_str)
+    return await _invoke(ctx, "edit_file", edit_file_raw, file_path=file_path, old_str=old_str, new_str=new_str)
+
+@function_tool
+async def replace_lines(
+    ctx: ToolContext,
+    file_path: str,
+    start_line: int,
+    end_line: int,
+    new_text: str,
+    expected_hash: Optional[str] = None
+) -> str:
+    """Replace lines start_line..end_line of a file with new text, by line number.
+    
+    Use this for large or generated files, or when the exact old text is long
+    or awkward to quote: no text has to match. Line numbers are those shown
+    by read_file (1-based, inclusive). To make sure the lines haven't changed
+    since you read them, read exactly start_line..end_line with read_file
+    (offset/limit) and pass the page's etag as expected_hash; the edit is
+    rejected if they changed in between. The result reports the hash of the
+    new lines for a follow-up edit of the same lines. Line numbers after the
+    range shift by the change in line count.
+    
+    Args:
+        file_path: The path to the file to modify (relative or absolute)
+        start_line: First line to replace
+        end_line: Last line to replace; use start_line - 1 to insert before start_line
+        new_text: Replacement text (empty string deletes the lines)
+        expected_hash: Etag of a read_file page of these lines, or the hash from a previous edit of them
+    """
+    return await _invoke(
+        ctx, "replace_lines", replace_lines_raw,
+        file_path=file_path, start_line=start_line, end_line=end_line,
+        new_text=new_text, expected_hash=expected_hash
+    )
+
+
+@function_tool
+async def apply_edits(ctx: ToolContext, file_path: str, edits: List[EditOperation]) -> str:
+    """Make several exact-text replacements in one file at once.
+    
+    Prefer this over repeated edit_file calls on the same file. Every
+    old_str is matched against the file as it is now (not after earlier
+    edits), must occur exactly once unless replace_all is set, and edits
+    must not overlap. If any edit fails, the file is left unchanged.
+    
+    Args:
+        file_path: The path to the file to modify (relative or absolute)
+        edits: Replacements, each with old_str, new_str and optional replace_all
+    """
+    # Plain dicts keep the recorded arguments JSON-serializable
+    return await _invoke(
+        ctx, "apply_edits", apply_edits_raw,
+        file_path=file_path, edits=[edit.model_dump() for edit in edits]
+    )
+
+@function_tool
+async def apply_patch(ctx: ToolContext, patch: str) -> str:
+    """Apply a unified diff that changes, creates or deletes several files at once.
+    
+    Use the format of 'git diff': '--- a/path' and '+++ b/path' headers
+    (/dev/null for created or deleted files) followed by '@@' hunks with
+    context lines. Paths are relative to the working directory. Hunks may
+    sit at shifted line numbers but their context must match exactly. If
+    any hunk fails, no file is changed.
+    
+    Args:
+        patch: The unified diff text
+    """
+    # Parsed once: the lock paths and the body both come from the same file patches
+    file_patches, error = parse_unified_diff(patch)
+    
+    def apply_parsed(patch: str) -> str:
+        return _apply_file_patches(file_patches, error)
+    
+    return await _invoke(
+        ctx, "apply_patch", apply_parsed,
+        lock_paths=functools.partial(_patch_paths, file_patches), patch=patch
+    )
+
 
 
 # Export all tools for the agent
@@ -574,8 +1773,19 @@ def get_nano_agent_tools():
     """
     return [
         read_file,
+        read_many_files,
         write_file,
+        open_write,
+        append_chunk,
+        commit_write,
         list_directory,
         get_file_info,
-        edit_file
+        get_files_info,
+        file_digest,
+        edit_file,
+        replace_lines,
+        apply_edits,
+        apply_patch,
+        search_files,
+        find_files
     ]
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Per-path Read/Write Locks for Nano Agent Tools.
+
+With parallel tool calls a model can issue several calls in one turn. Calls
+that only read may run together, but a write must not overlap any other call
+on the same path, so writes to one path run one at a time.
+Locks are created on demand and dropped once no call holds or waits for them.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+
+class _PathLock:
+    """Readers-writer lock for one path (writers take priority over new readers)."""
+
+    def __init__(self):
+        self.condition = asyncio.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+        self.users = 0
+
+
+class PathLocks:
+    """Table of per-path readers-writer locks."""
+
+    def __init__(self):
+        self._locks: Dict[str, _PathLock] = {}
+
+    def _checkout(self, key: str) -> _PathLock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = _PathLock()
+        lock.users += 1
+        return lock
+
+    def _checkin(self, key: str, lock: _PathLock) -> None:
+        lock.users -= 1
+        if lock.users == 0 and self._locks.get(key) is lock:
+            del self._locks[key]
+
+    @asynccontextmanager
+    async def shared(self, key: str) -> AsyncIterator[None]:
+        """Hold the path for reading; other readers may hold it too."""
+        lock = self._checkout(key)
+        try:
+            async with lock.condition:
+                await lock.condition.wait_for(lambda: not lock.writer and lock.waiting_writers == 0)
+                lock.readers += 1
+            try:
+                yield
+            finally:
+                async with lock.condition:
+                    lock.readers -= 1
+                    lock.condition.notify_all()
+        finally:
+            self._checkin(key, lock)
+
+    @asynccontextmanager
+    async def exclusive(self, key: str) -> AsyncIterator[None]:
+        """Hold the path for writing; no other call may hold it."""
+        lock = self._checkout(key)
+        try:
+            async with lock.condition:
+                lock.waiting_writers += 1
+                try:
+                    await lock.condition.wait_for(lambda: not lock.writer and lock.readers == 0)
+                finally:
+                    lock.waiting_writers -= 1
+                    # Readers held back by this writer may proceed if it was cancelled
+                    lock.condition.notify_all()
+                lock.writer = True
+            try:
+                yield
+            finally:
+                async with lock.condition:
+                    lock.writer = False
+                    lock.condition.notify_all()
+        finally:
+            self._checkin(key, lock)
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+# Process-wide table: writes from concurrent runs to one file are serialized too
+_path_locks = PathLocks()
+
+
+def get_path_locks() -> PathLocks:
+    """Get the process-wide path lock table."""
+    return _path_locks
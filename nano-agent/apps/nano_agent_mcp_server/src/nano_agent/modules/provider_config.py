@@ -6,6 +6,7 @@ with different model providers (OpenAI, Anthropic, Ollama).
 """
 
 from typing import Optional, Union
+import dataclasses
 import os
 import logging
 from openai import AsyncOpenAI
@@ -14,6 +15,7 @@ import requests
 
 # Apply typing fixes for Python 3.12+ compatibility
 from . import typing_fix
+from .constants import PARALLEL_TOOL_CALLS_BY_PROVIDER
 
 logger = logging.getLogger(__name__)
 
@@ -52,9 +54,25 @@ class ProviderConfig:
         if provider == "anthropic":
             pass
         
+        # Let the model request several independent tool calls in one turn
+        # (an explicit parallel_tool_calls in base_settings wins)
+        if "parallel_tool_calls" not in filtered_settings:
+            if PARALLEL_TOOL_CALLS_BY_PROVIDER.get(provider, False):
+                filtered_settings["parallel_tool_calls"] = True
+        elif filtered_settings["parallel_tool_calls"] is None:
+            del filtered_settings["parallel_tool_calls"]
+        if "parallel_tool_calls" in filtered_settings and not ProviderConfig._supports_setting("parallel_tool_calls"):
+            # Older Agent SDK releases don't know the setting
+            del filtered_settings["parallel_tool_calls"]
+        
         logger.debug(f"Model settings for {model}: {filtered_settings}")
         return ModelSettings(**filtered_settings)
     
+    @staticmethod
+    def _supports_setting(name: str) -> bool:
+        """Whether the installed Agent SDK's ModelSettings has a field."""
+        return name in {f.name for f in dataclasses.fields(ModelSettings)}
+    
     @staticmethod
     def create_agent(
         name: str,
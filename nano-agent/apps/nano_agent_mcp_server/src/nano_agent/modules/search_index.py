@@ -0,0 +1,492 @@
+"""
+Workspace Content Search for Nano Agent.
+
+Without a search tool the agent lists every folder and reads candidate
+files one by one to find a symbol. The search index keeps a compact
+trigram signature per file of the workspace, so a query only reads the files
+that can contain its literal text.
+
+A signature is a small bitset with one bit per hashed trigram of the file's
+lowercased identifier-like tokens ([A-Za-z0-9_]{3,}). A query's required
+literals are tokenized the same way. Any file that contains the literal has
+all of the query's trigram bits set. Bits can collide, so the filter may let
+extra files through, but it never drops a match. Candidates are then matched
+for real with the compiled pattern.
+
+The index is built lazily on the first search. Later searches re-index only
+the files whose (mtime_ns, size, inode) changed, plus files the tools wrote
+in between. Memory is bounded: signatures beyond SEARCH_INDEX_MAX_BYTES and
+files larger than SEARCH_INDEX_MAX_FILE_BYTES are not indexed and are scanned
+on every query instead. Paths excluded by .gitignore are never indexed.
+"""
+
+import functools
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from re import _parser as sre_parse
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .constants import (
+    SEARCH_INDEX_MAX_BYTES,
+    SEARCH_INDEX_MAX_FILE_BYTES,
+    SEARCH_INDEX_MAX_FILES,
+    SEARCH_INDEX_MAX_ROOTS,
+    SEARCH_INDEX_REFRESH_SECONDS,
+    SEARCH_SNIPPET_CHARS,
+)
+from .file_cache import FileVersion, file_version
+from .gitignore import GitIgnoreMatcher
+
+logger = logging.getLogger(__name__)
+
+# Identifier-like runs whose trigrams go into a signature
+_TOKEN_RE = re.compile(rb"[A-Za-z0-9_]{3,}")
+
+# Signature widths in bits, chosen per file from its number of distinct tokens
+_MIN_SIGNATURE_BITS = 512
+_MAX_SIGNATURE_BITS = 4096
+_BITS_PER_TOKEN = 16
+
+# Bytes sniffed for a NUL to recognise binary files
+_BINARY_SNIFF_BYTES = 8192
+
+# Signature width markers for files without a signature
+_BINARY = -1  # never searched
+_UNINDEXED = 0  # always scanned
+
+_REPEAT_OPS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, sre_parse.POSSESSIVE_REPEAT)
+
+
+@functools.lru_cache(maxsize=1 << 15)
+def _token_mask(token: bytes, bits: int) -> int:
+    """Signature bits of one lowercased token at a given width."""
+    mask = 0
+    for i in range(len(token) - 2):
+        mask |= 1 << (zlib.crc32(token[i:i + 3]) & (bits - 1))
+    return mask
+
+
+def _signature_bits(token_count: int) -> int:
+    """Signature width for a file with token_count distinct tokens."""
+    bits = _MIN_SIGNATURE_BITS
+    while bits < token_count * _BITS_PER_TOKEN and bits < _MAX_SIGNATURE_BITS:
+        bits <<= 1
+    return bits
+
+
+def _signature(data: bytes) -> Tuple[int, int]:
+    """(width, signature) of a file's content."""
+    tokens = set(_TOKEN_RE.findall(data.lower()))
+    bits = _signature_bits(len(tokens))
+    signature = 0
+    for token in tokens:
+        signature |= _token_mask(token, bits)
+    return bits, signature
+
+
+def _query_tokens(literals: List[str]) -> List[bytes]:
+    """Lowercased tokens every matching file must contain trigrams of."""
+    tokens: Set[bytes] = set()
+    for literal in literals:
+        tokens.update(_TOKEN_RE.findall(literal.encode("utf-8").lower()))
+    return sorted(tokens)
+
+
+def _required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """Literal strings any match of a regex must contain.
+
+    Only concatenated literals, plain groups and repeats with a minimum of
+    one contribute; alternations, classes and optional parts end a literal.
+    An unparsable pattern yields no literals (every file is a candidate).
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return []
+    literals: List[str] = []
+
+    def walk(items) -> None:
+        current: List[str] = []
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                current.append(chr(av))
+                continue
+            if current:
+                literals.append("".join(current))
+                current = []
+            if op is sre_parse.SUBPATTERN:
+                walk(av[-1])
+            elif op is sre_parse.ATOMIC_GROUP:
+                walk(av)
+            elif op in _REPEAT_OPS and av[0] >= 1:
+                walk(av[2])
+        if current:
+            literals.append("".join(current))
+
+    walk(parsed)
+    return literals
+
+
+@dataclass(slots=True)
+class _IndexedFile:
+    version: FileVersion
+    bits: int
+    signature: int = 0
+
+
+@dataclass
+class SearchMatch:
+    """One matching line."""
+    path: str
+    line: int
+    snippet: str
+
+
+@dataclass
+class SearchResults:
+    """Matches of a search plus what it cost."""
+    matches: List[SearchMatch] = field(default_factory=list)
+    files_matched: int = 0
+    files_indexed: int = 0
+    candidates: int = 0
+    truncated: bool = False
+    index_truncated: bool = False
+
+
+class TrigramIndex:
+    """Thread-safe trigram signature index of the files under one root."""
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_bytes: int = SEARCH_INDEX_MAX_BYTES,
+        max_file_bytes: int = SEARCH_INDEX_MAX_FILE_BYTES,
+        max_files: int = SEARCH_INDEX_MAX_FILES,
+        refresh_seconds: float = SEARCH_INDEX_REFRESH_SECONDS
+    ):
+        """Initialize an empty index; nothing is read until the first refresh.
+
+        Args:
+            root: Directory to index (absolute)
+            max_bytes: Memory ceiling for signatures
+            max_file_bytes: Larger files are scanned on every query instead
+            max_files: Stop walking the tree after this many files
+            refresh_seconds: Minimum interval between full rescans of the tree
+        """
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.refresh_seconds = refresh_seconds
+        self._files: Dict[str, _IndexedFile] = {}
+        self._changed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._last_scan: Optional[float] = None
+        self.signature_bytes = 0
+        self.truncated = False
+        self.scans = 0
+        self.indexed = 0
+        self.removed = 0
+
+    def contains(self, path: str, is_dir: bool = False) -> bool:
+        """Whether path lies under this index's root and is not excluded from it by .gitignore."""
+        if path == self.root:
+            return True
+        prefix = self.root.rstrip(os.sep) + os.sep
+        if not path.startswith(prefix):
+            return False
+        # Follow the walk down to path: an ignored directory on the way was never indexed
+        matcher = GitIgnoreMatcher.for_directory(self.root)
+        current = self.root
+        parts = path[len(prefix):].split(os.sep)
+        for i, part in enumerate(parts):
+            current = os.path.join(current, part)
+            last = i == len(parts) - 1
+            if matcher.is_ignored(current, is_dir or not last):
+                return False
+            if not last:
+                matcher = matcher.child(current)
+        return True
+
+    def mark_changed(self, path: str) -> None:
+        """Re-index path on the next search even if the next rescan is not due."""
+        with self._lock:
+            self._changed.add(path)
+
+    def _walk(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """Regular files under the root that .gitignore doesn't exclude (symlinked dirs are not followed)."""
+        stack = [(self.root, GitIgnoreMatcher.for_directory(self.root))]
+        while stack:
+            directory, matcher = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not matcher.is_ignored(entry.path, True):
+                                    stack.append((entry.path, matcher.child(entry.path)))
+                            elif entry.is_file() and not matcher.is_ignored(entry.path, False):
+                                yield entry.path, entry.stat()
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _index_file(self, path: str, stat: os.stat_result) -> None:
+        """(Re)compute the signature of one file. Caller holds the lock."""
+        old = self._files.pop(path, None)
+        if old is not None and old.bits > 0:
+            self.signature_bytes -= old.bits // 8
+        version = file_version(stat)
+        if stat.st_size > self.max_file_bytes:
+            self._files[path] = _IndexedFile(version, _UNINDEXED)
+            return
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        self.indexed += 1
+        if b"\0" in data[:_BINARY_SNIFF_BYTES]:
+            self._files[path] = _IndexedFile(version, _BINARY)
+            return
+        bits, signature = _signature(data)
+        if self.signature_bytes + bits // 8 > self.max_bytes:
+            self._files[path] = _IndexedFile(version, _UNINDEXED)
+            return
+        self.signature_bytes += bits // 8
+        self._files[path] = _IndexedFile(version, bits, signature)
+
+    def _drop(self, path: str) -> None:
+        entry = self._files.pop(path)
+        if entry.bits > 0:
+            self.signature_bytes -= entry.bits // 8
+        self.removed += 1
+
+    def refresh(self, force: bool = False) -> None:
+        """Bring the index up to date with the tree.
+
+        Rescans the whole tree (one stat per file) at most every
+        refresh_seconds unless forced; in between only files reported via
+        mark_changed are re-indexed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            due = (
+                force
+                or self._last_scan is None
+                or now - self._last_scan >= self.refresh_seconds
+            )
+            changed, self._changed = self._changed, set()
+            if not due:
+                for path in changed:
+                    try:
+                        self._index_file(path, os.stat(path))
+                    except OSError:
+                        if path in self._files:
+                            self._drop(path)
+                return
+
+            seen: Set[str] = set()
+            self.truncated = False
+            for path, stat in self._walk():
+                if len(seen) >= self.max_files:
+                    self.truncated = True
+                    break
+                seen.add(path)
+                entry = self._files.get(path)
+                if entry is None or entry.version != file_version(stat) or path in changed:
+                    self._index_file(path, stat)
+            for path in [p for p in self._files if p not in seen]:
+                self._drop(path)
+            self._last_scan = time.monotonic()
+            self.scans += 1
+
+    def candidates(self, tokens: List[bytes], directory: Optional[str] = None) -> Tuple[List[str], int]:
+        """Files under directory whose signature admits all tokens.
+
+        Returns:
+            Tuple of (sorted candidate paths, number of searchable files considered)
+        """
+        prefix = None
+        if directory is not None and directory != self.root:
+            prefix = directory.rstrip(os.sep) + os.sep
+        masks: Dict[int, int] = {}
+        result = []
+        considered = 0
+        with self._lock:
+            for path, entry in self._files.items():
+                if entry.bits == _BINARY or (prefix is not None and not path.startswith(prefix)):
+                    continue
+                considered += 1
+                if entry.bits == _UNINDEXED:
+                    result.append(path)
+                    continue
+                mask = masks.get(entry.bits)
+                if mask is None:
+                    mask = 0
+                    for token in tokens:
+                        mask |= _token_mask(token, entry.bits)
+                    masks[entry.bits] = mask
+                if entry.signature & mask == mask:
+                    result.append(path)
+        result.sort()
+        return result, considered
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._files)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Size and activity counters."""
+        with self._lock:
+            return {
+                "root": self.root,
+                "files": len(self._files),
+                "signature_bytes": self.signature_bytes,
+                "max_bytes": self.max_bytes,
+                "scans": self.scans,
+                "indexed": self.indexed,
+                "removed": self.removed,
+                "truncated": self.truncated,
+            }
+
+
+def compile_search_pattern(pattern: str, regex: bool = False, case_sensitive: bool = True) -> Tuple[re.Pattern, List[str]]:
+    """Compile a search pattern and find the literals a match must contain.
+
+    Raises:
+        re.error: If a regex pattern is invalid
+    """
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    if not regex:
+        return re.compile(re.escape(pattern), flags), [pattern]
+    compiled = re.compile(pattern, flags)
+    return compiled, _required_literals(pattern, flags)
+
+
+def _snippet(text: str, start: int, end: int) -> str:
+    """The line spanning text[start:end], trimmed to SEARCH_SNIPPET_CHARS."""
+    line = text[start:end].rstrip("\r")
+    if len(line) > SEARCH_SNIPPET_CHARS:
+        line = line[:SEARCH_SNIPPET_CHARS] + "..."
+    return line
+
+
+def search_index(
+    index: TrigramIndex,
+    pattern: str,
+    directory: Optional[str] = None,
+    regex: bool = False,
+    case_sensitive: bool = True,
+    max_results: int = 100
+) -> SearchResults:
+    """Search the files under directory, reading only index candidates.
+
+    Lines are reported once even if they match several times. The search
+    stops at the first matching line past max_results and marks the results
+    truncated.
+
+    Raises:
+        re.error: If a regex pattern is invalid
+    """
+    compiled, literals = compile_search_pattern(pattern, regex, case_sensitive)
+    index.refresh()
+    candidates, considered = index.candidates(_query_tokens(literals), directory)
+    results = SearchResults(files_indexed=considered, candidates=len(candidates), index_truncated=index.truncated)
+
+    for path in candidates:
+        if results.truncated:
+            break
+        try:
+            with open(path, "rb") as f:
+                text = f.read().decode("utf-8", errors="replace")
+        except OSError:
+            continue
+        line_number = 1
+        position = 0
+        last_line_start = -1
+        matched = False
+        for match in compiled.finditer(text):
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            if line_start == last_line_start:
+                continue
+            if len(results.matches) >= max_results:
+                results.truncated = True
+                break
+            matched = True
+            line_number += text.count("\n", position, line_start)
+            position = line_start
+            last_line_start = line_start
+            line_end = text.find("\n", match.start())
+            results.matches.append(SearchMatch(
+                path=path,
+                line=line_number,
+                snippet=_snippet(text, line_start, len(text) if line_end < 0 else line_end),
+            ))
+        if matched:
+            results.files_matched += 1
+    return results
+
+
+class SearchIndexRegistry:
+    """LRU of trigram indexes, one per searched root."""
+
+    def __init__(self, max_roots: int = SEARCH_INDEX_MAX_ROOTS):
+        self.max_roots = max_roots
+        self._indexes: "OrderedDict[str, TrigramIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, directory: Union[str, Path]) -> TrigramIndex:
+        """Index covering directory, creating one rooted at it if none does.
+
+        An index whose walk skips directory (it is .gitignored under that
+        index's root) doesn't cover it; searching there gets its own index.
+        """
+        directory = str(directory)
+        with self._lock:
+            for root, index in self._indexes.items():
+                if index.contains(directory, is_dir=True):
+                    self._indexes.move_to_end(root)
+                    return index
+            index = TrigramIndex(directory)
+            self._indexes[directory] = index
+            while len(self._indexes) > self.max_roots:
+                self._indexes.popitem(last=False)
+            return index
+
+    def mark_changed(self, path: Union[str, Path]) -> None:
+        """Tell every index containing path that it was modified."""
+        path = str(path)
+        with self._lock:
+            indexes = [index for index in self._indexes.values() if index.contains(path)]
+        for index in indexes:
+            index.mark_changed(path)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Stats of each live index."""
+        with self._lock:
+            indexes = list(self._indexes.values())
+        return [index.get_stats() for index in indexes]
+
+
+# Process-wide indexes shared by all runs in the server/CLI process
+_registry: Optional[SearchIndexRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_search_indexes() -> SearchIndexRegistry:
+    """Get the process-wide search index registry, creating it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SearchIndexRegistry()
+    return _registry
@@ -0,0 +1,320 @@
+"""
+Streaming Execution Support for Nano Agent.
+
+Translates OpenAI Agent SDK stream events into progress updates and
+collects per-turn timing (time-to-first-token, model and turn latency)
+while the agent runs.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from .constants import STREAM_TEXT_FLUSH_CHARS, STREAM_TEXT_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Progress event kinds passed to ProgressCallback
+PROGRESS_TURN_START = "turn_start"
+PROGRESS_TOOL_START = "tool_start"
+PROGRESS_TOOL_END = "tool_end"
+PROGRESS_TEXT = "text"
+
+# Async callback receiving (kind, message) for every progress update
+ProgressCallback = Callable[[str, str], Awaitable[None]]
+
+
+@dataclass
+class TurnTiming:
+    """Timing of a single agent turn (one model call plus its tool calls).
+
+    All values are seconds; started_at is relative to the start of the run.
+    tool_wall_seconds spans the first tool start to the last tool end, while
+    tool_busy_seconds sums the individual calls, so busy > wall means the
+    turn's tool calls overlapped.
+    """
+    turn: int
+    started_at: float
+    first_token_seconds: Optional[float] = None
+    model_seconds: Optional[float] = None
+    turn_seconds: Optional[float] = None
+    tool_calls: int = 0
+    tool_wall_seconds: Optional[float] = None
+    tool_busy_seconds: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert timing to dictionary."""
+        return {
+            "turn": self.turn,
+            "started_at": round(self.started_at, 4),
+            "first_token_seconds": round(self.first_token_seconds, 4) if self.first_token_seconds is not None else None,
+            "model_seconds": round(self.model_seconds, 4) if self.model_seconds is not None else None,
+            "turn_seconds": round(self.turn_seconds, 4) if self.turn_seconds is not None else None,
+            "tool_calls": self.tool_calls,
+            "tool_wall_seconds": round(self.tool_wall_seconds, 4) if self.tool_wall_seconds is not None else None,
+            "tool_busy_seconds": round(self.tool_busy_seconds, 4) if self.tool_busy_seconds is not None else None,
+        }
+
+
+class RunMetrics:
+    """Collects latency metrics for one streamed agent run.
+
+    A turn starts at the last boundary of the previous turn (run start,
+    model response completion or tool output), so per-turn first-token time
+    includes the provider's queueing and prompt processing.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """Initialize metrics and mark the start of the run.
+
+        Args:
+            clock: Monotonic clock returning seconds (injectable for tests)
+        """
+        self._clock = clock
+        self._start = clock()
+        self._last_boundary = 0.0
+        self._finished_at: Optional[float] = None
+        self.turns: List[TurnTiming] = []
+        self.time_to_first_token: Optional[float] = None
+
+    def now(self) -> float:
+        """Seconds elapsed since the run started."""
+        return self._clock() - self._start
+
+    @property
+    def current_turn(self) -> Optional[TurnTiming]:
+        """The turn in progress, if any."""
+        return self.turns[-1] if self.turns else None
+
+    def start_turn(self) -> TurnTiming:
+        """Record the start of a new model call and close the previous turn."""
+        started_at = self._last_boundary
+        if self.current_turn is not None and self.current_turn.turn_seconds is None:
+            self.current_turn.turn_seconds = started_at - self.current_turn.started_at
+        turn = TurnTiming(turn=len(self.turns) + 1, started_at=started_at)
+        self.turns.append(turn)
+        return turn
+
+    def record_token(self) -> None:
+        """Record that the model produced output in the current turn."""
+        turn = self.current_turn
+        if turn is None:
+            turn = self.start_turn()
+        if turn.first_token_seconds is None:
+            now = self.now()
+            turn.first_token_seconds = now - turn.started_at
+            if self.time_to_first_token is None:
+                self.time_to_first_token = now
+
+    def end_model_call(self) -> None:
+        """Record that the current model response completed."""
+        now = self.now()
+        turn = self.current_turn
+        if turn is not None and turn.model_seconds is None:
+            turn.model_seconds = now - turn.started_at
+        self._last_boundary = now
+
+    def record_tool_start(self) -> None:
+        """Record a tool call in the current turn."""
+        if self.current_turn is not None:
+            self.current_turn.tool_calls += 1
+
+    def record_tool_end(self) -> None:
+        """Record that a tool finished; the next model call starts from here."""
+        self._last_boundary = self.now()
+
+    def record_tool_calls(self, records: Iterable[Any], call_turns: Dict[str, int]) -> None:
+        """Attach tool wall and busy time to turns from finished tool call records.
+
+        Args:
+            records: ToolCallRecord objects (call_id, started_at, ended_at)
+            call_turns: Turn number of each tool call id
+        """
+        spans: Dict[int, List[Any]] = {}
+        for record in records:
+            turn_number = call_turns.get(record.call_id)
+            if turn_number is not None and record.ended_at is not None:
+                spans.setdefault(turn_number, []).append(record)
+        for turn in self.turns:
+            turn_records = spans.get(turn.turn)
+            if not turn_records:
+                continue
+            turn.tool_wall_seconds = (
+                max(r.ended_at for r in turn_records) - min(r.started_at for r in turn_records)
+            )
+            turn.tool_busy_seconds = sum(r.ended_at - r.started_at for r in turn_records)
+
+    @property
+    def last_boundary(self) -> float:
+        """Seconds since run start of the last model completion or tool output."""
+        return self._last_boundary
+
+    def finish(self) -> None:
+        """Mark the end of the run and close the last turn."""
+        if self._finished_at is not None:
+            return
+        self._finished_at = self.now()
+        turn = self.current_turn
+        if turn is not None and turn.turn_seconds is None:
+            turn.turn_seconds = self._finished_at - turn.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metrics to a metadata dictionary."""
+        return {
+            "time_to_first_token_seconds": round(self.time_to_first_token, 4) if self.time_to_first_token is not None else None,
+            "turn_latencies_seconds": [
+                round(t.turn_seconds, 4) for t in self.turns if t.turn_seconds is not None
+            ],
+            "turns": [t.to_dict() for t in self.turns],
+        }
+
+
+class RunDeadline:
+    """Wall-clock and per-turn deadlines for a streamed run.
+
+    The turn deadline restarts at every boundary (run start, model response
+    completion, tool output), so it bounds a single model call or a single
+    round of tool execution rather than the whole run.
+    """
+
+    WALL_CLOCK = "wall_clock"
+    TURN = "turn"
+
+    def __init__(self, metrics: RunMetrics, timeout_seconds: float, turn_timeout_seconds: float):
+        """Initialize deadlines relative to the metrics' run start.
+
+        Args:
+            metrics: RunMetrics of the run being bounded
+            timeout_seconds: Maximum total run time
+            turn_timeout_seconds: Maximum time for one model call or tool round
+        """
+        self.metrics = metrics
+        self.timeout_seconds = timeout_seconds
+        self.turn_timeout_seconds = turn_timeout_seconds
+
+    def remaining(self) -> float:
+        """Seconds until the nearest deadline (never negative)."""
+        now = self.metrics.now()
+        run_remaining = self.timeout_seconds - now
+        turn_remaining = self.metrics.last_boundary + self.turn_timeout_seconds - now
+        return max(0.0, min(run_remaining, turn_remaining))
+
+    def expired_limit(self) -> str:
+        """Which deadline fired: WALL_CLOCK or TURN."""
+        if self.metrics.now() >= self.timeout_seconds - 1e-3:
+            return self.WALL_CLOCK
+        return self.TURN
+
+    def limit_seconds(self, kind: str) -> float:
+        """The configured limit for a deadline kind."""
+        return self.timeout_seconds if kind == self.WALL_CLOCK else self.turn_timeout_seconds
+
+
+def _raw_item_field(item: Any, field_name: str) -> Optional[str]:
+    """Read a field from a run item's raw_item (object or dict)."""
+    raw_item = getattr(item, "raw_item", None)
+    if isinstance(raw_item, dict):
+        return raw_item.get(field_name)
+    return getattr(raw_item, field_name, None)
+
+
+class StreamEventProcessor:
+    """Consumes Agent SDK stream events, updating metrics and emitting progress.
+
+    Text deltas are coalesced and flushed at most every STREAM_TEXT_FLUSH_SECONDS
+    (or once STREAM_TEXT_FLUSH_CHARS accumulate) so chatty models don't flood
+    the client with one notification per token.
+    """
+
+    def __init__(
+        self,
+        metrics: RunMetrics,
+        on_progress: Optional[ProgressCallback] = None,
+        text_flush_seconds: float = STREAM_TEXT_FLUSH_SECONDS,
+        text_flush_chars: int = STREAM_TEXT_FLUSH_CHARS
+    ):
+        """Initialize the processor.
+
+        Args:
+            metrics: RunMetrics to update
+            on_progress: Optional async callback(kind, message)
+            text_flush_seconds: Minimum interval between text notifications
+            text_flush_chars: Flush buffered text once it reaches this size
+        """
+        self.metrics = metrics
+        self.on_progress = on_progress
+        self.text_flush_seconds = text_flush_seconds
+        self.text_flush_chars = text_flush_chars
+        self.progress_events = 0
+        self._text_buffer: List[str] = []
+        self._text_buffer_len = 0
+        self._last_text_flush = 0.0
+        self._tool_names: Dict[str, str] = {}
+        self._output_text: List[str] = []
+        self.call_turns: Dict[str, int] = {}
+
+    @property
+    def output_text(self) -> str:
+        """All text the model streamed so far (used for partial results)."""
+        return "".join(self._output_text)
+
+    async def _emit(self, kind: str, message: str) -> None:
+        """Send a progress update, never letting a callback failure break the run."""
+        if self.on_progress is None:
+            return
+        self.progress_events += 1
+        try:
+            await self.on_progress(kind, message)
+        except Exception as e:
+            logger.debug(f"Progress callback failed for {kind}: {e}")
+
+    async def flush(self) -> None:
+        """Emit any buffered text."""
+        if not self._text_buffer:
+            return
+        text = "".join(self._text_buffer)
+        self._text_buffer = []
+        self._text_buffer_len = 0
+        self._last_text_flush = self.metrics.now()
+        await self._emit(PROGRESS_TEXT, text)
+
+    async def process(self, event: Any) -> None:
+        """Handle a single stream event."""
+        event_type = getattr(event, "type", None)
+
+        if event_type == "raw_response_event":
+            data_type = getattr(event.data, "type", "")
+            if data_type == "response.created":
+                turn = self.metrics.start_turn()
+                await self._emit(PROGRESS_TURN_START, f"Turn {turn.turn} started")
+            elif data_type.endswith(".delta"):
+                self.metrics.record_token()
+                if data_type == "response.output_text.delta":
+                    delta = getattr(event.data, "delta", "") or ""
+                    self._output_text.append(delta)
+                    self._text_buffer.append(delta)
+                    self._text_buffer_len += len(delta)
+                    elapsed = self.metrics.now() - self._last_text_flush
+                    if self._text_buffer_len >= self.text_flush_chars or elapsed >= self.text_flush_seconds:
+                        await self.flush()
+            elif data_type == "response.completed":
+                self.metrics.end_model_call()
+                await self.flush()
+
+        elif event_type == "run_item_stream_event":
+            if event.name == "tool_called":
+                self.metrics.record_tool_start()
+                tool_name = _raw_item_field(event.item, "name") or "tool"
+                call_id = _raw_item_field(event.item, "call_id")
+                if call_id:
+                    self._tool_names[call_id] = tool_name
+                    if self.metrics.current_turn is not None:
+                        self.call_turns[call_id] = self.metrics.current_turn.turn
+                await self._emit(PROGRESS_TOOL_START, f"Tool started: {tool_name}")
+            elif event.name == "tool_output":
+                self.metrics.record_tool_end()
+                call_id = _raw_item_field(event.item, "call_id")
+                tool_name = self._tool_names.pop(call_id, "tool") if call_id else "tool"
+                output = getattr(event.item, "output", "")
+                await self._emit(PROGRESS_TOOL_END, f"Tool finished: {tool_name} ({len(str(output))} chars)")
@@ -0,0 +1,185 @@
+"""
+Text Encoding Detection for Nano Agent.
+
+Files the agent reads are not all UTF-8: Korean CSVs in particular come
+as cp949/euc-kr. Trying one codec after another on the whole file costs a
+full decode per candidate. Instead, the first ENCODING_SAMPLE_BYTES are
+sniffed once: a byte order mark decides outright, a NUL byte marks the
+file as binary (it is never decoded), and otherwise the sample is
+decoded with each candidate in ENCODING_CANDIDATES until one fits, with
+latin-1 (which decodes anything and writes the same bytes back) as the
+last resort. Results are cached per file version, so an unchanged file
+is sniffed once.
+
+A file whose sample is valid UTF-8 may still hold other bytes further
+on; read_decoded re-sniffs the whole file when the guessed codec fails
+to decode it.
+"""
+
+import codecs
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .constants import ENCODING_CACHE_ENTRIES, ENCODING_CANDIDATES, ENCODING_SAMPLE_BYTES
+from .file_cache import FileVersion, file_version, get_file_cache
+
+logger = logging.getLogger(__name__)
+
+ENCODING_FALLBACK = "latin-1"
+
+# Longest first: the UTF-32 LE mark starts with the UTF-16 LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+@dataclass(frozen=True)
+class EncodingGuess:
+    """Codec to decode a file with, or binary=True if it isn't text."""
+    encoding: Optional[str]
+    binary: bool = False
+    bom: bool = False
+
+
+BINARY = EncodingGuess(encoding=None, binary=True)
+
+
+def _fits(sample: bytes, encoding: str, complete: bool) -> bool:
+    """Whether sample decodes with encoding (a character cut at its end is allowed if incomplete)."""
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_encoding(sample: bytes, complete: bool = True) -> EncodingGuess:
+    """
+    Guess the encoding of content from its first bytes.
+
+    Args:
+        sample: Start of the content
+        complete: Whether sample is the whole content
+
+    Returns:
+        EncodingGuess for the content
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return EncodingGuess(encoding=encoding, bom=True)
+    if b"\0" in sample:
+        return BINARY
+    for encoding in ENCODING_CANDIDATES:
+        if _fits(sample, encoding, complete):
+            return EncodingGuess(encoding=encoding)
+    return EncodingGuess(encoding=ENCODING_FALLBACK)
+
+
+def _sniff_file(path: Union[str, Path], full: bool) -> Tuple[EncodingGuess, FileVersion]:
+    """Sniff the head of a file (or all of it), returning the guess and the version it applies to."""
+    with open(path, "rb") as f:
+        version = file_version(os.fstat(f.fileno()))
+        if full:
+            return sniff_encoding(f.read()), version
+        # One byte past the sample tells whether the sample is the whole file
+        sample = f.read(ENCODING_SAMPLE_BYTES + 1)
+    complete = len(sample) <= ENCODING_SAMPLE_BYTES
+    return sniff_encoding(sample[:ENCODING_SAMPLE_BYTES], complete), version
+
+
+class EncodingCache:
+    """Thread-safe LRU of encoding guesses, validated by file version."""
+
+    def __init__(self, max_entries: int = ENCODING_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[FileVersion, EncodingGuess]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def detect(
+        self, path: Union[str, Path], full: bool = False, stat: Optional[os.stat_result] = None
+    ) -> EncodingGuess:
+        """
+        Encoding of a file, sniffed only if it changed since last time.
+
+        Args:
+            path: Absolute path of a regular file
+            full: Sniff the whole file instead of a sample (replaces the cached guess)
+            stat: Its stat result, if the caller has just stat'ed it
+
+        Raises:
+            OSError: If the file can't be read
+        """
+        key = str(path)
+        if not full:
+            version = file_version(stat if stat is not None else os.stat(key))
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+        guess, version = _sniff_file(key, full)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, guess)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return guess
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache = EncodingCache()
+
+
+def get_encoding_cache() -> EncodingCache:
+    """Get the process-wide encoding cache."""
+    return _cache
+
+
+def detect_file_encoding(path: Union[str, Path], stat: Optional[os.stat_result] = None) -> EncodingGuess:
+    """Encoding of a file (cached per file version)."""
+    return _cache.detect(path, stat=stat)
+
+
+def read_decoded(path: Union[str, Path], guess: EncodingGuess) -> Tuple[Optional[str], os.stat_result, EncodingGuess]:
+    """
+    Decode a text file through the file content cache.
+
+    Args:
+        path: Absolute path of the file
+        guess: Its encoding, from detect_file_encoding (not binary)
+
+    Returns:
+        Tuple of (text, stat result of the version read, encoding used); text
+        is None if a full sniff finds the file is binary after all
+
+    Raises:
+        OSError: If the file can't be read
+    """
+    try:
+        text, stat = get_file_cache().read_text(path, guess.encoding)
+        return text, stat, guess
+    except UnicodeDecodeError:
+        # The head fitted but a later part of the file doesn't
+        guess = _cache.detect(path, full=True)
+        logger.debug(f"Re-sniffed {path} as {guess.encoding or 'binary'}")
+    if guess.binary:
+        return None, os.stat(path), guess
+    text, stat = get_file_cache().read_text(path, guess.encoding)
+    return text, stat, guess
@@ -6,7 +6,9 @@ and reporting for OpenAI Agent SDK operations.
 """
 
 import logging
-from typing import Dict, Any, Optional, Tuple
+import threading
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 import json
@@ -428,6 +430,148 @@ class TokenTracker:
         }
 
 
+def aggregate_token_summaries(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum several TokenTracker.get_summary() dictionaries.
+    
+    Costs are summed per run, so batches mixing models and providers
+    are still priced correctly.
+    
+    Args:
+        summaries: Summaries as returned by TokenTracker.get_summary()
+        
+    Returns:
+        Dictionary with the same keys holding the totals, plus the number of runs
+    """
+    totals: Dict[str, Any] = {
+        "total_tokens": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cached_tokens": 0,
+        "total_cost": 0.0,
+        "input_cost": 0.0,
+        "output_cost": 0.0,
+        "cached_savings": 0.0,
+    }
+    for summary in summaries:
+        for key in totals:
+            totals[key] += summary.get(key, 0) or 0
+    totals["runs"] = len(summaries)
+    return totals
+
+
+# Run outcomes recorded in the token ledger
+RUN_STATUS_COMPLETED = "completed"
+RUN_STATUS_FAILED = "failed"
+RUN_STATUS_TIMED_OUT = "timed_out"
+RUN_STATUS_CANCELLED = "cancelled"
+
+
+@dataclass
+class LedgerEntry:
+    """Token usage of one finished, failed, timed out or cancelled run."""
+    
+    model: str
+    provider: str
+    status: str
+    token_usage: Dict[str, Any]
+    execution_time_seconds: float
+    recorded_at: datetime = field(default_factory=datetime.now)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert entry to dictionary."""
+        return {
+            "model": self.model,
+            "provider": self.provider,
+            "status": self.status,
+            "token_usage": self.token_usage,
+            "execution_time_seconds": round(self.execution_time_seconds, 4),
+            "recorded_at": self.recorded_at.isoformat(),
+        }
+
+
+class TokenLedger:
+    """Process-wide record of token usage per run outcome.
+    
+    Every run is accounted for, including ones that never produce a response
+    (client cancelled, deadline hit), so money spent on abandoned runs shows
+    up in the totals. Only the most recent entries are kept individually.
+    """
+    
+    def __init__(self, max_entries: int = 100):
+        """Initialize the ledger.
+        
+        Args:
+            max_entries: Number of recent entries to keep
+        """
+        self._lock = threading.Lock()
+        self._entries: Deque[LedgerEntry] = deque(maxlen=max_entries)
+        self._totals: Dict[str, Dict[str, Any]] = {}
+    
+    def record(
+        self,
+        model: str,
+        provider: str,
+        status: str,
+        token_usage: Dict[str, Any],
+        execution_time_seconds: float = 0.0
+    ) -> LedgerEntry:
+        """Record the usage of a run.
+        
+        Args:
+            model: Model identifier
+            provider: Provider name
+            status: One of the RUN_STATUS_* values
+            token_usage: Summary as returned by TokenTracker.get_summary()
+            execution_time_seconds: Wall time of the run
+            
+        Returns:
+            The recorded entry
+        """
+        entry = LedgerEntry(
+            model=model,
+            provider=provider,
+            status=status,
+            token_usage=token_usage,
+            execution_time_seconds=execution_time_seconds,
+        )
+        with self._lock:
+            self._entries.append(entry)
+            previous = self._totals.get(status)
+            summaries = [token_usage] if previous is None else [previous, token_usage]
+            totals = aggregate_token_summaries(summaries)
+            totals["runs"] = (previous["runs"] if previous else 0) + 1
+            self._totals[status] = totals
+        return entry
+    
+    def recent(self, status: Optional[str] = None) -> List[LedgerEntry]:
+        """Recent entries, oldest first, optionally filtered by status."""
+        with self._lock:
+            return [e for e in self._entries if status is None or e.status == status]
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """Totals per status and across all runs."""
+        with self._lock:
+            by_status = {status: dict(totals) for status, totals in self._totals.items()}
+        overall = aggregate_token_summaries(list(by_status.values()))
+        overall["runs"] = sum(totals["runs"] for totals in by_status.values())
+        return {"by_status": by_status, "totals": overall}
+    
+    def reset(self) -> None:
+        """Clear all entries and totals."""
+        with self._lock:
+            self._entries.clear()
+            self._totals.clear()
+
+
+# Process-wide ledger shared by every run in this server/CLI process
+_ledger = TokenLedger()
+
+
+def get_token_ledger() -> TokenLedger:
+    """Get the process-wide token ledger."""
+    return _ledger
+
+
 def format_token_count(tokens: int) -> str:
     """Format token count for display.
     
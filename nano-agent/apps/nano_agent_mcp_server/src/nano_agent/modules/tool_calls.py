@@ -0,0 +1,131 @@
+"""
+Per-run Tool Call Records for Nano Agent.
+
+Each agent run gets its own ToolCallLog, installed in a context variable
+before the run starts. The SDK copies the context into every task it
+spawns and the tool executor copies it into worker threads, so concurrent
+runs in one server process never see each other's calls. Records are keyed
+by the SDK's tool call id, making lookups O(1) for hooks and metrics.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class ToolCallRecord:
+    """Arguments, timing and result size of one tool call."""
+    call_id: str
+    tool_name: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    ended_at: Optional[float] = None
+    result_size: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        """Wall time of the call, or None while it is running."""
+        if self.ended_at is None:
+            return None
+        return self.ended_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert record to dictionary."""
+        duration = self.duration_seconds
+        return {
+            "call_id": self.call_id,
+            "tool_name": self.tool_name,
+            "arguments": self.arguments,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "duration_seconds": round(duration, 6) if duration is not None else None,
+            "result_size": self.result_size,
+            "error": self.error,
+        }
+
+
+class ToolCallLog:
+    """Tool calls of a single agent run, in call order."""
+
+    def __init__(self):
+        self._records: Dict[str, ToolCallRecord] = {}
+
+    def start(self, call_id: Optional[str], tool_name: str, arguments: Dict[str, Any]) -> ToolCallRecord:
+        """Record the start of a call.
+
+        Args:
+            call_id: SDK tool call id (a local id is generated when unavailable)
+            tool_name: Name of the tool
+            arguments: Arguments the tool was called with
+
+        Returns:
+            The new record
+        """
+        if not call_id:
+            call_id = f"local-{len(self._records) + 1}"
+        record = ToolCallRecord(call_id=call_id, tool_name=tool_name, arguments=arguments)
+        self._records[call_id] = record
+        return record
+
+    def finish(self, record: ToolCallRecord, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Record the end of a call and the size of its result."""
+        record.ended_at = time.time()
+        if error is not None:
+            record.error = f"{type(error).__name__}: {error}"
+        else:
+            record.result_size = len(result) if isinstance(result, (str, bytes)) else len(str(result))
+
+    def get(self, call_id: Optional[str]) -> Optional[ToolCallRecord]:
+        """Look up a call by its SDK tool call id."""
+        if not call_id:
+            return None
+        return self._records.get(call_id)
+
+    @property
+    def records(self) -> List[ToolCallRecord]:
+        """All calls in the order they started."""
+        return list(self._records.values())
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Aggregate counts, durations and result sizes per tool."""
+        by_tool: Dict[str, Dict[str, Any]] = {}
+        for record in self._records.values():
+            stats = by_tool.setdefault(
+                record.tool_name, {"calls": 0, "errors": 0, "total_seconds": 0.0, "result_bytes": 0}
+            )
+            stats["calls"] += 1
+            stats["errors"] += int(record.error is not None)
+            stats["total_seconds"] += record.duration_seconds or 0.0
+            stats["result_bytes"] += record.result_size or 0
+        for stats in by_tool.values():
+            stats["total_seconds"] = round(stats["total_seconds"], 6)
+        return {"count": len(self._records), "by_tool": by_tool}
+
+
+_current_log: ContextVar[Optional[ToolCallLog]] = ContextVar("nano_agent_tool_call_log", default=None)
+
+
+def get_tool_call_log() -> Optional[ToolCallLog]:
+    """The tool call log of the run in the current context, if any."""
+    return _current_log.get()
+
+
+@contextmanager
+def tool_call_log_scope(log: Optional[ToolCallLog] = None) -> Iterator[ToolCallLog]:
+    """Install a tool call log for the duration of an agent run.
+
+    Must be entered before the run starts so the SDK's tasks inherit it.
+    """
+    log = log if log is not None else ToolCallLog()
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
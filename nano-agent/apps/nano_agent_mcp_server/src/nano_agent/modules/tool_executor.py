@@ -0,0 +1,198 @@
+"""
+Tool Execution Layer for Nano Agent.
+
+The file tools do blocking disk I/O. Running them inline in the event loop
+stalls every other MCP client served by the same process, so tool bodies are
+dispatched to a dedicated, sized thread pool. The executor keeps queue-depth
+and per-tool wait/run statistics so saturation is visible in get_agent_status.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .constants import DEFAULT_TOOL_WORKERS, TOOL_WORKERS_ENV
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class ToolTimingStats:
+    """Accumulated queue wait and run time for one tool."""
+    calls: int = 0
+    errors: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    total_run_seconds: float = 0.0
+    max_run_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert stats to dictionary."""
+        calls = max(self.calls, 1)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_wait_seconds": round(self.total_wait_seconds / calls, 6),
+            "max_wait_seconds": round(self.max_wait_seconds, 6),
+            "avg_run_seconds": round(self.total_run_seconds / calls, 6),
+            "max_run_seconds": round(self.max_run_seconds, 6),
+        }
+
+
+def get_tool_workers() -> int:
+    """Size of the tool thread pool (NANO_AGENT_TOOL_WORKERS or the default)."""
+    value = os.getenv(TOOL_WORKERS_ENV)
+    if value:
+        try:
+            workers = int(value)
+            if workers > 0:
+                return workers
+        except ValueError:
+            pass
+        logger.warning(f"Ignoring invalid {TOOL_WORKERS_ENV}={value!r}")
+    return DEFAULT_TOOL_WORKERS
+
+
+class ToolExecutor:
+    """Runs blocking tool bodies on a bounded thread pool.
+
+    Context variables of the calling task are copied into the worker thread,
+    so per-run state set by the agent loop is visible inside the tool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """Initialize the executor; threads are started lazily.
+
+        Args:
+            max_workers: Pool size (defaults to get_tool_workers())
+        """
+        self.max_workers = max_workers or get_tool_workers()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._max_queue_depth = 0
+        self._tools: Dict[str, ToolTimingStats] = {}
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="nano-agent-tool"
+                    )
+        return self._pool
+
+    async def run(self, tool_name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run func(*args, **kwargs) on the pool and await its result.
+
+        If the awaiting task is cancelled before a worker picks the call up,
+        the call never runs.
+
+        Args:
+            tool_name: Name used for per-tool statistics
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Whatever func returns (exceptions propagate)
+        """
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queued)
+        dequeued = False
+
+        def dequeue() -> None:
+            nonlocal dequeued
+            if not dequeued:
+                dequeued = True
+                self._queued -= 1
+
+        def call() -> T:
+            run_start = time.perf_counter()
+            with self._lock:
+                dequeue()
+                self._active += 1
+            failed = False
+            try:
+                return context.run(func, *args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                self._record(tool_name, run_start - submitted, time.perf_counter() - run_start, failed)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), call)
+        finally:
+            # Cancelled while still queued: the worker never dequeued the call
+            with self._lock:
+                dequeue()
+
+    def _record(self, tool_name: str, wait: float, run: float, failed: bool) -> None:
+        with self._lock:
+            self._active -= 1
+            stats = self._tools.setdefault(tool_name, ToolTimingStats())
+            stats.calls += 1
+            stats.errors += int(failed)
+            stats.total_wait_seconds += wait
+            stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+            stats.total_run_seconds += run
+            stats.max_run_seconds = max(stats.max_run_seconds, run)
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls submitted but not yet picked up by a worker."""
+        with self._lock:
+            return self._queued
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool utilisation and per-tool timing."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queue_depth,
+                "active": self._active,
+                "tools": {name: stats.to_dict() for name, stats in self._tools.items()},
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads (a new pool is created on next use)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Process-wide executor shared by all agent runs
+_executor: Optional[ToolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Get the process-wide tool executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ToolExecutor()
+    return _executor
+
+
+async def run_tool(tool_name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking tool body on the process-wide executor."""
+    return await get_tool_executor().run(tool_name, func, *args, **kwargs)
@@ -0,0 +1,212 @@
+"""
+Chunked Write Sessions for Nano Agent.
+
+write_file takes a whole file in one tool call, which a model can't emit
+for files longer than its output limit. A write session builds the file
+over several calls instead: open_write stages a temp file next to the
+target, each append_chunk streams one piece into it, and commit_write
+publishes it atomically. Chunks go straight to disk and only a running
+digest is kept, so memory stays flat however large the file gets. Until
+the commit, the target keeps its old content.
+
+Sessions live in a process-wide registry, are dropped after
+WRITE_SESSION_IDLE_SECONDS without use, and at most WRITE_SESSION_MAX_OPEN
+are kept at once. Sessions still open when the process exits are
+discarded, so no temp files are left next to their targets.
+"""
+
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .atomic_write import StagedFile, matches_digest, new_digest
+from .constants import WRITE_SESSION_IDLE_SECONDS, WRITE_SESSION_MAX_BYTES, WRITE_SESSION_MAX_OPEN
+from .digest_cache import get_digest_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WriteSession:
+    """A file being written chunk by chunk."""
+    session_id: str
+    path: Path
+    staged: StagedFile
+    size: int = 0
+    chunks: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    digest: Any = field(default_factory=new_digest)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    closed: bool = False  # Committed or discarded; its temp file is gone
+
+    def discard(self) -> None:
+        """Remove the temp file (hold self.lock)."""
+        self.closed = True
+        self.staged.discard()
+
+
+@dataclass
+class CommitResult:
+    """Outcome of committing a session."""
+    path: Path
+    size: int
+    chunks: int
+    changed: bool
+
+
+class WriteSessionRegistry:
+    """Open write sessions by id (LRU, with idle expiry)."""
+
+    def __init__(
+        self,
+        max_open: int = WRITE_SESSION_MAX_OPEN,
+        idle_seconds: float = WRITE_SESSION_IDLE_SECONDS,
+        max_bytes: int = WRITE_SESSION_MAX_BYTES
+    ):
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, WriteSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.committed = 0
+        self.expired = 0
+
+    def _expire(self) -> List[WriteSession]:
+        """Unregister idle sessions and the oldest beyond max_open (lock held).
+
+        Returns:
+            The sessions removed, for _discard once the registry lock is released
+        """
+        now = time.monotonic()
+        removed = []
+        for session_id in [s for s, session in self._sessions.items() if now - session.last_used > self.idle_seconds]:
+            removed.append(self._sessions.pop(session_id))
+        while len(self._sessions) > self.max_open:
+            removed.append(self._sessions.popitem(last=False)[1])
+        self.expired += len(removed)
+        return removed
+
+    @staticmethod
+    def _discard(sessions: List[WriteSession]) -> None:
+        """Discard sessions, waiting for any append in progress on each."""
+        for session in sessions:
+            with session.lock:
+                session.discard()
+
+    def open(self, path: Path) -> WriteSession:
+        """Start a session writing path (parent directories must exist).
+
+        Raises:
+            OSError: If the temp file can't be created
+        """
+        session = WriteSession(session_id=uuid.uuid4().hex[:12], path=path, staged=StagedFile(path))
+        with self._lock:
+            self._sessions[session.session_id] = session
+            expired = self._expire()
+        self._discard(expired)
+        return session
+
+    def get(self, session_id: str) -> Optional[WriteSession]:
+        """The open session with this id, or None if it's unknown or expired."""
+        with self._lock:
+            expired = self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+        self._discard(expired)
+        return session
+
+    def append(self, session_id: str, text: str, encoding: str = "utf-8") -> Tuple[Optional[WriteSession], Optional[str]]:
+        """Append text to a session's temp file.
+
+        Returns:
+            Tuple of (session, error_message)
+        """
+        session = self.get(session_id)
+        if session is None:
+            return None, f"No open write session {session_id!r} (it may have expired or been committed)"
+        data = text.encode(encoding)
+        with session.lock:
+            if session.closed:
+                # Expired or committed between the lookup and now
+                return None, f"No open write session {session_id!r} (it may have expired or been committed)"
+            if session.size + len(data) > self.max_bytes:
+                return None, f"The file would exceed {self.max_bytes} bytes"
+            session.staged.write(data)
+            session.digest.update(data)
+            session.size += len(data)
+            session.chunks += 1
+        return session, None
+
+    def commit(self, session_id: str) -> Tuple[Optional[CommitResult], Optional[str]]:
+        """Publish a session's file over its target and close the session.
+
+        When the target already holds exactly the written bytes it is left
+        untouched.
+
+        Returns:
+            Tuple of (CommitResult, error_message)
+
+        Raises:
+            OSError: If the file can't be published (the session is discarded)
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return None, f"No open write session {session_id!r} (it may have expired or been committed)"
+        with session.lock:
+            try:
+                digest = session.digest.hexdigest()
+                changed = not matches_digest(session.path, session.size, digest)
+                if changed:
+                    session.staged.publish()
+                get_digest_cache().record(session.path, digest)
+            finally:
+                session.discard()
+        with self._lock:
+            self.committed += 1
+        return CommitResult(path=session.path, size=session.size, chunks=session.chunks, changed=changed), None
+
+    def abort(self, session_id: str) -> bool:
+        """Discard a session without touching its target."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        with session.lock:
+            session.discard()
+        return True
+
+    def close_all(self) -> int:
+        """Discard every open session (at shutdown), returning how many there were."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        self._discard(sessions)
+        return len(sessions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Open, committed and expired session counts."""
+        with self._lock:
+            return {
+                "open": len(self._sessions),
+                "open_bytes": sum(session.size for session in self._sessions.values()),
+                "committed": self.committed,
+                "expired": self.expired,
+            }
+
+
+_write_sessions = WriteSessionRegistry()
+atexit.register(_write_sessions.close_all)
+
+
+def get_write_sessions() -> WriteSessionRegistry:
+    """Get the process-wide write session registry."""
+    return _write_sessions
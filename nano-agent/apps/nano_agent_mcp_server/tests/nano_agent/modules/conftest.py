@@ -0,0 +1,21 @@
+"""
+Shared fixtures for the module tests.
+"""
+
+import json
+
+import pytest
+from agents.tool_context import ToolContext
+
+
+async def _invoke(tool, call_id="call", **arguments):
+    """Invoke a function tool the way the SDK does."""
+    payload = json.dumps(arguments)
+    ctx = ToolContext(context=None, tool_name=tool.name, tool_call_id=call_id, tool_arguments=payload)
+    return await tool.on_invoke_tool(ctx, payload)
+
+
+@pytest.fixture
+def invoke():
+    """Coroutine function invoke(tool, call_id="call", **arguments) calling a function tool like the SDK."""
+    return _invoke
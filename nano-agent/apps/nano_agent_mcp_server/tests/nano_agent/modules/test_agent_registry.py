@@ -0,0 +1,157 @@
+"""
+Tests for the process-wide Agent Registry.
+
+Covers caching, invalidation, credential rotation and concurrent access,
+plus a small cold vs. warm setup latency benchmark.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from nano_agent.modules.agent_registry import (
+    AgentRegistry,
+    get_agent_registry,
+    invalidate_agent_registry,
+)
+from nano_agent.modules.constants import DEFAULT_MODEL, DEFAULT_PROVIDER
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fresh registry with a dummy OpenRouter key."""
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    return AgentRegistry()
+
+
+class TestAgentRegistry:
+    """Test agent caching behaviour."""
+
+    def test_same_key_returns_same_agent(self, registry):
+        """Agents are built once and shared."""
+        agent1, error1 = registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+        agent2, error2 = registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+
+        assert error1 is None and error2 is None
+        assert agent1 is agent2
+        stats = registry.get_stats()
+        assert stats["builds"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["cached_agents"] == 1
+
+    def test_different_settings_build_new_agent(self, registry):
+        """Settings are part of the key."""
+        agent1, _ = registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL, {"temperature": 0.2})
+        agent2, _ = registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL, {"temperature": 0.7})
+
+        assert agent1 is not agent2
+        assert len(registry) == 2
+
+    def test_validation_error_not_cached(self, registry):
+        """Failed validation returns an error and is retried next time."""
+        agent, error = registry.get_agent(DEFAULT_PROVIDER, "not-a-model")
+
+        assert agent is None
+        assert "not available" in error
+        assert len(registry) == 0
+
+    def test_missing_key_then_fixed(self, monkeypatch):
+        """Setting the missing key makes the next lookup succeed."""
+        monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+        registry = AgentRegistry()
+
+        agent, error = registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+        assert agent is None
+        assert "OPENROUTER_API_KEY" in error
+
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        agent, error = registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+        assert agent is not None
+        assert error is None
+
+    def test_key_rotation_rebuilds_and_drops_stale(self, registry, monkeypatch):
+        """Changing the API key produces a new agent and evicts the old one."""
+        agent1, _ = registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+
+        monkeypatch.setenv("OPENROUTER_API_KEY", "rotated-key")
+        agent2, _ = registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+
+        assert agent1 is not agent2
+        assert len(registry) == 1
+
+    def test_invalidate(self, registry):
+        """Invalidation drops matching entries only."""
+        registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+        registry.get_agent(DEFAULT_PROVIDER, "x-ai/grok-4-fast")
+
+        assert registry.invalidate(model="x-ai/grok-4-fast") == 1
+        assert len(registry) == 1
+        assert registry.invalidate() == 1
+        assert len(registry) == 0
+        assert registry.get_stats()["invalidations"] == 2
+
+    def test_concurrent_misses_build_once(self, registry):
+        """Concurrent callers for the same key share a single build."""
+        from nano_agent.modules.provider_config import ProviderConfig
+
+        original_create = ProviderConfig.create_agent
+
+        def slow_create(*args, **kwargs):
+            time.sleep(0.05)
+            return original_create(*args, **kwargs)
+
+        agents = []
+        with patch.object(ProviderConfig, "create_agent", side_effect=slow_create):
+            threads = [
+                threading.Thread(target=lambda: agents.append(registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)[0]))
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert len(agents) == 8
+        assert all(a is agents[0] for a in agents)
+        stats = registry.get_stats()
+        assert stats["builds"] == 1
+        assert stats["hits"] + stats["misses"] == 8
+
+    def test_process_wide_registry(self, monkeypatch):
+        """The module-level registry is a singleton."""
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        assert get_agent_registry() is get_agent_registry()
+
+        get_agent_registry().get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+        assert invalidate_agent_registry(provider=DEFAULT_PROVIDER) >= 1
+
+
+class TestAgentRegistryBenchmark:
+    """Cold vs. warm agent setup latency."""
+
+    def test_cold_vs_warm_setup_latency(self, registry):
+        """Warm lookups should be much cheaper than building the agent."""
+        iterations = 50
+
+        cold_times = []
+        for _ in range(iterations):
+            registry.invalidate()
+            start = time.perf_counter()
+            registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+            cold_times.append(time.perf_counter() - start)
+
+        warm_times = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            registry.get_agent(DEFAULT_PROVIDER, DEFAULT_MODEL)
+            warm_times.append(time.perf_counter() - start)
+
+        cold = sorted(cold_times)[iterations // 2]
+        warm = sorted(warm_times)[iterations // 2]
+        print(f"\nAgent setup median: cold={cold * 1e6:.1f}us warm={warm * 1e6:.1f}us "
+              f"speedup={cold / max(warm, 1e-9):.1f}x")
+
+        assert warm < cold
@@ -0,0 +1,126 @@
+"""
+Tests for atomic writes and the skip-if-unchanged write path.
+"""
+
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from nano_agent.modules import atomic_write as atomic_write_module
+from nano_agent.modules.atomic_write import (
+    FSYNC_DIR,
+    FSYNC_FILE,
+    FSYNC_NONE,
+    atomic_write,
+    atomic_write_text,
+    get_fsync_policy,
+)
+from nano_agent.modules.constants import SUCCESS_FILE_EDIT_UNCHANGED, WRITE_FSYNC_ENV
+from nano_agent.modules.nano_agent_tools import edit_file_raw, write_file_raw
+
+
+class TestAtomicWrite:
+    """Test replacing, skipping and failure handling."""
+
+    def test_create_replace_and_skip(self, tmp_path):
+        target = tmp_path / "f.txt"
+
+        created = atomic_write(target, b"one")
+        assert (created.changed, created.created, created.size) == (True, True, 3)
+
+        os.utime(target, ns=(1_000_000_000, 1_000_000_000))
+        same = atomic_write(target, b"one")
+        assert same.changed is False
+        assert target.stat().st_mtime_ns == 1_000_000_000
+
+        # Same size, different bytes: compared by digest, then written
+        replaced = atomic_write(target, b"two")
+        assert (replaced.changed, replaced.created) == (True, False)
+        assert target.read_bytes() == b"two"
+        assert [p.name for p in tmp_path.iterdir()] == ["f.txt"]
+
+    def test_keeps_mode_and_symlink(self, tmp_path):
+        real = tmp_path / "real.sh"
+        real.write_text("echo 1\n")
+        os.chmod(real, 0o751)
+        link = tmp_path / "link.sh"
+        link.symlink_to(real)
+
+        atomic_write_text(link, "echo 2\n")
+
+        assert link.is_symlink()
+        assert real.read_text() == "echo 2\n"
+        assert (real.stat().st_mode & 0o777) == 0o751
+
+    def test_failed_write_leaves_target(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text("original")
+
+        with patch.object(atomic_write_module.os, "replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                atomic_write(target, b"new content")
+
+        assert target.read_text() == "original"
+        assert [p.name for p in tmp_path.iterdir()] == ["f.txt"]
+
+    @pytest.mark.parametrize("policy, syncs", [(FSYNC_NONE, 0), (FSYNC_FILE, 1), (FSYNC_DIR, 2)])
+    def test_fsync_policy(self, tmp_path, policy, syncs):
+        calls = []
+        real_fsync = os.fsync
+        with patch.object(atomic_write_module.os, "fsync", side_effect=lambda fd: calls.append(fd) or real_fsync(fd)):
+            atomic_write(tmp_path / "f.txt", b"data", fsync=policy)
+        assert len(calls) == syncs
+
+    def test_fsync_policy_from_environment(self, monkeypatch):
+        monkeypatch.setenv(WRITE_FSYNC_ENV, "DIR")
+        assert get_fsync_policy() == FSYNC_DIR
+        monkeypatch.setenv(WRITE_FSYNC_ENV, "always")
+        assert get_fsync_policy() == FSYNC_NONE
+
+    def test_readers_never_see_partial_content(self, tmp_path):
+        """A concurrent reader sees one complete version or the other."""
+        target = tmp_path / "f.txt"
+        versions = [b"a" * 200_000, b"b" * 300_000]
+        target.write_bytes(versions[0])
+        seen = set()
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                seen.add(target.read_bytes())
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            for i in range(50):
+                atomic_write(target, versions[i % 2], skip_unchanged=False)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert seen <= set(versions)
+
+
+class TestWriteTools:
+    """Test that write tools report whether bytes changed."""
+
+    def test_write_file_skips_identical_content(self, tmp_path):
+        target = tmp_path / "f.txt"
+        assert write_file_raw(str(target), "hello").startswith("Successfully wrote 5 bytes")
+        mtime = target.stat().st_mtime_ns
+
+        result = write_file_raw(str(target), "hello")
+
+        assert result.startswith("File already up to date:") and "nothing written" in result
+        assert target.stat().st_mtime_ns == mtime
+
+    def test_write_file_reports_bytes(self, tmp_path):
+        result = write_file_raw(str(tmp_path / "k.txt"), "한글")
+        assert result.startswith("Successfully wrote 6 bytes")
+
+    def test_edit_file_noop(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text("x = 1\n")
+        assert edit_file_raw(str(target), "x = 1", "x = 1") == SUCCESS_FILE_EDIT_UNCHANGED
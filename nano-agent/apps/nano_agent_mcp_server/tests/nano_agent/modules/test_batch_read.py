@@ -0,0 +1,219 @@
+"""
+Tests for batch reads and the read_many_files tool.
+
+The benchmark drives the real Agent SDK runner with a scripted model that
+waits a fixed latency per turn, so turn counts and wall time of an
+exploration task can be compared without calling a provider.
+"""
+
+import asyncio
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from agents import Agent, RunConfig, Runner
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+
+from nano_agent.modules import batch_read
+from nano_agent.modules.batch_read import read_files
+from nano_agent.modules.nano_agent_tools import get_nano_agent_tools, read_many_files_raw
+
+MODULES_DIR = Path(__file__).resolve().parents[3] / "src" / "nano_agent" / "modules"
+
+
+class TestReadFiles:
+    """Test budget planning and concurrent reads."""
+
+    def test_budgets(self, tmp_path):
+        """Per-file budgets cut at line boundaries; the total budget skips later files."""
+        paths = []
+        for i in range(4):
+            path = tmp_path / f"f{i}.txt"
+            path.write_text("".join(f"line {j}\n" for j in range(100)))
+            paths.append(path)
+
+        result = read_files(paths, max_file_bytes=200, max_total_bytes=500)
+
+        assert [item.path for item in result.items] == paths[:3]
+        assert result.skipped == paths[3:]
+        first = result.items[0]
+        assert first.truncated and first.text.endswith("\n")
+        assert len(first.text) <= 200 and first.total_lines == 100
+        assert result.items[2].budget == 100
+
+    def test_errors_are_per_file(self, tmp_path):
+        """Missing, binary and directory paths don't fail the batch."""
+        good = tmp_path / "good.txt"
+        good.write_text("ok\n")
+        binary = tmp_path / "blob.bin"
+        binary.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00")
+
+        result = read_files([tmp_path / "missing.txt", binary, tmp_path, good], 1000, 10000)
+
+        assert [item.error for item in result.items] == [
+            "File not found", "Binary file, not text", "Path is not a file", None
+        ]
+        assert result.items[3].text == "ok\n"
+
+    def test_reads_concurrently(self, tmp_path):
+        """Files of a batch are read on several threads at once."""
+        paths = []
+        for i in range(6):
+            path = tmp_path / f"f{i}.txt"
+            path.write_text("x\n")
+            paths.append(path)
+        state = {"active": 0, "max_active": 0}
+        lock = threading.Lock()
+        original = batch_read.read_line_range
+
+        def slow_read(*args, **kwargs):
+            with lock:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+            time.sleep(0.03)
+            with lock:
+                state["active"] -= 1
+            return original(*args, **kwargs)
+
+        with patch.object(batch_read, "read_line_range", side_effect=slow_read):
+            result = read_files(paths, 1000, 10000)
+
+        assert all(item.text == "x\n" for item in result.items)
+        assert state["max_active"] > 1
+
+
+class TestReadManyFilesTool:
+    """Test the read_many_files tool body."""
+
+    def test_paths_and_glob(self, tmp_path, monkeypatch):
+        """Explicit paths come first, then glob matches, without duplicates."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "a.py").write_text("a = 1\n")
+        (tmp_path / "src" / "b.py").write_text("b = 2\n")
+        (tmp_path / "README.md").write_text("# readme\n")
+
+        result = read_many_files_raw(file_paths=["README.md", "src/b.py"], pattern="src/*.py")
+
+        assert result.splitlines() == [
+            "Read 3 of 3 files (21 bytes)",
+            "==> README.md (1 lines) <==",
+            "# readme",
+            "==> src/b.py (1 lines) <==",
+            "b = 2",
+            "==> src/a.py (1 lines) <==",
+            "a = 1",
+        ]
+
+    def test_truncation_and_budget_notes(self, tmp_path, monkeypatch):
+        """Cut files say where to continue; skipped files are listed."""
+        monkeypatch.chdir(tmp_path)
+        for name in ("a.txt", "b.txt"):
+            (tmp_path / name).write_text("0123456789\n" * 10)
+
+        result = read_many_files_raw(file_paths=["a.txt", "b.txt"], max_total_bytes=50)
+
+        assert "==> a.txt (lines 1-4 of 10, truncated; continue with read_file offset=5) <==" in result
+        assert "Not read (total budget of 50 bytes used up): b.txt" in result
+
+    def test_errors(self, tmp_path, monkeypatch):
+        """Missing arguments and empty globs are reported."""
+        monkeypatch.chdir(tmp_path)
+        assert read_many_files_raw().startswith("Error: Provide file_paths or a pattern")
+        assert read_many_files_raw(pattern="*.nothing") == "No files matching '*.nothing'"
+        assert "Error: File not found" in read_many_files_raw(file_paths=["nope.txt"])
+
+
+def tool_call(name, call_id, **arguments):
+    """A function call output item as a model would return it."""
+    return ResponseFunctionToolCall(
+        arguments=json.dumps(arguments), call_id=call_id, name=name, type="function_call", id=call_id
+    )
+
+
+def final_message(text):
+    """A final assistant message output item."""
+    return ResponseOutputMessage(
+        id="msg",
+        content=[ResponseOutputText(annotations=[], text=text, type="output_text")],
+        role="assistant",
+        status="completed",
+        type="message",
+    )
+
+
+class ScriptedModel(Model):
+    """Model returning scripted turns after a fixed latency."""
+
+    def __init__(self, turns, latency):
+        self.turns = list(turns)
+        self.latency = latency
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs):
+        await asyncio.sleep(self.latency)
+        output = self.turns[self.calls]
+        self.calls += 1
+        return ModelResponse(output=output, usage=Usage(), response_id=None)
+
+    async def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+        yield
+
+
+class TestReadManyFilesBenchmark:
+    """Round-trips of the code-analysis task (eval #4) with and without batching."""
+
+    @pytest.mark.asyncio
+    async def test_batched_exploration_needs_one_turn(self, tmp_path, monkeypatch):
+        """Reading every module: N+1 turns with read_file, 2 with read_many_files."""
+        shutil.copytree(MODULES_DIR, tmp_path / "modules", ignore=shutil.ignore_patterns("__pycache__"))
+        monkeypatch.chdir(tmp_path)
+        files = sorted(p.name for p in (tmp_path / "modules").glob("*.py"))
+        latency = 0.05
+
+        per_file = ScriptedModel(
+            [[tool_call("read_file", f"c{i}", file_path=f"modules/{name}")] for i, name in enumerate(files)]
+            + [[final_message("summary")]],
+            latency,
+        )
+        batched = ScriptedModel(
+            [
+                [tool_call("read_many_files", "c0", pattern="*.py", directory_path="modules",
+                           max_total_bytes=1024 * 1024, max_file_bytes=1024 * 1024)],
+                [final_message("summary")],
+            ],
+            latency,
+        )
+
+        timings = {}
+        outputs = {}
+        for label, model in (("read_file", per_file), ("read_many_files", batched)):
+            agent = Agent(name="NanoAgent", instructions="Summarize the modules.", tools=get_nano_agent_tools(), model=model)
+            start = time.perf_counter()
+            result = await Runner.run(agent, "Read all Python files in modules/ and summarize them",
+                                      max_turns=len(files) + 5, run_config=RunConfig(tracing_disabled=True))
+            timings[label] = time.perf_counter() - start
+            outputs[label] = [item for item in result.new_items if item.type == "tool_call_output_item"]
+
+        print(f"\nEval #4-style exploration of {len(files)} modules: "
+              f"read_file {per_file.calls} turns {timings['read_file'] * 1000:.0f}ms, "
+              f"read_many_files {batched.calls} turns {timings['read_many_files'] * 1000:.0f}ms")
+
+        batch_output = outputs["read_many_files"][0].output
+        assert per_file.calls == len(files) + 1
+        assert batched.calls == 2
+        assert f"Read {len(files)} of {len(files)} files" in batch_output
+        assert "==> modules/constants.py" in batch_output
+        assert timings["read_many_files"] < timings["read_file"]
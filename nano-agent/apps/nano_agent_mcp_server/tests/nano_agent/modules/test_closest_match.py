@@ -0,0 +1,147 @@
+"""
+Tests for closest-match diagnostics of failed edits.
+"""
+
+import random
+import time
+
+from nano_agent.modules.closest_match import (
+    NormalizedLineIndex,
+    describe_closest_match,
+    find_closest_match,
+    get_normalized_index_cache,
+)
+from nano_agent.modules.nano_agent_tools import edit_file_raw
+
+
+def generated_source(lines=10_000, seed=7):
+    """Python-like source with varied indentation and mostly unique lines."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        indent = "    " * (i % 4)
+        out.append(f"{indent}value_{i} = compute(alpha_{i % 97}, beta_{rng.randint(0, 999)})")
+    return out
+
+
+class TestFindClosestMatch:
+    """Test locating the intended region."""
+
+    def test_whitespace_only_difference(self):
+        lines = generated_source(200)
+        index = NormalizedLineIndex.build("\n".join(lines) + "\n")
+        old_str = "\n".join(line.replace("    ", "\t") for line in lines[100:105])
+
+        match = find_closest_match(index, old_str)
+
+        assert (match.start_line, match.end_line) == (101, 105)
+        assert match.whitespace_only
+
+    def test_changed_line_is_shown_in_diff(self):
+        lines = generated_source(200)
+        index = NormalizedLineIndex.build("\n".join(lines) + "\n")
+        block = lines[50:56]
+        old_str = "\n".join(block).replace("value_52 ", "value_52x ") + "\n"
+
+        match = find_closest_match(index, old_str, "gen.py")
+
+        assert (match.start_line, match.end_line) == (51, 56)
+        assert not match.whitespace_only
+        assert f"-{block[2].replace('value_52 ', 'value_52x ')}" in match.diff
+        assert f"+{block[2]}" in match.diff
+        assert "+++ gen.py lines 51-56" in match.diff
+
+    def test_single_line_typo(self):
+        """A one-line old_str with no verbatim line is found through its words."""
+        lines = generated_source(500)
+        index = NormalizedLineIndex.build("\n".join(lines))
+        wrong = lines[321].strip().replace("compute", "compte")
+
+        match = find_closest_match(index, wrong)
+
+        assert match.start_line == match.end_line == 322
+
+    def test_fragment_of_a_line(self):
+        index = NormalizedLineIndex.build("def  main(argv):\n    return 0\n")
+        match = find_closest_match(index, "def main(")
+        assert match.start_line == 1 and match.whitespace_only
+
+    def test_nothing_similar(self):
+        index = NormalizedLineIndex.build("alpha\nbeta\n")
+        assert find_closest_match(index, "completely unrelated text") is None
+        assert "no similar region was found" in describe_closest_match(None)
+
+
+class TestEditFileDiagnostics:
+    """Test the edit_file error message."""
+
+    def test_error_points_at_region(self, tmp_path):
+        target = tmp_path / "mod.py"
+        target.write_text("def f():\n    if x:\n        return 1\n    return 2\n")
+
+        result = edit_file_raw(str(target), "if x:\n    return 1", "if y:\n    return 1")
+
+        assert result.startswith("Error: Text not found exactly; lines 2-3 match apart from whitespace")
+        assert "read_file offset=2 limit=2" in result
+
+    def test_index_is_cached_per_version(self, tmp_path):
+        target = tmp_path / "mod.py"
+        target.write_text("a = 1\nb = 2\n")
+        cache = get_normalized_index_cache()
+        builds = cache.builds
+
+        edit_file_raw(str(target), "a = 10", "a = 3")
+        edit_file_raw(str(target), "b = 20", "b = 3")
+        assert cache.builds == builds + 1
+
+        edit_file_raw(str(target), "a = 1", "a = 3")
+        edit_file_raw(str(target), "b = 20", "b = 3")
+        assert cache.builds == builds + 2
+
+
+def previous_hint(content, old_str):
+    """The hint edit_file gave before closest-match diagnostics (for comparison)."""
+    lines = old_str.split("\n")
+    if len(lines) > 1:
+        found = [line.strip() for line in lines if line.strip() and line.strip() in content]
+        return f"Found: {found[:3]}" if found else "None of the lines exist in the file."
+    stripped = old_str.strip()
+    return f"around: '{stripped[:50]}...'" if stripped and stripped in content else "Text not found"
+
+
+class TestClosestMatchBenchmark:
+    """Diagnostics on 10k-line files: time and whether the answer locates the region."""
+
+    def test_10k_line_files(self, tmp_path):
+        lines = generated_source(10_000)
+        content = "\n".join(lines) + "\n"
+        cases = {
+            "re-indented block": "\n".join(line.replace("    ", "\t") for line in lines[6000:6012]),
+            "typo in one line": "\n".join(lines[7000:7012]).replace("value_7005 ", "value_7005_ "),
+            "60 lines, all rewritten": "\n".join(
+                line.replace("compute", "evaluate") for line in lines[3000:3060]
+            ),
+        }
+        expected = {"re-indented block": 6001, "typo in one line": 7001, "60 lines, all rewritten": 3001}
+
+        report = []
+        for label, old_str in cases.items():
+            start = time.perf_counter()
+            hint = previous_hint(content, old_str)
+            previous_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            index = NormalizedLineIndex.build(content)
+            build_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            match = find_closest_match(index, old_str)
+            match_ms = (time.perf_counter() - start) * 1000
+
+            assert match is not None and match.start_line == expected[label]
+            report.append(
+                f"{label}: previous hint {previous_ms:.1f}ms ({hint[:30]}), "
+                f"index build {build_ms:.1f}ms + match {match_ms:.1f}ms -> lines {match.start_line}-{match.end_line}"
+            )
+            assert match_ms < 500
+
+        print("\nClosest match on a 10k-line file:\n  " + "\n  ".join(report))
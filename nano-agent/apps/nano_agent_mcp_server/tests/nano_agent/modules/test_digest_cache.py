@@ -0,0 +1,157 @@
+"""
+Tests for the file digest cache and the file_digest tool.
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+from nano_agent.modules import digest_cache as digest_cache_module
+from nano_agent.modules.data_types import ReadFileRequest
+from nano_agent.modules.digest_cache import DigestCache, digest_bytes, get_digest_cache
+from nano_agent.modules.nano_agent_tools import (
+    _read_file_impl,
+    file_digest_raw,
+    get_file_info_raw,
+    read_file_raw,
+    write_file_raw,
+)
+
+
+class TestDigestCache:
+    """Test caching and invalidation of digests."""
+
+    def test_hashes_once_per_version(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text("one")
+        cache = DigestCache(workers=2)
+
+        with patch.object(digest_cache_module, "_hash_file", wraps=digest_cache_module._hash_file) as hashed:
+            first = cache.digest(target)
+            assert cache.digest(target) == first == digest_bytes(b"one")
+            assert hashed.call_count == 1
+
+            target.write_text("two")
+            os.utime(target, ns=(1, 1))
+            assert cache.digest(target) == digest_bytes(b"two")
+            assert hashed.call_count == 2
+
+    def test_digest_many_and_prefetch(self, tmp_path):
+        paths = [tmp_path / f"f{i}.txt" for i in range(20)]
+        for i, path in enumerate(paths):
+            path.write_text(f"content {i}")
+        cache = DigestCache(workers=4)
+
+        cache.prefetch(paths[0])
+        results = cache.digest_many(paths + [tmp_path / "missing", tmp_path])
+
+        assert [d for d, _ in results[:20]] == [digest_bytes(f"content {i}".encode()) for i in range(20)]
+        assert results[20] == (None, "not found") and results[21] == (None, "not a file")
+        assert cache.get_stats()["entries"] == 20
+
+    def test_put_records_written_content(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_bytes(b"written")
+        cache = DigestCache()
+
+        digest = cache.put(target, b"written")
+
+        with patch.object(digest_cache_module, "_hash_file") as hashed:
+            assert cache.digest(target) == digest
+        hashed.assert_not_called()
+
+    def test_lru_bound(self, tmp_path):
+        cache = DigestCache(max_entries=3)
+        for i in range(5):
+            path = tmp_path / f"f{i}"
+            path.write_text(str(i))
+            cache.digest(path)
+        assert cache.get_stats()["entries"] == 3
+
+
+class TestDigestTools:
+    """Test that tools report digests."""
+
+    def test_file_digest_tool(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        result = file_digest_raw([str(tmp_path / "a.txt"), str(tmp_path / "nope.txt")])
+        lines = result.splitlines()
+
+        assert lines[0] == f"{digest_bytes(b'a')}  {tmp_path / 'a.txt'}"
+        assert lines[1].startswith("-") and lines[1].endswith("nope.txt (not found)")
+        assert file_digest_raw([]) == "Error: Provide at least one path"
+
+    def test_digests_agree_across_tools(self, tmp_path):
+        target = tmp_path / "f.txt"
+        written = write_file_raw(str(target), "hello\n")
+        digest = digest_bytes(b"hello\n")
+
+        assert written.endswith(f"(digest {digest})")
+        assert json.loads(get_file_info_raw(str(target)))["digest"] == digest
+        assert _read_file_impl(ReadFileRequest(file_path=str(target))).digest == digest
+        assert file_digest_raw([str(target)]).split()[0] == digest
+
+    def test_read_prefetches_digest(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text("fresh content")
+        cache = get_digest_cache()
+        prefetched = cache.get_stats()["prefetched"]
+
+        read_file_raw(str(target))
+        read_file_raw(str(target))
+
+        # One background hash per version; digest() waits for it rather than hashing again
+        assert cache.get_stats()["prefetched"] == prefetched + 1
+        assert cache.digest(target) == digest_bytes(b"fresh content")
+
+    def test_info_never_hashes_inline(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text("cold")
+
+        cache = DigestCache()
+        pool = MagicMock()
+        with patch.object(digest_cache_module, "_cache", cache), patch.object(cache, "_get_executor", return_value=pool):
+            assert json.loads(get_file_info_raw(str(target)))["digest"] is None
+            assert _read_file_impl(ReadFileRequest(file_path=str(target))).digest is None
+            # The hash went to the pool (once), not inline
+            pool.submit.assert_called_once()
+
+            # Once the pool has hashed it, the digest is reported
+            pool.submit.call_args.args[0](*pool.submit.call_args.args[1:])
+            assert json.loads(get_file_info_raw(str(target)))["digest"] == digest_bytes(b"cold")
+
+
+class TestConditionalReads:
+    """Test read_file with if_none_match."""
+
+    def test_whole_file(self, tmp_path):
+        target = tmp_path / "f.txt"
+        written = write_file_raw(str(target), "v1\n")
+        digest = written.split("(digest ")[1].rstrip(")")
+
+        assert read_file_raw(str(target), if_none_match=digest) == (
+            f"Not modified: {target} is unchanged since the read with etag {digest}"
+        )
+
+        target.write_text("v2\n")
+        changed = read_file_raw(str(target), if_none_match=digest)
+        new_digest = digest_bytes(b"v2\n")
+        assert changed == f"v2\n\n[etag {new_digest}]"
+        assert read_file_raw(str(target), if_none_match=new_digest).startswith("Not modified")
+
+    def test_page(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+
+        page = read_file_raw(str(target), offset=10, limit=5)
+        etag = page.rsplit("[etag ", 1)[1].rstrip("]")
+        assert page.startswith("line 10\n")
+
+        again = read_file_raw(str(target), offset=10, limit=5, if_none_match=etag)
+        assert again.startswith("Not modified: lines 10-14 of") and "line 10" not in again
+
+        # Lines elsewhere in the file don't matter; the page's own lines do
+        target.write_text(target.read_text().replace("line 50\n", "line fifty\n"))
+        assert read_file_raw(str(target), offset=10, limit=5, if_none_match=etag).startswith("Not modified")
+        target.write_text(target.read_text().replace("line 12\n", "line twelve\n"))
+        assert "line twelve" in read_file_raw(str(target), offset=10, limit=5, if_none_match=etag)
@@ -0,0 +1,148 @@
+"""
+Tests for the process-wide file content cache.
+"""
+
+import os
+import sys
+
+import pytest
+
+from nano_agent.modules.constants import FILE_CACHE_MAX_BYTES
+from nano_agent.modules.file_cache import FileContentCache, get_file_cache, get_file_cache_max_bytes
+from nano_agent.modules.nano_agent_tools import edit_file_raw, read_file_raw, write_file_raw
+
+
+@pytest.fixture
+def cache():
+    """Cache large enough for the small test files."""
+    return FileContentCache(max_bytes=1024 * 1024)
+
+
+class TestFileContentCache:
+    """Test LRU behaviour and stat validation."""
+
+    def test_hit_after_miss(self, tmp_path, cache):
+        """The second read of an unchanged file is a hit."""
+        target = tmp_path / "a.txt"
+        target.write_text("hello")
+
+        text1, stat = cache.read_text(target)
+        text2, _ = cache.read_text(target)
+
+        assert text1 == text2 == "hello"
+        assert stat.st_size == 5
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    def test_modified_file_is_reread(self, tmp_path, cache):
+        """A new mtime or size invalidates the entry."""
+        target = tmp_path / "a.txt"
+        target.write_text("one")
+        cache.read_text(target)
+
+        target.write_text("two")
+        os.utime(target, ns=(1, 1))
+
+        assert cache.read_text(target)[0] == "two"
+        assert cache.get_stats()["stale"] == 1
+
+    def test_replaced_file_is_reread(self, tmp_path, cache):
+        """Atomic replacement changes the inode even if mtime and size match."""
+        target = tmp_path / "a.txt"
+        target.write_text("one")
+        cache.read_text(target)
+        stat = target.stat()
+
+        replacement = tmp_path / "b.txt"
+        replacement.write_text("two")
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, target)
+
+        assert cache.read_text(target)[0] == "two"
+
+    def test_evicts_least_recently_used_by_bytes(self, tmp_path):
+        """The byte ceiling evicts the coldest entries first."""
+        files = []
+        for name in "abc":
+            path = tmp_path / f"{name}.txt"
+            path.write_text(name * 1000)
+            files.append(path)
+        entry_cost = sys.getsizeof("a" * 1000)
+        cache = FileContentCache(max_bytes=entry_cost * 2)
+
+        cache.read_text(files[0])
+        cache.read_text(files[1])
+        cache.read_text(files[0])  # a is now most recently used
+        cache.read_text(files[2])  # evicts b
+
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["current_bytes"] <= cache.max_bytes
+        cache.read_text(files[0])
+        assert cache.get_stats()["hits"] == 2
+
+    def test_large_files_are_not_cached(self, tmp_path):
+        """Files above the per-entry limit are read but not kept."""
+        target = tmp_path / "big.txt"
+        target.write_text("x" * 5000)
+        cache = FileContentCache(max_bytes=100_000, max_entry_bytes=1000)
+
+        assert len(cache.read_text(target)[0]) == 5000
+        assert len(cache) == 0
+        assert cache.get_stats()["uncacheable"] == 1
+
+    def test_zero_ceiling_disables(self, tmp_path):
+        """A ceiling of 0 keeps nothing."""
+        target = tmp_path / "a.txt"
+        target.write_text("hello")
+        cache = FileContentCache(max_bytes=0)
+
+        cache.read_text(target)
+        assert len(cache) == 0
+
+    def test_ceiling_from_env(self, monkeypatch):
+        """NANO_AGENT_FILE_CACHE_MAX_BYTES overrides the default."""
+        monkeypatch.setenv("NANO_AGENT_FILE_CACHE_MAX_BYTES", "2048")
+        assert get_file_cache_max_bytes() == 2048
+        monkeypatch.setenv("NANO_AGENT_FILE_CACHE_MAX_BYTES", "lots")
+        assert get_file_cache_max_bytes() == FILE_CACHE_MAX_BYTES
+
+    def test_decode_errors_propagate(self, tmp_path, cache):
+        """Undecodable files raise like a normal read and are not cached."""
+        target = tmp_path / "bin.dat"
+        target.write_bytes(b"\xff\xfe\x00bad")
+
+        with pytest.raises(UnicodeDecodeError):
+            cache.read_text(target)
+        assert len(cache) == 0
+
+
+class TestToolsUseSharedCache:
+    """Test that the raw tools go through the process-wide cache."""
+
+    def test_read_and_edit_share_entries(self, tmp_path):
+        """An edit stores the new text, so the following read is a hit."""
+        target = tmp_path / "main.dart"
+        target.write_text("void main() { print('hi'); }")
+        cache = get_file_cache()
+        cache.invalidate()
+
+        read_file_raw(str(target))
+        hits_before = cache.get_stats()["hits"]
+        assert edit_file_raw(str(target), "'hi'", "'hello'") == "updated"
+        content = read_file_raw(str(target))
+
+        assert content == "void main() { print('hello'); }"
+        assert cache.get_stats()["hits"] >= hits_before + 2
+
+    def test_written_newlines_match_a_fresh_read(self, tmp_path):
+        """Text cached by a write reads back the same as after eviction."""
+        target = tmp_path / "w.txt"
+        cache = get_file_cache()
+
+        write_file_raw(str(target), "a\r\nb\rc\n")
+        cached = read_file_raw(str(target))
+        cache.invalidate(target)
+
+        assert cached == read_file_raw(str(target)) == "a\nb\nc\n"
+        assert target.read_bytes() == b"a\r\nb\rc\n"
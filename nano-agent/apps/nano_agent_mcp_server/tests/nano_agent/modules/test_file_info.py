@@ -0,0 +1,105 @@
+"""
+Tests for single-stat file metadata and the get_files_info tool.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from nano_agent.modules import nano_agent_tools
+from nano_agent.modules.file_info import KIND_DIR, KIND_FILE, stat_info, stat_many
+from nano_agent.modules.nano_agent_tools import get_file_info_raw, get_files_info_raw
+
+
+class StatCounter:
+    """Counts stat-family syscalls made through the os module by the calling thread."""
+
+    NAMES = ("stat", "lstat", "fstat", "access")
+
+    def __init__(self):
+        self.calls = 0
+        self._thread = threading.get_ident()
+
+    def __enter__(self):
+        self._patches = []
+        for name in self.NAMES:
+            real = getattr(os, name)
+
+            def counted(*args, _real=real, **kwargs):
+                # The digest pool hashes in the background; its fstat isn't the call's
+                if threading.get_ident() == self._thread:
+                    self.calls += 1
+                return _real(*args, **kwargs)
+
+            self._patches.append(patch.object(os, name, counted))
+        for p in self._patches:
+            p.start()
+        return self
+
+    def __exit__(self, *exc):
+        for p in self._patches:
+            p.stop()
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a.py").write_text("print(1)\n")
+    (tmp_path / "pkg").mkdir()
+    return tmp_path
+
+
+class TestStatInfo:
+    """Test the one-stat metadata helpers."""
+
+    def test_kinds_and_errors(self, tree):
+        assert stat_info(tree / "a.py").kind == KIND_FILE
+        assert stat_info(tree / "pkg").kind == KIND_DIR
+        with pytest.raises(FileNotFoundError):
+            stat_info(tree / "missing")
+
+        infos = stat_many([tree / "a.py", tree / "missing"])
+        assert infos[0].size == 9 and infos[0].error is None
+        assert infos[1].error == "not found"
+
+
+class TestFileInfoTools:
+    """Test get_file_info and get_files_info bodies."""
+
+    def test_get_file_info(self, tree):
+        info = json.loads(get_file_info_raw(str(tree / "a.py")))
+        assert (info["is_file"], info["is_directory"], info["size_bytes"], info["extension"]) == (True, False, 9, ".py")
+
+        info = json.loads(get_file_info_raw(str(tree / "pkg")))
+        assert (info["is_file"], info["is_directory"], info["size_bytes"]) == (False, True, None)
+
+        assert get_file_info_raw(str(tree / "missing")).startswith("Error: File not found")
+
+    def test_get_files_info_table(self, tree):
+        result = get_files_info_raw([str(tree / "a.py"), str(tree / "pkg"), str(tree / "missing"), str(tree / "a.py")])
+        lines = result.splitlines()
+
+        assert lines[0] == "3 paths (1 files, 1 directories, 1 not found or unreadable)"
+        assert lines[1].split() == ["type", "size", "modified", "path"]
+        assert lines[2].split()[:2] == ["file", "9"] and lines[2].endswith("a.py")
+        assert lines[3].split()[:2] == ["dir", "-"] and lines[3].endswith("pkg/")
+        assert lines[4].endswith("missing (not found)")
+        assert get_files_info_raw([]) == "Error: Provide at least one path"
+
+    def test_one_stat_per_path(self, tree):
+        """Benchmark: stat syscalls per described path, path resolution aside."""
+        paths = [tree / f"f{i}.txt" for i in range(100)]
+        for path in paths:
+            path.write_text("x")
+
+        with patch.object(nano_agent_tools, "resolve_path", Path):
+            with StatCounter() as single:
+                get_file_info_raw(str(paths[0]))
+            with StatCounter() as batch:
+                get_files_info_raw([str(p) for p in paths])
+
+        assert single.calls == 1
+        assert batch.calls == len(paths)
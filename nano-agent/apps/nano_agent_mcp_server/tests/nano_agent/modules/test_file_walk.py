@@ -0,0 +1,219 @@
+"""
+Tests for scandir tree walks and the find_files tool.
+"""
+
+import os
+import re
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from nano_agent.modules.file_walk import find_paths, iter_directory, list_directory_page
+from nano_agent.modules.nano_agent_tools import find_files_raw, list_directory_raw
+
+
+def make_tree(root, paths):
+    """Create empty-ish files for a list of relative paths."""
+    for relative in paths:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(relative)
+
+
+class TestFindPaths:
+    """Test glob matching, depth limits and pruning."""
+
+    def test_name_and_path_patterns(self, tmp_path):
+        """Patterns without '/' match names anywhere; with '/' they match relative paths."""
+        make_tree(tmp_path, ["a.py", "pkg/b.py", "pkg/sub/c.py", "pkg/readme.md"])
+
+        by_name = find_paths(str(tmp_path), "*.py")
+        by_path = find_paths(str(tmp_path), "pkg/*.py")
+        recursive = find_paths(str(tmp_path), "pkg/**/*.py")
+
+        assert [p.relative_path for p in by_name.paths] == ["a.py", "pkg/b.py", "pkg/sub/c.py"]
+        assert [p.relative_path for p in by_path.paths] == ["pkg/b.py"]
+        assert [p.relative_path for p in recursive.paths] == ["pkg/b.py", "pkg/sub/c.py"]
+
+    def test_depth_and_dirs(self, tmp_path):
+        """max_depth bounds the walk and directories can be listed."""
+        make_tree(tmp_path, ["a/b/c/deep.txt", "a/top.txt"])
+
+        results = find_paths(str(tmp_path), "*", max_depth=2, include_dirs=True)
+
+        assert [(p.relative_path, p.is_dir) for p in results.paths] == [
+            ("a", True), ("a/b", True), ("a/top.txt", False)
+        ]
+        assert results.paths[2].size == len("a/top.txt")
+
+    def test_gitignore_prunes(self, tmp_path):
+        """Ignored directories are not entered at all."""
+        (tmp_path / ".gitignore").write_text("build/\n*.log\n")
+        make_tree(tmp_path, [
+            "src/main.dart", "build/out.dart", ".dart_tool/cache.dart",
+            "node_modules/x/index.js", ".git/HEAD", "debug.log",
+        ])
+
+        results = find_paths(str(tmp_path), "*")
+        everything = find_paths(str(tmp_path), "*", respect_gitignore=False)
+
+        assert [p.relative_path for p in results.paths] == [".gitignore", "src/main.dart"]
+        assert results.directories_walked == 2
+        assert len(everything.paths) == 7
+
+    def test_max_results(self, tmp_path):
+        """Results stop at the cap and report truncation."""
+        make_tree(tmp_path, [f"f{i}.txt" for i in range(10)])
+        results = find_paths(str(tmp_path), "*.txt", max_results=4)
+        assert len(results.paths) == 4 and results.truncated
+
+    def test_symlinked_dirs_not_followed(self, tmp_path):
+        """A symlink loop doesn't hang the walk."""
+        make_tree(tmp_path, ["a/file.txt"])
+        os.symlink(tmp_path, tmp_path / "a" / "loop")
+        results = find_paths(str(tmp_path), "*.txt")
+        assert [p.relative_path for p in results.paths] == ["a/file.txt"]
+
+
+class TestFindFilesTool:
+    """Test the find_files tool body."""
+
+    def test_output(self, tmp_path, monkeypatch):
+        """Paths are shown relative to the cwd with sizes."""
+        monkeypatch.chdir(tmp_path)
+        make_tree(tmp_path, ["lib/main.dart", "lib/src/app.dart", "test/app_test.dart"])
+
+        result = find_files_raw("*.dart", directory_path="lib")
+
+        assert result.splitlines() == [
+            "Found 2 paths matching '*.dart' under lib",
+            f"{os.path.join('lib', 'main.dart')} (13 bytes)",
+            f"{os.path.join('lib', 'src', 'app.dart')} (16 bytes)",
+        ]
+
+    def test_errors_and_caps(self, tmp_path, monkeypatch):
+        """Bad arguments are reported and caps are explained."""
+        monkeypatch.chdir(tmp_path)
+        make_tree(tmp_path, [f"f{i}.txt" for i in range(5)])
+
+        assert find_files_raw(directory_path="missing").startswith("Error: Directory not found")
+        assert find_files_raw(max_depth=0).startswith("Error")
+        assert "stopped at 2" in find_files_raw("*.txt", max_results=2)
+        assert find_files_raw("*.nope").startswith("No paths matching")
+
+
+class TestListDirectoryPage:
+    """Test paginated single-directory listings."""
+
+    def test_pages_cover_directory_once(self, tmp_path):
+        """Following tokens visits every entry exactly once, in order."""
+        for i in range(25):
+            (tmp_path / f"f{i:02d}.txt").write_text("x" * i)
+        (tmp_path / "sub").mkdir()
+
+        names, token, pages = [], None, 0
+        while True:
+            page = list_directory_page(str(tmp_path), limit=10, page_token=token)
+            names.extend(e.name for e in page.entries)
+            pages += 1
+            token = page.next_token
+            if token is None:
+                break
+
+        assert pages == 3
+        assert names == sorted(os.listdir(tmp_path))
+        assert page.summary.files == 25 and page.summary.directories == 1
+        assert page.summary.total_bytes == sum(range(25))
+
+    @pytest.mark.parametrize("sort", ["size", "mtime"])
+    def test_sort_modes(self, tmp_path, sort):
+        """Size and mtime listings put the largest / newest entries first."""
+        for i in range(6):
+            path = tmp_path / f"f{i}.txt"
+            path.write_text("x" * i)
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+
+        first = list_directory_page(str(tmp_path), sort=sort, limit=4)
+        second = list_directory_page(str(tmp_path), sort=sort, limit=4, page_token=first.next_token)
+
+        assert [e.name for e in first.entries + second.entries] == [f"f{i}.txt" for i in range(5, -1, -1)]
+        assert second.start_index == 4 and second.next_token is None
+
+    def test_token_validation(self, tmp_path):
+        """Tokens are tied to their directory and sort mode."""
+        for i in range(3):
+            (tmp_path / f"f{i}").write_text("")
+        other = tmp_path / "other"
+        other.mkdir()
+        token = list_directory_page(str(tmp_path), limit=1).next_token
+
+        with pytest.raises(ValueError, match="sort"):
+            list_directory_page(str(tmp_path), sort="size", page_token=token)
+        with pytest.raises(ValueError, match="different directory"):
+            list_directory_page(str(other), page_token=token)
+        with pytest.raises(ValueError, match="malformed"):
+            list_directory_page(str(tmp_path), page_token="not-a-token")
+
+    def test_tool_output(self, tmp_path):
+        """The tool shows the summary header, the page range and the next token."""
+        for i in range(5):
+            (tmp_path / f"f{i}.txt").write_text("ab")
+
+        first = list_directory_raw(str(tmp_path), limit=2)
+        token = re.search(r"page_token='([^']+)'", first).group(1)
+        last = list_directory_raw(str(tmp_path), limit=2, page_token=token)
+
+        assert "Total items: 5 (0 directories, 5 files, 10 bytes)" in first
+        assert "Showing items 1-2 sorted by name" in first
+        assert "Showing items 3-4 sorted by name" in last
+        assert list_directory_raw(str(tmp_path), sort="color").startswith("Error: sort must be one of")
+        assert list_directory_raw(str(tmp_path), page_token="junk").startswith("Error: malformed page_token")
+
+    def test_page_memory_stays_flat(self, tmp_path):
+        """A page holds `limit` entries, not the whole directory."""
+        big = tmp_path / "assets"
+        big.mkdir()
+        for i in range(20000):
+            (big / f"asset_{i:05d}.png").touch()
+
+        tracemalloc.start()
+        list(iter_directory(str(big)))
+        _, materialized_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        page = list_directory_page(str(big), limit=100)
+        _, page_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"\nListing 20000 entries: materialized peak={materialized_peak / 1024:.0f}KiB "
+              f"page of 100 peak={page_peak / 1024:.0f}KiB")
+
+        assert page.summary.files == 20000 and len(page.entries) == 100
+        assert page_peak < materialized_peak / 5
+
+
+class TestFindBenchmark:
+    """Pruned scandir walk vs Path.rglob over a tree with a large ignored directory."""
+
+    def test_pruned_walk_faster_than_rglob(self, tmp_path):
+        """Skipping node_modules and build outputs beats walking them."""
+        make_tree(tmp_path, [f"lib/src/m{i}/file{i}.dart" for i in range(200)])
+        make_tree(tmp_path, [f"node_modules/p{i // 20}/lib/f{i}.js" for i in range(3000)])
+        make_tree(tmp_path, [f"build/gen/{i}/out.dart" for i in range(1000)])
+        (tmp_path / ".gitignore").write_text("build/\n")
+
+        start = time.perf_counter()
+        naive = [p for p in Path(tmp_path).rglob("*.dart") if p.is_file()]
+        rglob_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = find_paths(str(tmp_path), "*.dart")
+        walk_seconds = time.perf_counter() - start
+
+        print(f"\nFind *.dart: rglob={rglob_seconds * 1000:.1f}ms ({len(naive)} paths) "
+              f"pruned scandir={walk_seconds * 1000:.1f}ms ({len(results.paths)} paths, "
+              f"{results.directories_walked} dirs walked)")
+
+        assert len(results.paths) == 200
+        assert walk_seconds < rglob_seconds
@@ -7,12 +7,16 @@ import os
 from pathlib import Path
 import tempfile
 
+from unittest.mock import patch
+
 from nano_agent.modules.files import (
+    Workspace,
     resolve_path,
     get_working_directory,
     is_path_safe,
     format_path_for_display,
-    ensure_parent_exists
+    ensure_parent_exists,
+    workspace_scope
 )
 
 
@@ -248,4 +252,67 @@ class TestIntegration:
         assert "path" in info
         assert "absolute_path" in info
         assert info["path"] == "info_test.txt"  # Relative display
-        assert Path(info["absolute_path"]).is_absolute()  # Absolute path
\ No newline at end of file
+        assert Path(info["absolute_path"]).is_absolute()  # Absolute path
+
+
+class TestWorkspace:
+    """Test the run-scoped workspace root."""
+    
+    @pytest.fixture
+    def tree(self, tmp_path):
+        (tmp_path / "real" / "deep").mkdir(parents=True)
+        (tmp_path / "real" / "deep" / "f.txt").write_text("x")
+        (tmp_path / "link").symlink_to(tmp_path / "real")
+        (tmp_path / "file_link").symlink_to(tmp_path / "real" / "deep" / "f.txt")
+        return tmp_path
+    
+    def test_resolves_like_path_resolve(self, tree):
+        workspace = Workspace(tree)
+        cases = [
+            "real/deep/f.txt", "link/deep/f.txt", "link/../real", "link/deep/../deep/./f.txt",
+            "file_link", "link/deep/missing.txt", "new/dir/file.txt", ".", "..", "link/",
+            str(tree / "link" / "deep"),
+        ]
+        for case in cases:
+            assert workspace.resolve(case) == (tree / case).resolve(), case
+    
+    def test_directory_resolutions_are_memoized(self, tree):
+        workspace = Workspace(tree)
+        workspace.resolve("link/deep/f.txt")
+        
+        lstats = []
+        real_lstat = os.lstat
+        with patch.object(os, "lstat", side_effect=lambda p, *a, **k: lstats.append(p) or real_lstat(p, *a, **k)):
+            for _ in range(10):
+                workspace.resolve("link/deep/f.txt")
+        
+        # One lstat of the last component per call, none for the directories
+        assert len(lstats) == 10
+        assert workspace.dir_hits == 10
+    
+    def test_containment_display_and_confinement(self, tree):
+        workspace = Workspace(tree / "link", confine=True)
+        
+        assert workspace.contains(str(tree / "real" / "deep"))
+        assert not workspace.contains(str(tree / "realm"))
+        assert workspace.display(tree / "real" / "deep" / "f.txt") == "deep/f.txt"
+        assert workspace.display(tree / "real") == "./"
+        # Judged by where a path resolves to, not how it is spelled
+        assert workspace.resolve("../file_link") == tree / "real" / "deep" / "f.txt"
+        with pytest.raises(PermissionError):
+            workspace.resolve(str(tree / "outside.txt"))
+    
+    def test_scope_is_captured_once(self, tree):
+        from nano_agent.modules.nano_agent_tools import get_file_info_raw, read_file_raw
+        import json
+        
+        original_cwd = os.getcwd()
+        try:
+            with workspace_scope(Workspace(tree / "real")):
+                os.chdir(tree)
+                assert get_working_directory() == tree / "real"
+                assert read_file_raw("deep/f.txt") == "x"
+                assert json.loads(get_file_info_raw("deep/f.txt"))["path"] == "deep/f.txt"
+        finally:
+            os.chdir(original_cwd)
+        assert get_working_directory() == Path.cwd()
@@ -0,0 +1,104 @@
+"""
+Tests for compiled .gitignore matching.
+"""
+
+import pytest
+
+from nano_agent.modules.gitignore import (
+    GitIgnoreMatcher,
+    compile_glob,
+    match_rules,
+    parse_ignore_lines,
+)
+
+
+class TestGlob:
+    """Test glob translation."""
+
+    @pytest.mark.parametrize("pattern,path,expected", [
+        ("*.py", "a.py", True),
+        ("*.py", "dir/a.py", False),
+        ("**/*.py", "a.py", True),
+        ("**/*.py", "x/y/a.py", True),
+        ("src/**", "src/a/b.txt", True),
+        ("a/**/b", "a/b", True),
+        ("a/**/b", "a/x/y/b", True),
+        ("file?.txt", "file1.txt", True),
+        ("file?.txt", "file/.txt", False),
+        ("[!a]*.txt", "b.txt", True),
+        ("[!a]*.txt", "a.txt", False),
+        ("\\*.txt", "*.txt", True),
+        ("\\*.txt", "a.txt", False),
+    ])
+    def test_matches(self, pattern, path, expected):
+        """'*' stays within a directory, '**' crosses them."""
+        assert bool(compile_glob(pattern).match(path)) is expected
+
+
+class TestIgnoreRules:
+    """Test gitignore line semantics."""
+
+    def test_rules(self):
+        """Anchoring, directory-only patterns, negation and comments."""
+        rules = parse_ignore_lines([
+            "# comment",
+            "",
+            "*.log",
+            "!keep.log",
+            "build/",
+            "/top.txt",
+            "docs/*.md",
+            "\\#literal",
+        ])
+
+        assert match_rules(rules, "a/b/debug.log", False) is True
+        assert match_rules(rules, "keep.log", False) is False
+        assert match_rules(rules, "x/build", True) is True
+        assert match_rules(rules, "x/build", False) is None
+        assert match_rules(rules, "top.txt", False) is True
+        assert match_rules(rules, "sub/top.txt", False) is None
+        assert match_rules(rules, "docs/a.md", False) is True
+        assert match_rules(rules, "x/docs/a.md", False) is None
+        assert match_rules(rules, "#literal", False) is True
+
+
+class TestGitIgnoreMatcher:
+    """Test matchers built from a directory tree."""
+
+    def test_nested_files_and_defaults(self, tmp_path):
+        """Deeper .gitignore files override shallower ones; defaults can be re-included."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("*.tmp\nout/\n")
+        sub = tmp_path / "sub"
+        sub.mkdir()
+        (sub / ".gitignore").write_text("!special.tmp\n!node_modules/\n")
+
+        root = GitIgnoreMatcher.for_directory(str(sub))
+        child = root.child(str(sub / "pkg"))
+
+        assert root.is_ignored(str(sub / "a.tmp"), False)
+        assert not root.is_ignored(str(sub / "special.tmp"), False)
+        assert root.is_ignored(str(sub / "out"), True)
+        assert not root.is_ignored(str(sub / "node_modules"), True)
+        assert child.is_ignored(str(sub / "pkg" / ".git"), True)
+        assert not child.is_ignored(str(sub / "pkg" / "main.py"), False)
+
+    def test_outside_repository(self, tmp_path):
+        """Without a .git, only the directory's own rules and the defaults apply."""
+        (tmp_path / ".gitignore").write_text("*.bak\n")
+        matcher = GitIgnoreMatcher.for_directory(str(tmp_path))
+
+        assert matcher.is_ignored(str(tmp_path / "x.bak"), False)
+        assert matcher.is_ignored(str(tmp_path / "__pycache__"), True)
+        assert not matcher.is_ignored(str(tmp_path / "x.py"), False)
+
+    def test_recompiled_after_change(self, tmp_path):
+        """Edited .gitignore files are picked up on the next walk."""
+        gitignore = tmp_path / ".gitignore"
+        gitignore.write_text("*.a\n")
+        assert GitIgnoreMatcher.for_directory(str(tmp_path)).is_ignored(str(tmp_path / "x.a"), False)
+
+        gitignore.write_text("*.b\n")
+        matcher = GitIgnoreMatcher.for_directory(str(tmp_path))
+        assert not matcher.is_ignored(str(tmp_path / "x.a"), False)
+        assert matcher.is_ignored(str(tmp_path / "x.b"), False)
@@ -0,0 +1,130 @@
+"""
+Tests for line-range edits and the replace_lines tool.
+"""
+
+import os
+
+from nano_agent.modules.constants import LINE_INDEX_MIN_BYTES
+from nano_agent.modules.line_edit import range_hash, replace_line_range
+from nano_agent.modules.line_index import get_line_index_cache
+from nano_agent.modules.nano_agent_tools import read_file_raw, replace_lines_raw
+
+
+def numbered(count, start=1, ending="\n"):
+    return "".join(f"line {i}{ending}" for i in range(start, start + count))
+
+
+class TestReplaceLineRange:
+    """Test splicing by line number."""
+
+    def test_replace_insert_delete(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text(numbered(5))
+
+        splice, error = replace_line_range(target, 2, 3, "two\nthree\nthree and a half")
+        assert error is None
+        assert target.read_text() == "line 1\ntwo\nthree\nthree and a half\nline 4\nline 5\n"
+        assert (splice.new_end_line, splice.total_lines) == (4, 6)
+        assert splice.old_hash == range_hash(b"line 2\nline 3\n")
+
+        replace_line_range(target, 1, 0, "header")
+        assert target.read_text().startswith("header\nline 1\n")
+
+        splice, _ = replace_line_range(target, 2, 5, "")
+        assert target.read_text() == "header\nline 4\nline 5\n"
+        assert (splice.new_end_line, splice.total_lines) == (1, 3)
+
+    def test_append_and_unterminated_last_line(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text("a\nb")
+
+        replace_line_range(target, 2, 2, "B")
+        assert target.read_bytes() == b"a\nB"
+
+        replace_line_range(target, 3, 2, "c")
+        assert target.read_bytes() == b"a\nB\nc"
+
+    def test_keeps_crlf_and_mode(self, tmp_path):
+        target = tmp_path / "win.txt"
+        target.write_bytes(b"one\r\ntwo\r\nthree\r\n")
+        os.chmod(target, 0o640)
+
+        replace_line_range(target, 2, 2, "deux\nzwei")
+
+        assert target.read_bytes() == b"one\r\ndeux\r\nzwei\r\nthree\r\n"
+        assert (target.stat().st_mode & 0o777) == 0o640
+
+    def test_stale_hash_is_rejected(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text(numbered(5))
+        expected = range_hash(b"line 3\n")
+        target.write_text(numbered(5).replace("line 3", "LINE 3"))
+
+        splice, error = replace_line_range(target, 3, 3, "mine", expected_hash=expected)
+
+        assert splice is None
+        assert f"expected {expected}" in error and "Current lines:\nLINE 3" in error
+        assert "LINE 3" in target.read_text()
+
+    def test_range_errors(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text(numbered(3))
+        assert replace_line_range(target, 5, 5, "x")[1] == "start_line must be between 1 and 4 (the file has 3 lines)"
+        assert replace_line_range(target, 2, 4, "x")[1] == "end_line must be between 1 (insert only) and 3"
+
+    def test_large_file_uses_cached_line_index(self, tmp_path):
+        """Files paged through the mmap index are edited through the same index."""
+        target = tmp_path / "big.txt"
+        lines = LINE_INDEX_MIN_BYTES // 10 + 1000
+        target.write_text(numbered(lines))
+        cache = get_line_index_cache()
+
+        read_file_raw(str(target), offset=50_000, limit=1)
+        builds = cache.builds
+        splice, error = replace_line_range(target, 50_000, 50_001, "replaced\n")
+
+        assert error is None and cache.builds == builds
+        assert read_file_raw(str(target), offset=49_999, limit=3).splitlines()[:3] == [
+            "line 49999", "replaced", "line 50002"
+        ]
+        assert splice.total_lines == lines - 1
+
+
+class TestReplaceLinesTool:
+    """Test the replace_lines tool body."""
+
+    def test_chained_edits_with_hash(self, tmp_path):
+        target = tmp_path / "f.txt"
+        target.write_text(numbered(4))
+
+        first = replace_lines_raw(str(target), 2, 2, "second")
+        old_hash, new_hash = range_hash(b"line 2\n"), range_hash(b"second\n")
+        assert first == (f"Replaced lines 2-2 (hash {old_hash}) of {target}; "
+                         f"new text is lines 2-2 (hash {new_hash}). The file has 4 lines.")
+
+        second = replace_lines_raw(str(target), 2, 2, "2nd", expected_hash=new_hash)
+        assert second.startswith("Replaced lines 2-2")
+        stale = replace_lines_raw(str(target), 2, 2, "again", expected_hash=new_hash)
+        assert stale.startswith("Error: Lines 2-2 changed since they were read")
+        assert stale.endswith("No changes were made.")
+
+    def test_read_page_etag_guards_edit(self, tmp_path):
+        """A ranged read's etag is the hash replace_lines expects, CRLF and large files included."""
+        small = tmp_path / "small.txt"
+        small.write_bytes(numbered(20, ending="\r\n").encode())
+        large = tmp_path / "large.txt"
+        large.write_text(numbered(LINE_INDEX_MIN_BYTES // 8))
+
+        for target in (small, large):
+            page = read_file_raw(str(target), offset=5, limit=3)
+            etag = page.rsplit("[etag ", 1)[1].rstrip("]")
+            assert replace_lines_raw(str(target), 5, 7, "five", expected_hash=etag).startswith("Replaced lines 5-7")
+
+            page = read_file_raw(str(target), offset=8, limit=2)
+            etag = page.rsplit("[etag ", 1)[1].rstrip("]")
+            replace_lines_raw(str(target), 9, 9, "someone else's change")
+            stale = replace_lines_raw(str(target), 8, 9, "mine", expected_hash=etag)
+            assert stale.startswith("Error: Lines 8-9 changed since they were read")
+
+    def test_missing_file(self, tmp_path):
+        assert replace_lines_raw(str(tmp_path / "nope"), 1, 1, "x").startswith("Error: File not found")
@@ -0,0 +1,197 @@
+"""
+Tests for ranged reads and the mmap line index.
+"""
+
+import os
+import re
+import time
+
+import pytest
+
+from nano_agent.modules import line_index
+from nano_agent.modules.constants import LINE_INDEX_MIN_BYTES, READ_FILE_MAX_LINES
+from nano_agent.modules.line_index import LineIndex, LineIndexCache, read_line_range
+from nano_agent.modules.nano_agent_tools import read_file_raw
+
+
+def write_lines(path, count, width=20, newline="\n"):
+    """Write numbered lines and return them (without line endings)."""
+    lines = [f"line {i:08d} ".ljust(width, "x") for i in range(1, count + 1)]
+    with open(path, "w", newline="") as f:
+        f.write(newline.join(lines) + newline)
+    return lines
+
+
+@pytest.fixture
+def big_file(tmp_path):
+    """File above the mmap threshold."""
+    path = tmp_path / "big.log"
+    count = LINE_INDEX_MIN_BYTES // 20 * 2
+    lines = write_lines(path, count)
+    return path, lines
+
+
+@pytest.fixture
+def fresh_index_cache(monkeypatch):
+    """Isolated line index cache."""
+    cache = LineIndexCache()
+    monkeypatch.setattr(line_index, "_line_indexes", cache)
+    return cache
+
+
+class TestLineIndex:
+    """Test the block line index."""
+
+    @pytest.mark.parametrize("content", [b"", b"a", b"a\n", b"a\nb", b"\n\n\n", b"one\ntwo\nthree\n"])
+    def test_line_starts_match_naive(self, content):
+        """Line starts agree with splitlines for edge cases."""
+        index = LineIndex.build(content, len(content), block_size=2)
+        lines = content.splitlines(keepends=True)
+
+        assert index.total_lines == len(lines)
+        offset = 0
+        for number, line in enumerate(lines):
+            assert index.line_start(content, number) == offset
+            offset += len(line)
+        assert index.line_start(content, len(lines)) == len(content)
+
+
+class TestReadLineRange:
+    """Test range reads on small and mmap-backed files."""
+
+    def test_small_file_range(self, tmp_path):
+        """Ranges of small files come from the content cache."""
+        path = tmp_path / "small.txt"
+        lines = write_lines(path, 10)
+
+        page = read_line_range(path, offset=3, limit=2)
+
+        assert page.text == "\n".join(lines[2:4]) + "\n"
+        assert (page.start_line, page.end_line, page.total_lines) == (3, 4, 10)
+        assert page.has_more
+
+    def test_large_file_range_uses_cached_index(self, big_file, fresh_index_cache):
+        """Large files are served through mmap with one index build per version."""
+        path, lines = big_file
+        middle = len(lines) // 2
+
+        page = read_line_range(path, offset=middle, limit=3)
+        again = read_line_range(path, offset=len(lines) - 1, limit=10)
+
+        assert page.text == "\n".join(lines[middle - 1:middle + 2]) + "\n"
+        assert again.text == "\n".join(lines[-2:]) + "\n"
+        assert not again.has_more
+        assert fresh_index_cache.get_stats() == {"hits": 1, "builds": 1, "entries": 1}
+
+    def test_index_rebuilt_after_change(self, big_file, fresh_index_cache):
+        """A new file version gets a new index."""
+        path, _ = big_file
+        read_line_range(path, offset=1, limit=1)
+        with open(path, "a") as f:
+            f.write("appended\n")
+
+        page = read_line_range(path, offset=1, limit=1)
+        last = read_line_range(path, offset=page.total_lines, limit=1)
+
+        assert last.text == "appended\n"
+        assert fresh_index_cache.builds == 2
+
+    def test_crlf_and_max_bytes(self, tmp_path):
+        """CRLF is translated and max_bytes stops at a line boundary."""
+        path = tmp_path / "win.txt"
+        write_lines(path, 5, width=14, newline="\r\n")
+
+        page = read_line_range(path, offset=1, max_bytes=33)
+
+        assert page.text.count("\n") == 2
+        assert "\r" not in page.text
+        assert page.end_line == 2
+
+    def test_single_long_line_is_cut(self, tmp_path):
+        """A line longer than max_bytes returns its head without splitting a character."""
+        path = tmp_path / "long.txt"
+        path.write_text("é" * 100)
+
+        page = read_line_range(path, offset=1, max_bytes=11)
+
+        assert page.text == "é" * 5
+        assert page.truncated_line and page.has_more
+        assert page.line_bytes == 200
+
+
+class TestReadFileTool:
+    """Test paging through read_file_raw."""
+
+    def test_small_unranged_read_unchanged(self, tmp_path):
+        """Small files are still returned whole with no footer."""
+        path = tmp_path / "a.txt"
+        path.write_text("hello\nworld\n")
+        assert read_file_raw(str(path)) == "hello\nworld\n"
+
+    def test_ranged_read_has_continuation_footer(self, tmp_path):
+        """Partial reads tell the agent where to continue."""
+        path = tmp_path / "a.txt"
+        lines = write_lines(path, 50)
+
+        result = read_file_raw(str(path), offset=10, limit=5)
+
+        assert result.startswith("\n".join(lines[9:14]) + "\n")
+        assert "lines 10-14 of 50" in result
+        assert "offset=15" in result
+
+    def test_cut_line_footer_makes_progress(self, tmp_path):
+        """Following the footer of a cut line reads it whole instead of cutting it again."""
+        path = tmp_path / "wide.txt"
+        path.write_text("short\n" + "x" * 500 + "\nend\n")
+
+        page = read_file_raw(str(path), offset=2, max_bytes=100)
+        assert page.startswith("x" * 100 + "\n[Showing the first 100 bytes of line 2 of 3, which is 501 bytes long.")
+        call = re.search(r"read_file\('[^']+', offset=(\d+), max_bytes=(\d+)\)", page)
+        offset, max_bytes = int(call.group(1)), int(call.group(2))
+
+        whole = read_file_raw(str(path), offset=offset, max_bytes=max_bytes)
+        assert whole.startswith("x" * 500 + "\n\n[Showing lines 2-2 of 3. Call read_file(")
+
+    def test_large_unranged_read_is_paged(self, big_file):
+        """Huge files are not dumped into the model context in one go."""
+        path, lines = big_file
+        result = read_file_raw(str(path))
+
+        assert result.startswith(lines[0])
+        assert f"lines 1-{READ_FILE_MAX_LINES} of {len(lines)}" in result
+
+    def test_offset_past_end(self, tmp_path):
+        """Reading past the end reports an error."""
+        path = tmp_path / "a.txt"
+        write_lines(path, 3)
+        assert read_file_raw(str(path), offset=10).startswith("Error: offset 10 is past the end")
+
+
+class TestRangeReadBenchmark:
+    """Range reads cost O(range) once the index exists."""
+
+    def test_range_read_faster_than_full_read(self, tmp_path, fresh_index_cache):
+        """Reading 100 lines near the end beats reading the whole file."""
+        path = tmp_path / "huge.log"
+        lines = write_lines(path, 1_000_000, width=40)
+        target = len(lines) - 1000
+
+        start = time.perf_counter()
+        read_line_range(path, offset=target, limit=100)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        page = read_line_range(path, offset=target, limit=100)
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(path) as f:
+            full = f.read().splitlines()[target - 1:target + 99]
+        naive = time.perf_counter() - start
+
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"\nLines {target}-{target + 99} of a {size_mb:.0f}MB file: "
+              f"index build+read={cold * 1000:.1f}ms warm={warm * 1000:.2f}ms full read={naive * 1000:.1f}ms")
+
+        assert page.text.splitlines() == full
+        assert warm < naive / 10
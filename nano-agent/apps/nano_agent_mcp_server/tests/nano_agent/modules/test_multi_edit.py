@@ -0,0 +1,297 @@
+"""
+Tests for multi-edit planning, unified-diff patches and atomic commits.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from nano_agent.modules import multi_edit, nano_agent_tools
+from nano_agent.modules.data_types import EditOperation
+from nano_agent.modules.digest_cache import digest_bytes
+from nano_agent.modules.files import Workspace, workspace_scope
+from nano_agent.modules.multi_edit import apply_hunks, parse_unified_diff, plan_edits
+from nano_agent.modules.nano_agent_tools import apply_edits_raw, apply_patch_raw
+
+
+def edit(old_str, new_str, replace_all=False):
+    return EditOperation(old_str=old_str, new_str=new_str, replace_all=replace_all)
+
+
+class TestPlanEdits:
+    """Test locating and combining replacements."""
+
+    def test_edits_use_original_content(self):
+        """Edits are located in the original text, so they can't chain."""
+        new, error = plan_edits("a b c", [edit("a", "b"), edit("b", "x"), edit("c", "a")])
+        assert error is None
+        assert new == "b x a"
+
+    def test_replace_all(self):
+        new, error = plan_edits("x = 1\ny = x\n", [edit("x", "z", replace_all=True)])
+        assert (new, error) == ("z = 1\ny = z\n", None)
+
+    def test_validation_errors(self):
+        """Missing, ambiguous and overlapping edits are rejected."""
+        content = "foo bar foo baz"
+        assert plan_edits(content, [edit("qux", "")])[1].startswith("Edit 1: text not found")
+        assert "found 2 occurrences" in plan_edits(content, [edit("bar", "B"), edit("foo", "F")])[1]
+        assert plan_edits(content, [edit("bar foo", "1"), edit("foo baz", "2")])[1] == "Edits 1 and 2 overlap"
+        assert plan_edits(content, [edit("", "x")])[1] == "Edit 1: old_str must not be empty"
+
+
+SOURCE = "".join(f"line {i}\n" for i in range(1, 21))
+
+
+class TestUnifiedDiff:
+    """Test parsing and applying hunks."""
+
+    def test_parse_git_diff(self):
+        text = (
+            "diff --git a/src/x.py b/src/x.py\n"
+            "index 123..456 100644\n"
+            "--- a/src/x.py\n"
+            "+++ b/src/x.py\n"
+            "@@ -1,2 +1,2 @@\n"
+            "-old\n"
+            "+new\n"
+            " same\n"
+            "--- /dev/null\n"
+            "+++ b/new.txt\n"
+            "@@ -0,0 +1 @@\n"
+            "+hello\n"
+        )
+        patches, error = parse_unified_diff(text)
+        assert error is None
+        assert [(p.old_path, p.new_path) for p in patches] == [("src/x.py", "src/x.py"), (None, "new.txt")]
+        assert patches[0].hunks[0].lines == [("-", "old"), ("+", "new"), (" ", "same")]
+
+    def test_malformed_patches(self):
+        assert parse_unified_diff("just text")[1].startswith("No file changes found")
+        truncated = "--- a/x\n+++ b/x\n@@ -1,3 +1,3 @@\n a\n-b\n"
+        assert "is truncated" in parse_unified_diff(truncated)[1]
+
+    def test_hunks_with_drift(self):
+        """Hunks whose line numbers are off still apply where their context matches."""
+        diff = (
+            "--- a/f\n+++ b/f\n"
+            "@@ -2,3 +2,3 @@\n line 4\n-line 5\n+LINE 5\n line 6\n"
+            "@@ -15,2 +15,3 @@\n line 17\n+inserted\n line 18\n"
+        )
+        patches, _ = parse_unified_diff(diff)
+        new, error = apply_hunks(SOURCE, patches[0])
+        assert error is None
+        lines = new.splitlines()
+        assert lines[4] == "LINE 5" and lines[17] == "inserted" and len(lines) == 21
+        assert new.endswith("line 20\n")
+
+    def test_context_mismatch(self):
+        patches, _ = parse_unified_diff("--- a/f\n+++ b/f\n@@ -1,2 +1,2 @@\n line 1\n-line 9000\n+x\n")
+        new, error = apply_hunks(SOURCE, patches[0])
+        assert new is None
+        assert error == "Hunk @@ -1,2 +1,2 @@ of f does not apply: its context was not found"
+
+    def test_missing_newline_at_end(self):
+        patches, _ = parse_unified_diff(
+            "--- a/f\n+++ b/f\n@@ -1,2 +1,2 @@\n a\n-b\n\\ No newline at end of file\n+c\n"
+        )
+        assert apply_hunks("a\nb", patches[0]) == ("a\nc\n", None)
+
+
+class TestApplyEditsTool:
+    """Test the apply_edits tool body."""
+
+    def test_single_read_and_write(self, tmp_path):
+        """All edits land with one read and one write of the file."""
+        target = tmp_path / "mod.py"
+        target.write_text("def a():\n    return 1\n\ndef b():\n    return 2\n")
+        opened = []
+        real_open = os.open
+
+        def counting_open(path, flags, *args):
+            opened.append((path, flags))
+            return real_open(path, flags, *args)
+
+        with patch.object(multi_edit.os, "open", side_effect=counting_open):
+            result = apply_edits_raw(str(target), [
+                {"old_str": "def a", "new_str": "def alpha"},
+                {"old_str": "return 2", "new_str": "return 20"},
+            ])
+
+        expected = "def alpha():\n    return 1\n\ndef b():\n    return 20\n"
+        assert result == f"Successfully applied 2 edits to {target} (digest {digest_bytes(expected.encode())})"
+        assert target.read_text() == expected
+        assert len(opened) == 1
+        assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+    def test_failure_leaves_file_untouched(self, tmp_path):
+        target = tmp_path / "mod.py"
+        original = "x = 1\nx = 2\n"
+        target.write_text(original)
+        before = target.stat().st_mtime_ns
+
+        result = apply_edits_raw(str(target), [
+            {"old_str": "= 1", "new_str": "= 10"},
+            {"old_str": "x", "new_str": "y"},
+        ])
+
+        assert result.startswith("Error: Edit 2: found 2 occurrences")
+        assert result.endswith("No changes were made.")
+        assert target.read_text() == original
+        assert target.stat().st_mtime_ns == before
+
+    def test_keeps_file_mode(self, tmp_path):
+        target = tmp_path / "run.sh"
+        target.write_text("echo hi\n")
+        os.chmod(target, 0o750)
+        apply_edits_raw(str(target), [{"old_str": "hi", "new_str": "bye"}])
+        assert (target.stat().st_mode & 0o777) == 0o750
+
+    def test_keeps_crlf_line_endings(self, tmp_path):
+        target = tmp_path / "win.txt"
+        target.write_bytes(b"a\r\nb\r\n")
+
+        result = apply_edits_raw(str(target), [{"old_str": "a", "new_str": "z\nzz"}])
+
+        expected = b"z\r\nzz\r\nb\r\n"
+        assert result.endswith(f"(digest {digest_bytes(expected)})")
+        assert target.read_bytes() == expected
+
+    @pytest.mark.asyncio
+    async def test_function_tool(self, tmp_path, invoke):
+        """The tool accepts a list of edit objects through the SDK."""
+        target = tmp_path / "a.txt"
+        target.write_text("one two three\n")
+        result = await invoke(nano_agent_tools.apply_edits, file_path=str(target), edits=[
+            {"old_str": "one", "new_str": "1", "replace_all": False},
+            {"old_str": "three", "new_str": "3", "replace_all": False},
+        ])
+        assert result.startswith("Successfully applied 2 edits")
+        assert target.read_text() == "1 two 3\n"
+
+
+class TestApplyPatchTool:
+    """Test the apply_patch tool body."""
+
+    def make_tree(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.py").write_text("import os\n\nprint('hi')\n")
+        (tmp_path / "old.txt").write_text("obsolete\n")
+
+    PATCH = (
+        "--- a/src/app.py\n+++ b/src/app.py\n"
+        "@@ -1,3 +1,3 @@\n import os\n \n-print('hi')\n+print('hello')\n"
+        "--- a/old.txt\n+++ /dev/null\n"
+        "@@ -1 +0,0 @@\n-obsolete\n"
+        "--- /dev/null\n+++ b/docs/new.md\n"
+        "@@ -0,0 +1,2 @@\n+# New\n+text\n"
+    )
+
+    def test_multi_file_patch(self, tmp_path, monkeypatch):
+        """Modifies, deletes and creates files in one call."""
+        self.make_tree(tmp_path, monkeypatch)
+
+        result = apply_patch_raw(self.PATCH)
+
+        assert result.splitlines() == [
+            "Applied patch to 3 files:",
+            "  M src/app.py (+1 -1)",
+            "  D old.txt",
+            "  A docs/new.md (+2 -0)",
+        ]
+        assert (tmp_path / "src" / "app.py").read_text() == "import os\n\nprint('hello')\n"
+        assert not (tmp_path / "old.txt").exists()
+        assert (tmp_path / "docs" / "new.md").read_text() == "# New\ntext\n"
+
+    def test_conflict_changes_nothing(self, tmp_path, monkeypatch):
+        """A hunk that doesn't apply to the last file stops the whole patch."""
+        self.make_tree(tmp_path, monkeypatch)
+        bad = self.PATCH + "--- a/src/app.py2\n+++ b/src/app.py2\n@@ -1 +1 @@\n-x\n+y\n"
+
+        result = apply_patch_raw(bad)
+
+        assert result.startswith("Error: File not found: src/app.py2")
+        assert (tmp_path / "src" / "app.py").read_text() == "import os\n\nprint('hi')\n"
+        assert (tmp_path / "old.txt").exists()
+        assert not (tmp_path / "docs").exists()
+
+    def test_failed_replace_rolls_back(self, tmp_path, monkeypatch):
+        """If a replace fails midway, files already replaced are restored."""
+        self.make_tree(tmp_path, monkeypatch)
+        real_unlink = os.unlink
+
+        def failing_unlink(path, *args, **kwargs):
+            if str(path).endswith("old.txt"):
+                raise PermissionError("read-only")
+            return real_unlink(path, *args, **kwargs)
+
+        with patch.object(multi_edit.os, "unlink", side_effect=failing_unlink):
+            result = apply_patch_raw(self.PATCH)
+
+        assert result.startswith("Error: Failed to write")
+        assert result.endswith("all files were restored")
+        assert (tmp_path / "src" / "app.py").read_text() == "import os\n\nprint('hi')\n"
+        assert (tmp_path / "old.txt").read_text() == "obsolete\n"
+        assert [p.name for p in (tmp_path / "src").iterdir()] == ["app.py"]
+
+    def test_rollback_restores_original_bytes(self, tmp_path, monkeypatch):
+        """A rolled-back CRLF file gets its exact bytes back."""
+        self.make_tree(tmp_path, monkeypatch)
+        app = tmp_path / "src" / "app.py"
+        app.write_bytes(b"import os\r\n\r\nprint('hi')\r\n")
+        real_unlink = os.unlink
+
+        def failing_unlink(path, *args, **kwargs):
+            if str(path).endswith("old.txt"):
+                raise PermissionError("read-only")
+            return real_unlink(path, *args, **kwargs)
+
+        with patch.object(multi_edit.os, "unlink", side_effect=failing_unlink):
+            assert apply_patch_raw(self.PATCH).endswith("all files were restored")
+        assert app.read_bytes() == b"import os\r\n\r\nprint('hi')\r\n"
+
+        apply_patch_raw(self.PATCH)
+        assert app.read_bytes() == b"import os\r\n\r\nprint('hello')\r\n"
+
+    def test_concurrent_change_is_detected(self, tmp_path, monkeypatch):
+        """A file modified between reading and committing aborts the patch."""
+        self.make_tree(tmp_path, monkeypatch)
+        real_stage = multi_edit._stage
+
+        def stage_then_touch(change):
+            real_stage(change)
+            (tmp_path / "old.txt").write_text("someone else\n")
+
+        with patch.object(multi_edit, "_stage", side_effect=stage_then_touch):
+            result = apply_patch_raw(self.PATCH)
+
+        assert "changed on disk while the edit was prepared" in result
+        assert (tmp_path / "src" / "app.py").read_text() == "import os\n\nprint('hi')\n"
+        assert not (tmp_path / "docs" / "new.md").exists()
+        assert not [p for p in (tmp_path / "src").iterdir() if p.name.endswith(".tmp")]
+
+    def test_create_existing_file_is_rejected(self, tmp_path, monkeypatch):
+        self.make_tree(tmp_path, monkeypatch)
+        result = apply_patch_raw("--- /dev/null\n+++ b/old.txt\n@@ -0,0 +1 @@\n+x\n")
+        assert result == "Error: old.txt already exists but the patch creates it. No changes were made."
+
+    @pytest.mark.asyncio
+    async def test_function_tool(self, tmp_path, monkeypatch, invoke):
+        self.make_tree(tmp_path, monkeypatch)
+        result = await invoke(nano_agent_tools.apply_patch, patch=self.PATCH)
+        assert result.startswith("Applied patch to 3 files")
+
+    @pytest.mark.asyncio
+    async def test_function_tool_parses_once_and_reports_bad_paths(self, tmp_path, monkeypatch, invoke):
+        self.make_tree(tmp_path, monkeypatch)
+        escape = "--- /dev/null\n+++ b/../escaped.txt\n@@ -0,0 +1 @@\n+x\n"
+
+        with patch.object(nano_agent_tools, "parse_unified_diff", wraps=parse_unified_diff) as parsed:
+            with workspace_scope(Workspace(tmp_path, confine=True)):
+                result = await invoke(nano_agent_tools.apply_patch, patch=escape)
+
+        assert result.startswith("Error: Invalid path: Path is outside the workspace")
+        assert parsed.call_count == 1
+        assert not (tmp_path.parent / "escaped.txt").exists()
@@ -0,0 +1,217 @@
+"""
+Tests for batch execution of nano agent prompts.
+
+The single-prompt executor is replaced with a fake so these tests exercise
+scheduling, ordering and aggregation without calling any provider.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nano_agent.modules import nano_agent
+from nano_agent.modules.nano_agent import (
+    _execute_nano_agent_batch_async,
+    build_batch_request,
+    get_batch_concurrency,
+    prompt_nano_agent_batch,
+)
+from nano_agent.modules.constants import (
+    BATCH_CONCURRENCY_BY_PROVIDER,
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_MODEL,
+    DEFAULT_PROVIDER,
+)
+from nano_agent.modules.data_types import PromptNanoAgentResponse
+
+
+def make_fake_executor(delay: float = 0.02, fail_on: str = None):
+    """Create a fake _execute_nano_agent_async that records concurrency."""
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    async def fake_execute(request, enable_rich_logging=True):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            state["in_flight"] -= 1
+
+        if fail_on and fail_on in request.agentic_prompt:
+            return PromptNanoAgentResponse(success=False, error="boom", execution_time_seconds=delay)
+        return PromptNanoAgentResponse(
+            success=True,
+            result=f"done: {request.agentic_prompt}",
+            metadata={
+                "model": request.model,
+                "provider": request.provider,
+                "token_usage": {"total_tokens": 10, "input_tokens": 6, "output_tokens": 4, "total_cost": 0.001},
+            },
+            execution_time_seconds=delay
+        )
+
+    return fake_execute, state
+
+
+class TestBatchConcurrency:
+    """Test per-provider concurrency configuration."""
+
+    def test_default_limits(self, monkeypatch):
+        """Configured and fallback limits are used without overrides."""
+        monkeypatch.delenv("NANO_AGENT_BATCH_CONCURRENCY_OPENROUTER", raising=False)
+        assert get_batch_concurrency("openrouter") == BATCH_CONCURRENCY_BY_PROVIDER["openrouter"]
+        assert get_batch_concurrency("unknown-provider") == DEFAULT_BATCH_CONCURRENCY
+
+    def test_env_override(self, monkeypatch):
+        """Environment variable overrides the configured limit."""
+        monkeypatch.setenv("NANO_AGENT_BATCH_CONCURRENCY_OPENROUTER", "3")
+        assert get_batch_concurrency("openrouter") == 3
+
+    def test_invalid_env_ignored(self, monkeypatch):
+        """Invalid environment values fall back to configuration."""
+        monkeypatch.setenv("NANO_AGENT_BATCH_CONCURRENCY_OPENROUTER", "lots")
+        assert get_batch_concurrency("openrouter") == BATCH_CONCURRENCY_BY_PROVIDER["openrouter"]
+
+    def test_explicit_override(self, monkeypatch):
+        """Explicit override wins over everything."""
+        monkeypatch.setenv("NANO_AGENT_BATCH_CONCURRENCY_OPENROUTER", "3")
+        assert get_batch_concurrency("openrouter", override=2) == 2
+
+
+class TestBuildBatchRequest:
+    """Test normalization of batch items."""
+
+    def test_strings_and_objects(self):
+        """Strings use defaults, objects may override model/provider."""
+        request = build_batch_request(
+            ["first", {"prompt": "second", "model": "x-ai/grok-4-fast"}],
+            model=DEFAULT_MODEL,
+            provider=DEFAULT_PROVIDER
+        )
+
+        assert [p.agentic_prompt for p in request.prompts] == ["first", "second"]
+        assert request.prompts[0].model == DEFAULT_MODEL
+        assert request.prompts[1].model == "x-ai/grok-4-fast"
+        assert all(p.provider == DEFAULT_PROVIDER for p in request.prompts)
+
+    def test_invalid_item_rejected(self):
+        """Invalid items fail validation."""
+        with pytest.raises(Exception):
+            build_batch_request([{"model": DEFAULT_MODEL}])
+
+
+class TestExecuteBatch:
+    """Test the batch executor."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_order_with_bounded_concurrency(self):
+        """Concurrency never exceeds the limit and order is preserved."""
+        fake_execute, state = make_fake_executor()
+        request = build_batch_request([f"task {i}" for i in range(10)], max_concurrency=3)
+
+        completions = []
+
+        async def on_item_complete(item, completed, total):
+            completions.append((item.index, completed, total))
+
+        with patch.object(nano_agent, "_execute_nano_agent_async", side_effect=fake_execute):
+            response = await _execute_nano_agent_batch_async(request, on_item_complete=on_item_complete)
+
+        assert response.success is True
+        assert response.succeeded == 10
+        assert [r.index for r in response.results] == list(range(10))
+        assert [r.result for r in response.results] == [f"done: task {i}" for i in range(10)]
+        assert state["max_in_flight"] == 3
+        assert len(completions) == 10
+        assert completions[-1][1:] == (10, 10)
+        assert response.metadata["concurrency"] == {DEFAULT_PROVIDER: 3}
+
+    @pytest.mark.asyncio
+    async def test_aggregates_tokens_and_failures(self):
+        """Token totals are summed and failures are counted per item."""
+        fake_execute, _ = make_fake_executor(fail_on="bad")
+        request = build_batch_request(["good 1", "bad", "good 2"])
+
+        with patch.object(nano_agent, "_execute_nano_agent_async", side_effect=fake_execute):
+            response = await _execute_nano_agent_batch_async(request)
+
+        assert response.success is False
+        assert response.succeeded == 2
+        assert response.failed == 1
+        assert response.results[1].error == "boom"
+        assert response.token_usage["runs"] == 2
+        assert response.token_usage["total_tokens"] == 20
+        assert response.token_usage["total_cost"] == pytest.approx(0.002)
+        assert all(r.queue_wait_seconds is not None for r in response.results)
+
+    @pytest.mark.asyncio
+    async def test_failing_progress_callback_keeps_results(self):
+        """A progress notification that raises doesn't fail the batch."""
+        fake_execute, _ = make_fake_executor()
+        request = build_batch_request([f"task {i}" for i in range(4)])
+
+        async def on_item_complete(item, completed, total):
+            raise ConnectionError("client went away")
+
+        with patch.object(nano_agent, "_execute_nano_agent_async", side_effect=fake_execute):
+            response = await _execute_nano_agent_batch_async(request, on_item_complete=on_item_complete)
+
+        assert response.succeeded == 4
+        assert [r.result for r in response.results] == [f"done: task {i}" for i in range(4)]
+
+    @pytest.mark.asyncio
+    async def test_raising_item_cancels_the_rest(self):
+        """An item that raises stops the items still running."""
+        fake_execute, state = make_fake_executor(delay=10)
+
+        async def execute(request, enable_rich_logging=True):
+            if request.agentic_prompt == "crash":
+                raise RuntimeError("fatal")
+            return await fake_execute(request, enable_rich_logging)
+
+        request = build_batch_request(["slow 1", "crash", "slow 2"], max_concurrency=3)
+        with patch.object(nano_agent, "_execute_nano_agent_async", side_effect=execute):
+            with pytest.raises(RuntimeError):
+                await _execute_nano_agent_batch_async(request)
+            await asyncio.sleep(0)
+
+        assert state["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_batch_faster_than_serial(self):
+        """Running concurrently takes roughly one item's time, not N."""
+        fake_execute, _ = make_fake_executor(delay=0.05)
+        request = build_batch_request([f"task {i}" for i in range(8)], max_concurrency=8)
+
+        with patch.object(nano_agent, "_execute_nano_agent_async", side_effect=fake_execute):
+            response = await _execute_nano_agent_batch_async(request)
+
+        assert response.execution_time_seconds < response.metadata["sum_item_seconds"]
+
+
+class TestPromptNanoAgentBatchTool:
+    """Test the MCP tool wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_reports_progress(self):
+        """Progress is reported once per completed prompt."""
+        fake_execute, _ = make_fake_executor()
+        ctx = AsyncMock()
+
+        with patch.object(nano_agent, "_execute_nano_agent_async", side_effect=fake_execute):
+            result = await prompt_nano_agent_batch(["a", "b", "c"], ctx=ctx)
+
+        assert result["success"] is True
+        assert len(result["results"]) == 3
+        assert ctx.report_progress.await_count == 3
+        ctx.info.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invalid_batch_returns_error(self):
+        """Validation errors are returned, not raised."""
+        result = await prompt_nano_agent_batch([])
+
+        assert result["success"] is False
+        assert result["error"]
+        assert result["metadata"]["error_type"] == "ValidationError"
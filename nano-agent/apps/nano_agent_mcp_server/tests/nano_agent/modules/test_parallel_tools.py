@@ -0,0 +1,173 @@
+"""
+Tests for parallel tool-call execution within a turn.
+
+Read-only calls run concurrently; writes hold their path exclusively.
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from nano_agent.modules import nano_agent_tools
+from nano_agent.modules.path_locks import PathLocks
+from nano_agent.modules.provider_config import ProviderConfig
+from nano_agent.modules.streaming import RunMetrics
+
+
+def concurrency_probe(delay=0.05):
+    """Blocking fake tool body that records how many calls overlap."""
+    state = {"active": 0, "max_active": 0}
+    lock = threading.Lock()
+
+    def body(**kwargs):
+        with lock:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        time.sleep(delay)
+        with lock:
+            state["active"] -= 1
+        return "ok"
+
+    return body, state
+
+
+class TestModelSettings:
+    """Test parallel_tool_calls in provider model settings."""
+
+    def test_enabled_for_hosted_providers(self):
+        """Hosted providers get parallel tool calls, including GPT-5 models."""
+        settings = ProviderConfig.get_model_settings("x-ai/grok-code-fast-1", "openrouter", {"temperature": 0.2})
+        assert settings.parallel_tool_calls is True
+
+    def test_disabled_for_ollama(self):
+        """Local servers are left at their default."""
+        settings = ProviderConfig.get_model_settings("gpt-oss:20b", "ollama", {"temperature": 0.2})
+        assert settings.parallel_tool_calls is None
+
+    def test_explicit_setting_wins(self):
+        """An explicit base setting is passed through."""
+        settings = ProviderConfig.get_model_settings(
+            "x-ai/grok-code-fast-1", "openrouter", {"parallel_tool_calls": False}
+        )
+        assert settings.parallel_tool_calls is False
+
+
+class TestPathLocks:
+    """Test the readers-writer lock table."""
+
+    @pytest.mark.asyncio
+    async def test_readers_share_writers_exclude(self):
+        """Readers overlap; a writer waits for readers and blocks new ones."""
+        locks = PathLocks()
+        events = []
+
+        async def reader(name):
+            async with locks.shared("/a"):
+                events.append(f"{name}+")
+                await asyncio.sleep(0.02)
+                events.append(f"{name}-")
+
+        async def writer():
+            await asyncio.sleep(0.005)
+            async with locks.exclusive("/a"):
+                events.append("w+")
+                await asyncio.sleep(0.01)
+                events.append("w-")
+
+        await asyncio.gather(reader("r1"), reader("r2"), writer())
+
+        assert events[:2] == ["r1+", "r2+"]
+        assert events.index("w+") > max(events.index("r1-"), events.index("r2-"))
+        assert len(locks) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_writer_releases_readers(self):
+        """A cancelled waiting writer does not leave readers blocked."""
+        locks = PathLocks()
+
+        async def hold_read():
+            async with locks.shared("/a"):
+                await asyncio.sleep(0.05)
+
+        holder = asyncio.create_task(hold_read())
+        await asyncio.sleep(0.005)
+        waiting_writer = asyncio.create_task(locks.exclusive("/a").__aenter__())
+        await asyncio.sleep(0.005)
+        waiting_writer.cancel()
+        await asyncio.sleep(0)
+
+        async def late_reader():
+            async with locks.shared("/a"):
+                return True
+
+        assert await asyncio.wait_for(late_reader(), timeout=0.03)
+        await holder
+
+
+class TestParallelToolExecution:
+    """Test concurrency of the agent tools themselves."""
+
+    @pytest.mark.asyncio
+    async def test_read_only_calls_run_concurrently(self, tmp_path, invoke):
+        """Independent reads overlap, so the turn takes about one call's time."""
+        body, state = concurrency_probe()
+        paths = [str(tmp_path / f"f{i}.txt") for i in range(4)]
+
+        with patch.object(nano_agent_tools, "read_file_raw", body):
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                invoke(nano_agent_tools.read_file, f"c{i}", file_path=p) for i, p in enumerate(paths)
+            ])
+            wall = time.perf_counter() - start
+
+        print(f"\n4 reads of 50ms: parallel wall={wall * 1000:.0f}ms (serial would be ~200ms)")
+        assert state["max_active"] == 4
+        assert wall < 0.15
+
+    @pytest.mark.asyncio
+    async def test_writes_to_same_path_are_serialized(self, tmp_path, invoke):
+        """Writes (and edits) of one file never overlap; other files are unaffected."""
+        body, state = concurrency_probe(delay=0.02)
+        target = str(tmp_path / "same.txt")
+
+        with patch.object(nano_agent_tools, "write_file_raw", body), \
+             patch.object(nano_agent_tools, "edit_file_raw", body):
+            await asyncio.gather(
+                invoke(nano_agent_tools.write_file, "w1", file_path=target, content="a"),
+                invoke(nano_agent_tools.edit_file, "e1", file_path=target, old_str="a", new_str="b"),
+                invoke(nano_agent_tools.write_file, "w2", file_path=target, content="c"),
+            )
+            assert state["max_active"] == 1
+
+            await asyncio.gather(*[
+                invoke(nano_agent_tools.write_file, f"o{i}", file_path=str(tmp_path / f"o{i}.txt"), content="x")
+                for i in range(3)
+            ])
+            assert state["max_active"] == 3
+
+
+class TestTurnToolTiming:
+    """Test per-turn tool wall and busy time."""
+
+    def test_overlapping_calls_report_busy_above_wall(self):
+        """Busy time sums the calls, wall time spans them."""
+        metrics = RunMetrics()
+        metrics.start_turn()
+        metrics.start_turn()
+        records = [
+            SimpleNamespace(call_id="a", started_at=10.0, ended_at=10.5),
+            SimpleNamespace(call_id="b", started_at=10.1, ended_at=10.6),
+            SimpleNamespace(call_id="c", started_at=20.0, ended_at=20.2),
+        ]
+
+        metrics.record_tool_calls(records, {"a": 1, "b": 1, "c": 2})
+
+        first, second = metrics.turns
+        assert first.tool_wall_seconds == pytest.approx(0.6)
+        assert first.tool_busy_seconds == pytest.approx(1.0)
+        assert second.tool_wall_seconds == pytest.approx(0.2)
+        assert metrics.to_dict()["turns"][0]["tool_busy_seconds"] == pytest.approx(1.0)
@@ -0,0 +1,254 @@
+"""
+Tests for the trigram search index and the search_files tool.
+"""
+
+import os
+import random
+import re
+import time
+
+import pytest
+
+from nano_agent.modules import search_index as search_module
+from nano_agent.modules.nano_agent_tools import edit_file_raw, search_files_raw, write_file_raw
+from nano_agent.modules.search_index import (
+    SearchIndexRegistry,
+    TrigramIndex,
+    _required_literals,
+    search_index,
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Isolated process-wide index registry."""
+    registry = SearchIndexRegistry()
+    monkeypatch.setattr(search_module, "_registry", registry)
+    return registry
+
+
+def make_tree(root, files):
+    """Create files from a {relative_path: content} mapping."""
+    for relative, content in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+
+
+def naive_search(root, pattern, flags=0):
+    """Reference os.walk + re scan returning (path, line) pairs."""
+    compiled = re.compile(pattern, flags)
+    found = []
+    for directory, dirs, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            with open(path, "rb") as f:
+                text = f.read().decode("utf-8", errors="replace")
+            for number, line in enumerate(text.split("\n"), 1):
+                if compiled.search(line):
+                    found.append((path, number))
+    return sorted(found)
+
+
+class TestRequiredLiterals:
+    """Test literal extraction from regexes."""
+
+    @pytest.mark.parametrize("pattern,expected", [
+        (r"def \w+_handler", ["def ", "_handler"]),
+        (r"(foo)bar", ["foo", "bar"]),
+        (r"colou?r", ["colo", "r"]),
+        (r"(?:ab)+cd", ["ab", "cd"]),
+        (r"(?:ab)*cd", ["cd"]),
+        (r"foo|bar", []),
+        (r"[abc]", []),
+    ])
+    def test_literals(self, pattern, expected):
+        """Only text every match must contain is extracted."""
+        assert _required_literals(pattern) == expected
+
+
+class TestTrigramIndex:
+    """Test index correctness and incremental maintenance."""
+
+    def test_matches_naive_scan(self, tmp_path):
+        """The signature filter never drops a file the naive scan matches."""
+        rng = random.Random(7)
+        words = ["alpha", "beta_gamma", "delta", "epsilon", "zeta9", "Theta", "iota_kappa"]
+        make_tree(tmp_path, {
+            f"d{i % 7}/f{i}.txt": "\n".join(" ".join(rng.sample(words, 3)) for _ in range(5))
+            for i in range(120)
+        })
+        index = TrigramIndex(tmp_path)
+
+        for pattern, regex, case_sensitive in [
+            ("beta_gamma delta", False, True),
+            ("theta", False, False),
+            (r"zeta\d \w+", True, True),
+            ("a_ka", False, True),
+        ]:
+            results = search_index(index, pattern, regex=regex, case_sensitive=case_sensitive, max_results=10_000)
+            flags = 0 if case_sensitive else re.IGNORECASE
+            expected = naive_search(tmp_path, pattern if regex else re.escape(pattern), flags)
+            assert sorted((m.path, m.line) for m in results.matches) == expected
+
+    def test_filter_reads_only_candidates(self, tmp_path):
+        """A rare token narrows the files read to (roughly) those containing it."""
+        make_tree(tmp_path, {f"f{i}.py": f"value_{i} = compute(value_{i})\n" for i in range(200)})
+        make_tree(tmp_path, {"target.py": "needle_symbol = 1\n"})
+        index = TrigramIndex(tmp_path)
+
+        results = search_index(index, "needle_symbol")
+
+        assert [(os.path.basename(m.path), m.line) for m in results.matches] == [("target.py", 1)]
+        assert results.files_indexed == 201
+        assert results.candidates < 10
+
+    def test_incremental_refresh(self, tmp_path):
+        """Rescans re-index only changed files and forget deleted ones."""
+        make_tree(tmp_path, {f"f{i}.txt": f"line {i}\n" for i in range(20)})
+        index = TrigramIndex(tmp_path, refresh_seconds=0)
+        index.refresh()
+        assert index.indexed == 20
+
+        (tmp_path / "f3.txt").write_text("changed needle\n")
+        (tmp_path / "f4.txt").unlink()
+        results = search_index(index, "needle")
+
+        assert index.indexed == 21
+        assert index.removed == 1
+        assert len(index) == 19
+        assert [os.path.basename(m.path) for m in results.matches] == ["f3.txt"]
+
+    def test_marked_changes_between_rescans(self, tmp_path):
+        """Files reported by the tools are re-indexed before the next rescan is due."""
+        make_tree(tmp_path, {"a.txt": "old text\n"})
+        index = TrigramIndex(tmp_path, refresh_seconds=3600)
+        assert search_index(index, "fresh_token").matches == []
+
+        (tmp_path / "a.txt").write_text("fresh_token\n")
+        index.mark_changed(str(tmp_path / "a.txt"))
+
+        assert len(search_index(index, "fresh_token").matches) == 1
+        assert index.scans == 1
+
+    def test_memory_bound_falls_back_to_scanning(self, tmp_path):
+        """Files past the signature budget are still searched."""
+        make_tree(tmp_path, {f"f{i}.txt": f"token_{i}\n" for i in range(10)})
+        index = TrigramIndex(tmp_path, max_bytes=64 * 3)
+
+        results = search_index(index, "token_7")
+
+        assert index.signature_bytes <= 64 * 3
+        assert [os.path.basename(m.path) for m in results.matches] == ["f7.txt"]
+
+    def test_skips_binary_and_vendored_dirs(self, tmp_path):
+        """Binary files and SEARCH_SKIP_DIRS are never searched."""
+        make_tree(tmp_path, {
+            "src/a.py": "shared_name\n",
+            "blob.bin": b"shared_name\0\1\2",
+            ".git/config": "shared_name\n",
+            "node_modules/x/index.js": "shared_name\n",
+        })
+        results = search_index(TrigramIndex(tmp_path), "shared_name")
+        assert [os.path.relpath(m.path, tmp_path) for m in results.matches] == [os.path.join("src", "a.py")]
+
+    def test_max_results_and_subdirectory(self, tmp_path):
+        """Results are capped and limited to the searched directory."""
+        make_tree(tmp_path, {"a/one.txt": "hit\n" * 5, "b/two.txt": "hit\n" * 5})
+        index = TrigramIndex(tmp_path)
+
+        capped = search_index(index, "hit", max_results=3)
+        scoped = search_index(index, "hit", directory=str(tmp_path / "b"))
+
+        assert len(capped.matches) == 3 and capped.truncated
+        assert {os.path.basename(m.path) for m in scoped.matches} == {"two.txt"}
+
+
+class TestSearchFilesTool:
+    """Test the search_files tool body."""
+
+    def test_output_format(self, tmp_path, registry, monkeypatch):
+        """Matches come back as path:line: snippet relative to the cwd."""
+        monkeypatch.chdir(tmp_path)
+        make_tree(tmp_path, {"pkg/mod.py": "import os\n\ndef load_config():\n    pass\n"})
+
+        result = search_files_raw("def load_config")
+
+        assert result.splitlines() == [
+            "Found 1 matching lines in 1 files under ./",
+            f"{os.path.join('pkg', 'mod.py')}:3: def load_config():",
+        ]
+
+    def test_sees_tool_writes_immediately(self, tmp_path, registry, monkeypatch):
+        """Writes and edits made through the tools are searchable right away."""
+        monkeypatch.chdir(tmp_path)
+        make_tree(tmp_path, {"a.txt": "first\n"})
+        assert search_files_raw("second").startswith("No matches")
+
+        write_file_raw("b.txt", "second\n")
+        edit_file_raw("a.txt", "first", "second")
+
+        assert search_files_raw("second").startswith("Found 2 matching lines in 2 files")
+
+    def test_errors(self, tmp_path, registry, monkeypatch):
+        """Bad input is reported, not raised."""
+        monkeypatch.chdir(tmp_path)
+        assert search_files_raw("").startswith("Error")
+        assert search_files_raw("(", regex=True).startswith("Error: Invalid regular expression")
+        assert search_files_raw("x", directory_path="missing").startswith("Error: Directory not found")
+
+    @pytest.mark.parametrize("first", [".", "build"])
+    def test_search_inside_ignored_directory(self, tmp_path, registry, monkeypatch, first):
+        """Searching a .gitignored directory finds its files whichever search came first."""
+        monkeypatch.chdir(tmp_path)
+        make_tree(tmp_path, {".gitignore": "build/\n", "src/a.txt": "needle_token\n", "build/out.txt": "needle_token\n"})
+
+        search_files_raw("needle_token", first)
+
+        assert search_files_raw("needle_token").startswith("Found 1 matching lines in 1 files")
+        assert f"{os.path.join('build', 'out.txt')}:1:" in search_files_raw("needle_token", "build")
+
+    def test_truncation_note(self, tmp_path, registry, monkeypatch):
+        """A capped result says how to see more."""
+        monkeypatch.chdir(tmp_path)
+        make_tree(tmp_path, {"a.txt": "word\n" * 10})
+        assert "stopped at 2" in search_files_raw("word", max_results=2)
+
+
+class TestSearchBenchmark:
+    """Indexed search vs a naive os.walk + re scan."""
+
+    def test_indexed_search_faster_than_naive(self, tmp_path):
+        """After the first (building) search, queries read only a few files."""
+        rng = random.Random(1)
+        words = ["request", "response", "handler", "config", "buffer", "stream", "token", "result"]
+        files = {}
+        for i in range(3000):
+            lines = [f"{rng.choice(words)}_{i % 97} = {rng.choice(words)}({rng.choice(words)}_{j})" for j in range(40)]
+            if i % 500 == 17:
+                lines.append("needle_symbol_xyz = 1")
+            files[f"pkg{i // 300}/mod{(i // 30) % 10}/file_{i}.py"] = "\n".join(lines) + "\n"
+        make_tree(tmp_path, files)
+
+        start = time.perf_counter()
+        expected = naive_search(tmp_path, re.escape("needle_symbol_xyz"))
+        naive = time.perf_counter() - start
+
+        index = TrigramIndex(tmp_path, refresh_seconds=3600)
+        start = time.perf_counter()
+        search_index(index, "needle_symbol_xyz")
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = search_index(index, "needle_symbol_xyz")
+        warm = time.perf_counter() - start
+
+        print(f"\nSearch of {len(files)} files: naive={naive * 1000:.1f}ms "
+              f"index build={build * 1000:.1f}ms warm={warm * 1000:.1f}ms "
+              f"(read {results.candidates} files, {index.signature_bytes} signature bytes)")
+
+        assert sorted((m.path, m.line) for m in results.matches) == expected
+        assert warm < naive
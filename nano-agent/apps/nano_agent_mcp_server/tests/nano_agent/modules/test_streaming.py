@@ -0,0 +1,365 @@
+"""
+Tests for streamed execution progress and latency metrics.
+
+Stream events are simulated with lightweight stand-ins shaped like the
+Agent SDK's RawResponsesStreamEvent and RunItemStreamEvent.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nano_agent.modules import nano_agent
+from nano_agent.modules.data_types import PromptNanoAgentRequest
+from nano_agent.modules.streaming import (
+    PROGRESS_TEXT,
+    PROGRESS_TOOL_END,
+    PROGRESS_TOOL_START,
+    PROGRESS_TURN_START,
+    RunDeadline,
+    RunMetrics,
+    StreamEventProcessor,
+)
+from nano_agent.modules.token_tracking import RUN_STATUS_CANCELLED, Usage, get_token_ledger
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.value = 100.0
+
+    def __call__(self):
+        return self.value
+
+    def advance(self, seconds):
+        self.value += seconds
+
+
+def raw(data_type, **fields):
+    """Build a raw response stream event."""
+    return SimpleNamespace(type="raw_response_event", data=SimpleNamespace(type=data_type, **fields))
+
+
+def tool_called(tool_name, call_id):
+    """Build a tool called run item event."""
+    item = SimpleNamespace(raw_item=SimpleNamespace(name=tool_name, call_id=call_id))
+    return SimpleNamespace(type="run_item_stream_event", name="tool_called", item=item)
+
+
+def tool_output(call_id):
+    """Build a tool output run item event (raw_item is a dict in the SDK)."""
+    item = SimpleNamespace(raw_item={"call_id": call_id, "type": "function_call_output"}, output="abc")
+    return SimpleNamespace(type="run_item_stream_event", name="tool_output", item=item)
+
+
+class TestRunMetrics:
+    """Test per-turn timing bookkeeping."""
+
+    def test_turn_timings(self):
+        """Turn, model and first-token latencies are measured from boundaries."""
+        clock = FakeClock()
+        metrics = RunMetrics(clock=clock)
+
+        clock.advance(0.5)
+        metrics.start_turn()
+        clock.advance(0.25)
+        metrics.record_token()
+        clock.advance(1.0)
+        metrics.end_model_call()
+        metrics.record_tool_start()
+        clock.advance(0.5)
+        metrics.record_tool_end()
+
+        clock.advance(0.2)
+        metrics.start_turn()
+        clock.advance(0.3)
+        metrics.record_token()
+        clock.advance(0.5)
+        metrics.end_model_call()
+        metrics.finish()
+
+        data = metrics.to_dict()
+        first, second = data["turns"]
+        assert data["time_to_first_token_seconds"] == pytest.approx(0.75)
+        assert first["first_token_seconds"] == pytest.approx(0.75)
+        assert first["model_seconds"] == pytest.approx(1.75)
+        assert first["tool_calls"] == 1
+        assert first["turn_seconds"] == pytest.approx(2.25)
+        assert second["started_at"] == pytest.approx(2.25)
+        assert second["first_token_seconds"] == pytest.approx(0.5)
+        assert second["turn_seconds"] == pytest.approx(1.0)
+        assert data["turn_latencies_seconds"] == [pytest.approx(2.25), pytest.approx(1.0)]
+
+    def test_finish_is_idempotent(self):
+        """Calling finish twice keeps the first end time."""
+        clock = FakeClock()
+        metrics = RunMetrics(clock=clock)
+        metrics.start_turn()
+        clock.advance(1.0)
+        metrics.finish()
+        clock.advance(5.0)
+        metrics.finish()
+        assert metrics.turns[0].turn_seconds == pytest.approx(1.0)
+
+
+class TestRunDeadline:
+    """Test wall-clock and per-turn deadline arithmetic."""
+
+    def test_turn_deadline_restarts_at_boundaries(self):
+        """The turn limit is measured from the last boundary."""
+        clock = FakeClock()
+        metrics = RunMetrics(clock=clock)
+        deadline = RunDeadline(metrics, timeout_seconds=100.0, turn_timeout_seconds=10.0)
+
+        clock.advance(4.0)
+        assert deadline.remaining() == pytest.approx(6.0)
+        metrics.start_turn()
+        metrics.end_model_call()
+        clock.advance(1.0)
+        assert deadline.remaining() == pytest.approx(9.0)
+        clock.advance(20.0)
+        assert deadline.remaining() == 0.0
+        assert deadline.expired_limit() == RunDeadline.TURN
+
+    def test_wall_clock_deadline_wins_near_end(self):
+        """Close to the run limit the wall-clock deadline is nearest."""
+        clock = FakeClock()
+        metrics = RunMetrics(clock=clock)
+        deadline = RunDeadline(metrics, timeout_seconds=30.0, turn_timeout_seconds=10.0)
+
+        clock.advance(25.0)
+        metrics.record_tool_end()
+        assert deadline.remaining() == pytest.approx(5.0)
+        clock.advance(5.0)
+        assert deadline.expired_limit() == RunDeadline.WALL_CLOCK
+        assert deadline.limit_seconds(RunDeadline.WALL_CLOCK) == 30.0
+
+
+class TestStreamEventProcessor:
+    """Test translation of stream events into progress."""
+
+    @pytest.mark.asyncio
+    async def test_progress_for_turns_tools_and_text(self):
+        """Each turn and tool event produces a progress update; text is coalesced."""
+        clock = FakeClock()
+        metrics = RunMetrics(clock=clock)
+        progress = AsyncMock()
+        processor = StreamEventProcessor(metrics, progress, text_flush_seconds=10.0, text_flush_chars=1000)
+
+        await processor.process(raw("response.created"))
+        await processor.process(raw("response.function_call_arguments.delta", delta="{"))
+        await processor.process(raw("response.completed"))
+        await processor.process(tool_called("read_file", "call_1"))
+        await processor.process(tool_output("call_1"))
+        await processor.process(raw("response.created"))
+        for chunk in ["Hel", "lo ", "world"]:
+            await processor.process(raw("response.output_text.delta", delta=chunk))
+        await processor.process(raw("response.completed"))
+
+        kinds = [call.args[0] for call in progress.await_args_list]
+        messages = [call.args[1] for call in progress.await_args_list]
+        assert kinds == [PROGRESS_TURN_START, PROGRESS_TOOL_START, PROGRESS_TOOL_END, PROGRESS_TURN_START, PROGRESS_TEXT]
+        assert messages[1] == "Tool started: read_file"
+        assert messages[2].startswith("Tool finished: read_file")
+        assert messages[-1] == "Hello world"
+        assert processor.progress_events == 5
+        assert len(metrics.turns) == 2
+
+    @pytest.mark.asyncio
+    async def test_text_flushes_on_size(self):
+        """Large text bursts are flushed without waiting for the interval."""
+        metrics = RunMetrics(clock=FakeClock())
+        progress = AsyncMock()
+        processor = StreamEventProcessor(metrics, progress, text_flush_seconds=10.0, text_flush_chars=5)
+
+        await processor.process(raw("response.created"))
+        await processor.process(raw("response.output_text.delta", delta="abc"))
+        await processor.process(raw("response.output_text.delta", delta="def"))
+
+        assert progress.await_args_list[-1].args == (PROGRESS_TEXT, "abcdef")
+
+    @pytest.mark.asyncio
+    async def test_callback_failure_does_not_raise(self):
+        """A failing progress callback never breaks the run."""
+        metrics = RunMetrics(clock=FakeClock())
+        processor = StreamEventProcessor(metrics, AsyncMock(side_effect=RuntimeError("gone")))
+
+        await processor.process(raw("response.created"))
+        assert processor.progress_events == 1
+
+
+class FakeStreamedResult:
+    """Stand-in for RunResultStreaming."""
+
+    def __init__(self, events, final_output="done", delays=None):
+        self._events = events
+        self._delays = delays or {}
+        self.final_output = final_output
+        self.cancelled = False
+        usage = Usage()
+        usage.requests = 2
+        usage.input_tokens = 120
+        usage.output_tokens = 30
+        usage.total_tokens = 150
+        self.context_wrapper = SimpleNamespace(usage=usage)
+
+    async def stream_events(self):
+        for index, event in enumerate(self._events):
+            if index in self._delays:
+                await asyncio.sleep(self._delays[index])
+            yield event
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TestStreamedExecution:
+    """Test _execute_nano_agent_async on top of the streamed runner."""
+
+    @pytest.mark.asyncio
+    async def test_streamed_run_reports_progress_and_metadata(self):
+        """Progress is forwarded and latency metadata is recorded."""
+        events = [
+            raw("response.created"),
+            raw("response.completed"),
+            tool_called("list_directory", "c1"),
+            tool_output("c1"),
+            raw("response.created"),
+            raw("response.output_text.delta", delta="All done"),
+            raw("response.completed"),
+        ]
+        registry = MagicMock()
+        registry.get_agent.return_value = (MagicMock(), None)
+        progress = AsyncMock()
+        request = PromptNanoAgentRequest(agentic_prompt="List files", model="m", provider="openrouter")
+
+        with patch.object(nano_agent, "get_agent_registry", return_value=registry), \
+             patch.object(nano_agent.Runner, "run_streamed", return_value=FakeStreamedResult(events)):
+            response = await nano_agent._execute_nano_agent_async(
+                request, enable_rich_logging=False, on_progress=progress
+            )
+
+        assert response.success is True
+        assert response.result == "done"
+        assert response.metadata["turns"] == 2
+        streaming = response.metadata["streaming"]
+        assert streaming["time_to_first_token_seconds"] is not None
+        assert len(streaming["turn_latencies_seconds"]) == 2
+        assert response.metadata["token_usage"]["total_tokens"] == 150
+        kinds = [call.args[0] for call in progress.await_args_list]
+        assert kinds.count(PROGRESS_TURN_START) == 2
+        assert PROGRESS_TOOL_START in kinds and PROGRESS_TOOL_END in kinds
+
+    @pytest.mark.asyncio
+    async def test_prompt_nano_agent_progress_is_monotonic(self):
+        """MCP progress values strictly increase and finish at the total."""
+        events = [raw("response.created"), raw("response.output_text.delta", delta="hi"), raw("response.completed")]
+        registry = MagicMock()
+        registry.get_agent.return_value = (MagicMock(), None)
+        ctx = AsyncMock()
+
+        with patch.object(nano_agent, "get_agent_registry", return_value=registry), \
+             patch.object(nano_agent.Runner, "run_streamed", return_value=FakeStreamedResult(events)):
+            result = await nano_agent.prompt_nano_agent("Say hi", provider="openrouter", ctx=ctx)
+
+        assert result["success"] is True
+        values = [call.args[0] for call in ctx.report_progress.await_args_list]
+        assert values == sorted(values) and len(set(values)) == len(values)
+        last = ctx.report_progress.await_args_list[-1].args
+        assert last[0] == last[1]
+
+
+class TestStreamedExecutionTimeouts:
+    """Test that deadlines cancel the run and return a partial result."""
+
+    async def _run(self, streamed, **request_kwargs):
+        registry = MagicMock()
+        registry.get_agent.return_value = (MagicMock(), None)
+        request = PromptNanoAgentRequest(
+            agentic_prompt="Slow task", model="m", provider="openrouter", **request_kwargs
+        )
+        with patch.object(nano_agent, "get_agent_registry", return_value=registry), \
+             patch.object(nano_agent.Runner, "run_streamed", return_value=streamed):
+            return await nano_agent._execute_nano_agent_async(request, enable_rich_logging=False)
+
+    @pytest.mark.asyncio
+    async def test_turn_timeout_returns_partial_result(self):
+        """A stalled turn is cancelled and streamed text is kept."""
+        events = [
+            raw("response.created"),
+            raw("response.output_text.delta", delta="Partial answer"),
+            raw("response.completed"),
+            raw("response.created"),
+        ]
+        streamed = FakeStreamedResult(events, delays={3: 5.0})
+
+        response = await self._run(streamed, timeout_seconds=30, turn_timeout_seconds=0.1)
+
+        assert response.success is False
+        assert streamed.cancelled is True
+        assert response.result == "Partial answer"
+        assert "per-turn" in response.error
+        assert response.metadata["timed_out"] is True
+        assert response.metadata["timeout"] == {"kind": RunDeadline.TURN, "limit_seconds": 0.1}
+        assert response.metadata["token_usage"]["total_tokens"] == 150
+        assert response.execution_time_seconds < 2.0
+
+    @pytest.mark.asyncio
+    async def test_wall_clock_timeout_spans_turns(self):
+        """Turns that each fit the turn limit still hit the run limit."""
+        events = [raw("response.created"), raw("response.completed")] * 10
+        streamed = FakeStreamedResult(events, delays={i: 0.05 for i in range(20)})
+
+        response = await self._run(streamed, timeout_seconds=0.2, turn_timeout_seconds=10)
+
+        assert response.success is False
+        assert streamed.cancelled is True
+        assert response.result is None
+        assert response.metadata["timeout"]["kind"] == RunDeadline.WALL_CLOCK
+        assert 0 < response.metadata["turns"] < 10
+
+    @pytest.mark.asyncio
+    async def test_run_within_limits_is_not_cancelled(self):
+        """Runs that finish in time are unaffected."""
+        events = [raw("response.created"), raw("response.completed")]
+        streamed = FakeStreamedResult(events, delays={1: 0.01})
+
+        response = await self._run(streamed, timeout_seconds=5, turn_timeout_seconds=1)
+
+        assert response.success is True
+        assert streamed.cancelled is False
+        assert "timed_out" not in response.metadata
+
+
+class TestStreamedExecutionCancellation:
+    """Test that client cancellation stops the run and is accounted for."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_run_and_records_usage(self):
+        """Cancelling the caller cancels the SDK run and records the tokens spent."""
+        events = [raw("response.created"), raw("response.completed"), raw("response.created")]
+        streamed = FakeStreamedResult(events, delays={2: 5.0})
+        registry = MagicMock()
+        registry.get_agent.return_value = (MagicMock(), None)
+        request = PromptNanoAgentRequest(agentic_prompt="Abandoned", model="m", provider="openrouter")
+        get_token_ledger().reset()
+
+        with patch.object(nano_agent, "get_agent_registry", return_value=registry), \
+             patch.object(nano_agent.Runner, "run_streamed", return_value=streamed):
+            task = asyncio.create_task(
+                nano_agent._execute_nano_agent_async(request, enable_rich_logging=False)
+            )
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert streamed.cancelled is True
+        entries = get_token_ledger().recent(RUN_STATUS_CANCELLED)
+        assert len(entries) == 1
+        assert entries[0].token_usage["total_tokens"] == 150
+        by_status = get_token_ledger().get_summary()["by_status"]
+        assert by_status[RUN_STATUS_CANCELLED]["runs"] == 1
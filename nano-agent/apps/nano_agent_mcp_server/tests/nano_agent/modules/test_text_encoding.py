@@ -0,0 +1,196 @@
+"""
+Tests for encoding detection and its use by the read and edit tools.
+"""
+
+import codecs
+from unittest.mock import patch
+
+import pytest
+
+from nano_agent.modules import text_encoding as text_encoding_module
+from nano_agent.modules.constants import ENCODING_SAMPLE_BYTES, LINE_INDEX_MIN_BYTES
+from nano_agent.modules.nano_agent_tools import (
+    apply_edits_raw,
+    apply_patch_raw,
+    edit_file_raw,
+    read_file_raw,
+    read_many_files_raw,
+    replace_lines_raw,
+)
+from nano_agent.modules.text_encoding import EncodingCache, sniff_encoding
+
+KOREAN = "이름,나이\n홍길동,30\n"
+
+
+class TestSniffEncoding:
+    """Test guesses from a sample."""
+
+    @pytest.mark.parametrize("data, encoding", [
+        ("plain ascii\n".encode("utf-8"), "utf-8"),
+        (KOREAN.encode("utf-8"), "utf-8"),
+        (KOREAN.encode("cp949"), "cp949"),
+        (KOREAN.encode("euc-kr"), "cp949"),
+        (codecs.BOM_UTF8 + b"x", "utf-8-sig"),
+        ("x\n".encode("utf-16"), "utf-16"),
+        ("x\n".encode("utf-32"), "utf-32"),
+        (b"caf\xe9 \x81\xff", "latin-1"),
+    ])
+    def test_encodings(self, data, encoding):
+        assert sniff_encoding(data).encoding == encoding
+
+    def test_binary(self):
+        assert sniff_encoding(b"\x7fELF\x02\x01\x01\x00\x00").binary
+        assert sniff_encoding(b"text until a \x00 byte").binary
+
+    def test_cut_character_at_sample_end(self):
+        assert sniff_encoding(KOREAN.encode("cp949")[:5], complete=False).encoding == "cp949"
+        assert sniff_encoding("가".encode("utf-8")[:2], complete=False).encoding == "utf-8"
+
+
+class TestEncodingCache:
+    """Test that a file is sniffed once per version."""
+
+    def test_sniffs_once_per_version(self, tmp_path):
+        target = tmp_path / "data.csv"
+        target.write_bytes(KOREAN.encode("cp949"))
+        cache = EncodingCache()
+
+        with patch.object(text_encoding_module, "_sniff_file", wraps=text_encoding_module._sniff_file) as sniffed:
+            assert cache.detect(target).encoding == "cp949"
+            assert cache.detect(target).encoding == "cp949"
+            assert sniffed.call_count == 1
+
+            target.write_bytes(KOREAN.encode("utf-8"))
+            assert cache.detect(target).encoding == "utf-8"
+            assert sniffed.call_count == 2
+        assert cache.get_stats()["hits"] == 1
+
+    def test_reads_only_the_sample(self, tmp_path):
+        target = tmp_path / "big.txt"
+        target.write_bytes(b"a" * (ENCODING_SAMPLE_BYTES * 4))
+        with patch.object(text_encoding_module, "sniff_encoding", wraps=sniff_encoding) as sniffed:
+            EncodingCache().detect(target)
+        assert len(sniffed.call_args.args[0]) == ENCODING_SAMPLE_BYTES
+
+
+class TestEncodingTools:
+    """Test the read and edit tools on non-UTF-8 files."""
+
+    def test_read_cp949(self, tmp_path):
+        target = tmp_path / "data.csv"
+        target.write_bytes(KOREAN.encode("cp949"))
+
+        assert read_file_raw(str(target)) == KOREAN
+        assert read_file_raw(str(target), offset=2, limit=1).startswith("홍길동,30\n")
+
+    def test_read_utf16_page(self, tmp_path):
+        target = tmp_path / "notes.txt"
+        target.write_text("".join(f"줄 {i}\n" for i in range(1, 11)), encoding="utf-16")
+        assert read_file_raw(str(target), offset=3, limit=2).startswith("줄 3\n줄 4\n")
+
+    def test_non_utf8_past_the_sample(self, tmp_path):
+        target = tmp_path / "late.csv"
+        target.write_bytes(b"a,b\n" * (ENCODING_SAMPLE_BYTES // 4) + KOREAN.encode("cp949"))
+        assert read_file_raw(str(target)).endswith(KOREAN)
+
+        large = tmp_path / "large.csv"
+        lines = (LINE_INDEX_MIN_BYTES // 4) + 1
+        large.write_bytes(b"a,b\n" * lines + KOREAN.encode("cp949"))
+        assert read_file_raw(str(large), offset=lines + 1, limit=2).startswith(KOREAN)
+
+    def test_binary_refused(self, tmp_path):
+        target = tmp_path / "blob.bin"
+        target.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+
+        assert read_file_raw(str(target)) == f"Error: {target} is a binary file, not text"
+        assert edit_file_raw(str(target), "PNG", "GIF").startswith("Error: ")
+        assert target.read_bytes().startswith(b"\x89PNG")
+
+    def test_edit_keeps_encoding(self, tmp_path):
+        target = tmp_path / "data.csv"
+        target.write_bytes(KOREAN.encode("cp949"))
+
+        assert edit_file_raw(str(target), "홍길동", "김철수") == "updated"
+        assert target.read_bytes() == KOREAN.replace("홍길동", "김철수").encode("cp949")
+
+        bom = tmp_path / "bom.txt"
+        bom.write_bytes(codecs.BOM_UTF8 + "α\n".encode("utf-8"))
+        assert edit_file_raw(str(bom), "α", "β") == "updated"
+        assert bom.read_bytes() == codecs.BOM_UTF8 + "β\n".encode("utf-8")
+
+    def test_edit_unencodable_text(self, tmp_path):
+        target = tmp_path / "data.csv"
+        target.write_bytes(KOREAN.encode("cp949"))
+
+        result = edit_file_raw(str(target), "30", "🙂")
+        assert "cp949" in result and result.endswith("No changes were made.")
+        assert target.read_bytes() == KOREAN.encode("cp949")
+
+    def test_replace_lines_cp949(self, tmp_path):
+        target = tmp_path / "data.csv"
+        target.write_bytes(KOREAN.encode("cp949"))
+
+        assert "new text is lines 2-2" in replace_lines_raw(str(target), 2, 2, "김철수,41")
+        assert target.read_bytes() == "이름,나이\n김철수,41\n".encode("cp949")
+        assert read_file_raw(str(target)) == "이름,나이\n김철수,41\n"
+
+        stale = replace_lines_raw(str(target), 1, 1, "x", expected_hash="0" * 16)
+        assert "Current lines:\n이름,나이" in stale
+
+        assert "cp949" in replace_lines_raw(str(target), 1, 1, "🙂")
+        assert target.read_bytes() == "이름,나이\n김철수,41\n".encode("cp949")
+
+    def test_replace_lines_refuses_utf16_and_binary(self, tmp_path):
+        target = tmp_path / "notes.txt"
+        target.write_text("a\nb\nc\n", encoding="utf-16")
+        original = target.read_bytes()
+
+        result = replace_lines_raw(str(target), 2, 2, "x")
+        assert result.startswith("Error: ") and "utf-16" in result and "edit_file" in result
+        assert target.read_bytes() == original
+
+        blob = tmp_path / "blob.bin"
+        blob.write_bytes(b"a\n\x00\nb\n")
+        assert replace_lines_raw(str(blob), 1, 1, "x") == f"Error: {blob} is a binary file, not text"
+
+    def test_replace_lines_keeps_single_bom(self, tmp_path):
+        target = tmp_path / "bom.txt"
+        target.write_bytes(codecs.BOM_UTF8 + b"a\nb\n")
+
+        replace_lines_raw(str(target), 2, 2, "\u03b2")
+        assert target.read_bytes() == codecs.BOM_UTF8 + "a\n\u03b2\n".encode("utf-8")
+
+    def test_read_many_cp949(self, tmp_path):
+        target = tmp_path / "data.csv"
+        target.write_bytes(KOREAN.encode("cp949"))
+        blob = tmp_path / "blob.bin"
+        blob.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00")
+
+        result = read_many_files_raw([str(target), str(blob)])
+        assert KOREAN in result
+        assert "Binary file, not text" in result
+
+    def test_multi_edit_keeps_cp949(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        target = tmp_path / "data.csv"
+        target.write_bytes(KOREAN.encode("cp949"))
+
+        assert apply_edits_raw(str(target), [{"old_str": "홍길동", "new_str": "김철수"}]).startswith("Successfully")
+        assert target.read_bytes() == KOREAN.replace("홍길동", "김철수").encode("cp949")
+        assert read_file_raw(str(target)) == KOREAN.replace("홍길동", "김철수")
+
+        patch_text = "--- a/data.csv\n+++ b/data.csv\n@@ -2 +2 @@\n-김철수,30\n+김철수,41\n"
+        assert apply_patch_raw(patch_text).startswith("Applied patch to 1 files")
+        assert target.read_bytes() == "이름,나이\n김철수,41\n".encode("cp949")
+
+    def test_multi_edit_unencodable_and_binary(self, tmp_path):
+        target = tmp_path / "data.csv"
+        target.write_bytes(KOREAN.encode("cp949"))
+
+        result = apply_edits_raw(str(target), [{"old_str": "30", "new_str": "🙂"}])
+        assert result.startswith("Error: ") and "cp949" in result
+        assert target.read_bytes() == KOREAN.encode("cp949")
+
+        blob = tmp_path / "blob.bin"
+        blob.write_bytes(b"a\n\x00\nb\n")
+        assert apply_edits_raw(str(blob), [{"old_str": "a", "new_str": "x"}]) == f"Error: {blob} is a binary file, not text"
@@ -18,6 +18,10 @@ from nano_agent.modules.token_tracking import (
     MODEL_PRICING,
     format_token_count,
     format_cost,
+    aggregate_token_summaries,
+    TokenLedger,
+    RUN_STATUS_CANCELLED,
+    RUN_STATUS_COMPLETED,
 )
 
 
@@ -363,6 +367,64 @@ class TestFormatting:
         assert format_cost(100.789) == "$100.79"
 
 
+class TestAggregateTokenSummaries:
+    """Test aggregation of per-run summaries."""
+    
+    def test_aggregate_sums_counts_and_costs(self):
+        """Totals are summed across runs, tolerating missing keys."""
+        summaries = [
+            {"total_tokens": 150, "input_tokens": 100, "output_tokens": 50, "total_cost": 0.01},
+            {"total_tokens": 300, "input_tokens": 200, "output_tokens": 100, "total_cost": 0.02,
+             "cached_tokens": 40, "cached_savings": 0.001},
+        ]
+        
+        totals = aggregate_token_summaries(summaries)
+        
+        assert totals["runs"] == 2
+        assert totals["total_tokens"] == 450
+        assert totals["input_tokens"] == 300
+        assert totals["output_tokens"] == 150
+        assert totals["cached_tokens"] == 40
+        assert totals["total_cost"] == pytest.approx(0.03)
+    
+    def test_aggregate_empty(self):
+        """No runs yields zero totals."""
+        totals = aggregate_token_summaries([])
+        assert totals["runs"] == 0
+        assert totals["total_tokens"] == 0
+
+
+class TestTokenLedger:
+    """Test the per-outcome token ledger."""
+    
+    def test_totals_by_status(self):
+        """Usage is summed per status and overall."""
+        ledger = TokenLedger()
+        ledger.record("m", "openai", RUN_STATUS_COMPLETED, {"total_tokens": 100, "total_cost": 0.01})
+        ledger.record("m", "openai", RUN_STATUS_COMPLETED, {"total_tokens": 50, "total_cost": 0.005})
+        ledger.record("m", "openai", RUN_STATUS_CANCELLED, {"total_tokens": 30, "total_cost": 0.002})
+        
+        summary = ledger.get_summary()
+        
+        assert summary["by_status"][RUN_STATUS_COMPLETED]["runs"] == 2
+        assert summary["by_status"][RUN_STATUS_COMPLETED]["total_tokens"] == 150
+        assert summary["by_status"][RUN_STATUS_CANCELLED]["total_tokens"] == 30
+        assert summary["totals"]["runs"] == 3
+        assert summary["totals"]["total_cost"] == pytest.approx(0.017)
+        assert [e.status for e in ledger.recent(RUN_STATUS_CANCELLED)] == [RUN_STATUS_CANCELLED]
+    
+    def test_recent_entries_bounded(self):
+        """Only the newest entries are kept, totals still cover all runs."""
+        ledger = TokenLedger(max_entries=2)
+        for i in range(5):
+            ledger.record("m", "openai", RUN_STATUS_COMPLETED, {"total_tokens": i})
+        
+        assert len(ledger.recent()) == 2
+        assert ledger.get_summary()["totals"]["total_tokens"] == 10
+        ledger.reset()
+        assert ledger.get_summary()["totals"]["runs"] == 0
+
+
 class TestModelPricing:
     """Test model pricing configuration."""
     
@@ -0,0 +1,118 @@
+"""
+Tests for per-run tool call records.
+"""
+
+import asyncio
+
+import pytest
+
+from nano_agent.modules.files import Workspace, workspace_scope
+from nano_agent.modules.nano_agent_tools import read_file, list_directory, write_file
+from nano_agent.modules.tool_calls import ToolCallLog, get_tool_call_log, tool_call_log_scope
+
+
+class TestToolCallLog:
+    """Test record bookkeeping."""
+
+    def test_start_finish_and_summary(self):
+        """Records keep args, timing and result size; summary aggregates per tool."""
+        log = ToolCallLog()
+        record = log.start("call_1", "read_file", {"file_path": "a.py"})
+        log.finish(record, result="hello")
+        failed = log.start(None, "read_file", {"file_path": "b.py"})
+        log.finish(failed, error=OSError("boom"))
+
+        assert log.get("call_1") is record
+        assert record.result_size == 5
+        assert record.duration_seconds >= 0
+        assert failed.call_id == "local-2"
+        assert failed.error == "OSError: boom"
+        summary = log.get_summary()
+        assert summary["count"] == 2
+        assert summary["by_tool"]["read_file"]["calls"] == 2
+        assert summary["by_tool"]["read_file"]["errors"] == 1
+
+    def test_scope_restores_previous_log(self):
+        """Leaving a scope restores the outer log."""
+        assert get_tool_call_log() is None
+        with tool_call_log_scope() as outer:
+            with tool_call_log_scope() as inner:
+                assert get_tool_call_log() is inner
+            assert get_tool_call_log() is outer
+        assert get_tool_call_log() is None
+
+
+class TestToolRecording:
+    """Test that tools record into the log of their own run."""
+
+    @pytest.mark.asyncio
+    async def test_tool_records_call_by_id(self, tmp_path, invoke):
+        """Arguments and result size are recorded under the SDK call id."""
+        target = tmp_path / "notes.txt"
+        target.write_text("twelve chars")
+
+        with tool_call_log_scope() as log:
+            result = await invoke(read_file, "call_abc", file_path=str(target))
+
+        record = log.get("call_abc")
+        assert result == "twelve chars"
+        assert record.tool_name == "read_file"
+        assert record.arguments == {"file_path": str(target)}
+        assert record.result_size == len(result)
+        assert record.ended_at >= record.started_at
+
+    @pytest.mark.asyncio
+    async def test_default_arguments_not_recorded(self, tmp_path, monkeypatch, invoke):
+        """Arguments left at their default are omitted."""
+        monkeypatch.chdir(tmp_path)
+        with tool_call_log_scope() as log:
+            await invoke(list_directory, "call_ls")
+
+        assert log.get("call_ls").arguments == {}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_runs_are_isolated(self, tmp_path, invoke):
+        """Concurrent runs only see their own calls."""
+        for name in ("a", "b"):
+            (tmp_path / f"{name}.txt").write_text(name)
+
+        async def run(name):
+            with tool_call_log_scope() as log:
+                await asyncio.gather(*[
+                    invoke(read_file, f"{name}-{i}", file_path=str(tmp_path / f"{name}.txt"))
+                    for i in range(5)
+                ])
+            return log
+
+        log_a, log_b = await asyncio.gather(run("a"), run("b"))
+
+        assert len(log_a) == 5 and len(log_b) == 5
+        assert all(r.call_id.startswith("a-") for r in log_a.records)
+        assert all(r.arguments["file_path"].endswith("b.txt") for r in log_b.records)
+
+    @pytest.mark.asyncio
+    async def test_no_log_outside_a_run(self, tmp_path, invoke):
+        """Tools still work when no run installed a log."""
+        target = tmp_path / "x.txt"
+        target.write_text("x")
+
+        assert await invoke(read_file, "call_x", file_path=str(target)) == "x"
+
+    @pytest.mark.asyncio
+    async def test_unresolvable_paths_are_tool_errors(self, tmp_path, invoke):
+        """A path that can't be locked is the tool's error string, and the call is still recorded."""
+        (tmp_path / "inside.txt").write_text("in")
+        outside = tmp_path.parent / f"{tmp_path.name}-outside.txt"
+
+        with workspace_scope(Workspace(tmp_path, confine=True)), tool_call_log_scope() as log:
+            nul = await invoke(read_file, "call_nul", file_path="bad\0dir/name.txt")
+            escaped = await invoke(write_file, "call_out", file_path=str(outside), content="x")
+            inside = await invoke(read_file, "call_in", file_path="inside.txt")
+
+        assert nul == "Error: Invalid path: embedded null byte"
+        assert escaped.startswith("Error: Invalid path: Path is outside the workspace")
+        assert not outside.exists()
+        assert inside == "in"
+        assert log.get_summary()["count"] == 3
+        assert all(r.ended_at is not None and r.error is None for r in log.records)
+        assert log.get("call_out").result_size == len(escaped)
@@ -0,0 +1,150 @@
+"""
+Tests for the tool execution layer.
+
+Includes a small benchmark comparing event-loop lag while blocking tools run
+inline in the loop versus on the tool thread pool.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from nano_agent.modules.tool_executor import ToolExecutor, get_tool_executor, get_tool_workers
+from nano_agent.modules.constants import DEFAULT_TOOL_WORKERS
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.fixture
+def executor():
+    """Executor with a small pool, shut down after the test."""
+    executor = ToolExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+class TestToolExecutor:
+    """Test dispatching and statistics."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_loop_thread(self, executor):
+        """Tool bodies run on a pool thread and return their result."""
+        loop_thread = threading.get_ident()
+
+        result = await executor.run("probe", lambda: threading.get_ident())
+
+        assert result != loop_thread
+        stats = executor.get_stats()
+        assert stats["tools"]["probe"]["calls"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_context_is_propagated(self, executor):
+        """Context variables of the caller are visible in the tool."""
+        request_id.set("run-42")
+        assert await executor.run("probe", request_id.get) == "run-42"
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_counted(self, executor):
+        """Exceptions reach the caller and count as errors."""
+        def fail():
+            raise ValueError("bad")
+
+        with pytest.raises(ValueError):
+            await executor.run("fail", fail)
+        assert executor.get_stats()["tools"]["fail"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_and_wait_time(self, executor):
+        """Calls beyond the pool size queue up and record their wait."""
+        calls = [executor.run("slow", time.sleep, 0.05) for _ in range(6)]
+        gathered = asyncio.gather(*calls)
+        await asyncio.sleep(0.01)
+        assert executor.queue_depth == 4
+
+        await gathered
+        stats = executor.get_stats()
+        assert stats["max_queue_depth"] >= 4
+        assert stats["queue_depth"] == 0
+        assert stats["tools"]["slow"]["max_wait_seconds"] >= 0.08
+
+    @pytest.mark.asyncio
+    async def test_cancelled_queued_call_never_runs(self, executor):
+        """A call cancelled while queued is dropped."""
+        ran = []
+        blockers = [asyncio.ensure_future(executor.run("slow", time.sleep, 0.05)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(executor.run("late", ran.append, 1))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await asyncio.gather(*blockers)
+        await asyncio.sleep(0.01)
+
+        assert ran == []
+        assert executor.queue_depth == 0
+
+    def test_pool_size_from_env(self, monkeypatch):
+        """NANO_AGENT_TOOL_WORKERS overrides the default, invalid values are ignored."""
+        monkeypatch.setenv("NANO_AGENT_TOOL_WORKERS", "3")
+        assert get_tool_workers() == 3
+        monkeypatch.setenv("NANO_AGENT_TOOL_WORKERS", "zero")
+        assert get_tool_workers() == DEFAULT_TOOL_WORKERS
+
+    def test_process_wide_executor(self):
+        """The module-level executor is a singleton."""
+        assert get_tool_executor() is get_tool_executor()
+
+
+async def measure_loop_lag(workload, interval: float = 0.005) -> float:
+    """Run workload while a ticker measures the worst event-loop lag."""
+    worst = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal worst
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            worst = max(worst, time.perf_counter() - start - interval)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    await workload()
+    done.set()
+    await tick
+    return worst
+
+
+class TestEventLoopLagBenchmark:
+    """Blocking tools inline vs. on the tool pool."""
+
+    @pytest.mark.asyncio
+    async def test_pool_keeps_loop_responsive(self):
+        """Concurrent blocking tools stall the loop only when run inline."""
+        def blocking_tool():
+            time.sleep(0.03)
+            return "ok"
+
+        async def inline_tool():
+            return blocking_tool()
+
+        executor = ToolExecutor(max_workers=8)
+        try:
+            inline_lag = await measure_loop_lag(
+                lambda: asyncio.gather(*[inline_tool() for _ in range(8)])
+            )
+            pooled_lag = await measure_loop_lag(
+                lambda: asyncio.gather(*[executor.run("blocking", blocking_tool) for _ in range(8)])
+            )
+        finally:
+            executor.shutdown()
+
+        print(f"\nWorst event-loop lag with 8 concurrent 30ms tools: "
+              f"inline={inline_lag * 1000:.1f}ms pooled={pooled_lag * 1000:.1f}ms")
+
+        assert inline_lag > 0.2
+        assert pooled_lag < inline_lag / 4
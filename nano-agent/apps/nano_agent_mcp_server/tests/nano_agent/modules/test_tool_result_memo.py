@@ -0,0 +1,112 @@
+"""
+Tests for the run-scoped memo of read-only tool results.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from nano_agent.modules import nano_agent_tools
+from nano_agent.modules.nano_agent_tools import ToolResultMemo, tool_result_memo_scope
+
+
+def counting(func):
+    """Wrap a raw tool to count real executions."""
+    calls = []
+
+    def wrapper(**kwargs):
+        calls.append(kwargs)
+        return func(**kwargs)
+
+    return wrapper, calls
+
+
+class TestToolResultMemo:
+    """Test memo hits, misses and invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_reads_hit(self, tmp_path, invoke):
+        """Reading an unchanged file again is served from the memo."""
+        target = tmp_path / "a.txt"
+        target.write_text("hello")
+        raw, calls = counting(nano_agent_tools.read_file_raw)
+
+        with patch.object(nano_agent_tools, "read_file_raw", raw), tool_result_memo_scope() as memo:
+            first = await invoke(nano_agent_tools.read_file, file_path=str(target))
+            second = await invoke(nano_agent_tools.read_file, file_path=str(target))
+            await invoke(nano_agent_tools.get_file_info, file_path=str(target))
+
+        assert first == second == "hello"
+        assert len(calls) == 1
+        assert memo.get_stats() == {"hits": 1, "misses": 2, "invalidations": 0, "entries": 2}
+
+    @pytest.mark.asyncio
+    async def test_external_change_is_detected(self, tmp_path, invoke):
+        """A change in size or mtime makes the entry stale."""
+        target = tmp_path / "a.txt"
+        target.write_text("one")
+
+        with tool_result_memo_scope() as memo:
+            await invoke(nano_agent_tools.read_file, file_path=str(target))
+            target.write_text("three")
+            os.utime(target, ns=(1, 1))
+            assert await invoke(nano_agent_tools.read_file, file_path=str(target)) == "three"
+
+        assert memo.hits == 0
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_file(self, tmp_path, invoke):
+        """edit_file drops the file's entry; listings are always fresh."""
+        target = tmp_path / "a.txt"
+        target.write_text("old value")
+
+        with tool_result_memo_scope() as memo:
+            await invoke(nano_agent_tools.read_file, file_path=str(target))
+            await invoke(nano_agent_tools.list_directory, directory_path=str(tmp_path))
+            await invoke(nano_agent_tools.edit_file, file_path=str(target), old_str="old", new_str="new")
+            content = await invoke(nano_agent_tools.read_file, file_path=str(target))
+            listing = await invoke(nano_agent_tools.list_directory, directory_path=str(tmp_path))
+
+        assert content == "new value"
+        assert f"a.txt ({len('new value')} bytes)" in listing
+        assert memo.invalidations == 1
+        assert memo.hits == 0
+
+    @pytest.mark.asyncio
+    async def test_listing_sees_external_size_changes(self, tmp_path, invoke):
+        """A file growing outside the tools shows in the next listing of its directory."""
+        target = tmp_path / "a.txt"
+        target.write_text("x")
+
+        with tool_result_memo_scope():
+            await invoke(nano_agent_tools.list_directory, directory_path=str(tmp_path))
+            directory_version = os.stat(tmp_path).st_mtime_ns
+            target.write_text("grown")
+            assert os.stat(tmp_path).st_mtime_ns == directory_version
+            listing = await invoke(nano_agent_tools.list_directory, directory_path=str(tmp_path))
+
+        assert "a.txt (5 bytes)" in listing
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_memoized(self, tmp_path, invoke):
+        """Missing files are looked up again every time."""
+        raw, calls = counting(nano_agent_tools.read_file_raw)
+        missing = str(tmp_path / "missing.txt")
+
+        with patch.object(nano_agent_tools, "read_file_raw", raw), tool_result_memo_scope() as memo:
+            await invoke(nano_agent_tools.read_file, file_path=missing)
+            await invoke(nano_agent_tools.read_file, file_path=missing)
+
+        assert len(calls) == 2
+        assert memo.get_stats()["entries"] == 0
+
+    def test_invalidate_counts(self):
+        """Invalidation removes entries of the path and its parent."""
+        memo = ToolResultMemo()
+        memo.store("read_file", "/w/a.txt", (1, 1), "x")
+        memo.store("list_directory", "/w", (1, 1), "listing")
+        memo.store("read_file", "/w/b.txt", (1, 1), "y")
+
+        assert memo.invalidate("/w/a.txt") == 2
+        assert memo.lookup("read_file", "/w/b.txt", (1, 1)) == "y"
@@ -0,0 +1,156 @@
+"""
+Tests for chunked write sessions and the open_write/append_chunk/commit_write tools.
+"""
+
+import re
+import threading
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+from nano_agent.modules import nano_agent_tools
+from nano_agent.modules.nano_agent_tools import append_chunk_raw, commit_write_raw, open_write_raw
+from nano_agent.modules.write_sessions import WriteSessionRegistry
+
+
+def session_id_of(result):
+    return re.search(r"session ([0-9a-f]{12})", result).group(1)
+
+
+class TestWriteSessionRegistry:
+    """Test session lifecycle."""
+
+    def test_target_unchanged_until_commit(self, tmp_path):
+        target = tmp_path / "out.txt"
+        target.write_text("old\n")
+        sessions = WriteSessionRegistry()
+
+        session = sessions.open(target)
+        sessions.append(session.session_id, "new ")
+        sessions.append(session.session_id, "content\n")
+        assert target.read_text() == "old\n"
+
+        result, error = sessions.commit(session.session_id)
+        assert error is None
+        assert (result.size, result.chunks, result.changed) == (12, 2, True)
+        assert target.read_text() == "new content\n"
+        assert [p.name for p in tmp_path.iterdir()] == ["out.txt"]
+        assert sessions.commit(session.session_id)[1].startswith("No open write session")
+
+    def test_identical_content_is_not_rewritten(self, tmp_path):
+        target = tmp_path / "out.txt"
+        target.write_text("same")
+        mtime = target.stat().st_mtime_ns
+        sessions = WriteSessionRegistry()
+
+        session = sessions.open(target)
+        sessions.append(session.session_id, "sa")
+        sessions.append(session.session_id, "me")
+        result, _ = sessions.commit(session.session_id)
+
+        assert result.changed is False
+        assert target.stat().st_mtime_ns == mtime
+
+    def test_abort_expiry_and_limits(self, tmp_path):
+        sessions = WriteSessionRegistry(max_open=2, idle_seconds=60, max_bytes=10)
+        first = sessions.open(tmp_path / "a.txt")
+        assert sessions.append(first.session_id, "x" * 11)[1] == "The file would exceed 10 bytes"
+        assert sessions.abort(first.session_id)
+
+        ids = [sessions.open(tmp_path / f"{i}.txt").session_id for i in range(3)]
+        assert sessions.get(ids[0]) is None  # least recently used beyond max_open
+        assert sessions.get_stats()["expired"] == 1
+
+        sessions.idle_seconds = 0
+        time.sleep(0.01)
+        assert sessions.get(ids[2]) is None
+        assert not [p for p in tmp_path.iterdir()]
+
+    def test_expiry_waits_for_append_and_blocks_later_ones(self, tmp_path):
+        sessions = WriteSessionRegistry(idle_seconds=60)
+        session = sessions.open(tmp_path / "a.txt")
+
+        # An append holding the session lock delays the discard until it finishes
+        session.lock.acquire()
+        sessions.idle_seconds = 0
+        time.sleep(0.01)
+        expiry = threading.Thread(target=sessions.get, args=(session.session_id,))
+        expiry.start()
+        expiry.join(0.05)
+        assert expiry.is_alive() and not session.closed
+        session.lock.release()
+        expiry.join()
+        assert session.closed
+
+        # A writer that looked the session up before it expired gets an error, not a crash
+        with patch.object(sessions, "get", return_value=session):
+            _, error = sessions.append(session.session_id, "late")
+        assert error.startswith("No open write session")
+        assert not list(tmp_path.iterdir())
+
+    def test_close_all_removes_temp_files(self, tmp_path):
+        sessions = WriteSessionRegistry()
+        for name in ("a.txt", "b.txt"):
+            sessions.append(sessions.open(tmp_path / name).session_id, "partial")
+        assert len(list(tmp_path.iterdir())) == 2
+
+        assert sessions.close_all() == 2
+        assert not list(tmp_path.iterdir())
+        assert sessions.get_stats()["open"] == 0
+
+    def test_memory_stays_flat(self, tmp_path):
+        """Writing 32 MiB in 1 MiB chunks holds about one chunk in memory."""
+        sessions = WriteSessionRegistry(max_bytes=64 * 1024 * 1024)
+        chunk = "0123456789abcdef" * 65536
+        session = sessions.open(tmp_path / "big.txt")
+
+        tracemalloc.start()
+        try:
+            for _ in range(32):
+                sessions.append(session.session_id, chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        sessions.commit(session.session_id)
+
+        assert (tmp_path / "big.txt").stat().st_size == 32 * len(chunk)
+        assert peak < 3 * len(chunk)
+
+
+class TestWriteSessionTools:
+    """Test the tool bodies and their locking wrappers."""
+
+    def test_raw_round_trip(self, tmp_path):
+        target = tmp_path / "sub" / "spec.md"
+        opened = open_write_raw(str(target))
+        session_id = session_id_of(opened)
+        assert f"append_chunk(session_id='{session_id}'" in opened
+
+        assert append_chunk_raw(session_id, "# Spec\n").endswith("(chunk 1, 7 bytes so far)")
+        append_chunk_raw(session_id, "body\n")
+        result = commit_write_raw(session_id)
+
+        assert result.startswith("Successfully wrote 12 bytes") and result.endswith("from 2 chunks")
+        assert target.read_text() == "# Spec\nbody\n"
+
+    def test_discard_and_unknown_session(self, tmp_path):
+        target = tmp_path / "keep.txt"
+        target.write_text("keep")
+        session_id = session_id_of(open_write_raw(str(target)))
+        append_chunk_raw(session_id, "replace")
+
+        assert commit_write_raw(session_id, discard=True).startswith("Discarded write session")
+        assert target.read_text() == "keep"
+        assert append_chunk_raw(session_id, "x").startswith("Error: No open write session")
+
+    @pytest.mark.asyncio
+    async def test_function_tools(self, tmp_path, invoke):
+        target = tmp_path / "gen.dart"
+        session_id = session_id_of(await invoke(nano_agent_tools.open_write, file_path=str(target)))
+        for i in range(3):
+            await invoke(nano_agent_tools.append_chunk, session_id=session_id, content=f"// part {i}\n")
+        result = await invoke(nano_agent_tools.commit_write, session_id=session_id)
+        assert result.endswith("from 3 chunks")
+        assert target.read_text() == "// part 0\n// part 1\n// part 2\n"